@@ -180,7 +180,7 @@ export default function HomePageClient() {
 			store.registerEndpoint({
 				id: "ddl-reminder",
 				url: "/api/notifications",
-				interval: 10000, // 10秒轮询一次，显著短于后端检查间隔（30秒）
+				interval: 10000, // 优先使用 SSE 推送；推送不可用时 10 秒轮询一次
 				enabled: true, // 默认启用
 			});
 			console.log("[DDL提醒轮询] 已注册，间隔: 10秒");
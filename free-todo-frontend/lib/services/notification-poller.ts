@@ -1,4 +1,5 @@
 import { unwrapApiData } from "@/lib/api/fetcher";
+import { snakeToCamel } from "@/lib/generated/case-transform";
 import { getNotificationApiNotificationsGet } from "@/lib/generated/notifications/notifications";
 import { listTodosApiTodosGet } from "@/lib/generated/todos/todos";
 import type {
@@ -17,8 +18,18 @@ interface NotificationResponse {
 	todoId?: number;
 }
 
+// 后端通知推送（SSE）地址；与聊天流式接口一样直连后端，避免 Next.js 代理缓冲
+const NOTIFICATION_STREAM_PATH = "/api/notifications/stream";
+const NOTIFICATION_ENDPOINT_PATH = "/api/notifications";
+
+function getStreamApiBaseUrl(): string {
+	return process.env.NEXT_PUBLIC_API_URL || "http://localhost:8100";
+}
+
 class NotificationPoller {
 	private timers: Map<string, NodeJS.Timeout> = new Map();
+	private streams: Map<string, EventSource> = new Map();
+	private activeEndpoints: Map<string, PollingEndpoint> = new Map();
 	private isPageVisible: boolean = true;
 
 	constructor() {
@@ -47,7 +58,59 @@ class NotificationPoller {
 		if (!endpoint.enabled) {
 			return;
 		}
+		this.activeEndpoints.set(endpoint.id, endpoint);
+
+		// 标准通知端点优先使用服务端推送，连接失败时回退到轮询
+		if (
+			endpoint.url === NOTIFICATION_ENDPOINT_PATH &&
+			typeof EventSource !== "undefined"
+		) {
+			this.subscribeEndpoint(endpoint);
+			return;
+		}
+
+		this.startPolling(endpoint);
+	}
+
+	/**
+	 * 通过 SSE 订阅通知列表，首次连接前出错则回退到轮询
+	 */
+	private subscribeEndpoint(endpoint: PollingEndpoint): void {
+		const source = new EventSource(
+			`${getStreamApiBaseUrl()}${NOTIFICATION_STREAM_PATH}`,
+		);
+		let connected = false;
+
+		source.addEventListener("notifications", (event) => {
+			connected = true;
+			try {
+				const rawList = snakeToCamel<NotificationResponse[]>(
+					JSON.parse((event as MessageEvent<string>).data),
+				);
+				this.applyNotifications(endpoint, rawList);
+			} catch (error) {
+				console.warn(
+					`Failed to parse notifications from ${endpoint.id}:`,
+					error,
+				);
+			}
+		});
+		source.onerror = () => {
+			// 已连接过时由 EventSource 自动重连；从未连上说明后端不支持，改为轮询
+			if (!connected) {
+				source.close();
+				this.streams.delete(endpoint.id);
+				this.startPolling(endpoint);
+			}
+		};
+
+		this.streams.set(endpoint.id, source);
+	}
 
+	/**
+	 * 启动定时轮询
+	 */
+	private startPolling(endpoint: PollingEndpoint): void {
 		// 立即执行一次
 		this.pollEndpoint(endpoint);
 
@@ -70,6 +133,12 @@ class NotificationPoller {
 			clearInterval(timer);
 			this.timers.delete(id);
 		}
+		const stream = this.streams.get(id);
+		if (stream) {
+			stream.close();
+			this.streams.delete(id);
+		}
+		this.activeEndpoints.delete(id);
 	}
 
 	/**
@@ -98,27 +167,37 @@ class NotificationPoller {
 					? [notificationData]
 					: [];
 
-			const notifications: Notification[] = rawList
-				.filter((item) => item && (item.title || item.content))
-				.map((item, index) => ({
-					id:
-						item.id ||
-						`${endpoint.id}-${item.timestamp || Date.now()}-${index}`,
-					title: item.title,
-					content: item.content,
-					timestamp: item.timestamp || new Date().toISOString(),
-					source: endpoint.id,
-					todoId: item.todoId,
-				}));
-
-			const store = useNotificationStore.getState();
-			store.setNotificationsFromSource(endpoint.id, notifications);
+			this.applyNotifications(endpoint, rawList);
 		} catch (error) {
 			// 静默处理错误，避免频繁失败请求
 			console.warn(`Failed to poll endpoint ${endpoint.id}:`, error);
 		}
 	}
 
+	/**
+	 * 将后端通知列表写入通知 store
+	 */
+	private applyNotifications(
+		endpoint: PollingEndpoint,
+		rawList: NotificationResponse[],
+	): void {
+		const notifications: Notification[] = rawList
+			.filter((item) => item && (item.title || item.content))
+			.map((item, index) => ({
+				id:
+					item.id ||
+					`${endpoint.id}-${item.timestamp || Date.now()}-${index}`,
+				title: item.title,
+				content: item.content,
+				timestamp: item.timestamp || new Date().toISOString(),
+				source: endpoint.id,
+				todoId: item.todoId,
+			}));
+
+		const store = useNotificationStore.getState();
+		store.setNotificationsFromSource(endpoint.id, notifications);
+	}
+
 	/**
 	 * 轮询 draft todo 端点
 	 */
@@ -210,7 +289,8 @@ class NotificationPoller {
 		const store = useNotificationStore.getState();
 		const endpoints = store.getAllEndpoints();
 		for (const endpoint of endpoints) {
-			if (endpoint.enabled) {
+			// 推送连接无需补拉
+			if (endpoint.enabled && !this.streams.has(endpoint.id)) {
 				this.pollEndpoint(endpoint);
 			}
 		}
@@ -224,12 +304,27 @@ class NotificationPoller {
 			clearInterval(timer);
 		}
 		this.timers.clear();
+		for (const stream of this.streams.values()) {
+			stream.close();
+		}
+		this.streams.clear();
+		this.activeEndpoints.clear();
 	}
 
 	/**
 	 * 更新端点配置
 	 */
 	updateEndpoint(endpoint: PollingEndpoint): void {
+		// 配置未变化时保持现有定时器/推送连接（store 任意变化都会触发同步）
+		const active = this.activeEndpoints.get(endpoint.id);
+		if (
+			active &&
+			endpoint.enabled &&
+			active.url === endpoint.url &&
+			active.interval === endpoint.interval
+		) {
+			return;
+		}
 		this.unregisterEndpoint(endpoint.id);
 		if (endpoint.enabled) {
 			this.registerEndpoint(endpoint);
@@ -2,4 +2,9 @@
 LifeTrace - A cross-platform screen recording and activity tracking application
 """
 
+from lifetrace.util.import_profiler import install_if_requested
+
 __version__ = "0.1.0"
+
+# 启用导入耗时分析时需在其他 lifetrace 模块导入前安装（--profile-imports）
+install_if_requested()
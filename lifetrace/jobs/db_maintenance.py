@@ -0,0 +1,258 @@
+"""
+SQLite 数据库维护任务
+
+按各自的间隔在录制器空闲时执行：
+- wal_checkpoint：WAL 模式下把日志写回主库并截断 -wal 文件（非 WAL 模式跳过）
+- optimize：ANALYZE / PRAGMA optimize，刷新查询规划器的统计信息（analysis_limit 限制采样量）
+- incremental_vacuum：回收 CleanDataService 等大量删除后留下的空闲页，使数据库文件缩小；
+  数据库未开启增量回收时，体积不超过 full_vacuum_max_mb 才执行一次完整 VACUUM 并切换为增量模式
+
+单次维护有时长上限：操作之间检查截止时间，操作内部通过 SQLite 进度回调中断
+（被中断的操作自动回滚，数据不受影响）。每次维护记录数据库大小、空闲页与碎片率。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy.exc import OperationalError
+
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.settings import settings
+from lifetrace.util.time_utils import get_utc_now
+
+from .recorder_activity import get_idle_seconds
+
+if TYPE_CHECKING:
+    from sqlalchemy import Connection, Engine
+
+    from lifetrace.storage.schema_manager import SchemaState
+
+logger = get_logger()
+
+OPERATIONS = ("wal_checkpoint", "optimize", "incremental_vacuum")
+STATE_KEY_PREFIX = "maintenance."
+LAST_REPORT_KEY = "maintenance.last_report"
+# SQLite 每执行这么多条虚拟机指令回调一次进度函数
+PROGRESS_HANDLER_STEPS = 1000
+AUTO_VACUUM_INCREMENTAL = 2
+BYTES_PER_MB = 1024 * 1024
+
+
+class MaintenanceInterruptedError(Exception):
+    """维护操作超出时长上限被中断"""
+
+
+def collect_database_metrics(conn: Connection) -> dict[str, Any]:
+    """数据库大小、空闲页与碎片率"""
+
+    def pragma(name: str) -> Any:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+    page_size = pragma("page_size") or 0
+    page_count = pragma("page_count") or 0
+    freelist_count = pragma("freelist_count") or 0
+    db_path = conn.engine.url.database or ""
+    on_disk = bool(db_path) and os.path.exists(db_path)
+    wal_path = f"{db_path}-wal"
+    return {
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_count": freelist_count,
+        "fragmentation": round(freelist_count / page_count, 4) if page_count else 0.0,
+        "reclaimable_bytes": freelist_count * page_size,
+        "size_bytes": page_count * page_size,
+        "file_size_bytes": os.path.getsize(db_path) if on_disk else 0,
+        "wal_size_bytes": os.path.getsize(wal_path) if on_disk and os.path.exists(wal_path) else 0,
+        "journal_mode": pragma("journal_mode"),
+        "auto_vacuum": pragma("auto_vacuum"),
+    }
+
+
+class DatabaseMaintenanceService:
+    """SQLite 维护服务"""
+
+    def __init__(self, engine: Engine | None = None, state: SchemaState | None = None):
+        if engine is None or state is None:
+            from lifetrace.storage import db_base  # noqa: PLC0415
+
+            engine = engine or db_base.engine
+            state = state or db_base.schema_state
+        self.engine = engine
+        self.state = state
+        self.idle_seconds = settings.get("jobs.db_maintenance.params.idle_seconds", 300)
+        self.max_duration = settings.get("jobs.db_maintenance.params.max_duration_seconds", 20)
+        self.intervals = {
+            "wal_checkpoint": settings.get("jobs.db_maintenance.params.checkpoint_interval", 1800),
+            "optimize": settings.get("jobs.db_maintenance.params.optimize_interval", 86400),
+            "incremental_vacuum": settings.get("jobs.db_maintenance.params.vacuum_interval", 86400),
+        }
+        self.analysis_limit = settings.get("jobs.db_maintenance.params.analysis_limit", 1000)
+        self.pages_per_step = settings.get("jobs.db_maintenance.params.vacuum_pages_per_step", 256)
+        self.min_fragmentation = settings.get(
+            "jobs.db_maintenance.params.vacuum_min_fragmentation", 0.1
+        )
+        self.full_vacuum_max_mb = settings.get("jobs.db_maintenance.params.full_vacuum_max_mb", 256)
+
+    # ===== 调度状态 =====
+
+    def _last_run(self, operation: str) -> datetime | None:
+        value = self.state.get(f"{STATE_KEY_PREFIX}{operation}.last_run")
+        return datetime.fromisoformat(value) if value else None
+
+    def due_operations(self) -> list[str]:
+        """到期的维护操作"""
+        now = get_utc_now()
+        due = []
+        for operation in OPERATIONS:
+            last_run = self._last_run(operation)
+            if last_run is None or now - last_run >= timedelta(seconds=self.intervals[operation]):
+                due.append(operation)
+        return due
+
+    def status(self) -> dict[str, Any]:
+        """当前指标、各操作上次执行时间与上次维护报告"""
+        with self.engine.connect() as conn:
+            metrics = collect_database_metrics(conn)
+        last_report = self.state.get(LAST_REPORT_KEY)
+        return {
+            "metrics": metrics,
+            "idle_seconds": round(get_idle_seconds(), 1),
+            "last_runs": {
+                operation: (
+                    last_run.isoformat() if (last_run := self._last_run(operation)) else None
+                )
+                for operation in OPERATIONS
+            },
+            "last_report": json.loads(last_report) if last_report else None,
+        }
+
+    # ===== 执行 =====
+
+    def execute(self, force: bool = False) -> dict[str, Any]:
+        """执行到期的维护操作（force=True 时忽略空闲判断与间隔）"""
+        idle = get_idle_seconds()
+        if not force and idle < self.idle_seconds:
+            logger.debug(f"录制器空闲 {idle:.0f}s，未达到 {self.idle_seconds}s，跳过数据库维护")
+            return {"skipped": "not_idle", "idle_seconds": round(idle, 1)}
+
+        operations = list(OPERATIONS) if force else self.due_operations()
+        if not operations:
+            return {"skipped": "nothing_due"}
+
+        started = time.monotonic()
+        deadline = started + self.max_duration
+        report: dict[str, Any] = {"started_at": get_utc_now().isoformat(), "operations": {}}
+        # AUTOCOMMIT：VACUUM 不能在事务内执行
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            report["before"] = collect_database_metrics(conn)
+            raw = conn.connection.dbapi_connection
+            raw.set_progress_handler(lambda: time.monotonic() > deadline, PROGRESS_HANDLER_STEPS)
+            try:
+                for operation in operations:
+                    report["operations"][operation] = self._run_operation(conn, operation, deadline)
+            finally:
+                raw.set_progress_handler(None, 0)
+            report["after"] = collect_database_metrics(conn)
+
+        report["duration_seconds"] = round(time.monotonic() - started, 3)
+        self.state.set(LAST_REPORT_KEY, json.dumps(report))
+        logger.info(
+            f"数据库维护完成，用时 {report['duration_seconds']}s，"
+            f"空闲页 {report['before']['freelist_count']} -> {report['after']['freelist_count']}，"
+            f"结果: { {name: op['status'] for name, op in report['operations'].items()} }"
+        )
+        return report
+
+    def _run_operation(self, conn: Connection, operation: str, deadline: float) -> dict[str, Any]:
+        if time.monotonic() >= deadline:
+            return {"status": "deferred"}
+        started = time.monotonic()
+        try:
+            result = getattr(self, f"_{operation}")(conn, deadline)
+        except (MaintenanceInterruptedError, OperationalError) as e:
+            if not isinstance(e, MaintenanceInterruptedError) and "interrupt" not in str(e):
+                logger.error(f"数据库维护操作 {operation} 失败: {e}")
+                return {"status": "failed", "error": str(e)}
+            # 被中断的操作已由 SQLite 回滚，下次空闲时重试
+            logger.warning(f"数据库维护操作 {operation} 超出时长上限，已中断")
+            return {"status": "interrupted"}
+        self.state.set(f"{STATE_KEY_PREFIX}{operation}.last_run", get_utc_now().isoformat())
+        return {"status": "done", "seconds": round(time.monotonic() - started, 3), **result}
+
+    def _wal_checkpoint(self, conn: Connection, _deadline: float) -> dict[str, Any]:
+        journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+        if str(journal_mode).lower() != "wal":
+            return {"skipped": f"journal_mode={journal_mode}"}
+        busy, log_frames, checkpointed = conn.exec_driver_sql(
+            "PRAGMA wal_checkpoint(TRUNCATE)"
+        ).one()
+        return {"busy": bool(busy), "log_frames": log_frames, "checkpointed": checkpointed}
+
+    def _optimize(self, conn: Connection, _deadline: float) -> dict[str, Any]:
+        conn.exec_driver_sql(f"PRAGMA analysis_limit={int(self.analysis_limit)}")
+        has_stats = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+        ).first()
+        # 从未 ANALYZE 过的库先完整收集一次；之后 optimize 只分析统计信息可能过期的表
+        statement = "PRAGMA optimize" if has_stats else "ANALYZE"
+        conn.exec_driver_sql(statement)
+        return {"statement": statement}
+
+    def _incremental_vacuum(self, conn: Connection, deadline: float) -> dict[str, Any]:
+        metrics = collect_database_metrics(conn)
+        if metrics["fragmentation"] < self.min_fragmentation:
+            return {"skipped": "below_min_fragmentation", "fragmentation": metrics["fragmentation"]}
+
+        if metrics["auto_vacuum"] != AUTO_VACUUM_INCREMENTAL:
+            size_mb = metrics["size_bytes"] / BYTES_PER_MB
+            if size_mb > self.full_vacuum_max_mb:
+                return {"skipped": "full_vacuum_too_large", "size_mb": round(size_mb, 1)}
+            # 一次性重写数据库并切换为增量回收模式（之后只需 incremental_vacuum）
+            conn.exec_driver_sql("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.exec_driver_sql("VACUUM")
+            return {"mode": "full", "freed_pages": metrics["freelist_count"]}
+
+        freed = 0
+        remaining = metrics["freelist_count"]
+        while remaining > 0:
+            if time.monotonic() >= deadline:
+                raise MaintenanceInterruptedError
+            current = self._incremental_vacuum_step(conn)
+            if current >= remaining:
+                break
+            freed += remaining - current
+            remaining = current
+        return {"mode": "incremental", "freed_pages": freed}
+
+    def _incremental_vacuum_step(self, conn: Connection) -> int:
+        """回收至多 pages_per_step 个空闲页，返回剩余空闲页数"""
+        # incremental_vacuum 每执行一步只释放一页，必须取完结果才会回收全部页数；
+        # 该语句没有结果列，SQLAlchemy 会直接关闭结果，因此用 DBAPI 游标取完
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA incremental_vacuum({int(self.pages_per_step)})")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        return conn.exec_driver_sql("PRAGMA freelist_count").scalar() or 0
+
+
+@lru_cache(maxsize=1)
+def get_db_maintenance_instance() -> DatabaseMaintenanceService:
+    """获取数据库维护服务单例"""
+    return DatabaseMaintenanceService()
+
+
+def execute_db_maintenance_task():
+    """执行数据库维护任务（供调度器调用的可序列化函数）"""
+    try:
+        return get_db_maintenance_instance().execute()
+    except Exception as e:
+        logger.error(f"执行数据库维护任务失败: {e}", exc_info=True)
+        return {"error": str(e)}
@@ -1,5 +1,11 @@
 """
-Todo 提醒调度（基于 APScheduler 的按时触发）
+Todo 提醒调度
+
+每个待办的每个提醒偏移是 reminders 表中的一行（按 due_at 建索引），
+调度器中只保留一个一次性任务，定在最近一条提醒的时间：
+- 触发时一次取出所有到期提醒（含错过的）批量投递，再定到下一条提醒
+- 待办变更只替换该待办的提醒行并重新定时，不再逐个增删 APScheduler 任务
+- 启动时先补发错过的提醒（在宽限期内，或待办时间尚未到），再重建未来的提醒
 """
 
 from __future__ import annotations
@@ -9,8 +15,8 @@ from typing import Any, cast
 
 from sqlalchemy import or_
 
-from lifetrace.jobs.scheduler import get_scheduler_manager
-from lifetrace.storage import todo_mgr
+from lifetrace.jobs.scheduler import PERSISTENT_JOBSTORE, get_scheduler_manager
+from lifetrace.storage import reminder_mgr, todo_mgr
 from lifetrace.storage.models import Todo
 from lifetrace.storage.notification_storage import add_notification, is_notification_dismissed
 from lifetrace.storage.sql_utils import col
@@ -23,7 +29,19 @@ logger = get_logger()
 
 MINUTES_PER_HOUR = 60
 HOURS_PER_DAY = 24
-REMINDER_JOB_PREFIX = "todo_reminder"
+REMINDER_ENGINE_JOB_ID = "reminder_engine_job"
+DEFAULT_GRACE_SECONDS = 60
+_TODO_FIELDS = (
+    "id",
+    "name",
+    "status",
+    "item_type",
+    "due",
+    "deadline",
+    "dtstart",
+    "start_time",
+    "reminder_offsets",
+)
 
 
 def _normalize_offsets(value: object | None) -> list[int]:
@@ -89,187 +107,228 @@ def _format_remaining(deadline: datetime, now: datetime) -> str:
     return f"{minutes}分钟"
 
 
-def _build_reminder_job_id(todo_id: int, reminder_at: datetime) -> str:
-    return f"{REMINDER_JOB_PREFIX}_{todo_id}_{int(reminder_at.timestamp())}"
-
-
 def _build_notification_id(todo_id: int, reminder_at: datetime) -> str:
     return f"todo_{todo_id}_reminder_{int(reminder_at.timestamp())}"
 
 
-def execute_todo_reminder_job(
-    todo_id: int,
-    reminder_at: str,
-    reminder_offset: int | None = None,
-) -> None:
-    """按时触发的提醒任务（由 APScheduler 直接调度）"""
+def _grace_seconds() -> int:
     try:
-        todo = todo_mgr.get_todo(todo_id)
-        if not todo:
-            logger.info("提醒任务跳过：todo 不存在: %s", todo_id)
-            return
-
-        if todo.get("status") != "active":
-            logger.info("提醒任务跳过：todo 非 active: %s", todo_id)
-            return
-
-        schedule_time = _resolve_schedule_time(todo)
-        if not schedule_time:
-            logger.info("提醒任务跳过：todo 无有效时间: %s", todo_id)
-            return
-
-        schedule_utc = naive_as_utc(schedule_time)
-        reminder_at_dt = _parse_datetime(reminder_at) or schedule_utc
-
-        offset = reminder_offset
-        if offset is None:
-            offset = max(0, int((schedule_utc - reminder_at_dt).total_seconds() // 60))
-
-        expected_reminder_at = schedule_utc - timedelta(minutes=offset)
-        if abs((expected_reminder_at - reminder_at_dt).total_seconds()) >= 1:
-            logger.info(
-                "提醒任务跳过：时间不匹配 todo_id=%s expected=%s actual=%s",
-                todo_id,
-                expected_reminder_at,
-                reminder_at_dt,
-            )
-            return
+        return int(settings.get("scheduler.misfire_grace_time", DEFAULT_GRACE_SECONDS))
+    except (TypeError, ValueError):
+        return DEFAULT_GRACE_SECONDS
 
-        if is_notification_dismissed(todo_id, reminder_at_dt):
-            logger.debug(
-                "提醒任务跳过：通知已取消 todo_id=%s reminder_at=%s",
-                todo_id,
-                reminder_at_dt,
-            )
-            return
 
-        now = get_utc_now()
-        remaining = _format_remaining(schedule_utc, now)
-        notification_id = _build_notification_id(todo_id, reminder_at_dt)
-
-        added = add_notification(
-            notification_id=notification_id,
-            title=todo.get("name") or "",
-            content=f"还有 {remaining}",
-            timestamp=now,
-            todo_id=todo_id,
-            schedule_time=schedule_utc,
-            reminder_at=reminder_at_dt,
-            reminder_offset=offset,
-        )
+def _is_enabled() -> bool:
+    return bool(settings.get("jobs.deadline_reminder.enabled", False))
 
-        if added:
-            logger.info(
-                "生成提醒通知: todo_id=%s, name=%s, time=%s, offset=%s",
-                todo_id,
-                todo.get("name"),
-                schedule_utc,
-                offset,
-            )
-    except Exception as e:
-        logger.error("执行提醒任务失败: %s", e, exc_info=True)
+
+def _snapshot_todo(todo: Todo) -> dict[str, Any]:
+    """在会话内取出投递与计划需要的字段，避免会话关闭后访问过期对象"""
+    return {field: getattr(todo, field, None) for field in _TODO_FIELDS}
 
 
-def schedule_todo_reminders(todo: object) -> list[str]:
-    """为单个 Todo 创建按时提醒任务"""
+def plan_todo_reminders(todo: object, now: datetime, grace_seconds: int) -> list[dict[str, Any]]:
+    """计算单个待办的提醒行
+
+    只保留未来的提醒；刚错过（在宽限期内）的提醒也保留原触发时间，
+    写入后会被提醒任务立即取出投递。
+    """
     todo_id = _get_field(todo, "id")
     schedule_time = _resolve_schedule_time(todo)
-    offsets = _normalize_offsets(_get_field(todo, "reminder_offsets"))
-    scheduler = get_scheduler_manager()
-    can_schedule = (
-        settings.get("jobs.deadline_reminder.enabled", False)
-        and isinstance(todo_id, int)
-        and _get_field(todo, "status") == "active"
-        and schedule_time is not None
-        and offsets
-        and scheduler
-        and scheduler.scheduler
-    )
-    if not can_schedule:
-        if isinstance(todo_id, int) and scheduler and not scheduler.scheduler:
-            logger.warning("调度器未初始化，跳过提醒任务创建: todo_id=%s", todo_id)
+    if not isinstance(todo_id, int) or _get_field(todo, "status") != "active":
         return []
+    if schedule_time is None:
+        return []
+
+    schedule_utc = naive_as_utc(schedule_time)
+    earliest = now - timedelta(seconds=grace_seconds)
+    reminders: dict[datetime, dict[str, Any]] = {}
+    for offset in _normalize_offsets(_get_field(todo, "reminder_offsets")):
+        due_at = schedule_utc - timedelta(minutes=offset)
+        if due_at < earliest:
+            continue
+        reminders.setdefault(
+            due_at,
+            {
+                "todo_id": todo_id,
+                "due_at": due_at,
+                "schedule_time": schedule_utc,
+                "reminder_offset": offset,
+            },
+        )
+    return list(reminders.values())
+
+
+def should_deliver_late(reminder: dict[str, Any], now: datetime, grace_seconds: int) -> bool:
+    """错过的提醒是否仍需补发：在宽限期内，或待办时间还没到"""
+    due_at = naive_as_utc(reminder["due_at"])
+    if (now - due_at).total_seconds() <= grace_seconds:
+        return True
+    return naive_as_utc(reminder["schedule_time"]) > now
+
 
-    todo_id = cast("int", todo_id)
-    schedule_time = cast("datetime", schedule_time)
+def _deliver(todo: object, reminder_at: datetime, offset: int | None) -> bool:
+    """校验待办当前状态后生成提醒通知，返回是否新增了通知"""
+    todo_id = cast("int", _get_field(todo, "id"))
+    if _get_field(todo, "status") != "active":
+        logger.info("提醒跳过：todo 非 active: %s", todo_id)
+        return False
+
+    schedule_time = _resolve_schedule_time(todo)
+    if not schedule_time:
+        logger.info("提醒跳过：todo 无有效时间: %s", todo_id)
+        return False
 
     schedule_utc = naive_as_utc(schedule_time)
+    reminder_at = naive_as_utc(reminder_at)
+    if offset is None:
+        offset = max(0, int((schedule_utc - reminder_at).total_seconds() // 60))
+
+    expected_reminder_at = schedule_utc - timedelta(minutes=offset)
+    if abs((expected_reminder_at - reminder_at).total_seconds()) >= 1:
+        logger.info(
+            "提醒跳过：时间不匹配 todo_id=%s expected=%s actual=%s",
+            todo_id,
+            expected_reminder_at,
+            reminder_at,
+        )
+        return False
+
+    if is_notification_dismissed(todo_id, reminder_at):
+        logger.debug("提醒跳过：通知已取消 todo_id=%s reminder_at=%s", todo_id, reminder_at)
+        return False
+
     now = get_utc_now()
-    grace_seconds = settings.get("scheduler.misfire_grace_time", 60)
-    try:
-        grace_seconds = int(grace_seconds)
-    except (TypeError, ValueError):
-        grace_seconds = 60
-
-    created_jobs: list[str] = []
-    for offset in offsets:
-        reminder_at = schedule_utc - timedelta(minutes=offset)
-        if reminder_at <= now:
-            if (now - reminder_at).total_seconds() <= grace_seconds:
-                reminder_at = now
-            else:
-                continue
-
-        job_id = _build_reminder_job_id(todo_id, reminder_at)
-        scheduler.add_date_job(
-            func=execute_todo_reminder_job,
-            job_id=job_id,
-            name=f"todo_{todo_id}_reminder",
-            run_date=reminder_at,
-            replace_existing=True,
-            todo_id=todo_id,
-            reminder_at=reminder_at.isoformat(),
-            reminder_offset=offset,
+    name = _get_field(todo, "name") or ""
+    added = add_notification(
+        notification_id=_build_notification_id(todo_id, reminder_at),
+        title=name,
+        content=f"还有 {_format_remaining(schedule_utc, now)}",
+        timestamp=now,
+        todo_id=todo_id,
+        schedule_time=schedule_utc,
+        reminder_at=reminder_at,
+        reminder_offset=offset,
+    )
+    if added:
+        logger.info(
+            "生成提醒通知: todo_id=%s, name=%s, time=%s, offset=%s",
+            todo_id,
+            name,
+            schedule_utc,
+            offset,
         )
-        created_jobs.append(job_id)
+    return added
+
 
-    return created_jobs
+def _fetch_todos(todo_ids: set[int]) -> dict[int, dict[str, Any]]:
+    with todo_mgr.db_base.get_session() as session:
+        todos = session.query(Todo).filter(col(Todo.id).in_(todo_ids)).all()
+        return {cast("int", todo.id): _snapshot_todo(todo) for todo in todos}
 
 
-def remove_todo_reminder_jobs(todo_id: int) -> int:
-    """移除指定 Todo 的所有提醒任务"""
+def _arm_timer() -> datetime | None:
+    """把唯一的提醒任务定到最近一条提醒；没有提醒时移除该任务"""
     scheduler = get_scheduler_manager()
     if not scheduler or not scheduler.scheduler:
+        return None
+
+    next_due = reminder_mgr.next_due_at()
+    if next_due is None:
+        if scheduler.get_job(REMINDER_ENGINE_JOB_ID):
+            scheduler.remove_job(REMINDER_ENGINE_JOB_ID)
+        return None
+
+    run_date = max(naive_as_utc(next_due), get_utc_now())
+    scheduler.add_date_job(
+        func=run_due_reminders,
+        job_id=REMINDER_ENGINE_JOB_ID,
+        name="待办提醒",
+        run_date=run_date,
+        replace_existing=True,
+        # 晚于触发时间执行时由 run_due_reminders 自行决定补发或跳过
+        job_options={"misfire_grace_time": None, "jobstore": PERSISTENT_JOBSTORE},
+    )
+    return run_date
+
+
+def run_due_reminders() -> int:
+    """提醒任务：批量投递所有到期提醒，然后定到下一条，返回新增通知数"""
+    delivered = 0
+    try:
+        now = get_utc_now()
+        grace_seconds = _grace_seconds()
+        due = reminder_mgr.pop_due(now)
+        if due:
+            todos = _fetch_todos({reminder["todo_id"] for reminder in due})
+            for reminder in due:
+                todo = todos.get(reminder["todo_id"])
+                if todo is None:
+                    logger.info("提醒跳过：todo 不存在: %s", reminder["todo_id"])
+                    continue
+                if not should_deliver_late(reminder, now, grace_seconds):
+                    logger.info(
+                        "提醒跳过：已错过 todo_id=%s reminder_at=%s",
+                        reminder["todo_id"],
+                        reminder["due_at"],
+                    )
+                    continue
+                if _deliver(todo, reminder["due_at"], reminder["reminder_offset"]):
+                    delivered += 1
+    except Exception as e:
+        logger.error("执行提醒任务失败: %s", e, exc_info=True)
+    finally:
+        _arm_timer()
+    return delivered
+
+
+def schedule_todo_reminders(todo: object) -> int:
+    """写入单个 Todo 的提醒行并重新定时，返回提醒数"""
+    todo_id = _get_field(todo, "id")
+    if not _is_enabled() or not isinstance(todo_id, int):
         return 0
 
-    prefix = f"{REMINDER_JOB_PREFIX}_{todo_id}_"
-    removed = 0
-    for job in scheduler.get_all_jobs():
-        if job.id.startswith(prefix) and scheduler.remove_job(job.id):
-            removed += 1
+    reminders = plan_todo_reminders(todo, get_utc_now(), _grace_seconds())
+    if not reminder_mgr.replace_for_todo(todo_id, reminders):
+        return 0
+    _arm_timer()
+    return len(reminders)
 
+
+def remove_todo_reminder_jobs(todo_id: int) -> int:
+    """移除指定 Todo 的所有提醒"""
+    removed = reminder_mgr.delete_for_todo(todo_id)
     if removed:
-        logger.debug("已移除 %s 个提醒任务: todo_id=%s", removed, todo_id)
+        logger.debug("已移除 %s 个提醒: todo_id=%s", removed, todo_id)
+        _arm_timer()
     return removed
 
 
-def refresh_todo_reminders(todo: object) -> list[str]:
-    """刷新单个 Todo 的提醒任务（先清理再重建）"""
+def refresh_todo_reminders(todo: object) -> int:
+    """刷新单个 Todo 的提醒（只替换该待办的提醒行）"""
     todo_id = _get_field(todo, "id")
-    if isinstance(todo_id, int):
+    if not isinstance(todo_id, int):
+        return 0
+    if not _is_enabled():
         remove_todo_reminder_jobs(todo_id)
+        return 0
     return schedule_todo_reminders(todo)
 
 
 def clear_all_todo_reminder_jobs() -> int:
-    """清理所有按时提醒任务"""
+    """清理所有提醒（提醒行与提醒任务）"""
+    removed = reminder_mgr.clear()
     scheduler = get_scheduler_manager()
-    if not scheduler or not scheduler.scheduler:
-        return 0
-
-    removed = 0
-    for job in scheduler.get_all_jobs():
-        if job.id.startswith(f"{REMINDER_JOB_PREFIX}_") and scheduler.remove_job(job.id):
-            removed += 1
-
+    if scheduler and scheduler.scheduler and scheduler.get_job(REMINDER_ENGINE_JOB_ID):
+        scheduler.remove_job(REMINDER_ENGINE_JOB_ID)
     if removed:
-        logger.info("清理提醒任务: %s", removed)
+        logger.info("清理提醒: %s", removed)
     return removed
 
 
 def sync_all_todo_reminders() -> int:
-    """同步所有待办的提醒任务（启动时调用）"""
-    if not settings.get("jobs.deadline_reminder.enabled", False):
+    """同步所有待办的提醒（启动时调用）"""
+    if not _is_enabled():
         logger.info("DDL 提醒未启用，跳过同步")
         return 0
 
@@ -278,13 +337,17 @@ def sync_all_todo_reminders() -> int:
         logger.warning("调度器未初始化，跳过提醒同步")
         return 0
 
-    clear_all_todo_reminder_jobs()
+    # 先补发停机期间错过的提醒，再按当前待办重建
+    run_due_reminders()
 
+    now = get_utc_now()
+    grace_seconds = _grace_seconds()
     with todo_mgr.db_base.get_session() as session:
         todos = (
             session.query(Todo)
             .filter(
                 col(Todo.status) == "active",
+                col(Todo.reminder_offsets).isnot(None),
                 or_(
                     col(Todo.due).isnot(None),
                     col(Todo.dtstart).isnot(None),
@@ -294,12 +357,13 @@ def sync_all_todo_reminders() -> int:
             )
             .all()
         )
+        reminders = [
+            reminder for todo in todos for reminder in plan_todo_reminders(todo, now, grace_seconds)
+        ]
 
-        created = 0
-        for todo in todos:
-            created += len(schedule_todo_reminders(todo))
-
-    logger.info("提醒任务同步完成: %s", created)
+    created = reminder_mgr.replace_all(reminders)
+    _arm_timer()
+    logger.info("提醒同步完成: %s", created)
     return created
 
 
@@ -7,7 +7,7 @@
 from functools import lru_cache
 
 from lifetrace.core.module_registry import get_module_states
-from lifetrace.jobs.scheduler import SchedulerManager, get_scheduler_manager
+from lifetrace.jobs.scheduler import FAST_EXECUTOR, SchedulerManager, get_scheduler_manager
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.settings import settings
 
@@ -44,6 +44,18 @@ def _execute_clean_data_task():
     return execute_clean_data_task()
 
 
+def _execute_screenshot_transcode_task():
+    from lifetrace.jobs.screenshot_transcoder import execute_screenshot_transcode_task
+
+    return execute_screenshot_transcode_task()
+
+
+def _execute_db_maintenance_task():
+    from lifetrace.jobs.db_maintenance import execute_db_maintenance_task
+
+    return execute_db_maintenance_task()
+
+
 def _execute_deadline_reminder_task():
     from lifetrace.jobs.deadline_reminder import execute_deadline_reminder_task
 
@@ -134,6 +146,12 @@ class JobManager:
         # 启动数据清理任务
         self._start_clean_data_job()
 
+        # 启动截图转码任务
+        self._start_screenshot_transcoder_job()
+
+        # 启动数据库维护任务
+        self._start_db_maintenance_job()
+
         # 启动 DDL 提醒任务
         self._start_deadline_reminder_job()
 
@@ -204,6 +222,7 @@ class JobManager:
                 name=recorder_id,
                 seconds=recorder_interval,
                 replace_existing=True,
+                job_options={"executor": FAST_EXECUTOR},
             )
             logger.info(f"录制器定时任务已添加，间隔: {recorder_interval}秒")
 
@@ -248,6 +267,7 @@ class JobManager:
                 name=todo_recorder_id,
                 seconds=todo_recorder_interval,
                 replace_existing=True,
+                job_options={"executor": FAST_EXECUTOR},
             )
             logger.info(f"Todo 录制器定时任务已添加，间隔: {todo_recorder_interval}秒")
 
@@ -279,6 +299,7 @@ class JobManager:
                 name=ocr_id,
                 seconds=ocr_interval,
                 replace_existing=True,
+                job_options={"executor": FAST_EXECUTOR},
             )
             logger.info(f"OCR定时任务已添加，间隔: {ocr_interval}秒")
 
@@ -362,6 +383,58 @@ class JobManager:
         except Exception as e:
             logger.error(f"启动数据清理服务失败: {e}", exc_info=True)
 
+    def _start_screenshot_transcoder_job(self):
+        """启动截图转码任务（将历史 PNG 迁移为配置的存储格式）"""
+        enabled = settings.get("jobs.screenshot_transcoder.enabled", False)
+
+        try:
+            scheduler = self._get_scheduler()
+            if not scheduler:
+                return
+
+            interval = settings.get("jobs.screenshot_transcoder.interval", 300)
+            transcoder_id = settings.get("jobs.screenshot_transcoder.id", "screenshot_transcoder")
+            scheduler.add_interval_job(
+                func=_execute_screenshot_transcode_task,
+                job_id="screenshot_transcoder_job",
+                name=transcoder_id,
+                seconds=interval,
+                replace_existing=True,
+            )
+            logger.info(f"截图转码定时任务已添加，间隔: {interval}秒")
+
+            if not enabled:
+                scheduler.pause_job("screenshot_transcoder_job")
+                logger.info("截图转码服务未启用，已暂停")
+        except Exception as e:
+            logger.error(f"启动截图转码服务失败: {e}", exc_info=True)
+
+    def _start_db_maintenance_job(self):
+        """启动数据库维护任务（ANALYZE、空间回收、WAL 检查点，仅在录制器空闲时执行）"""
+        enabled = settings.get("jobs.db_maintenance.enabled", True)
+
+        try:
+            scheduler = self._get_scheduler()
+            if not scheduler:
+                return
+
+            interval = settings.get("jobs.db_maintenance.interval", 600)
+            maintenance_id = settings.get("jobs.db_maintenance.id", "db_maintenance")
+            scheduler.add_interval_job(
+                func=_execute_db_maintenance_task,
+                job_id="db_maintenance_job",
+                name=maintenance_id,
+                seconds=interval,
+                replace_existing=True,
+            )
+            logger.info(f"数据库维护定时任务已添加，间隔: {interval}秒")
+
+            if not enabled:
+                scheduler.pause_job("db_maintenance_job")
+                logger.info("数据库维护服务未启用，已暂停")
+        except Exception as e:
+            logger.error(f"启动数据库维护服务失败: {e}", exc_info=True)
+
     def _start_deadline_reminder_job(self):
         """启动 DDL 提醒任务"""
         if not self._is_module_active("todo", "notification"):
@@ -421,6 +494,7 @@ class JobManager:
                 name=proactive_ocr_id,
                 seconds=interval,
                 replace_existing=True,
+                job_options={"executor": FAST_EXECUTOR},
             )
             logger.info(f"主动OCR定时任务已添加，间隔: {interval}秒")
 
@@ -9,24 +9,23 @@ from datetime import datetime
 from functools import lru_cache
 
 import mss
-from PIL import Image
 
-from lifetrace.storage import event_mgr, screenshot_mgr
+from lifetrace.services.thumbnail_service import generate_thumbnails_async
+from lifetrace.storage.recorder_write_buffer import get_recorder_write_buffer
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.path_utils import get_screenshots_dir
 from lifetrace.util.settings import settings
 from lifetrace.util.utils import ensure_dir, get_active_window_info, get_active_window_screen
 
+from .recorder_activity import mark_activity
 from .recorder_blacklist import get_blacklist_reason, log_blacklist_config
 from .recorder_capture import (
     ScreenshotCapture,
-    extract_screen_id_from_path,
-    get_unprocessed_files,
-    process_screenshot_event,
     should_detect_todos,
     trigger_todo_detection_async,
 )
 from .recorder_config import UNKNOWN_APP, UNKNOWN_WINDOW, with_timeout
+from .screenshot_reconciler import get_screenshot_reconciler
 
 logger = get_logger()
 
@@ -53,6 +52,9 @@ class ScreenRecorder:
             hash_threshold=settings.get("jobs.recorder.params.hash_threshold"),
         )
 
+        # 截图元数据写缓冲（首次创建时重放上次未提交的日志）
+        self.write_buffer = get_recorder_write_buffer()
+
         # 初始化截图目录
         ensure_dir(self.screenshots_dir)
 
@@ -67,8 +69,8 @@ class ScreenRecorder:
         # 打印黑名单配置信息
         log_blacklist_config()
 
-        # 启动时扫描未处理的文件
-        self._scan_unprocessed_files()
+        # 在后台与数据库对账磁盘上的截图，不阻塞截图开始
+        get_screenshot_reconciler().start_background()
 
     def _get_window_info(self) -> tuple[str, str]:
         """获取当前活动窗口信息"""
@@ -133,7 +135,7 @@ class ScreenRecorder:
                 return None, "skipped"
 
             # 更新哈希记录并保存截图
-            self.capture.last_hashes[screen_id] = image_hash
+            self.capture.remember_hash(screen_id, image_hash)
             if not self.capture.save_screenshot(screenshot, file_path):
                 filename = os.path.basename(file_path)
                 logger.error(f"[窗口 {screen_id}] 保存截图失败: {filename}")
@@ -162,7 +164,7 @@ class ScreenRecorder:
     def _save_screenshot_metadata(
         self, file_path: str, screen_id: int, app_name: str, window_title: str, timestamp: datetime
     ):
-        """保存截图的元数据到数据库"""
+        """保存截图的元数据到数据库（经写缓冲与事件切换、关联合并在一个事务内提交）"""
         filename = os.path.basename(file_path)
 
         width, height = self.capture.get_image_size(file_path)
@@ -171,28 +173,46 @@ class ScreenRecorder:
             logger.warning(f"[窗口 {screen_id}] 计算文件哈希失败，使用空值: {filename}")
             file_hash = ""
 
-        screenshot_id = self.capture.save_to_database(
-            file_path, file_hash, width, height, screen_id, app_name, window_title
-        )
-
-        if screenshot_id:
+        def _on_committed(result: dict):
+            screenshot_id = result.get("screenshot_id")
+            if not screenshot_id:
+                logger.warning(f"[窗口 {screen_id}] 数据库保存失败，但文件已保存: {filename}")
+                return
             logger.debug(f"[窗口 {screen_id}] 截图记录已保存到数据库: {screenshot_id}")
-            process_screenshot_event(screenshot_id, app_name, window_title, timestamp)
-
+            if result.get("event_id"):
+                logger.info(
+                    f"📎 截图 {screenshot_id} 已添加到事件 {result['event_id']} "
+                    f"[{app_name} - {window_title}]"
+                )
+            generate_thumbnails_async(
+                {"id": screenshot_id, "file_path": file_path, "file_hash": file_hash}
+            )
             if should_detect_todos(app_name):
                 trigger_todo_detection_async(screenshot_id, app_name)
-        else:
-            logger.warning(f"[窗口 {screen_id}] 数据库保存失败，但文件已保存: {filename}")
+
+        self.write_buffer.add_screenshot(
+            file_path,
+            file_hash,
+            width,
+            height,
+            metadata={
+                "screen_id": screen_id,
+                "app_name": app_name or UNKNOWN_APP,
+                "window_title": window_title or UNKNOWN_WINDOW,
+            },
+            timestamp=timestamp,
+            on_committed=_on_committed,
+        )
 
         file_size = os.path.getsize(file_path)
         file_size_kb = file_size / 1024
         logger.info(f"[窗口 {screen_id}] 截图保存: {filename} ({file_size_kb:.2f} KB) - {app_name}")
 
     def _close_active_event_on_blacklist(self):
-        """当应用进入黑名单时关闭活跃事件"""
+        """当应用进入黑名单时关闭活跃事件（排在已缓冲的截图之后执行）"""
         try:
-            event_mgr.close_active_event()
-            logger.info("已关闭上一个活跃事件")
+            self.write_buffer.close_active_event()
+            logger.info("已请求关闭上一个活跃事件")
         except Exception as e:
             logger.error(f"关闭活跃事件失败: {e}")
 
@@ -228,6 +248,7 @@ class ScreenRecorder:
             captured_files.append(file_path)
 
         if status == "success":
+            mark_activity()
             logger.info(f"截图成功 - 屏幕: {active_screen_id}")
         elif status == "skipped":
             logger.info(f"截图跳过 - 屏幕: {active_screen_id}")
@@ -284,81 +305,6 @@ class ScreenRecorder:
         finally:
             pass
 
-    def _process_single_file(self, file_path: str) -> bool:
-        """处理单个未处理的截图文件，返回是否成功"""
-        if not os.path.exists(file_path):
-            return False
-
-        file_stats = os.stat(file_path)
-        if file_stats.st_size == 0:
-            logger.warning(f"文件为空，跳过: {file_path}")
-            return False
-
-        try:
-            with Image.open(file_path) as img:
-                width, height = img.size
-        except Exception as e:
-            logger.error(f"无法处理图像文件 {file_path}: {e}")
-            return False
-
-        screen_id = extract_screen_id_from_path(file_path)
-
-        file_hash = self.capture.calculate_file_hash(file_path)
-        if not file_hash:
-            filename = os.path.basename(file_path)
-            logger.warning(f"[窗口 {screen_id}] 计算文件哈希失败，使用空值: {filename}")
-            file_hash = ""
-
-        app_name, window_title = self._get_window_info()
-
-        screenshot_id = screenshot_mgr.add_screenshot(
-            file_path=file_path,
-            file_hash=file_hash,
-            width=width,
-            height=height,
-            metadata={
-                "screen_id": screen_id,
-                "app_name": app_name,
-                "window_title": window_title,
-            },
-        )
-
-        if screenshot_id:
-            filename = os.path.basename(file_path)
-            logger.debug(f"[窗口 {screen_id}] 已处理未处理文件: {filename} (ID: {screenshot_id})")
-            return True
-
-        logger.warning(f"[窗口 {screen_id}] 添加截图记录失败: {file_path}")
-        return False
-
-    def _scan_unprocessed_files(self):
-        """扫描并处理未处理的截图文件"""
-        if not os.path.exists(self.screenshots_dir):
-            logger.info("截图目录不存在，跳过扫描")
-            return
-
-        logger.info(f"扫描现有截图文件: {self.screenshots_dir}")
-
-        unprocessed_files = get_unprocessed_files(self.screenshots_dir)
-
-        if not unprocessed_files:
-            logger.info("未发现未处理的截图文件")
-            return
-
-        logger.info(f"发现 {len(unprocessed_files)} 个未处理文件，开始处理...")
-
-        processed_count = 0
-        for file_path in unprocessed_files:
-            try:
-                if self._process_single_file(file_path):
-                    processed_count += 1
-            except Exception as e:
-                logger.error(f"处理文件失败 {file_path}: {e}")
-
-        logger.info(
-            f"未处理文件扫描完成，成功处理 {processed_count}/{len(unprocessed_files)} 个文件"
-        )
-
     def _print_final_stats(self):
         """输出最终统计信息"""
         logger.info("录制会话结束")
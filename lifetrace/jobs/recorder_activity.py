@@ -0,0 +1,46 @@
+"""
+录制器空闲信号
+
+录制器每保存一张新截图（画面发生变化、非重复）即记录一次活动；距最近一次活动的时长
+即为空闲时长。数据库维护等重负载后台任务据此只在用户空闲时执行。
+
+本模块不依赖截图库（mss），可以在录制器未启用时安全导入。
+"""
+
+import threading
+import time
+
+
+class RecorderActivity:
+    """最近一次录制活动的时间（单调时钟）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 尚无截图时以创建时间为基准，录制器未启用时视为一直空闲
+        self._last_activity = time.monotonic()
+
+    def mark(self) -> None:
+        with self._lock:
+            self._last_activity = time.monotonic()
+
+    def idle_seconds(self) -> float:
+        with self._lock:
+            return time.monotonic() - self._last_activity
+
+
+_activity = RecorderActivity()
+
+
+def mark_activity() -> None:
+    """记录一次录制活动（保存了新截图）"""
+    _activity.mark()
+
+
+def get_idle_seconds() -> float:
+    """距最近一次录制活动的秒数"""
+    return _activity.idle_seconds()
+
+
+def is_idle(threshold_seconds: float) -> bool:
+    """空闲时长是否达到阈值"""
+    return get_idle_seconds() >= threshold_seconds
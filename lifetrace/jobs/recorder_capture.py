@@ -8,7 +8,6 @@ import importlib
 import os
 import threading
 from datetime import datetime
-from pathlib import Path
 from typing import Any
 
 import imagehash
@@ -16,13 +15,18 @@ import mss
 from mss import tools as mss_tools
 from PIL import Image
 
-from lifetrace.storage import event_mgr, screenshot_mgr
+from lifetrace.storage.screenshot_dedup import PerceptualHashIndex
 from lifetrace.util.logging_config import get_logger
+from lifetrace.util.screenshot_codec import (
+    get_screenshot_codec,
+    get_screenshot_extension,
+    save_rgb_screenshot,
+)
 from lifetrace.util.settings import settings
 from lifetrace.util.time_utils import get_utc_now
 from lifetrace.util.utils import get_screenshot_filename
 
-from .recorder_config import UNKNOWN_APP, UNKNOWN_WINDOW, with_timeout
+from .recorder_config import with_timeout
 
 logger = get_logger()
 
@@ -44,13 +48,23 @@ class ScreenshotCapture:
         self.deduplicate = deduplicate
         self.hash_threshold = hash_threshold
         self.last_hashes = {}
+        # 跨屏幕近似去重：最近截图的感知哈希近邻索引（未启用时为 None）
+        self.phash_index = (
+            PerceptualHashIndex(int(settings.get("jobs.recorder.params.phash_window", 512)))
+            if settings.get("jobs.recorder.params.cross_screen_dedup", False)
+            else None
+        )
 
     def save_screenshot(self, screenshot, file_path: str) -> bool:
-        """保存截图到文件"""
+        """保存截图到文件（格式由 screenshot_storage.codec 决定）"""
 
         @with_timeout(timeout_seconds=self.file_io_timeout, operation_name="保存截图文件")
         def _do_save():
-            mss_tools.to_png(screenshot.rgb, screenshot.size, output=file_path)
+            codec = get_screenshot_codec()
+            if codec == "png":
+                mss_tools.to_png(screenshot.rgb, screenshot.size, output=file_path)
+            else:
+                save_rgb_screenshot(screenshot.rgb, screenshot.size, file_path, codec)
             return True
 
         try:
@@ -120,11 +134,23 @@ class ScreenshotCapture:
             logger.error(f"从内存计算图像哈希失败: {e}")
             return ""
 
+    def remember_hash(self, screen_id: int, image_hash: str) -> None:
+        """记录已保存截图的感知哈希"""
+        self.last_hashes[screen_id] = image_hash
+        if self.phash_index is not None:
+            self.phash_index.add(image_hash)
+
     def is_duplicate(self, screen_id: int, image_hash: str) -> bool:
         """检查是否为重复图像"""
         if not self.deduplicate:
             return False
 
+        if self.phash_index is not None:
+            distance = self.phash_index.find_within(image_hash, self.hash_threshold)
+            if distance is not None:
+                logger.info(f"[窗口 {screen_id}] 跳过与最近截图近似的重复截图 (距离 {distance})")
+                return True
+
         if screen_id not in self.last_hashes:
             return False
 
@@ -144,41 +170,6 @@ class ScreenshotCapture:
             logger.error(f"比较图像哈希失败: {e}")
             return False
 
-    def save_to_database(
-        self,
-        file_path: str,
-        file_hash: str,
-        width: int,
-        height: int,
-        screen_id: int,
-        app_name: str,
-        window_title: str,
-    ) -> int | None:
-        """保存截图信息到数据库"""
-
-        @with_timeout(timeout_seconds=self.db_timeout, operation_name="数据库操作")
-        def _do_save_to_db():
-            screenshot_id = screenshot_mgr.add_screenshot(
-                file_path=file_path,
-                file_hash=file_hash,
-                width=width,
-                height=height,
-                metadata={
-                    "screen_id": screen_id,
-                    "app_name": app_name or UNKNOWN_APP,
-                    "window_title": window_title or UNKNOWN_WINDOW,
-                    "event_id": None,
-                },
-            )
-            return screenshot_id
-
-        try:
-            result = _do_save_to_db()
-            return result
-        except Exception as e:
-            logger.error(f"保存截图记录到数据库失败: {e}")
-            return None
-
     def grab_and_prepare_screenshot(self, screen_id: int) -> tuple[Any | None, str, datetime]:
         """抓取屏幕并准备截图文件路径"""
         with mss.mss() as sct:
@@ -189,78 +180,11 @@ class ScreenshotCapture:
             monitor = sct.monitors[screen_id]
             screenshot = sct.grab(monitor)
             timestamp = get_utc_now()
-            filename = get_screenshot_filename(screen_id, timestamp)
+            filename = get_screenshot_filename(screen_id, timestamp, get_screenshot_extension())
             file_path = os.path.join(self.screenshots_dir, filename)
             return screenshot, file_path, timestamp
 
 
-def process_screenshot_event(
-    screenshot_id: int,
-    app_name: str,
-    window_title: str,
-    timestamp: datetime,
-):
-    """处理截图事件：将截图关联到事件
-
-    Args:
-        screenshot_id: 截图ID
-        app_name: 应用名称
-        window_title: 窗口标题
-        timestamp: 截图时间
-    """
-    try:
-        event_id = event_mgr.get_or_create_event(
-            app_name=app_name,
-            window_title=window_title,
-            timestamp=timestamp,
-        )
-
-        if event_id:
-            success = event_mgr.add_screenshot_to_event(screenshot_id, event_id)
-            if success:
-                logger.info(
-                    f"📎 截图 {screenshot_id} 已添加到事件 {event_id} [{app_name} - {window_title}]"
-                )
-            else:
-                logger.warning(f"⚠️  截图 {screenshot_id} 添加到事件失败")
-        else:
-            logger.warning(f"⚠️  获取或创建事件失败，截图ID: {screenshot_id}")
-
-    except Exception as e:
-        logger.error(f"处理截图事件失败: {e}", exc_info=True)
-
-
-def get_unprocessed_files(screenshots_dir: str) -> list[str]:
-    """获取所有未处理的截图文件列表"""
-    screenshot_files = []
-    for file_path in Path(screenshots_dir).glob("*.png"):
-        if file_path.is_file():
-            screenshot_files.append(str(file_path))
-
-    unprocessed_files = []
-    for file_path in screenshot_files:
-        screenshot = screenshot_mgr.get_screenshot_by_path(file_path)
-        if not screenshot:
-            unprocessed_files.append(file_path)
-
-    return unprocessed_files
-
-
-def extract_screen_id_from_path(file_path: str) -> int:
-    """从文件名提取屏幕ID"""
-    min_filename_parts = 2
-
-    try:
-        filename = os.path.basename(file_path)
-        if filename.startswith("screen_"):
-            parts = filename.split("_")
-            if len(parts) >= min_filename_parts:
-                return int(parts[1])
-    except (ValueError, IndexError):
-        pass
-    return 0
-
-
 def should_detect_todos(app_name: str) -> bool:
     """判断是否需要触发待办检测
 
@@ -0,0 +1,282 @@
+"""
+截图保留策略引擎
+按分层策略分批清理截图，供数据清理任务调用：
+
+- 每批（batch_size 条）使用独立的短事务，避免长时间占用写锁
+- 截图文件在线程池中并行删除
+- 删除记录时级联删除 OCR 结果、向量文档与已无截图的事件
+- 支持的动作：
+    drop_images         删除图片，保留记录与 OCR 文本（记录标记为 file_deleted）
+    keep_one_per_event  每个事件只保留一张图片（最早的一张），其余按 drop_images 处理
+    delete_all          删除图片、截图记录及其关联数据
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import delete, func, update
+
+from lifetrace.services.thumbnail_service import get_thumbnail_service
+from lifetrace.storage import get_session
+from lifetrace.storage.models import ActivityEventRelation, Event, OCRResult, Screenshot
+from lifetrace.storage.sql_utils import col
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.settings import settings
+from lifetrace.util.time_utils import get_utc_now
+
+logger = get_logger()
+
+RETENTION_ACTIONS = ("drop_images", "keep_one_per_event", "delete_all")
+
+
+@dataclass
+class RetentionTier:
+    """单个保留层级
+
+    after_days 与 max_count 二选一：前者清理早于 N 天的截图，
+    后者只保留最新的 N 张（未删除文件的）截图。
+    """
+
+    name: str
+    action: str
+    after_days: float | None = None
+    max_count: int | None = None
+
+    def __post_init__(self):
+        if self.action not in RETENTION_ACTIONS:
+            raise ValueError(
+                f"不支持的保留动作: {self.action}，可选: {', '.join(RETENTION_ACTIONS)}"
+            )
+        if self.after_days is None and self.max_count is None:
+            raise ValueError(f"保留层级 {self.name} 需要配置 after_days 或 max_count")
+
+
+@dataclass
+class TierReport:
+    """单个层级的清理统计"""
+
+    name: str
+    action: str
+    screenshots: int = 0
+    files: int = 0
+    reclaimed_bytes: int = 0
+    records: int = 0
+    ocr_records: int = 0
+    vector_documents: int = 0
+    events: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def parse_tiers(raw_tiers: list[dict[str, Any]]) -> list[RetentionTier]:
+    """解析配置中的分层策略"""
+    tiers = []
+    for index, raw in enumerate(raw_tiers or []):
+        tiers.append(
+            RetentionTier(
+                name=str(raw.get("name") or f"tier_{index + 1}"),
+                action=str(raw.get("action", "drop_images")),
+                after_days=raw.get("after_days"),
+                max_count=raw.get("max_count"),
+            )
+        )
+    return tiers
+
+
+class RetentionEngine:
+    """分批执行保留策略"""
+
+    def __init__(self, batch_size: int = 500, max_workers: int = 4):
+        self.batch_size = max(int(batch_size), 1)
+        self.max_workers = max(int(max_workers), 1)
+
+    def apply(self, tier: RetentionTier) -> TierReport:
+        """执行单个保留层级"""
+        report = TierReport(name=tier.name, action=tier.action)
+        cutoff = self._cutoff_condition(tier)
+        if cutoff is None:
+            return report
+
+        last_id = 0
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="retention"
+        ) as executor:
+            while True:
+                batch = self._next_batch(tier, cutoff, last_id)
+                if not batch:
+                    break
+                last_id = batch[-1][0]
+                if tier.action == "keep_one_per_event":
+                    batch = self._exclude_event_keepers(batch)
+                if batch:
+                    self._process_batch(tier, batch, report, executor)
+
+        if report.screenshots:
+            logger.info(
+                f"保留层级 {tier.name} ({tier.action}) - 截图: {report.screenshots}, "
+                f"删除文件: {report.files}, 删除记录: {report.records}, "
+                f"释放空间: {report.reclaimed_bytes / 1024 / 1024:.2f}MB"
+            )
+        return report
+
+    # ===== 选取 =====
+
+    def _cutoff_condition(self, tier: RetentionTier):
+        if tier.after_days is not None:
+            cutoff_date = get_utc_now() - timedelta(days=float(tier.after_days))
+            return col(Screenshot.created_at) < cutoff_date
+
+        # 按数量：找到第 max_count 新的截图，比它更早的都超出限制
+        with get_session() as session:
+            row = (
+                session.query(Screenshot.id)
+                .filter(col(Screenshot.file_deleted).is_not(True))
+                .order_by(col(Screenshot.id).desc())
+                .offset(max(int(tier.max_count or 0), 0))
+                .first()
+            )
+        if row is None:
+            logger.debug(f"截图数量未超过限制 ({tier.max_count})，跳过层级 {tier.name}")
+            return None
+        return col(Screenshot.id) <= row[0]
+
+    def _next_batch(self, tier: RetentionTier, cutoff, last_id: int) -> list[tuple]:
+        with get_session() as session:
+            query = session.query(Screenshot.id, Screenshot.file_path, Screenshot.event_id).filter(
+                cutoff, col(Screenshot.id) > last_id
+            )
+            if tier.action != "delete_all":
+                query = query.filter(col(Screenshot.file_deleted).is_not(True))
+            if tier.action == "keep_one_per_event":
+                query = query.filter(col(Screenshot.event_id).is_not(None))
+            return [
+                tuple(row)
+                for row in query.order_by(col(Screenshot.id).asc()).limit(self.batch_size).all()
+            ]
+
+    @staticmethod
+    def _exclude_event_keepers(batch: list[tuple]) -> list[tuple]:
+        """排除每个事件中保留的那张截图（事件内未删除文件的最早截图）"""
+        event_ids = {event_id for _, _, event_id in batch}
+        with get_session() as session:
+            keepers = {
+                row[0]
+                for row in session.query(func.min(Screenshot.id))
+                .filter(col(Screenshot.event_id).in_(event_ids))
+                .filter(col(Screenshot.file_deleted).is_not(True))
+                .group_by(col(Screenshot.event_id))
+                .all()
+            }
+        return [item for item in batch if item[0] not in keepers]
+
+    # ===== 删除 =====
+
+    def _process_batch(
+        self,
+        tier: RetentionTier,
+        batch: list[tuple],
+        report: TierReport,
+        executor: ThreadPoolExecutor,
+    ) -> None:
+        results = list(executor.map(_delete_screenshot_files, batch))
+        report.screenshots += len(batch)
+        report.files += sum(1 for _, size in results if size is not None)
+        report.reclaimed_bytes += sum(size or 0 for _, size in results)
+        # 文件删除失败的截图保留记录，下次清理时重试
+        batch = [item for item, (ok, _) in zip(batch, results, strict=True) if ok]
+        ids = [item[0] for item in batch]
+        if not ids:
+            return
+
+        if tier.action != "delete_all":
+            with get_session() as session:
+                session.execute(
+                    update(Screenshot).where(col(Screenshot.id).in_(ids)).values(file_deleted=True)
+                )
+            return
+
+        event_ids = {item[2] for item in batch if item[2] is not None}
+        with get_session() as session:
+            ocr_ids = [
+                row[0]
+                for row in session.query(OCRResult.id)
+                .filter(col(OCRResult.screenshot_id).in_(ids))
+                .all()
+            ]
+            if ocr_ids:
+                session.execute(delete(OCRResult).where(col(OCRResult.id).in_(ocr_ids)))
+            session.execute(delete(Screenshot).where(col(Screenshot.id).in_(ids)))
+            deleted_events = self._delete_empty_events(session, event_ids)
+        report.events += len(deleted_events)
+        report.records += len(ids)
+        report.ocr_records += len(ocr_ids)
+        report.vector_documents += _delete_vector_documents(ocr_ids, deleted_events)
+
+    @staticmethod
+    def _delete_empty_events(session, event_ids: set[int]) -> list[int]:
+        """删除已结束且不再包含任何截图的事件及其活动关联，返回删除的事件 ID"""
+        if not event_ids:
+            return []
+        still_used = {
+            row[0]
+            for row in session.query(Screenshot.event_id)
+            .filter(col(Screenshot.event_id).in_(event_ids))
+            .distinct()
+            .all()
+        }
+        candidates = event_ids - still_used
+        if not candidates:
+            return []
+        empty = [
+            row[0]
+            for row in session.query(Event.id)
+            .filter(col(Event.id).in_(candidates), col(Event.end_time).is_not(None))
+            .all()
+        ]
+        if empty:
+            session.execute(
+                delete(ActivityEventRelation).where(col(ActivityEventRelation.event_id).in_(empty))
+            )
+            session.execute(delete(Event).where(col(Event.id).in_(empty)))
+        return empty
+
+
+def _delete_screenshot_files(item: tuple) -> tuple[bool, int | None]:
+    """删除截图文件与缩略图
+
+    Returns:
+        (是否可以继续处理记录, 释放的字节数；文件原本不存在时为 None)
+    """
+    screenshot_id, file_path, _ = item
+    get_thumbnail_service().delete_thumbnails(screenshot_id)
+    if not file_path:
+        return True, None
+    try:
+        size = os.path.getsize(file_path)
+        os.remove(file_path)
+    except FileNotFoundError:
+        return True, None
+    except OSError as e:
+        logger.warning(f"删除截图文件失败 {file_path}: {e}")
+        return False, None
+    return True, size
+
+
+def _delete_vector_documents(ocr_ids: list[int], event_ids: list[int]) -> int:
+    """删除 OCR 结果与事件对应的向量文档（向量数据库未启用时跳过）"""
+    if not (ocr_ids or event_ids) or not settings.get("vector_db.enabled", False):
+        return 0
+    from lifetrace.core.lazy_services import get_vector_service  # noqa: PLC0415
+
+    try:
+        vector_service = get_vector_service()
+        return vector_service.delete_ocr_results(ocr_ids) + vector_service.delete_events(event_ids)
+    except Exception as e:
+        logger.warning(f"删除向量文档失败: {e}")
+        return 0
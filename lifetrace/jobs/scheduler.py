@@ -1,5 +1,13 @@
 """
 APScheduler 调度器管理模块，用于管理 LifeTrace 的定时任务
+
+作业存储与执行器按任务性质拆分：
+- 内置的周期任务（录制、OCR 等）每次启动都按配置重新添加，放在内存作业存储（default），
+  触发时不再读写 scheduler.db
+- 录制器、主动 OCR 等秒级任务使用独立的 fast 执行器，不与慢任务争抢线程
+- 用户自动化任务与待办提醒需要跨重启保留，放在持久化作业存储（persistent）
+- 升级前所有任务都存放在 apscheduler_jobs 表中，启动时删除该表一次；
+  自动化任务与待办提醒在启动时会重新同步到持久化作业存储
 """
 
 import os
@@ -12,16 +20,43 @@ from apscheduler.events import (
     EVENT_JOB_REMOVED,
 )
 from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import SQLAlchemyError
 
+from lifetrace.jobs.scheduler_metrics import METRIC_EVENTS, SchedulerMetrics
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.path_utils import get_scheduler_database_path
 from lifetrace.util.settings import settings
 
 logger = get_logger()
 
+PERSISTENT_JOBSTORE = "persistent"
+FAST_EXECUTOR = "fast"
+# 持久化任务使用独立的表，升级前存放在 apscheduler_jobs 中的内置任务不会被重复加载
+PERSISTENT_JOBS_TABLE = "apscheduler_persistent_jobs"
+LEGACY_JOBS_TABLE = "apscheduler_jobs"
+
+
+def drop_legacy_jobs_table(db_url: str) -> bool:
+    """删除升级前的 apscheduler_jobs 表，返回是否删除了该表"""
+    engine = create_engine(db_url)
+    try:
+        if not inspect(engine).has_table(LEGACY_JOBS_TABLE):
+            return False
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {LEGACY_JOBS_TABLE}"))
+        logger.info(f"已删除旧版作业表 {LEGACY_JOBS_TABLE}")
+        return True
+    except SQLAlchemyError as e:
+        logger.warning(f"删除旧版作业表 {LEGACY_JOBS_TABLE} 失败: {e}")
+        return False
+    finally:
+        engine.dispose()
+
 
 class SchedulerManager:
     """APScheduler 调度器管理器"""
@@ -29,6 +64,7 @@ class SchedulerManager:
     def __init__(self):
         """初始化调度器管理器"""
         self.scheduler: BackgroundScheduler | None = None
+        self.metrics = SchedulerMetrics()
         self._setup_scheduler()
 
     def _setup_scheduler(self):
@@ -39,12 +75,21 @@ class SchedulerManager:
         # 确保数据库目录存在
         os.makedirs(os.path.dirname(scheduler_db_path), exist_ok=True)
 
-        # 配置作业存储（持久化到 SQLite）
-        jobstores = {"default": SQLAlchemyJobStore(url=f"sqlite:///{scheduler_db_path}")}
+        # 配置作业存储：内置任务在内存中，只有需要跨重启保留的任务持久化到 SQLite
+        db_url = f"sqlite:///{scheduler_db_path}"
+        drop_legacy_jobs_table(db_url)
+        jobstores = {
+            "default": MemoryJobStore(),
+            PERSISTENT_JOBSTORE: SQLAlchemyJobStore(url=db_url, tablename=PERSISTENT_JOBS_TABLE),
+        }
 
-        # 配置执行器（线程池）
+        # 配置执行器（线程池），秒级任务使用独立的线程池
         max_workers = settings.get("scheduler.max_workers")
-        executors = {"default": ThreadPoolExecutor(max_workers=max_workers)}
+        fast_max_workers = settings.get("scheduler.fast_max_workers", 4)
+        executors = {
+            "default": ThreadPoolExecutor(max_workers=max_workers),
+            FAST_EXECUTOR: ThreadPoolExecutor(max_workers=fast_max_workers),
+        }
 
         # 调度器配置
         job_defaults = {
@@ -69,6 +114,7 @@ class SchedulerManager:
         self.scheduler.add_listener(self._job_error_listener, EVENT_JOB_ERROR)
         self.scheduler.add_listener(self._job_added_listener, EVENT_JOB_ADDED)
         self.scheduler.add_listener(self._job_removed_listener, EVENT_JOB_REMOVED)
+        self.scheduler.add_listener(self.metrics.listener, METRIC_EVENTS)
 
         logger.info(f"调度器已初始化，作业数据库: {scheduler_db_path}")
 
@@ -113,7 +159,7 @@ class SchedulerManager:
         else:
             logger.warning("调度器未运行")
 
-    def add_interval_job(
+    def add_interval_job(  # noqa: PLR0913
         self,
         func,
         job_id: str,
@@ -122,6 +168,8 @@ class SchedulerManager:
         minutes: int | None = None,
         hours: int | None = None,
         replace_existing: bool = True,
+        *,
+        job_options: dict | None = None,
         **kwargs,
     ):
         """添加间隔型任务
@@ -134,6 +182,7 @@ class SchedulerManager:
             minutes: 间隔分钟数
             hours: 间隔小时数
             replace_existing: 如果任务已存在是否替换
+            job_options: 原样传给 APScheduler 的任务选项（如 executor、jobstore）
             **kwargs: 传递给函数的参数
         """
         if not self.scheduler:
@@ -162,6 +211,7 @@ class SchedulerManager:
                 replace_existing=replace_existing,
                 kwargs=kwargs,
                 **interval_kwargs,
+                **(job_options or {}),
             )
             logger.info(
                 f"添加间隔任务: {job_id} ({name}), 间隔: {interval_kwargs}, 下次运行: {job.next_run_time}"
@@ -178,9 +228,14 @@ class SchedulerManager:
         run_date,
         name: str | None = None,
         replace_existing: bool = True,
+        job_options: dict | None = None,
         **kwargs,
     ):
-        """添加一次性任务（指定时间触发）"""
+        """添加一次性任务（指定时间触发）
+
+        job_options 会原样传给 APScheduler（如 misfire_grace_time、jobstore），
+        kwargs 为任务函数参数。
+        """
         if not self.scheduler:
             logger.error("调度器未初始化")
             return None
@@ -194,6 +249,7 @@ class SchedulerManager:
                 run_date=run_date,
                 replace_existing=replace_existing,
                 kwargs=kwargs,
+                **(job_options or {}),
             )
             logger.info(f"添加一次性任务: {job_id} ({name}), 触发时间: {job.next_run_time}")
             return job
@@ -0,0 +1,145 @@
+"""
+调度器任务指标
+
+通过 APScheduler 事件监听统计每个任务的运行情况：
+- lag：任务提交到执行器时距计划触发时间的延迟（调度器唤醒、作业存储读写造成的滞后）
+- run：从提交到执行结束的耗时（包含执行器线程池中的排队时间）
+- misses / skipped：错过触发时间被丢弃、因已有实例在运行而跳过的次数
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+)
+
+if TYPE_CHECKING:
+    from apscheduler.events import JobEvent
+
+METRIC_EVENTS = (
+    EVENT_JOB_SUBMITTED
+    | EVENT_JOB_EXECUTED
+    | EVENT_JOB_ERROR
+    | EVENT_JOB_MISSED
+    | EVENT_JOB_MAX_INSTANCES
+)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+@dataclass
+class _Timing:
+    """耗时统计（毫秒）"""
+
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_ms: float | None = None
+
+    def add(self, value_ms: float) -> None:
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+        self.last_ms = value_ms
+
+    def to_dict(self) -> dict[str, Any]:
+        avg = round(self.total_ms / self.count, 2) if self.count else None
+        return {"avg_ms": avg, "max_ms": round(self.max_ms, 2), "last_ms": self.last_ms}
+
+
+@dataclass
+class JobMetrics:
+    """单个任务的累计指标"""
+
+    job_id: str
+    runs: int = 0
+    errors: int = 0
+    misses: int = 0
+    skipped: int = 0
+    last_run_at: str | None = None
+    run: _Timing = field(default_factory=_Timing)
+    lag: _Timing = field(default_factory=_Timing)
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["run"] = self.run.to_dict()
+        data["lag"] = self.lag.to_dict()
+        return data
+
+
+class SchedulerMetrics:
+    """按任务汇总调度指标（监听器在调度线程与执行器线程中回调，内部加锁）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: dict[str, JobMetrics] = {}
+        # job_id -> {计划触发时间: 提交时间}；按计划时间配对，执行事件可能先于提交事件到达
+        self._submitted_at: dict[str, dict[datetime, datetime]] = {}
+
+    def _job(self, job_id: str) -> JobMetrics:
+        metrics = self._jobs.get(job_id)
+        if metrics is None:
+            metrics = self._jobs[job_id] = JobMetrics(job_id)
+        return metrics
+
+    def listener(self, event: JobEvent, now: datetime | None = None) -> None:
+        """APScheduler 事件监听器，注册时使用 METRIC_EVENTS 掩码"""
+        now = now or datetime.now(UTC)
+        with self._lock:
+            metrics = self._job(event.job_id)
+            if event.code == EVENT_JOB_SUBMITTED:
+                self._on_submitted(metrics, event, now)
+            elif event.code in (EVENT_JOB_EXECUTED, EVENT_JOB_ERROR):
+                self._on_finished(metrics, event, now)
+            elif event.code == EVENT_JOB_MISSED:
+                metrics.misses += 1
+                metrics.lag.add(_ms((now - event.scheduled_run_time).total_seconds()))
+            elif event.code == EVENT_JOB_MAX_INSTANCES:
+                metrics.skipped += 1
+
+    def _on_submitted(self, metrics: JobMetrics, event: JobEvent, now: datetime) -> None:
+        run_times = getattr(event, "scheduled_run_times", None) or []
+        if not run_times:
+            return
+        pending = self._submitted_at.setdefault(event.job_id, {})
+        for run_time in run_times:
+            pending[run_time] = now
+        metrics.lag.add(_ms((now - min(run_times)).total_seconds()))
+
+    def _on_finished(self, metrics: JobMetrics, event: JobEvent, now: datetime) -> None:
+        metrics.runs += 1
+        if event.code == EVENT_JOB_ERROR:
+            metrics.errors += 1
+        metrics.last_run_at = now.isoformat()
+
+        pending = self._submitted_at.setdefault(event.job_id, {})
+        scheduled = event.scheduled_run_time
+        submitted_at = pending.pop(scheduled, None)
+        if submitted_at is not None:
+            metrics.run.add(_ms((now - submitted_at).total_seconds()))
+        # 丢弃更早且未配对的记录，避免无限增长
+        for run_time in [rt for rt in pending if rt < scheduled]:
+            del pending[run_time]
+
+    def snapshot(self, job_id: str | None = None) -> list[dict[str, Any]]:
+        with self._lock:
+            if job_id is not None:
+                metrics = self._jobs.get(job_id)
+                return [metrics.to_dict()] if metrics else []
+            return [self._jobs[key].to_dict() for key in sorted(self._jobs)]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._jobs.clear()
+            self._submitted_at.clear()
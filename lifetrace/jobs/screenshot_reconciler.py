@@ -0,0 +1,223 @@
+"""
+截图对账模块
+启动后在后台线程中将截图目录与数据库对账，为没有记录的截图文件补建记录：
+
+- 一次性加载数据库中已知的截图路径到集合，避免逐文件查询
+- 使用 os.scandir 与 mtime 水位线，只检查上次对账之后修改过的文件
+- 不阻塞启动：由录制器在开始截图后异步触发
+- 定期持久化进度（按文件名排序的游标），中断后可从断点继续
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+
+from lifetrace.storage import screenshot_mgr
+from lifetrace.util.base_paths import get_user_data_dir
+from lifetrace.util.file_cache import atomic_write_bytes
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.path_utils import get_screenshots_dir
+from lifetrace.util.screenshot_codec import SCREENSHOT_EXTENSIONS
+
+from .recorder_config import UNKNOWN_APP, UNKNOWN_WINDOW
+
+logger = get_logger()
+
+STATE_FILENAME = "screenshot_reconcile_state.json"
+# 水位线回退的安全余量（秒），覆盖文件系统 mtime 精度与时钟抖动
+WATERMARK_MARGIN_SECONDS = 300
+# 每处理多少个候选文件持久化一次进度
+CHECKPOINT_INTERVAL = 200
+
+
+def extract_screen_id_from_path(file_path: str) -> int:
+    """从文件名提取屏幕ID（screen_{id}_... 或 todo_screen_{id}_...）"""
+    filename = os.path.basename(file_path).removeprefix("todo_")
+    if filename.startswith("screen_"):
+        try:
+            return int(filename.split("_")[1])
+        except (ValueError, IndexError):
+            pass
+    return 0
+
+
+class ScreenshotReconciler:
+    """截图目录与数据库的对账器"""
+
+    def __init__(self, screenshots_dir: str | Path, state_path: str | Path):
+        self.screenshots_dir = str(screenshots_dir)
+        self.state_path = Path(state_path)
+        self._lock = threading.Lock()
+        self._running = False
+
+    # ===== 状态持久化 =====
+
+    def load_state(self) -> dict[str, Any]:
+        """读取对账状态；目录变化时视为首次对账"""
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if state.get("screenshots_dir") != self.screenshots_dir:
+            return {}
+        return state
+
+    def _save_state(self, state: dict[str, Any]) -> None:
+        state["screenshots_dir"] = self.screenshots_dir
+        try:
+            atomic_write_bytes(
+                self.state_path, json.dumps(state, ensure_ascii=False).encode("utf-8")
+            )
+        except OSError as e:
+            logger.warning(f"保存截图对账进度失败: {e}")
+
+    # ===== 扫描 =====
+
+    def _scan_candidates(self, watermark: float, cursor: str) -> list[str]:
+        """列出 mtime 不早于水位线、文件名大于游标的截图文件名（已排序）"""
+        names = []
+        with os.scandir(self.screenshots_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if cursor and name <= cursor:
+                    continue
+                if os.path.splitext(name)[1].lower() not in SCREENSHOT_EXTENSIONS:
+                    continue
+                try:
+                    if not entry.is_file() or entry.stat().st_mtime < watermark:
+                        continue
+                except OSError:
+                    continue
+                names.append(name)
+        names.sort()
+        return names
+
+    @staticmethod
+    def _skip_transcode_leftovers(names: list[str]) -> list[str]:
+        # 已转码截图若在删除旧 PNG 前中断，会残留同名 PNG，不能当作新截图导入
+        converted = {os.path.splitext(name)[0] for name in names if not name.endswith(".png")}
+        return [
+            name
+            for name in names
+            if not (name.endswith(".png") and os.path.splitext(name)[0] in converted)
+        ]
+
+    def run(self) -> dict[str, Any]:
+        """执行一次对账（同一时刻只允许一个对账在运行）
+
+        Returns:
+            对账统计
+        """
+        with self._lock:
+            if self._running:
+                return {"skipped": True}
+            self._running = True
+        try:
+            return self._run()
+        finally:
+            with self._lock:
+                self._running = False
+
+    def _run(self) -> dict[str, Any]:
+        stats = {"candidates": 0, "registered": 0, "failed": 0, "resumed": False}
+        if not os.path.isdir(self.screenshots_dir):
+            logger.info("截图目录不存在，跳过对账")
+            return stats
+
+        state = self.load_state()
+        pending = state.get("pending")
+        if pending:
+            # 上次对账未完成：沿用其扫描起点与游标继续
+            scan_started = pending["scan_started"]
+            watermark = pending["watermark"]
+            cursor = pending.get("cursor", "")
+            stats["resumed"] = True
+        else:
+            scan_started = time.time()
+            watermark = state.get("watermark", 0.0)
+            cursor = ""
+
+        started = time.perf_counter()
+        names = self._skip_transcode_leftovers(self._scan_candidates(watermark, cursor))
+        stats["candidates"] = len(names)
+        known_paths = screenshot_mgr.get_all_file_paths() if names else set()
+
+        pending = {"scan_started": scan_started, "watermark": watermark, "cursor": cursor}
+        for index, name in enumerate(names, start=1):
+            file_path = os.path.join(self.screenshots_dir, name)
+            if file_path not in known_paths:
+                if self._register_file(file_path):
+                    stats["registered"] += 1
+                else:
+                    stats["failed"] += 1
+            if index % CHECKPOINT_INTERVAL == 0:
+                pending["cursor"] = name
+                self._save_state({"watermark": watermark, "pending": pending})
+
+        self._save_state({"watermark": max(scan_started - WATERMARK_MARGIN_SECONDS, 0.0)})
+        stats["elapsed_seconds"] = round(time.perf_counter() - started, 2)
+        logger.info(
+            f"截图对账完成 - 候选文件: {stats['candidates']}, 补建记录: {stats['registered']}, "
+            f"失败: {stats['failed']}, 续传: {stats['resumed']}, 耗时: {stats['elapsed_seconds']}s"
+        )
+        return stats
+
+    @staticmethod
+    def _register_file(file_path: str) -> bool:
+        """为没有记录的截图文件补建记录（窗口信息未知，不查询当前活动窗口）"""
+        try:
+            if os.path.getsize(file_path) == 0:
+                logger.warning(f"文件为空，跳过: {file_path}")
+                return False
+            with Image.open(file_path) as img:
+                width, height = img.size
+            with open(file_path, "rb") as f:
+                file_hash = hashlib.md5(f.read(), usedforsecurity=False).hexdigest()
+        except Exception as e:
+            logger.error(f"无法处理图像文件 {file_path}: {e}")
+            return False
+
+        screenshot_id = screenshot_mgr.add_screenshot(
+            file_path=file_path,
+            file_hash=file_hash,
+            width=width,
+            height=height,
+            metadata={
+                "screen_id": extract_screen_id_from_path(file_path),
+                "app_name": UNKNOWN_APP,
+                "window_title": UNKNOWN_WINDOW,
+            },
+        )
+        if screenshot_id:
+            logger.debug(f"已补建截图记录: {os.path.basename(file_path)} (ID: {screenshot_id})")
+            return True
+        logger.warning(f"添加截图记录失败: {file_path}")
+        return False
+
+    def start_background(self) -> threading.Thread:
+        """在后台守护线程中执行对账"""
+
+        def _target():
+            try:
+                self.run()
+            except Exception as e:
+                logger.error(f"截图对账失败: {e}", exc_info=True)
+
+        thread = threading.Thread(target=_target, name="screenshot-reconciler", daemon=True)
+        thread.start()
+        return thread
+
+
+@lru_cache(maxsize=1)
+def get_screenshot_reconciler() -> ScreenshotReconciler:
+    """获取截图对账器单例"""
+    return ScreenshotReconciler(get_screenshots_dir(), get_user_data_dir() / STATE_FILENAME)
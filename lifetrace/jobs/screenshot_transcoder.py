@@ -0,0 +1,265 @@
+"""
+截图转码任务
+将历史 PNG 截图迁移为配置的存储格式（screenshot_storage.codec），
+并提供抽样评估（节省空间与 OCR 准确率影响）。
+
+迁移单张截图的步骤：
+1. 编码新文件并原子写入（与原 PNG 同名，仅扩展名不同）
+2. 在同一事务中更新 file_path、file_size、file_hash（记录已被其他操作修改时放弃）
+3. 事务提交后删除原 PNG；若在此之前中断，残留 PNG 不会被当作新截图导入，
+   并会在进程内首次执行转码时清理
+"""
+
+import contextlib
+import difflib
+import hashlib
+import io
+import os
+import random
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+
+from lifetrace.storage import get_session, screenshot_mgr
+from lifetrace.storage.models import Screenshot
+from lifetrace.storage.sql_utils import col
+from lifetrace.util.file_cache import atomic_write_bytes
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.path_utils import get_screenshots_dir
+from lifetrace.util.screenshot_codec import (
+    encode_screenshot,
+    get_screenshot_codec,
+    get_screenshot_extension,
+    list_screenshot_files,
+)
+from lifetrace.util.settings import settings
+
+logger = get_logger()
+
+# 评估 OCR 影响时认为文本“基本一致”的相似度阈值
+OCR_MATCH_SIMILARITY = 0.95
+
+
+class ScreenshotTranscoder:
+    """截图转码服务"""
+
+    def __init__(self):
+        self.batch_size = int(settings.get("jobs.screenshot_transcoder.params.batch_size", 50))
+        self._leftovers_checked = False
+        # 按 id 递增扫描的游标：转码失败的记录仍是 .png，游标保证每批都向前推进
+        self._last_id = 0
+
+    # ===== 迁移 =====
+
+    def execute(self) -> dict[str, Any]:
+        """转码一批 PNG 截图
+
+        Returns:
+            执行结果统计
+        """
+        result = {"codec": get_screenshot_codec(), "transcoded": 0, "skipped": 0, "saved_bytes": 0}
+        if result["codec"] == "png":
+            logger.debug("截图存储格式为 png，跳过转码")
+            return result
+
+        if not self._leftovers_checked:
+            self._leftovers_checked = True
+            result["removed_leftovers"] = self._remove_leftover_pngs()
+
+        for screenshot_id, file_path in self._get_png_batch():
+            saved = self.transcode_one(screenshot_id, file_path, result["codec"])
+            if saved is None:
+                result["skipped"] += 1
+                continue
+            result["transcoded"] += 1
+            result["saved_bytes"] += saved
+
+        if result["transcoded"]:
+            logger.info(
+                f"截图转码完成 - 格式: {result['codec']}, 转码: {result['transcoded']}, "
+                f"跳过: {result['skipped']}, 节省空间: {result['saved_bytes'] / 1024 / 1024:.2f}MB"
+            )
+        return result
+
+    def _get_png_batch(self) -> list[tuple[int, str]]:
+        """取游标之后的一批 PNG；扫描到末尾时游标归零，下一轮从头重试失败的记录"""
+        with get_session() as session:
+            rows = (
+                session.query(Screenshot.id, Screenshot.file_path)
+                .filter(col(Screenshot.id) > self._last_id)
+                .filter(col(Screenshot.file_path).like("%.png"))
+                .filter(col(Screenshot.file_deleted).isnot(True))
+                .order_by(col(Screenshot.id).asc())
+                .limit(self.batch_size)
+                .all()
+            )
+        self._last_id = rows[-1][0] if rows else 0
+        return [(row[0], row[1]) for row in rows]
+
+    def transcode_one(self, screenshot_id: int, file_path: str, codec: str) -> int | None:
+        """转码单张截图，返回节省的字节数；无法转码时返回 None"""
+        new_path = os.path.splitext(file_path)[0] + get_screenshot_extension(codec)
+        if not os.path.exists(file_path):
+            if os.path.exists(new_path) and self._commit(
+                screenshot_id, file_path, new_path, created=False
+            ):
+                # 上次已写入新文件但未更新记录，直接复用
+                return 0
+            logger.warning(f"待转码截图文件不存在: {file_path}")
+            return None
+
+        try:
+            original_size = os.path.getsize(file_path)
+            with Image.open(file_path) as image:
+                data = encode_screenshot(image, codec)
+            atomic_write_bytes(Path(new_path), data)
+        except Exception as e:
+            logger.error(f"截图转码失败 (id={screenshot_id}): {e}")
+            return None
+
+        if not self._commit(screenshot_id, file_path, new_path, created=True):
+            return None
+        try:
+            os.remove(file_path)
+        except OSError as e:
+            logger.warning(f"删除原 PNG 失败 {file_path}: {e}")
+        return original_size - len(data)
+
+    @staticmethod
+    def _commit(screenshot_id: int, old_path: str, new_path: str, created: bool) -> bool:
+        """在一个事务中更新路径、大小与哈希；记录已变化时删除新写入的文件"""
+        with open(new_path, "rb") as f:
+            data = f.read()
+        try:
+            with get_session() as session:
+                screenshot = session.get(Screenshot, screenshot_id)
+                if screenshot is None or screenshot.file_path != old_path:
+                    raise LookupError("截图记录已被删除或修改")
+                old_hash = screenshot.file_hash
+                screenshot.file_path = new_path
+                screenshot.file_size = len(data)
+                screenshot.file_hash = hashlib.md5(data, usedforsecurity=False).hexdigest()
+                new_hash = screenshot.file_hash
+        except Exception as e:
+            logger.warning(f"更新转码截图记录失败 (id={screenshot_id}): {e}")
+            if created:
+                with contextlib.suppress(OSError):
+                    os.remove(new_path)
+            return False
+        screenshot_mgr.hash_index.discard(old_hash)
+        screenshot_mgr.hash_index.add(new_hash, screenshot_id)
+        return True
+
+    @staticmethod
+    def _remove_leftover_pngs() -> int:
+        """删除已转码但未删除成功的旧 PNG（存在同名新格式文件且没有截图记录引用）"""
+        removed = 0
+        files = list_screenshot_files(get_screenshots_dir())
+        transcoded_stems = {path.stem for path in files if path.suffix.lower() != ".png"}
+        for path in files:
+            if path.suffix.lower() != ".png" or path.stem not in transcoded_stems:
+                continue
+            if screenshot_mgr.get_screenshot_by_path(str(path)):
+                continue
+            with contextlib.suppress(OSError):
+                path.unlink()
+                removed += 1
+        if removed:
+            logger.info(f"已清理 {removed} 个转码残留的 PNG 文件")
+        return removed
+
+    # ===== 抽样评估 =====
+
+    def evaluate_sample(self, sample_size: int = 20, codec: str | None = None) -> dict[str, Any]:
+        """在 PNG 截图样本上评估目标格式的空间节省与 OCR 文本差异（不修改任何文件）"""
+        codec = codec or get_screenshot_codec()
+        with get_session() as session:
+            paths = [
+                row[0]
+                for row in session.query(Screenshot.file_path)
+                .filter(col(Screenshot.file_path).like("%.png"))
+                .filter(col(Screenshot.file_deleted).isnot(True))
+                .order_by(col(Screenshot.id).desc())
+                .limit(sample_size * 5)
+                .all()
+            ]
+        paths = [path for path in paths if os.path.exists(path)]
+        sample = random.sample(paths, min(sample_size, len(paths)))  # nosec B311
+
+        ocr = _get_ocr_runner()
+        report: dict[str, Any] = {
+            "codec": codec,
+            "sample_count": len(sample),
+            "original_bytes": 0,
+            "encoded_bytes": 0,
+            "space_saved_ratio": None,
+            "ocr_evaluated": 0,
+            "ocr_similarity_mean": None,
+            "ocr_similarity_min": None,
+            "ocr_match_rate": None,
+        }
+        similarities = []
+        for path in sample:
+            with open(path, "rb") as f:
+                original = f.read()
+            with Image.open(io.BytesIO(original)) as image:
+                encoded = encode_screenshot(image, codec)
+            report["original_bytes"] += len(original)
+            report["encoded_bytes"] += len(encoded)
+            if ocr is not None:
+                similarities.append(
+                    difflib.SequenceMatcher(None, ocr(original), ocr(encoded)).ratio()
+                )
+
+        if report["original_bytes"]:
+            report["space_saved_ratio"] = round(
+                1 - report["encoded_bytes"] / report["original_bytes"], 4
+            )
+        if similarities:
+            report["ocr_evaluated"] = len(similarities)
+            report["ocr_similarity_mean"] = round(sum(similarities) / len(similarities), 4)
+            report["ocr_similarity_min"] = round(min(similarities), 4)
+            matched = sum(1 for value in similarities if value >= OCR_MATCH_SIMILARITY)
+            report["ocr_match_rate"] = round(matched / len(similarities), 4)
+        return report
+
+
+def _get_ocr_runner():
+    """返回 bytes -> 文本 的 OCR 函数；RapidOCR 不可用时返回 None"""
+    from lifetrace.jobs.ocr_config import create_rapidocr_instance  # noqa: PLC0415
+    from lifetrace.jobs.ocr_processor import (  # noqa: PLC0415
+        extract_text_from_ocr_result,
+        preprocess_image,
+    )
+
+    try:
+        engine = create_rapidocr_instance()
+    except Exception as e:
+        logger.warning(f"RapidOCR 不可用，跳过 OCR 准确率评估: {e}")
+        return None
+    if engine is None:
+        return None
+
+    def _run(data: bytes) -> str:
+        # preprocess_image 使用 PIL 打开，同样接受文件对象
+        result, _ = engine(preprocess_image(io.BytesIO(data)))
+        return extract_text_from_ocr_result(result)
+
+    return _run
+
+
+def execute_screenshot_transcode_task() -> dict[str, Any]:
+    """执行截图转码任务（供调度器调用）"""
+    try:
+        return get_screenshot_transcoder().execute()
+    except Exception as e:
+        logger.error(f"执行截图转码任务失败: {e}", exc_info=True)
+        return {"error": str(e)}
+
+
+@lru_cache(maxsize=1)
+def get_screenshot_transcoder() -> ScreenshotTranscoder:
+    """获取截图转码服务单例"""
+    return ScreenshotTranscoder()
@@ -23,6 +23,11 @@ from lifetrace.llm.auto_todo_detection_service import get_whitelist_apps
 from lifetrace.storage import screenshot_mgr
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.path_utils import get_screenshots_dir
+from lifetrace.util.screenshot_codec import (
+    get_screenshot_codec,
+    get_screenshot_extension,
+    save_rgb_screenshot,
+)
 from lifetrace.util.settings import settings
 from lifetrace.util.time_utils import get_utc_now
 from lifetrace.util.utils import (
@@ -167,7 +172,11 @@ class TodoScreenRecorder:
 
         @with_timeout(timeout_seconds=self.file_io_timeout, operation_name="保存截图文件")
         def _do_save():
-            mss_tools.to_png(screenshot.rgb, screenshot.size, output=file_path)
+            codec = get_screenshot_codec()
+            if codec == "png":
+                mss_tools.to_png(screenshot.rgb, screenshot.size, output=file_path)
+            else:
+                save_rgb_screenshot(screenshot.rgb, screenshot.size, file_path, codec)
             return True
 
         try:
@@ -313,7 +322,8 @@ class TodoScreenRecorder:
             monitor = sct.monitors[active_screen_id]
             screenshot = sct.grab(monitor)
             timestamp = get_utc_now()
-            filename = f"todo_{get_screenshot_filename(active_screen_id, timestamp)}"
+            extension = get_screenshot_extension()
+            filename = f"todo_{get_screenshot_filename(active_screen_id, timestamp, extension)}"
             file_path = os.path.join(self.screenshots_dir, filename)
 
             # 计算图像哈希（用于去重）
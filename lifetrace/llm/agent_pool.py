@@ -0,0 +1,213 @@
+"""
+Agno Agent 实例池
+
+Agno 模式每条消息都新建 AgnoAgentService 时，需要重新构建工具集（FreeTodoToolkit、外部工具）、
+instructions 与 OpenAILike 模型（及其 HTTP 客户端）。实例池按
+(lang, selected_tools, external_tools, external_tools_config) 缓存已构建的实例：
+- 借出/归还：同一实例同一时间只服务一个请求，空闲实例按 key 复用（LRU 淘汰）
+- 所有实例共享一个保持长连接的 httpx.Client，省去每次请求的 TCP/TLS 握手
+- LLM 配置变更时由配置服务调用 invalidate_agno_agent_pool 使池失效，借出中的旧实例归还时直接丢弃
+- 记录首 token 延迟、命中率与构建耗时，供 /api/chat/agno/metrics 查询
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.settings import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Iterable, Iterator
+
+logger = get_logger()
+
+LATENCY_WINDOW = 200
+MS_PER_SECOND = 1000
+P95 = 0.95
+
+AgentPoolKey = tuple[str, tuple[str, ...], tuple[str, ...], str]
+
+
+def make_pool_key(
+    lang: str,
+    selected_tools: Iterable[str] | None,
+    external_tools: Iterable[str] | None,
+    external_tools_config: dict[str, dict] | None,
+) -> AgentPoolKey:
+    """实例池 key：工具列表与顺序无关，外部工具配置序列化为稳定字符串"""
+    return (
+        lang,
+        tuple(sorted(selected_tools or ())),
+        tuple(sorted(external_tools or ())),
+        json.dumps(external_tools_config or {}, sort_keys=True, ensure_ascii=False, default=str),
+    )
+
+
+class LatencyStats:
+    """最近若干次的延迟统计"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            samples = sorted(self._samples)
+            last = self._samples[-1] if self._samples else None
+        if not samples:
+            return {"count": 0}
+        return {
+            "count": len(samples),
+            "avg_ms": round(sum(samples) / len(samples) * MS_PER_SECOND, 1),
+            "p50_ms": round(samples[len(samples) // 2] * MS_PER_SECOND, 1),
+            "p95_ms": round(
+                samples[min(len(samples) - 1, int(len(samples) * P95))] * MS_PER_SECOND, 1
+            ),
+            "last_ms": round(last * MS_PER_SECOND, 1) if last is not None else None,
+        }
+
+
+class AgentInstancePool:
+    """按 key 缓存的实例池（线程安全；流式响应在线程池中迭代）"""
+
+    def __init__(
+        self,
+        factory: Callable[[AgentPoolKey], Any],
+        max_keys: int = 8,
+        max_idle_per_key: int = 2,
+    ):
+        self.factory = factory
+        self.max_keys = max(1, max_keys)
+        self.max_idle_per_key = max(1, max_idle_per_key)
+        self._idle: OrderedDict[AgentPoolKey, list[Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.build_latency = LatencyStats()
+        self.first_token_latency = LatencyStats()
+
+    def acquire(self, key: AgentPoolKey) -> tuple[Any, int]:
+        """借出实例，返回 (实例, 代数)；没有空闲实例时新建"""
+        with self._lock:
+            generation = self._generation
+            idle = self._idle.get(key)
+            if idle:
+                self._idle.move_to_end(key)
+                self.hits += 1
+                return idle.pop(), generation
+            self.misses += 1
+        started = time.perf_counter()
+        instance = self.factory(key)
+        self.build_latency.record(time.perf_counter() - started)
+        return instance, generation
+
+    def release(self, key: AgentPoolKey, instance: Any, generation: int) -> None:
+        """归还实例；池已失效或该 key 空闲实例已满时丢弃"""
+        with self._lock:
+            if generation != self._generation:
+                return
+            idle = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            if len(idle) < self.max_idle_per_key:
+                idle.append(instance)
+            while len(self._idle) > self.max_keys:
+                self._idle.popitem(last=False)
+
+    @contextmanager
+    def lease(self, key: AgentPoolKey) -> Iterator[Any]:
+        instance, generation = self.acquire(key)
+        try:
+            yield instance
+        finally:
+            self.release(key, instance, generation)
+
+    def invalidate(self, reason: str = "") -> None:
+        """丢弃所有空闲实例，借出中的实例归还时也会被丢弃"""
+        with self._lock:
+            self._idle.clear()
+            self._generation += 1
+            self.invalidations += 1
+        logger.info(f"Agno Agent 实例池已失效{f'（{reason}）' if reason else ''}")
+
+    def stream_with_metrics(
+        self, stream: Iterable[str], is_content: Callable[[str], bool] | None = None
+    ) -> Generator[str]:
+        """透传流式输出，并记录首个内容片段（is_content 为真）的延迟"""
+        started = time.perf_counter()
+        first = True
+        for chunk in stream:
+            if first and chunk and (is_content is None or is_content(chunk)):
+                self.first_token_latency.record(time.perf_counter() - started)
+                first = False
+            yield chunk
+
+    def metrics(self) -> dict[str, Any]:
+        with self._lock:
+            idle = {"|".join(key[:1] + key[1] + key[2]): len(v) for key, v in self._idle.items()}
+            requests = self.hits + self.misses
+            return {
+                "keys": len(self._idle),
+                "idle_instances": idle,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / requests, 4) if requests else None,
+                "invalidations": self.invalidations,
+                "build": self.build_latency.snapshot(),
+                "first_token": self.first_token_latency.snapshot(),
+            }
+
+
+@lru_cache(maxsize=1)
+def get_shared_http_client():
+    """所有 Agno Agent 共享的长连接 HTTP 客户端"""
+    import httpx  # noqa: PLC0415
+
+    return httpx.Client(
+        timeout=httpx.Timeout(settings.get("chat.agno_pool.timeout_seconds", 600), connect=5.0),
+        limits=httpx.Limits(
+            max_connections=settings.get("chat.agno_pool.max_connections", 20),
+            max_keepalive_connections=settings.get("chat.agno_pool.max_keepalive", 10),
+        ),
+    )
+
+
+def _build_agno_service(key: AgentPoolKey):
+    from lifetrace.llm.agno_agent import AgnoAgentService  # noqa: PLC0415
+
+    lang, selected_tools, external_tools, config_json = key
+    return AgnoAgentService(
+        lang=lang,
+        selected_tools=list(selected_tools),
+        external_tools=list(external_tools) or None,
+        external_tools_config=json.loads(config_json) or None,
+        http_client=get_shared_http_client(),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_agno_agent_pool() -> AgentInstancePool:
+    """获取 Agno Agent 实例池单例"""
+    return AgentInstancePool(
+        _build_agno_service,
+        max_keys=settings.get("chat.agno_pool.max_keys", 8),
+        max_idle_per_key=settings.get("chat.agno_pool.max_idle_per_key", 2),
+    )
+
+
+def invalidate_agno_agent_pool(reason: str = "") -> None:
+    """LLM 配置（模型、密钥或地址）变更后使实例池失效；池尚未创建时无需处理"""
+    if get_agno_agent_pool.cache_info().currsize:
+        get_agno_agent_pool().invalidate(reason)
@@ -9,17 +9,37 @@ if TYPE_CHECKING:
 else:
     ChatCompletionMessageParam = Any
 
-# 导入工具模块以触发工具注册
-from lifetrace.llm import tools  # noqa: F401
+from openai import BadRequestError, UnprocessableEntityError
+
+from lifetrace.llm.agent_tool_calling import (
+    DEFAULT_TOOL_TIMEOUT_SECONDS,
+    MODE_NATIVE,
+    MODE_PROMPT,
+    WEB_SEARCH_SOURCES_INSTRUCTION,
+    NativeToolCallingUnsupportedError,
+    TurnMetrics,
+    build_openai_tools,
+    consume_tool_stream,
+    format_tool_marker,
+    is_tools_rejection,
+    mark_native_unsupported,
+    native_tool_calling_enabled,
+    run_tool_calls,
+)
 from lifetrace.llm.llm_client import LLMClient
+from lifetrace.llm.tools import register_builtin_tools
 from lifetrace.llm.tools.base import ToolResult
 from lifetrace.llm.tools.registry import ToolRegistry
 from lifetrace.util.language import get_language_instruction
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.prompt_loader import get_prompt
+from lifetrace.util.settings import settings
 
 logger = get_logger()
 
+# 注册内置工具（联网搜索等）
+register_builtin_tools()
+
 
 class AgentService:
     """Agent 服务，管理工具调用工作流"""
@@ -32,6 +52,8 @@ class AgentService:
         self.llm_client = LLMClient()
         # 使用单例模式的工具注册表（工具已在 tools/__init__.py 中注册）
         self.tool_registry = ToolRegistry()
+        # 最近一轮的端到端耗时（见 TurnMetrics.finish）
+        self.last_turn_metrics: dict[str, Any] | None = None
 
     def stream_agent_response(
         self,
@@ -43,16 +65,9 @@ class AgentService:
         """
         流式生成 Agent 回答
 
-        工作流：
-        1. 工具选择：LLM 判断是否需要工具
-        2. 工具执行：执行选中的工具
-        3. 任务评估：LLM 评估任务是否完成
-        4. 循环控制：如果未完成，重新进入工具选择
+        提供商支持时使用原生工具调用（同一轮多个工具并行执行），
+        否则回退到基于提示词的工具选择循环。每轮结束时记录端到端耗时。
         """
-        tool_call_count = 0
-        iteration_count = 0
-        accumulated_context = []
-
         # 构建初始消息
         messages = self._build_initial_messages(
             user_query,
@@ -60,13 +75,123 @@ class AgentService:
             conversation_history,
             lang,
         )
+        base_url, model = self.llm_client.base_url, self.llm_client.model
+        use_native = native_tool_calling_enabled(base_url, model)
+        metrics = TurnMetrics(MODE_NATIVE if use_native else MODE_PROMPT)
+        try:
+            if use_native:
+                try:
+                    yield from self._stream_native_tool_calling(messages, metrics)
+                    return
+                except NativeToolCallingUnsupportedError as e:
+                    if e.rejects_tools:
+                        logger.warning(f"[Agent] 模型不支持原生工具调用，回退到提示词决策: {e}")
+                        mark_native_unsupported(base_url, model)
+                    else:
+                        logger.warning(f"[Agent] 原生工具调用请求失败，本轮回退到提示词决策: {e}")
+                    metrics.mode = MODE_PROMPT
+            yield from self._stream_prompt_tool_calling(user_query, messages, metrics)
+        finally:
+            self.last_turn_metrics = metrics.finish()
+
+    def _stream_native_tool_calling(
+        self, messages: list[dict], metrics: TurnMetrics
+    ) -> Generator[str]:
+        """原生工具调用：模型流式返回内容或工具调用，同一轮的工具调用并行执行"""
+        client = self.llm_client._get_client()
+        openai_tools = build_openai_tools(self.tool_registry.get_available_tools())
+        timeout = settings.get("chat.agent.tool_timeout_seconds", DEFAULT_TOOL_TIMEOUT_SECONDS)
+        messages = list(messages)
+        tool_call_count = 0
+        used_web_search = False
+
+        for iteration in range(1, self.MAX_ITERATIONS + 1):
+            # 达到工具调用上限或最后一轮时，要求模型直接回答
+            allow_tools = bool(openai_tools) and (
+                tool_call_count < self.MAX_TOOL_CALLS and iteration < self.MAX_ITERATIONS
+            )
+            request: dict[str, Any] = {}
+            if openai_tools:
+                request = {"tools": openai_tools, "tool_choice": "auto" if allow_tools else "none"}
+            try:
+                with metrics.phase("llm"):
+                    stream = client.chat.completions.create(
+                        model=self.llm_client.model,
+                        messages=cast("list[ChatCompletionMessageParam]", messages),
+                        temperature=0.7,
+                        stream=True,
+                        **request,
+                    )
+                    content, calls = yield from consume_tool_stream(
+                        stream, on_content=metrics.mark_first_token
+                    )
+            except Exception as e:
+                # 首轮尚未输出任何内容时回退到提示词决策，否则保留已输出的部分回答
+                if iteration == 1 and metrics.first_token_seconds is None:
+                    rejects_tools = bool(openai_tools) and (
+                        isinstance(e, (BadRequestError, UnprocessableEntityError))
+                        and is_tools_rejection(e)
+                    )
+                    raise NativeToolCallingUnsupportedError(
+                        str(e), rejects_tools=rejects_tools
+                    ) from e
+                logger.error(f"[Agent] 生成回答失败: {e}")
+                yield f"生成回答时出现错误: {e!s}"
+                return
+
+            if not calls or not allow_tools:
+                return
+
+            calls = calls[: self.MAX_TOOL_CALLS - tool_call_count]
+            tool_call_count += len(calls)
+            metrics.tool_calls += len(calls)
+            logger.info(f"[Agent] 迭代 {iteration}: 并行执行 {[c.name for c in calls]}")
+            messages.append(
+                {
+                    "role": "assistant",
+                    "content": content or None,
+                    "tool_calls": [call.to_message() for call in calls],
+                }
+            )
+            with metrics.phase("tool"):
+                outcomes = yield from run_tool_calls(calls, self._execute_tool, timeout)
+            for outcome in outcomes:
+                messages.append(
+                    {
+                        "role": "tool",
+                        "tool_call_id": outcome.call.id,
+                        "content": self._format_tool_result(outcome.call.name, outcome.result),
+                    }
+                )
+            if not used_web_search and any(
+                o.call.name == "web_search" and o.result.success for o in outcomes
+            ):
+                used_web_search = True
+                # 部分提供商只允许 system 消息出现在开头，格式要求以 user 消息追加
+                messages.append({"role": "user", "content": WEB_SEARCH_SOURCES_INSTRUCTION.strip()})
+
+    def _stream_prompt_tool_calling(
+        self, user_query: str, messages: list[dict], metrics: TurnMetrics
+    ) -> Generator[str]:
+        """
+        基于提示词的工具调用工作流（不支持原生工具调用时使用）
+
+        1. 工具选择：LLM 判断是否需要工具
+        2. 工具执行：执行选中的工具
+        3. 任务评估：LLM 评估任务是否完成
+        4. 循环控制：如果未完成，重新进入工具选择
+        """
+        tool_call_count = 0
+        iteration_count = 0
+        accumulated_context = []
 
         while iteration_count < self.MAX_ITERATIONS:
             iteration_count += 1
             logger.info(f"[Agent] 迭代 {iteration_count}/{self.MAX_ITERATIONS}")
 
             # 步骤1: 工具选择
-            tool_decision = self._decide_tool_usage(messages, tool_call_count)
+            with metrics.phase("llm"):
+                tool_decision = self._decide_tool_usage(messages, tool_call_count)
 
             if tool_decision["use_tool"]:
                 # 步骤2: 执行工具
@@ -78,19 +203,12 @@ class AgentService:
                 tool_params = tool_decision.get("tool_params", {})
 
                 # 构建工具调用标记，包含参数信息（特别是搜索关键词）
-                if tool_name == "web_search" and "query" in tool_params:
-                    # 对于 web_search，显示搜索关键词
-                    yield f"\n[使用工具: {tool_name} | 关键词: {tool_params['query']}]\n\n"
-                else:
-                    # 其他工具，显示工具名称和参数（如果有）
-                    params_str = ", ".join([f"{k}: {v}" for k, v in tool_params.items()])
-                    if params_str:
-                        yield f"\n[使用工具: {tool_name} | {params_str}]\n\n"
-                    else:
-                        yield f"\n[使用工具: {tool_name}]\n\n"
+                yield format_tool_marker(tool_name, tool_params)
 
-                tool_result = self._execute_tool(tool_name, tool_params)
+                with metrics.phase("tool"):
+                    tool_result = self._execute_tool(tool_name, tool_params)
                 tool_call_count += 1
+                metrics.tool_calls += 1
 
                 # 将工具结果添加到上下文
                 tool_context = self._format_tool_result(tool_name, tool_result)
@@ -111,11 +229,12 @@ class AgentService:
                 )
 
                 # 步骤3: 任务评估
-                should_continue = self._evaluate_task_completion(
-                    user_query,
-                    messages,
-                    tool_result,
-                )
+                with metrics.phase("llm"):
+                    should_continue = self._evaluate_task_completion(
+                        user_query,
+                        messages,
+                        tool_result,
+                    )
 
                 if not should_continue:
                     logger.info("[Agent] 任务评估：可以生成最终回答")
@@ -126,11 +245,14 @@ class AgentService:
                 break
 
         # 步骤4: 生成最终回答
-        yield from self._generate_final_response(
-            user_query,
-            messages,
-            accumulated_context,
-        )
+        with metrics.phase("llm"):
+            yield from metrics.track_first_token(
+                self._generate_final_response(
+                    user_query,
+                    messages,
+                    accumulated_context,
+                )
+            )
 
     def _build_initial_messages(
         self,
@@ -191,18 +313,17 @@ class AgentService:
         if not available_tools:
             return {"use_tool": False, "tool_name": None, "tool_params": None}
 
-        # 构建工具选择提示词
-        tools_schema = self.tool_registry.get_tools_schema()
+        # 构建工具选择提示词（紧凑 Schema 按可用工具组合缓存，每轮不再重新序列化）
         tool_selection_prompt = get_prompt(
             "agent",
             "tool_selection",
-            tools=json.dumps(tools_schema, ensure_ascii=False, indent=2),
+            tools=self.tool_registry.get_tools_schema_json(available_tools),
             user_query=messages[-1]["content"] if messages else "",
         )
 
         if not tool_selection_prompt:
             tool_selection_prompt = self._get_default_tool_selection_prompt(
-                tools_schema,
+                self.tool_registry.get_tools_schema(),
             )
 
         # 调用 LLM 进行工具选择
@@ -404,18 +525,7 @@ class AgentService:
 
             # 如果使用了 web_search，添加 Sources 格式要求
             if used_web_search:
-                base_instruction += (
-                    "\n\n**重要格式要求（必须严格遵守）：**"
-                    "\n1. 在回答中引用信息时，必须使用引用标记格式：[[1]]、[[2]] 等，数字对应搜索结果编号"
-                    '\n2. 在回答的末尾，必须添加一个 "Sources:" 段落，列出所有引用的来源'
-                    "\n3. Sources 段落的格式必须严格按照以下格式（与工具执行结果中的格式一致）："
-                    "\n   Sources:"
-                    "\n   1. 标题 (URL)"
-                    "\n   2. 标题 (URL)"
-                    "\n   ..."
-                    "\n4. 工具执行结果中已经包含了 Sources 列表，请直接使用这些来源信息，不要修改格式"
-                    '\n5. 确保 Sources 段落与回答正文之间有两个空行（即 "\\n\\nSources:"）'
-                )
+                base_instruction += WEB_SEARCH_SOURCES_INSTRUCTION
 
             final_messages.append(
                 {
@@ -0,0 +1,311 @@
+"""
+Agent 原生工具调用（OpenAI function calling）
+
+相比基于提示词的 JSON 决策（每个工具都要额外一次阻塞的决策调用 + 一次评估调用）：
+- 一次流式调用同时返回回答内容或工具调用，模型不需要工具时内容直接流式输出
+- 同一轮返回的多个工具调用并行执行，每个工具单独设超时，超时的工具结果记为失败
+- 工具开始执行时立即输出工具标记（与前端的 [使用工具: ...] 格式一致）
+- 首轮请求在输出任何内容前失败时抛出 NativeToolCallingUnsupportedError，由调用方回退到
+  提示词决策；仅当错误指向 tools/tool_choice/functions 参数时才记住该 (base_url, model) 组合，
+  之后直接走提示词决策，其他错误（连接、超时、限流等）只对本轮回退
+
+通过 chat.agent.tool_calling 选择：auto（默认，先尝试原生，失败回退）、native、prompt。
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from lifetrace.llm.agent_pool import LatencyStats
+from lifetrace.llm.tools.base import ToolResult
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.settings import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator, Iterable, Iterator
+
+    from lifetrace.llm.tools.base import Tool
+
+logger = get_logger()
+
+MODE_AUTO = "auto"
+MODE_NATIVE = "native"
+MODE_PROMPT = "prompt"
+DEFAULT_TOOL_TIMEOUT_SECONDS = 20.0
+
+WEB_SEARCH_SOURCES_INSTRUCTION = (
+    "\n\n**重要格式要求（必须严格遵守）：**"
+    "\n1. 在回答中引用信息时，必须使用引用标记格式：[[1]]、[[2]] 等，数字对应搜索结果编号"
+    '\n2. 在回答的末尾，必须添加一个 "Sources:" 段落，列出所有引用的来源'
+    "\n3. Sources 段落的格式必须严格按照以下格式（与工具执行结果中的格式一致）："
+    "\n   Sources:"
+    "\n   1. 标题 (URL)"
+    "\n   2. 标题 (URL)"
+    "\n   ..."
+    "\n4. 工具执行结果中已经包含了 Sources 列表，请直接使用这些来源信息，不要修改格式"
+    '\n5. 确保 Sources 段落与回答正文之间有两个空行（即 "\\n\\nSources:"）'
+)
+
+# 已确认不支持原生工具调用的 (base_url, model)
+_unsupported_endpoints: set[tuple[str, str]] = set()
+
+TURN_LATENCY = LatencyStats()
+FIRST_TOKEN_LATENCY = LatencyStats()
+
+
+# 请求错误的 param/code/message 中包含这些关键词时，视为提供商不支持工具调用参数
+TOOLS_REJECTION_KEYWORDS = ("tool", "function")
+
+
+class NativeToolCallingUnsupportedError(RuntimeError):
+    """原生工具调用的首轮请求在输出内容前失败（回退到提示词决策）
+
+    rejects_tools 为真表示错误指向 tools 相关参数，调用方据此记住该组合不支持原生调用。
+    """
+
+    def __init__(self, message: str, rejects_tools: bool = False):
+        super().__init__(message)
+        self.rejects_tools = rejects_tools
+
+
+def is_tools_rejection(error: Exception) -> bool:
+    """判断请求错误是否由 tools/tool_choice/functions 参数引起"""
+    parts = (getattr(error, "param", None), getattr(error, "code", None), str(error))
+    text = " ".join(str(part) for part in parts if part).lower()
+    return any(keyword in text for keyword in TOOLS_REJECTION_KEYWORDS)
+
+
+def get_tool_calling_mode() -> str:
+    mode = str(settings.get("chat.agent.tool_calling", MODE_AUTO)).lower()
+    return mode if mode in {MODE_AUTO, MODE_NATIVE, MODE_PROMPT} else MODE_AUTO
+
+
+def native_tool_calling_enabled(base_url: str, model: str) -> bool:
+    """按配置与已知的不支持列表判断本轮是否使用原生工具调用"""
+    mode = get_tool_calling_mode()
+    if mode == MODE_PROMPT:
+        return False
+    return mode == MODE_NATIVE or (base_url, model) not in _unsupported_endpoints
+
+
+def mark_native_unsupported(base_url: str, model: str) -> None:
+    _unsupported_endpoints.add((base_url, model))
+
+
+def build_openai_tools(tools: Iterable[Tool]) -> list[dict[str, Any]]:
+    """把注册表中的工具转换为 OpenAI tools 参数"""
+    return [
+        {
+            "type": "function",
+            "function": {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": tool.parameters_schema,
+            },
+        }
+        for tool in tools
+    ]
+
+
+def format_tool_marker(tool_name: str, tool_params: dict[str, Any]) -> str:
+    """工具调用标记（前端按 [使用工具: name | ...] 渲染）"""
+    if tool_name == "web_search" and "query" in tool_params:
+        return f"\n[使用工具: {tool_name} | 关键词: {tool_params['query']}]\n\n"
+    params_str = ", ".join(f"{k}: {v}" for k, v in tool_params.items())
+    if params_str:
+        return f"\n[使用工具: {tool_name} | {params_str}]\n\n"
+    return f"\n[使用工具: {tool_name}]\n\n"
+
+
+@dataclass
+class ToolCall:
+    """模型返回的一个工具调用"""
+
+    id: str
+    name: str
+    raw_arguments: str
+    arguments: dict[str, Any]
+    error: str | None = None
+
+    @classmethod
+    def from_raw(cls, index: int, call_id: str, name: str, raw_arguments: str) -> ToolCall:
+        try:
+            arguments = json.loads(raw_arguments) if raw_arguments.strip() else {}
+            error = None if isinstance(arguments, dict) else "参数必须是 JSON 对象"
+        except json.JSONDecodeError as e:
+            arguments, error = {}, f"参数解析失败: {e}"
+        return cls(
+            id=call_id or f"call_{index}",
+            name=name,
+            raw_arguments=raw_arguments or "{}",
+            arguments=arguments if isinstance(arguments, dict) else {},
+            error=error,
+        )
+
+    def to_message(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": "function",
+            "function": {"name": self.name, "arguments": self.raw_arguments},
+        }
+
+
+@dataclass
+class ToolCallOutcome:
+    call: ToolCall
+    result: ToolResult
+    seconds: float
+
+
+def consume_tool_stream(
+    stream: Iterable[Any], on_content: Callable[[], None] | None = None
+) -> Generator[str, None, tuple[str, list[ToolCall]]]:
+    """流式输出内容片段，并拼接分片到达的工具调用；返回 (完整内容, 工具调用列表)"""
+    content: list[str] = []
+    partial: dict[int, dict[str, str]] = {}
+    for chunk in stream:
+        if not getattr(chunk, "choices", None):
+            continue
+        delta = chunk.choices[0].delta
+        text = getattr(delta, "content", None)
+        if text:
+            if on_content is not None:
+                on_content()
+            content.append(text)
+            yield text
+        for tool_delta in getattr(delta, "tool_calls", None) or []:
+            entry = partial.setdefault(tool_delta.index, {"id": "", "name": "", "arguments": ""})
+            entry["id"] = entry["id"] or (tool_delta.id or "")
+            function = tool_delta.function
+            if function is not None:
+                # 名称只在首个分片中完整出现，参数按分片拼接
+                entry["name"] = entry["name"] or (function.name or "")
+                entry["arguments"] += function.arguments or ""
+    calls = [
+        ToolCall.from_raw(index, entry["id"], entry["name"], entry["arguments"])
+        for index, entry in sorted(partial.items())
+        if entry["name"]
+    ]
+    return "".join(content), calls
+
+
+def _run_one(execute: Callable[[str, dict], ToolResult], call: ToolCall) -> ToolCallOutcome:
+    started = time.perf_counter()
+    if call.error:
+        result = ToolResult(success=False, content="", error=call.error)
+    else:
+        result = execute(call.name, call.arguments)
+    return ToolCallOutcome(call, result, time.perf_counter() - started)
+
+
+def run_tool_calls(
+    calls: list[ToolCall],
+    execute: Callable[[str, dict], ToolResult],
+    timeout: float = DEFAULT_TOOL_TIMEOUT_SECONDS,
+) -> Generator[str, None, list[ToolCallOutcome]]:
+    """并行执行同一轮的工具调用，流式输出进度；返回与 calls 顺序一致的结果
+
+    每个调用占一个线程（同一轮调用数受 MAX_TOOL_CALLS 限制），因此全部同时开始，
+    统一的截止时间即每个工具的超时。超时的工具线程无法中断，结果被丢弃。
+    """
+    for call in calls:
+        yield format_tool_marker(call.name, call.arguments)
+
+    outcomes: dict[int, ToolCallOutcome] = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, len(calls)), thread_name_prefix="AgentTool")
+    try:
+        futures = {executor.submit(_run_one, execute, call): i for i, call in enumerate(calls)}
+        pending = set(futures)
+        deadline = time.perf_counter() + timeout
+        while pending:
+            done, pending = wait(
+                pending,
+                timeout=max(0.0, deadline - time.perf_counter()),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                break
+            for future in done:
+                outcomes[futures[future]] = future.result()
+        for future in pending:
+            call = calls[futures[future]]
+            logger.warning(f"[Agent] 工具 {call.name} 执行超时（{timeout} 秒）")
+            outcomes[futures[future]] = ToolCallOutcome(
+                call,
+                ToolResult(success=False, content="", error=f"执行超时（{timeout} 秒）"),
+                timeout,
+            )
+            yield f"\n[提示] 工具 {call.name} 执行超时，已跳过。\n\n"
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return [outcomes[i] for i in range(len(calls))]
+
+
+class TurnMetrics:
+    """单轮对话的端到端耗时（LLM 调用、工具执行、首 token、总耗时）"""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.llm_seconds = 0.0
+        self.tool_seconds = 0.0
+        self.llm_calls = 0
+        self.tool_calls = 0
+        self.first_token_seconds: float | None = None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """计时一个阶段（llm 或 tool）"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if name == "llm":
+                self.llm_seconds += elapsed
+                self.llm_calls += 1
+            else:
+                self.tool_seconds += elapsed
+
+    def mark_first_token(self) -> None:
+        if self.first_token_seconds is None:
+            self.first_token_seconds = time.perf_counter() - self.started
+
+    def track_first_token(self, stream: Iterable[str]) -> Generator[str]:
+        for chunk in stream:
+            if chunk:
+                self.mark_first_token()
+            yield chunk
+
+    def finish(self) -> dict[str, Any]:
+        total = time.perf_counter() - self.started
+        TURN_LATENCY.record(total)
+        if self.first_token_seconds is not None:
+            FIRST_TOKEN_LATENCY.record(self.first_token_seconds)
+        report = {
+            "mode": self.mode,
+            "total_seconds": round(total, 3),
+            "first_token_seconds": (
+                round(self.first_token_seconds, 3) if self.first_token_seconds is not None else None
+            ),
+            "llm_seconds": round(self.llm_seconds, 3),
+            "llm_calls": self.llm_calls,
+            "tool_seconds": round(self.tool_seconds, 3),
+            "tool_calls": self.tool_calls,
+        }
+        logger.info(f"[Agent] 本轮耗时: {report}")
+        return report
+
+
+def get_agent_metrics() -> dict[str, Any]:
+    return {
+        "mode": get_tool_calling_mode(),
+        "unsupported_endpoints": [model for _, model in sorted(_unsupported_endpoints)],
+        "turn": TURN_LATENCY.snapshot(),
+        "first_token": FIRST_TOKEN_LATENCY.snapshot(),
+    }
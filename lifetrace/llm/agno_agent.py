@@ -28,6 +28,7 @@ from lifetrace.util.settings import settings
 if TYPE_CHECKING:
     from collections.abc import Generator
 
+    import httpx
     from agno.tools import Toolkit
 
 # 全局 ContextVar 用于跨 span 传递 session_id
@@ -243,6 +244,7 @@ class AgnoAgentService:
         selected_tools: list[str] | None = None,
         external_tools: list[str] | None = None,
         external_tools_config: dict[str, dict] | None = None,
+        http_client: httpx.Client | None = None,
     ):
         """初始化 Agno Agent 服务
 
@@ -255,6 +257,8 @@ class AgnoAgentService:
                            If None or empty, no external tools are enabled.
             external_tools_config: Configuration dict for external tools.
                            Example: {"file": {"base_dir": "/path/to/workspace", "enable_delete": False}}
+            http_client: Shared keep-alive HTTP client for the model (see agent_pool).
+                           If None, the OpenAI SDK creates its own client.
         """
         try:
             self.lang = lang or DEFAULT_LANG
@@ -278,6 +282,7 @@ class AgnoAgentService:
                     id=settings.llm.model,
                     api_key=settings.llm.api_key,
                     base_url=settings.llm.base_url,
+                    http_client=http_client,
                 ),
                 tools=tools_to_use if tools_to_use else None,
                 instructions=instructions_list,
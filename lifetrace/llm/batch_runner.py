@@ -0,0 +1,305 @@
+"""
+批量 LLM 任务执行器
+
+用于提示词变更后的回填、转录待办/日程重新提取、OCR 待办重新提取、日记重新生成等批处理：
+- 有界并发（asyncio.Semaphore）与每分钟请求数限制，同步 LLM 调用通过 asyncio.to_thread 执行
+- 进度检查点（JSONL，每完成一项追加一行），重新运行时跳过已完成的 key
+- 长文本按段落/句子切块（带重叠），逐块调用后由 reduce 合并（map-reduce）
+- 试运行成本估算：按文本估算输入 token，按 TokenUsage 历史的输出/输入比例估算输出 token，
+  按 llm.model_prices 计价
+
+用法（示例）::
+
+    runner = BatchLLMRunner("re_extract_transcriptions", concurrency=4, requests_per_minute=60)
+    stats = await runner.run(items, map_chunk=extract, reduce=merge, commit=save)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import func
+from sqlmodel import select
+
+from lifetrace.llm.context_packer import get_token_counter
+from lifetrace.storage import get_session
+from lifetrace.storage.models import TokenUsageDaily
+from lifetrace.storage.sql_utils import col
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.path_utils import get_database_path
+from lifetrace.util.time_utils import get_utc_now
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable
+    from pathlib import Path
+
+logger = get_logger()
+
+CHECKPOINT_DIRNAME = "batch_jobs"
+# 没有历史用量时假定的输出/输入 token 比例
+DEFAULT_OUTPUT_RATIO = 0.3
+SECONDS_PER_MINUTE = 60.0
+TOKENS_PER_PRICE_UNIT = 1000  # llm.model_prices 单位为 元/千token
+
+_SENTENCE_END_RE = re.compile(r"(?<=[。！？!?.；;\n])")
+
+
+@dataclass
+class BatchItem:
+    """批处理的一项（key 用于检查点，重复运行时据此跳过）"""
+
+    key: str
+    text: str
+    payload: dict[str, Any] = field(default_factory=dict)
+
+
+def _split_sentences(text: str, max_chars: int) -> list[str]:
+    """按句末标点切分，超过 max_chars 的句子按字符硬切"""
+    pieces: list[str] = []
+    for sentence in _SENTENCE_END_RE.split(text):
+        pieces.extend(
+            sentence[start : start + max_chars] for start in range(0, len(sentence), max_chars)
+        )
+    return pieces
+
+
+def _tail_overlap(sentences: list[str], overlap_chars: int) -> list[str]:
+    """取末尾总长不超过 overlap_chars 的完整句子"""
+    tail: list[str] = []
+    size = 0
+    for sentence in reversed(sentences):
+        if size + len(sentence) > overlap_chars:
+            break
+        tail.insert(0, sentence)
+        size += len(sentence)
+    return tail
+
+
+def chunk_text(text: str, max_chars: int, overlap_chars: int = 0) -> list[str]:
+    """按句子边界把长文本切成不超过 max_chars 的块，相邻块重叠约 overlap_chars 字"""
+    text = text.strip()
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text] if text else []
+
+    chunks: list[str] = []
+    current: list[str] = []
+    for sentence in _split_sentences(text, max_chars):
+        if current and sum(map(len, current)) + len(sentence) > max_chars:
+            chunks.append("".join(current).strip())
+            # 下一块以上一块末尾的几句作为上下文开头
+            current = _tail_overlap(current, overlap_chars)
+            if sum(map(len, current)) + len(sentence) > max_chars:
+                current = []
+        current.append(sentence)
+    if current:
+        chunks.append("".join(current).strip())
+    return [chunk for chunk in chunks if chunk]
+
+
+class BatchCheckpoint:
+    """批处理进度检查点（JSONL，每行一条已完成记录）"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.done: set[str] = set()
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.done.add(str(json.loads(line)["key"]))
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        continue  # 中断时写了一半的行
+
+    def mark_done(self, key: str, summary: dict[str, Any] | None = None) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        record = {"key": key, "at": get_utc_now().isoformat(), **(summary or {})}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.done.add(key)
+
+    def reset(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.done.clear()
+
+
+class RateLimiter:
+    """按固定间隔放行请求（requests_per_minute <= 0 表示不限制）"""
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = SECONDS_PER_MINUTE / requests_per_minute if requests_per_minute > 0 else 0
+        self._next_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def historical_output_ratio(feature_type: str | None = None) -> float:
+    """TokenUsage 日汇总中的输出/输入 token 比例（可按功能类型过滤）"""
+    try:
+        with get_session() as session:
+            statement = select(
+                func.sum(TokenUsageDaily.input_tokens), func.sum(TokenUsageDaily.output_tokens)
+            )
+            if feature_type:
+                statement = statement.where(col(TokenUsageDaily.feature_type) == feature_type)
+            input_tokens, output_tokens = session.exec(statement).one()
+    except Exception as e:
+        logger.warning(f"读取历史 token 用量失败，使用默认输出比例: {e}")
+        return DEFAULT_OUTPUT_RATIO
+    if not input_tokens:
+        return DEFAULT_OUTPUT_RATIO
+    return (output_tokens or 0) / input_tokens
+
+
+class BatchLLMRunner:
+    """批量 LLM 任务执行器"""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        concurrency: int = 4,
+        requests_per_minute: float = 60,
+        chunk_chars: int = 6000,
+        chunk_overlap: int = 200,
+        checkpoint_path: Path | None = None,
+    ):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.limiter = RateLimiter(requests_per_minute)
+        self.chunk_chars = chunk_chars
+        self.chunk_overlap = chunk_overlap
+        self.checkpoint = BatchCheckpoint(
+            checkpoint_path or get_database_path().parent / CHECKPOINT_DIRNAME / f"{name}.jsonl"
+        )
+
+    def pending(self, items: Iterable[BatchItem]) -> list[BatchItem]:
+        """过滤掉检查点中已完成的项"""
+        return [item for item in items if item.key not in self.checkpoint.done]
+
+    def estimate(
+        self,
+        items: Iterable[BatchItem],
+        *,
+        model: str,
+        prompt_tokens: int = 0,
+        calls_per_chunk: int = 1,
+        feature_type: str | None = None,
+        output_ratio: float | None = None,
+    ) -> dict[str, Any]:
+        """试运行：估算待处理项的调用次数、token 与成本（不调用 LLM）
+
+        Args:
+            items: 待处理项（已完成的自动跳过）
+            model: 计价使用的模型
+            prompt_tokens: 每次调用的固定提示词 token 数
+            calls_per_chunk: 每块的 LLM 调用次数
+            feature_type: 用于查询历史输出/输入比例的功能类型
+            output_ratio: 指定输出/输入比例（不查询历史）
+        """
+        from lifetrace.util.token_usage_logger import get_token_logger  # noqa: PLC0415
+
+        items = list(items)
+        pending = self.pending(items)
+        counter = get_token_counter(model)
+        ratio = output_ratio if output_ratio is not None else historical_output_ratio(feature_type)
+        price_logger = get_token_logger()
+        calls = input_tokens = output_tokens = 0
+        cost = 0.0
+        for item in pending:
+            for chunk in chunk_text(item.text, self.chunk_chars, self.chunk_overlap):
+                chunk_input = (prompt_tokens + counter.count(chunk)) * calls_per_chunk
+                chunk_output = int(chunk_input * ratio)
+                input_price, output_price = price_logger.get_model_price(
+                    model, chunk_input // calls_per_chunk
+                )
+                calls += calls_per_chunk
+                input_tokens += chunk_input
+                output_tokens += chunk_output
+                cost += (
+                    chunk_input * input_price + chunk_output * output_price
+                ) / TOKENS_PER_PRICE_UNIT
+        return {
+            "job": self.name,
+            "items": len(pending),
+            "skipped_done": len(items) - len(pending),
+            "calls": calls,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "output_ratio": round(ratio, 4),
+            "estimated_cost": round(cost, 4),
+            "model": model,
+        }
+
+    async def run(
+        self,
+        items: Iterable[BatchItem],
+        *,
+        map_chunk: Callable[[BatchItem, str], Awaitable[Any]],
+        reduce: Callable[[BatchItem, list[Any]], Any] | None = None,
+        commit: Callable[[BatchItem, Any], dict[str, Any] | None] | None = None,
+    ) -> dict[str, Any]:
+        """并发处理所有未完成的项
+
+        Args:
+            items: 待处理项
+            map_chunk: 处理一个文本块（一次受限流控制的 LLM 调用），返回该块的结果
+            reduce: 合并同一项各块的结果；未提供时单块返回该块结果，多块返回结果列表
+            commit: 保存一项的最终结果（同步调用），返回值写入检查点作为摘要
+
+        Returns:
+            统计信息（total/done/failed/skipped/chunks/seconds）
+        """
+        items = list(items)
+        pending = self.pending(items)
+        stats: dict[str, Any] = {
+            "total": len(pending),
+            "done": 0,
+            "failed": 0,
+            "skipped": len(items) - len(pending),
+            "chunks": 0,
+        }
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.monotonic()
+
+        async def process(item: BatchItem) -> None:
+            async with semaphore:
+                try:
+                    chunks = chunk_text(item.text, self.chunk_chars, self.chunk_overlap)
+                    results = []
+                    for chunk in chunks:
+                        await self.limiter.acquire()
+                        results.append(await map_chunk(item, chunk))
+                    stats["chunks"] += len(chunks)
+                    if reduce is not None:
+                        result = reduce(item, results)
+                    else:
+                        result = results[0] if len(results) == 1 else results
+                    summary = await asyncio.to_thread(commit, item, result) if commit else None
+                except Exception as e:
+                    stats["failed"] += 1
+                    logger.error(f"[{self.name}] 处理 {item.key} 失败: {e}")
+                    return
+                self.checkpoint.mark_done(item.key, summary)
+                stats["done"] += 1
+                logger.info(
+                    f"[{self.name}] {stats['done'] + stats['failed']}/{stats['total']} "
+                    f"完成 {item.key}（{len(chunks)} 块）"
+                )
+
+        await asyncio.gather(*(process(item) for item in pending))
+        stats["seconds"] = round(time.monotonic() - started, 3)
+        return stats
@@ -1,35 +1,60 @@
-import contextlib
 import json
 from datetime import datetime
 from typing import Any
 
+from lifetrace.llm.context_packer import (
+    ContextPacker,
+    PackedRecord,
+    PackingReport,
+    get_context_budget_config,
+    get_token_counter,
+)
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.prompt_loader import get_prompt
+from lifetrace.util.settings import settings
 from lifetrace.util.time_utils import get_utc_now
 
 logger = get_logger()
 
 # 常量定义
-MAX_RECORDS_PER_APP = 5  # 每个应用最多显示的记录数
-MAX_SEARCH_RESULTS = 10  # 搜索结果最大显示数量
 MAX_APP_STATS = 10  # 应用统计最大显示数量
-OCR_TEXT_SUMMARY_LIMIT = 200  # 总结模式下 OCR 文本截断长度
-OCR_TEXT_SEARCH_LIMIT = 150  # 搜索模式下 OCR 文本截断长度
-OCR_TEXT_TRUNCATE_LIMIT = 100  # 截断模式下 OCR 文本长度
+DEFAULT_MAX_CONTEXT_TOKENS = 6000  # 默认上下文 token 预算
+DEFAULT_PER_RECORD_MAX_TOKENS = 200  # 默认单条记录 OCR 文本 token 上限
+DETAILED_RECORDS_LIMIT = 20  # 结构化上下文最多保留的详细记录数
+OCR_TEXT_TRUNCATE_TOKENS = 60  # 结构化上下文超限时单条 OCR 文本的 token 上限
 
 
 class ContextBuilder:
     """上下文构建器，将检索到的数据整理成适合LLM处理的格式"""
 
-    def __init__(self, max_context_length: int = 8000):
+    def __init__(self, max_context_tokens: int | None = None, model: str | None = None):
         """
         初始化上下文构建器
 
         Args:
-            max_context_length: 最大上下文长度（字符数）
+            max_context_tokens: 最大上下文 token 数（默认读取 llm.context_budget.max_tokens）
+            model: 用于选择分词器的模型名称（默认使用 llm.model）
         """
-        self.max_context_length = max_context_length
-        logger.info(f"上下文构建器初始化完成，最大长度: {max_context_length}")
+        budget_config = get_context_budget_config()
+        self.max_context_tokens = max_context_tokens or int(
+            budget_config.get("max_tokens", DEFAULT_MAX_CONTEXT_TOKENS)
+        )
+        self.token_counter = get_token_counter(
+            model or settings.llm.model, str(budget_config.get("tokenizer", "auto"))
+        )
+        self.packer = ContextPacker(
+            self.token_counter,
+            per_record_max_tokens=int(
+                budget_config.get("per_record_max_tokens", DEFAULT_PER_RECORD_MAX_TOKENS)
+            ),
+            dedupe_similarity=float(budget_config.get("dedupe_similarity", 0.85)),
+        )
+        # 最近一次打包的效率报告
+        self.last_packing_report: PackingReport | None = None
+        logger.info(
+            f"上下文构建器初始化完成，最大 token 数: {self.max_context_tokens}，"
+            f"分词器: {self.token_counter.backend}"
+        )
 
     def build_context(
         self,
@@ -72,26 +97,65 @@ class ContextBuilder:
         except Exception:
             return timestamp
 
-    def _format_record_for_summary(
-        self, index: int, record: dict[str, Any], text_limit: int
-    ) -> str:
-        """格式化单条记录用于总结"""
+    def _format_record_for_summary(self, index: int, record: dict[str, Any], ocr_text: str) -> str:
+        """格式化单条记录用于总结（ocr_text 已按 token 截断）"""
         timestamp = self._format_timestamp(record.get("timestamp", "未知时间"))
-        ocr_text = record.get("ocr_text", "无文本内容")
         window_title = record.get("window_title", "")
         screenshot_id = record.get("screenshot_id") or record.get("id")
 
-        if len(ocr_text) > text_limit:
-            ocr_text = ocr_text[:text_limit] + "..."
-
         record_text = f"{index + 1}. 时间: {timestamp}"
         if window_title:
             record_text += f", 窗口: {window_title}"
         if screenshot_id:
             record_text += f", 截图ID: {screenshot_id}"
-        record_text += f"\n   内容: {ocr_text}"
+        record_text += f"\n   内容: {ocr_text or '无文本内容'}"
         return record_text
 
+    def _format_record_for_search(self, index: int, record: dict[str, Any], ocr_text: str) -> str:
+        """格式化单条记录用于搜索（ocr_text 已按 token 截断）"""
+        timestamp = self._format_timestamp(record.get("timestamp", "未知时间"))
+        app_name = record.get("app_name", "未知应用")
+        relevance = record.get("relevance_score", 0)
+        screenshot_id = record.get("screenshot_id") or record.get("id")
+
+        id_info = f" (截图ID: {screenshot_id})" if screenshot_id else ""
+        return (
+            f"{index + 1}. [{app_name}] {timestamp} (相关性: {relevance:.2f}){id_info}\n"
+            f"   {ocr_text or '无文本内容'}"
+        )
+
+    def _pack_records(
+        self, header_text: str, retrieved_data: list[dict[str, Any]]
+    ) -> tuple[list[PackedRecord], PackingReport]:
+        """在扣除固定头部后的 token 预算内打包记录"""
+        budget = self.max_context_tokens - self.token_counter.count(header_text)
+        packed, report = self.packer.pack(retrieved_data, budget)
+        self.last_packing_report = report
+        return packed, report
+
+    def _log_packing_report(self, report: PackingReport, header_text: str) -> None:
+        report.used_tokens += self.token_counter.count(header_text)
+        report.budget_tokens = self.max_context_tokens
+        logger.info(
+            f"上下文打包完成: 选中 {report.packed}/{report.candidates} 条，"
+            f"去重 {report.deduplicated} 条，超预算 {report.over_budget} 条，"
+            f"使用 {report.used_tokens}/{report.budget_tokens} tokens "
+            f"(利用率 {report.efficiency:.1%}，相关性覆盖 {report.relevance_coverage:.1%})"
+        )
+
+    def _context_header(self, query_line: str, count_line: str) -> list[str]:
+        return [
+            get_prompt("context_builder", "data_analysis_base"),
+            "",
+            get_prompt("context_builder", "citation_requirements"),
+            "",
+            get_prompt("context_builder", "response_format"),
+            "",
+            query_line,
+            count_line,
+            "",
+        ]
+
     def build_summary_context(self, query: str, retrieved_data: list[dict[str, Any]]) -> str:
         """
         构建用于总结的上下文文本
@@ -106,40 +170,40 @@ class ContextBuilder:
         if not retrieved_data:
             return "没有找到相关的历史记录数据。"
 
-        context_parts = [
-            get_prompt("context_builder", "data_analysis_base"),
-            "",
-            get_prompt("context_builder", "citation_requirements"),
-            "",
-            get_prompt("context_builder", "response_format"),
-            "",
-            f"用户查询: {query}",
-            f"找到 {len(retrieved_data)} 条相关记录:",
-            "",
-        ]
-
-        # 按应用分组
-        app_groups = self._group_by_app(retrieved_data)
+        context_parts = self._context_header(
+            f"用户查询: {query}", f"找到 {len(retrieved_data)} 条相关记录:"
+        )
+        header_text = "\n".join(context_parts)
+        packed, report = self._pack_records(header_text, retrieved_data)
 
-        for app_name, records in app_groups.items():
-            context_parts.append(f"=== {app_name} ({len(records)} 条记录) ===")
+        # 统计每个应用的记录总数，用于提示未展示的记录
+        app_totals: dict[str, int] = {}
+        for record in retrieved_data:
+            app_name = record.get("app_name", "未知应用")
+            app_totals[app_name] = app_totals.get(app_name, 0) + 1
 
-            for i, record in enumerate(records[:MAX_RECORDS_PER_APP]):
-                record_text = self._format_record_for_summary(i, record, OCR_TEXT_SUMMARY_LIMIT)
-                context_parts.append(record_text)
+        # 按应用分组（仅对选中的记录进行格式化）
+        app_groups: dict[str, list[PackedRecord]] = {}
+        for item in packed:
+            app_groups.setdefault(item.record.get("app_name", "未知应用"), []).append(item)
 
-            if len(records) > MAX_RECORDS_PER_APP:
-                context_parts.append(f"   ... 还有 {len(records) - MAX_RECORDS_PER_APP} 条记录")
+        for app_name, items in sorted(
+            app_groups.items(), key=lambda x: app_totals.get(x[0], 0), reverse=True
+        ):
+            total = app_totals.get(app_name, len(items))
+            context_parts.append(f"=== {app_name} ({total} 条记录) ===")
 
-            context_parts.append("")
+            for i, item in enumerate(items):
+                context_parts.append(self._format_record_for_summary(i, item.record, item.text))
+                report.formatted += 1
 
-        context_text = "\n".join(context_parts)
+            if total > len(items):
+                context_parts.append(f"   ... 还有 {total - len(items)} 条记录")
 
-        # 检查长度并截断
-        if len(context_text) > self.max_context_length:
-            context_text = context_text[: self.max_context_length] + "\n\n[内容过长，已截断]"
+            context_parts.append("")
 
-        return context_text
+        self._log_packing_report(report, header_text)
+        return "\n".join(context_parts)
 
     def build_search_context(self, query: str, retrieved_data: list[dict[str, Any]]) -> str:
         """
@@ -155,52 +219,20 @@ class ContextBuilder:
         if not retrieved_data:
             return f"查询: {query}\n\n未找到相关记录。"
 
-        context_parts = [
-            get_prompt("context_builder", "data_analysis_base"),
-            "",
-            get_prompt("context_builder", "citation_requirements"),
-            "",
-            get_prompt("context_builder", "response_format"),
-            "",
-            f"搜索查询: {query}",
-            f"找到 {len(retrieved_data)} 条匹配结果:",
-            "",
-        ]
-
-        # 按相关性排序显示
-        sorted_data = sorted(
-            retrieved_data, key=lambda x: x.get("relevance_score", 0), reverse=True
+        context_parts = self._context_header(
+            f"搜索查询: {query}", f"找到 {len(retrieved_data)} 条匹配结果:"
         )
+        header_text = "\n\n".join(context_parts)
+        packed, report = self._pack_records(header_text, retrieved_data)
 
-        for i, record in enumerate(sorted_data[:10]):  # 最多显示10条
-            timestamp = record.get("timestamp", "未知时间")
-            if timestamp and timestamp != "未知时间":
-                with contextlib.suppress(ValueError, TypeError):
-                    dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-                    timestamp = dt.strftime("%Y-%m-%d %H:%M")
-
-            app_name = record.get("app_name", "未知应用")
-            ocr_text = record.get("ocr_text", "无文本内容")
-            relevance = record.get("relevance_score", 0)
-            screenshot_id = record.get("screenshot_id") or record.get("id")  # 获取截图ID
-
-            # 截断过长的文本
-            if len(ocr_text) > OCR_TEXT_SEARCH_LIMIT:
-                ocr_text = ocr_text[:OCR_TEXT_SEARCH_LIMIT] + "..."
-
-            # 构建包含截图ID的上下文信息
-            id_info = f" (截图ID: {screenshot_id})" if screenshot_id else ""
-            context_parts.append(
-                f"{i + 1}. [{app_name}] {timestamp} (相关性: {relevance:.2f}){id_info}\n   {ocr_text}"
-            )
-
-        context_text = "\n\n".join(context_parts)
+        # 按相关性排序显示（仅对选中的记录进行格式化）
+        packed.sort(key=lambda item: item.record.get("relevance_score", 0), reverse=True)
+        for i, item in enumerate(packed):
+            context_parts.append(self._format_record_for_search(i, item.record, item.text))
+            report.formatted += 1
 
-        # 检查长度并截断
-        if len(context_text) > self.max_context_length:
-            context_text = context_text[: self.max_context_length] + "\n\n[搜索结果过长，已截断]"
-
-        return context_text
+        self._log_packing_report(report, header_text)
+        return "\n\n".join(context_parts)
 
     def _build_app_distribution_context(
         self, app_distribution: dict[str, int], total_count: int
@@ -343,12 +375,14 @@ class ContextBuilder:
         """构建详细记录"""
         detailed_records = []
 
-        for record in retrieved_data[:20]:  # 最多保留20条详细记录
+        for record in retrieved_data[:DETAILED_RECORDS_LIMIT]:
             detailed_record = {
                 "timestamp": record.get("timestamp"),
                 "app_name": record.get("app_name"),
                 "window_title": record.get("window_title"),
-                "ocr_text": record.get("ocr_text", "")[:500],  # 截断OCR文本
+                "ocr_text": self.token_counter.truncate(
+                    record.get("ocr_text", ""), self.packer.per_record_max_tokens
+                ),
                 "relevance_score": record.get("relevance_score", 0),
                 "screenshot_id": record.get("screenshot_id") or record.get("id"),  # 添加截图ID
             }
@@ -364,41 +398,26 @@ class ContextBuilder:
             "context_version": "1.0",
         }
 
-    def _group_by_app(
-        self, retrieved_data: list[dict[str, Any]]
-    ) -> dict[str, list[dict[str, Any]]]:
-        """按应用分组"""
-        app_groups = {}
-
-        for record in retrieved_data:
-            app_name = record.get("app_name", "未知应用")
-            if app_name not in app_groups:
-                app_groups[app_name] = []
-            app_groups[app_name].append(record)
-
-        # 按记录数量排序
-        return dict(sorted(app_groups.items(), key=lambda x: len(x[1]), reverse=True))
+    def _context_tokens(self, context: dict[str, Any]) -> int:
+        return self.token_counter.count(json.dumps(context, ensure_ascii=False))
 
     def _truncate_context(self, context: dict[str, Any]) -> dict[str, Any]:
-        """截断过长的上下文"""
-        context_str = json.dumps(context, ensure_ascii=False)
-
-        if len(context_str) <= self.max_context_length:
+        """截断过长的上下文（按 token 计数）"""
+        if self._context_tokens(context) <= self.max_context_tokens:
             return context
 
         # 逐步减少详细记录
         detailed_records = context.get("detailed_records", [])
-        while (
-            len(json.dumps(context, ensure_ascii=False)) > self.max_context_length
-            and detailed_records
-        ):
+        while self._context_tokens(context) > self.max_context_tokens and detailed_records:
             detailed_records.pop()
             context["detailed_records"] = detailed_records
 
         # 如果还是太长，截断OCR文本
         for record in context.get("detailed_records", []):
-            if "ocr_text" in record and len(record["ocr_text"]) > OCR_TEXT_TRUNCATE_LIMIT:
-                record["ocr_text"] = record["ocr_text"][:OCR_TEXT_TRUNCATE_LIMIT] + "..."
+            if "ocr_text" in record:
+                record["ocr_text"] = self.token_counter.truncate(
+                    record["ocr_text"], OCR_TEXT_TRUNCATE_TOKENS
+                )
 
-        logger.warning(f"上下文过长，已截断至 {len(json.dumps(context, ensure_ascii=False))} 字符")
+        logger.warning(f"上下文过长，已截断至 {self._context_tokens(context)} tokens")
         return context
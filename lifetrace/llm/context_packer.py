@@ -0,0 +1,269 @@
+"""
+上下文打包模块
+按 token 预算将检索记录打包进 LLM 上下文：
+
+- 使用配置模型的分词器计数（tiktoken 可用时），否则回退到中英文混合的快速估算
+- 按「相关性 / token 成本」贪心选择记录
+- 基于字符 n-gram 的 Jaccard 相似度去除近似重复的 OCR 文本块
+- 惰性构建：只有被选中的记录才会被格式化
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.settings import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = get_logger()
+
+# 单条记录除 OCR 文本外的元信息（时间、窗口、截图ID 等）预估 token 数
+RECORD_OVERHEAD_TOKENS = 24
+# 近似重复判定阈值（字符 n-gram 的 Jaccard 相似度）
+DEFAULT_DEDUPE_SIMILARITY = 0.85
+# 去重使用的字符 n-gram 长度
+SHINGLE_SIZE = 3
+# 相关性分数下限，避免 0 分记录的性价比恒为 0
+MIN_RELEVANCE = 0.01
+
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]")
+_WORD_PATTERN = re.compile(r"[A-Za-z0-9_]+")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+# 截断扫描：依次匹配 CJK 字符、英文单词或其他单个字符
+_TOKEN_SCAN_PATTERN = re.compile(f"({_CJK_PATTERN.pattern})|({_WORD_PATTERN.pattern})|.", re.DOTALL)
+
+
+class TokenCounter:
+    """token 计数器：优先使用模型分词器，否则使用快速估算"""
+
+    def __init__(self, model: str | None = None, tokenizer: str = "auto"):
+        self.model = model or ""
+        self._encoding = self._load_encoding(self.model, tokenizer)
+        self.backend = "tiktoken" if self._encoding is not None else "approx"
+
+    @staticmethod
+    def _load_encoding(model: str, tokenizer: str) -> Any | None:
+        if tokenizer == "approx" or tiktoken is None:
+            return None
+        try:
+            if tokenizer.startswith("tiktoken:"):
+                return tiktoken.get_encoding(tokenizer.split(":", 1)[1])
+            return tiktoken.encoding_for_model(model)
+        except Exception:
+            # 非 OpenAI 模型（如 qwen）没有对应编码，使用估算更贴近实际
+            return None
+
+    def count(self, text: str) -> int:
+        """计算文本的 token 数"""
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return approximate_token_count(text)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """将文本截断到不超过 max_tokens 个 token"""
+        if max_tokens <= 0 or not text:
+            return ""
+        if self._encoding is not None:
+            tokens = self._encoding.encode(text, disallowed_special=())
+            if len(tokens) <= max_tokens:
+                return text
+            return self._encoding.decode(tokens[:max_tokens]) + "..."
+        # 估算模式下单次扫描累计 token 数，在首个超出预算的位置截断
+        cjk_count = word_count = other_chars = 0
+        for match in _TOKEN_SCAN_PATTERN.finditer(text):
+            if match.group(1):
+                cjk_count += 1
+            elif match.group(2):
+                word_count += 1
+            elif match.group() != " ":
+                other_chars += 1
+            if cjk_count + int(word_count * 1.3 + 0.5) + other_chars // 4 > max_tokens:
+                return text[: match.start()] + "..."
+        return text
+
+
+def approximate_token_count(text: str) -> int:
+    """中英文混合文本的快速 token 估算
+
+    CJK 字符约 1 token/字；英文单词与数字约 1.3 token/词；其余符号约 4 字符/token。
+    """
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    words = _WORD_PATTERN.findall(text)
+    word_chars = sum(len(word) for word in words)
+    other_chars = len(text) - cjk_count - word_chars - text.count(" ")
+    return cjk_count + int(len(words) * 1.3 + 0.5) + max(other_chars, 0) // 4
+
+
+def shingles(text: str) -> frozenset[str]:
+    """将文本规范化后切分为字符 n-gram 集合"""
+    normalized = _WHITESPACE_PATTERN.sub(" ", text.strip().lower())
+    if len(normalized) <= SHINGLE_SIZE:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(
+        normalized[i : i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)
+    )
+
+
+def jaccard_similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    """计算两个 n-gram 集合的 Jaccard 相似度"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class PackedRecord:
+    """被选中的记录（OCR 文本已按 token 截断，尚未格式化）"""
+
+    record: dict[str, Any]
+    text: str
+    tokens: int
+
+
+@dataclass
+class PackingReport:
+    """打包效率报告"""
+
+    budget_tokens: int
+    used_tokens: int = 0
+    candidates: int = 0
+    packed: int = 0
+    deduplicated: int = 0
+    over_budget: int = 0
+    formatted: int = 0
+    relevance_packed: float = 0.0
+    relevance_total: float = 0.0
+    tokenizer: str = "approx"
+
+    @property
+    def efficiency(self) -> float:
+        """预算利用率（已使用 token / 预算）"""
+        return self.used_tokens / self.budget_tokens if self.budget_tokens else 0.0
+
+    @property
+    def relevance_coverage(self) -> float:
+        """被打包记录的相关性之和占全部候选相关性之和的比例"""
+        return self.relevance_packed / self.relevance_total if self.relevance_total else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "budget_tokens": self.budget_tokens,
+            "used_tokens": self.used_tokens,
+            "candidates": self.candidates,
+            "packed": self.packed,
+            "deduplicated": self.deduplicated,
+            "over_budget": self.over_budget,
+            "formatted": self.formatted,
+            "efficiency": round(self.efficiency, 4),
+            "relevance_coverage": round(self.relevance_coverage, 4),
+            "tokenizer": self.tokenizer,
+        }
+
+
+class ContextPacker:
+    """按 token 预算贪心打包检索记录"""
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        per_record_max_tokens: int = 200,
+        dedupe_similarity: float = DEFAULT_DEDUPE_SIMILARITY,
+    ):
+        self.counter = counter
+        self.per_record_max_tokens = per_record_max_tokens
+        self.dedupe_similarity = dedupe_similarity
+
+    def pack(
+        self,
+        records: list[dict[str, Any]],
+        budget_tokens: int,
+        text_getter: Callable[[dict[str, Any]], str] | None = None,
+    ) -> tuple[list[PackedRecord], PackingReport]:
+        """选择记录直到用完预算
+
+        Args:
+            records: 候选记录
+            budget_tokens: 可用 token 预算（不含固定提示词部分）
+            text_getter: 从记录中取正文的函数，默认取 ocr_text
+
+        Returns:
+            (按原始顺序排列的选中记录, 打包报告)
+        """
+        get_text = text_getter or (lambda record: record.get("ocr_text") or "")
+        report = PackingReport(
+            budget_tokens=max(budget_tokens, 0),
+            candidates=len(records),
+            tokenizer=self.counter.backend,
+        )
+
+        # 每条记录只计数一次，成本按单条上限封顶估算；截断推迟到选中之后
+        candidates: list[tuple[float, int, str, int]] = []
+        for index, record in enumerate(records):
+            text = get_text(record)
+            text_tokens = self.counter.count(text)
+            tokens = min(text_tokens, self.per_record_max_tokens) + RECORD_OVERHEAD_TOKENS
+            relevance = max(float(record.get("relevance_score") or 0.0), MIN_RELEVANCE)
+            report.relevance_total += relevance
+            candidates.append((relevance / tokens, index, text, text_tokens))
+
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+
+        selected: list[tuple[int, PackedRecord]] = []
+        seen_shingles: list[frozenset[str]] = []
+        for _, index, raw_text, text_tokens in candidates:
+            tokens = min(text_tokens, self.per_record_max_tokens) + RECORD_OVERHEAD_TOKENS
+            if report.used_tokens + tokens > report.budget_tokens:
+                report.over_budget += 1
+                continue
+            text = (
+                self.counter.truncate(raw_text, self.per_record_max_tokens)
+                if text_tokens > self.per_record_max_tokens
+                else raw_text
+            )
+            current = shingles(text)
+            if any(
+                jaccard_similarity(current, seen) >= self.dedupe_similarity
+                for seen in seen_shingles
+            ):
+                report.deduplicated += 1
+                continue
+            seen_shingles.append(current)
+            record = records[index]
+            selected.append((index, PackedRecord(record, text, tokens)))
+            report.used_tokens += tokens
+            report.relevance_packed += max(
+                float(record.get("relevance_score") or 0.0), MIN_RELEVANCE
+            )
+
+        selected.sort(key=lambda item: item[0])
+        report.packed = len(selected)
+        return [packed for _, packed in selected], report
+
+
+@lru_cache(maxsize=8)
+def get_token_counter(model: str, tokenizer: str = "auto") -> TokenCounter:
+    """获取（缓存的）token 计数器"""
+    counter = TokenCounter(model, tokenizer)
+    logger.info(f"上下文 token 计数器: model={model}, backend={counter.backend}")
+    return counter
+
+
+def get_context_budget_config() -> dict[str, Any]:
+    """读取上下文预算配置"""
+    config = settings.get("llm.context_budget") or {}
+    if hasattr(config, "to_dict"):
+        config = config.to_dict()
+    return config
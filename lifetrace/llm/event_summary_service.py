@@ -15,7 +15,6 @@ from lifetrace.storage.models import Event
 from lifetrace.storage.sql_utils import col
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.prompt_loader import get_prompt
-from lifetrace.util.token_usage_logger import log_token_usage
 
 from .event_summary_clustering import cluster_ocr_texts_with_hdbscan
 from .event_summary_config import (
@@ -281,28 +280,22 @@ class EventSummaryService:
                 ocr_text=combined_text,
             )
 
-            client = self.llm_client._get_client()
-            response = client.chat.completions.create(
-                model=self.llm_client.model,
+            response_text = self.llm_client.chat(
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
                 ],
                 temperature=0.3,
                 max_tokens=200,
+                cache_feature="event_summary",
+                usage_metadata={
+                    "endpoint": "event_summary",
+                    "response_type": "summary_generation",
+                    "feature_type": "event_summary",
+                },
             )
 
-            if hasattr(response, "usage") and response.usage:
-                log_token_usage(
-                    model=self.llm_client.model,
-                    input_tokens=response.usage.prompt_tokens,
-                    output_tokens=response.usage.completion_tokens,
-                    endpoint="event_summary",
-                    response_type="summary_generation",
-                    feature_type="event_summary",
-                )
-
-            content = (response.choices[0].message.content or "").strip()
+            content = response_text.strip()
             if content:
                 extracted_content, original_content = self._extract_json_from_response(content)
                 if extracted_content:
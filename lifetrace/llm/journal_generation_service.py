@@ -7,7 +7,6 @@ from typing import Any
 
 from lifetrace.llm.llm_client import LLMClient
 from lifetrace.util.logging_config import get_logger
-from lifetrace.util.token_usage_logger import log_token_usage
 
 logger = get_logger()
 
@@ -19,7 +18,14 @@ class JournalGenerationService:
     """Generate objective log and AI view for journals."""
 
     def __init__(self) -> None:
-        self.llm_client = LLMClient()
+        self._llm_client: LLMClient | None = None
+
+    @property
+    def llm_client(self) -> LLMClient:
+        """首次使用时才创建 LLM 客户端（模块级单例在导入时不触发 openai 加载）"""
+        if self._llm_client is None:
+            self._llm_client = LLMClient()
+        return self._llm_client
 
     def generate_objective(
         self,
@@ -74,28 +80,22 @@ class JournalGenerationService:
             return self._fallback_ai_view(content_original, language)
 
     def _call_llm(self, system_prompt: str, user_prompt: str, response_type: str) -> str:
-        client = self.llm_client._get_client()
-        response = client.chat.completions.create(
-            model=self.llm_client.model,
+        response_text = self.llm_client.chat(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
             temperature=0.4,
             max_tokens=800,
+            cache_feature="journal_generation",
+            usage_metadata={
+                "endpoint": "journal_generation",
+                "response_type": response_type,
+                "feature_type": "journal_generation",
+            },
         )
 
-        if hasattr(response, "usage") and response.usage:
-            log_token_usage(
-                model=self.llm_client.model,
-                input_tokens=response.usage.prompt_tokens,
-                output_tokens=response.usage.completion_tokens,
-                endpoint="journal_generation",
-                response_type=response_type,
-                feature_type="journal_generation",
-            )
-
-        content = (response.choices[0].message.content or "").strip()
+        content = response_text.strip()
         if not content:
             logger.warning("LLM returned empty content for journal generation")
             return ""
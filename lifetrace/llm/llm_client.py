@@ -4,18 +4,19 @@ LLM客户端模块
 """
 
 import contextlib
+from collections.abc import Callable
 from typing import TYPE_CHECKING, Any, cast
 
-from openai import OpenAI
-
 if TYPE_CHECKING:
+    from openai import OpenAI
     from openai.types.chat import ChatCompletionMessageParam
 else:
     ChatCompletionMessageParam = Any
 
+from lifetrace.util.llm_response_cache import get_llm_response_cache
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.settings import settings
-from lifetrace.util.token_usage_logger import setup_token_logger
+from lifetrace.util.token_usage_logger import log_token_usage, setup_token_logger
 
 from .llm_client_intent import classify_intent_with_llm, rule_based_intent_classification
 from .llm_client_query import (
@@ -74,8 +75,9 @@ class LLMClient:
             logger.warning("使用硬编码默认值初始化LLM客户端")
 
         try:
-            if OpenAI is None:
-                raise ImportError("openai 依赖未安装")
+            # openai 导入较慢（约 1 秒），延迟到首次创建客户端时
+            from openai import OpenAI  # noqa: PLC0415
+
             self.client = OpenAI(base_url=self.base_url, api_key=self.api_key)
             logger.info(f"LLM客户端初始化成功，使用模型: {self.model}")
             logger.info(f"API Base URL: {self.base_url}")
@@ -104,7 +106,7 @@ class LLMClient:
         """检查LLM客户端是否可用"""
         return self.client is not None
 
-    def _get_client(self) -> OpenAI:
+    def _get_client(self) -> "OpenAI":
         if self.client is None:
             raise RuntimeError("LLM客户端不可用，无法进行请求")
         return self.client
@@ -115,7 +117,7 @@ class LLMClient:
             logger.warning("LLM客户端不可用，使用规则分类")
             return rule_based_intent_classification(user_query)
 
-        return classify_intent_with_llm(self.client, self.model, user_query)
+        return classify_intent_with_llm(self, user_query)
 
     def parse_query(self, user_query: str) -> dict[str, Any]:
         """解析用户查询"""
@@ -123,7 +125,7 @@ class LLMClient:
             logger.warning("LLM客户端不可用，使用规则解析")
             return rule_based_parse(user_query)
 
-        return parse_query_with_llm(self.client, self.model, user_query)
+        return parse_query_with_llm(self, user_query)
 
     def generate_summary(self, query: str, context_data: list[dict[str, Any]]) -> str:
         """生成摘要"""
@@ -133,31 +135,83 @@ class LLMClient:
 
         return generate_summary_with_llm(self.client, self.model, query, context_data)
 
-    def chat(
+    def chat(  # noqa: PLR0913
         self,
         messages: list[dict[str, str]],
         temperature: float = 0.7,
         model: str | None = None,
         max_tokens: int | None = None,
+        *,
+        cache_feature: str | None = None,
+        cache_key: str | None = None,
+        usage_metadata: dict[str, Any] | None = None,
+        cache_if: Callable[[str], bool] | None = None,
     ) -> str:
-        """通用非流式聊天方法，返回完整文本结果。"""
+        """通用非流式聊天方法，返回完整文本结果。
+
+        Args:
+            messages: 消息列表
+            temperature: 温度参数
+            model: 模型名称（默认使用配置模型）
+            max_tokens: 最大输出 token 数
+            cache_feature: 响应缓存的功能标识；为空或该功能未启用缓存时不使用缓存
+            cache_key: 自定义缓存键原文（默认使用完整 messages 计算 prompt hash）
+            usage_metadata: 传给 log_token_usage 的元数据；为空时不记录 token 使用量
+            cache_if: 响应写入缓存的条件（如含时间范围的查询解析结果不缓存）；默认总是写入
+        """
         if not self.is_available():
             raise RuntimeError("LLM客户端不可用，无法进行文本聊天")
 
+        resolved_model = model or self.model
+        response_cache = get_llm_response_cache()
+        cache_prompt = cache_key if cache_key is not None else messages
+        # 未启用缓存时为 None
+        enabled_feature = cache_feature if response_cache.is_enabled(cache_feature) else None
+        if enabled_feature:
+            cached = response_cache.get(
+                feature=enabled_feature,
+                model=resolved_model,
+                prompt=cache_prompt,
+                temperature=temperature,
+            )
+            if cached is not None:
+                return cached
+
         try:
             client = self._get_client()
             response = client.chat.completions.create(
-                model=model or self.model,
+                model=resolved_model,
                 messages=cast("list[ChatCompletionMessageParam]", messages),
                 temperature=temperature,
                 max_tokens=max_tokens,
             )
             content = response.choices[0].message.content or ""
-            return content
         except Exception as e:
             logger.error(f"文本聊天失败: {e}")
             raise
 
+        usage = getattr(response, "usage", None)
+        input_tokens = usage.prompt_tokens if usage else 0
+        output_tokens = usage.completion_tokens if usage else 0
+        if usage_metadata is not None and usage:
+            log_token_usage(
+                model=resolved_model,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                **usage_metadata,
+            )
+        if enabled_feature and (cache_if is None or cache_if(content)):
+            response_cache.set(
+                feature=enabled_feature,
+                model=resolved_model,
+                prompt=cache_prompt,
+                temperature=temperature,
+                response=content,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+            )
+        return content
+
     def stream_chat(
         self,
         messages: list[dict[str, str]],
@@ -8,17 +8,17 @@ from typing import Any
 
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.prompt_loader import get_prompt
-from lifetrace.util.token_usage_logger import log_token_usage
 
 logger = get_logger()
 
+INTENT_CACHE_FEATURE = "intent_classification"
 
-def classify_intent_with_llm(client, model: str, user_query: str) -> dict[str, Any]:
+
+def classify_intent_with_llm(llm_client, user_query: str) -> dict[str, Any]:
     """使用LLM分类用户意图
 
     Args:
-        client: OpenAI客户端
-        model: 模型名称
+        llm_client: LLMClient 实例（通过 chat 调用，响应缓存与 token 记录由其处理）
         user_query: 用户查询
 
     Returns:
@@ -44,63 +44,56 @@ def classify_intent_with_llm(client, model: str, user_query: str) -> dict[str, A
 只返回JSON，不要返回其他任何信息，不要使用markdown代码块标记。
 """
         user_content = prompt.replace("<USER_QUERY>", user_query)
-
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": get_prompt("llm_client", "intent_classification"),
-                },
-                {"role": "user", "content": user_content},
-            ],
+        messages = [
+            {
+                "role": "system",
+                "content": get_prompt("llm_client", "intent_classification"),
+            },
+            {"role": "user", "content": user_content},
+        ]
+
+        result_text = llm_client.chat(
+            messages=messages,
             temperature=0.1,
             max_tokens=200,
-        )
-
-        if hasattr(response, "usage") and response.usage:
-            log_token_usage(
-                model=model,
-                input_tokens=response.usage.prompt_tokens,
-                output_tokens=response.usage.completion_tokens,
-                endpoint="classify_intent",
-                user_query=user_query,
-                response_type="intent_classification",
-                feature_type="event_assistant",
-            )
-
-        result_text = response.choices[0].message.content.strip()
-
-        logger.info("=== LLM意图分类响应 ===")
-        logger.info(f"用户输入: {user_query}")
-        logger.info(f"LLM回复: {result_text}")
-        logger.info("=== 响应结束 ===")
+            cache_feature=INTENT_CACHE_FEATURE,
+            usage_metadata={
+                "endpoint": "classify_intent",
+                "user_query": user_query,
+                "response_type": "intent_classification",
+                "feature_type": "event_assistant",
+            },
+        ).strip()
 
         logger.info(f"LLM意图分类 - 用户输入: {user_query}")
         logger.info(f"LLM意图分类 - 原始响应: {result_text}")
-
-        try:
-            clean_text = result_text.strip()
-            if clean_text.startswith("```json"):
-                clean_text = clean_text[7:]
-            if clean_text.endswith("```"):
-                clean_text = clean_text[:-3]
-            clean_text = clean_text.strip()
-
-            result = json.loads(clean_text)
-            logger.info(
-                f"意图分类结果: {result['intent_type']}, 需要数据库: {result['needs_database']}"
-            )
-            return result
-        except json.JSONDecodeError:
-            logger.warning(f"LLM返回的不是有效JSON: {result_text}")
-            return rule_based_intent_classification(user_query)
+        return _parse_intent_result(result_text, user_query)
 
     except Exception as e:
         logger.error(f"LLM意图分类失败: {e}")
         return rule_based_intent_classification(user_query)
 
 
+def _parse_intent_result(result_text: str, user_query: str) -> dict[str, Any]:
+    """解析 LLM 返回的意图分类 JSON，失败时回退到规则分类"""
+    try:
+        clean_text = result_text.strip()
+        if clean_text.startswith("```json"):
+            clean_text = clean_text[7:]
+        if clean_text.endswith("```"):
+            clean_text = clean_text[:-3]
+        clean_text = clean_text.strip()
+
+        result = json.loads(clean_text)
+        logger.info(
+            f"意图分类结果: {result['intent_type']}, 需要数据库: {result['needs_database']}"
+        )
+        return result
+    except (json.JSONDecodeError, KeyError, TypeError):
+        logger.warning(f"LLM返回的不是有效JSON: {result_text}")
+        return rule_based_intent_classification(user_query)
+
+
 def rule_based_intent_classification(user_query: str) -> dict[str, Any]:
     """基于规则的意图分类（备用方案）"""
     query_lower = user_query.lower()
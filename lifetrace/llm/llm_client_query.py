@@ -14,13 +14,14 @@ from lifetrace.util.token_usage_logger import log_token_usage
 
 logger = get_logger()
 
+QUERY_CACHE_FEATURE = "query_parsing"
 
-def parse_query_with_llm(client, model: str, user_query: str) -> dict[str, Any]:
+
+def parse_query_with_llm(llm_client, user_query: str) -> dict[str, Any]:
     """使用LLM解析用户查询
 
     Args:
-        client: OpenAI客户端
-        model: 模型名称
+        llm_client: LLMClient 实例（通过 chat 调用，响应缓存与 token 记录由其处理）
         user_query: 用户查询
 
     Returns:
@@ -33,54 +34,60 @@ def parse_query_with_llm(client, model: str, user_query: str) -> dict[str, Any]:
 
     try:
         user_message = f"当前时间是：{current_date_str}\n请解析这个查询：{user_query}"
-        response = client.chat.completions.create(
+        # 缓存键不含当前时间：只缓存不含时间范围的解析结果（见 _is_time_independent），
+        # 含时间范围的结果依赖当前时间，每次都重新解析
+        result_text = llm_client.chat(
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message},
             ],
-            model=model,
             temperature=0.1,
-        )
-
-        if hasattr(response, "usage") and response.usage:
-            log_token_usage(
-                model=model,
-                input_tokens=response.usage.prompt_tokens,
-                output_tokens=response.usage.completion_tokens,
-                endpoint="parse_query",
-                user_query=user_query,
-                response_type="query_parsing",
-                feature_type="event_assistant",
-            )
-
-        result_text = response.choices[0].message.content.strip()
-
-        logger.info("=== LLM查询解析响应 ===")
-        logger.info(f"用户查询: {user_query}")
-        logger.info(f"LLM回复: {result_text}")
-        logger.info("=== 响应结束 ===")
-
+            cache_feature=QUERY_CACHE_FEATURE,
+            cache_key=f"{system_prompt}\n{user_query}",
+            cache_if=lambda text: _is_time_independent(_load_result(text)),
+            usage_metadata={
+                "endpoint": "parse_query",
+                "user_query": user_query,
+                "response_type": "query_parsing",
+                "feature_type": "event_assistant",
+            },
+        ).strip()
         logger.info(f"LLM查询解析 - 用户查询: {user_query}")
         logger.info(f"LLM查询解析 - 原始响应: {result_text}")
 
-        try:
-            clean_text = result_text.strip()
-            if clean_text.startswith("```json"):
-                clean_text = clean_text[7:]
-            if clean_text.endswith("```"):
-                clean_text = clean_text[:-3]
-            clean_text = clean_text.strip()
-            result = json.loads(clean_text)
-            return result
-        except json.JSONDecodeError:
+        result = _load_result(result_text)
+        if result is None:
             logger.warning(f"LLM返回的不是有效JSON: {result_text}")
             return rule_based_parse(user_query)
+        return result
 
     except Exception as e:
         logger.error(f"LLM解析失败: {e}")
         return rule_based_parse(user_query)
 
 
+def _load_result(result_text: str) -> Any:
+    """解析 LLM 返回的 JSON（去掉 markdown 代码块），无效时返回 None"""
+    clean_text = result_text.strip()
+    if clean_text.startswith("```json"):
+        clean_text = clean_text[7:]
+    if clean_text.endswith("```"):
+        clean_text = clean_text[:-3]
+    try:
+        return json.loads(clean_text.strip())
+    except json.JSONDecodeError:
+        return None
+
+
+def _is_time_independent(result: Any) -> bool:
+    """解析结果不含绝对时间范围时才可缓存（“最近10分钟”等会被解析成随当前时间变化的范围）"""
+    return (
+        isinstance(result, dict)
+        and result.get("start_date") is None
+        and result.get("end_date") is None
+    )
+
+
 def rule_based_parse(user_query: str) -> dict[str, Any]:
     """基于规则的查询解析（备用方案）"""
     query_lower = user_query.lower()  # noqa: F841
@@ -3,6 +3,7 @@ LLM 视觉多模态模块
 包含视觉分析相关功能
 """
 
+import time
 from typing import Any
 
 from lifetrace.util.image_utils import get_screenshots_base64
@@ -52,7 +53,9 @@ def vision_chat(
         包含响应和元信息的字典
     """
     try:
+        prepare_start = time.perf_counter()
         screenshot_data = get_screenshots_base64(screenshot_ids)
+        prepare_ms = int((time.perf_counter() - prepare_start) * 1000)
         valid_screenshots = [item for item in screenshot_data if "base64_data" in item]
 
         if not valid_screenshots:
@@ -69,6 +72,12 @@ def vision_chat(
             )
 
         content.append({"type": "text", "text": prompt})
+        payload_metrics = {
+            "payload_bytes": sum(item.get("payload_bytes", 0) for item in valid_screenshots),
+            "original_bytes": sum(item.get("original_bytes", 0) for item in valid_screenshots),
+            "cached_images": sum(1 for item in valid_screenshots if item.get("cached")),
+            "prepare_ms": prepare_ms,
+        }
 
         messages = [{"role": "user", "content": content}]
 
@@ -76,10 +85,16 @@ def vision_chat(
         vision_temperature = get_vision_temperature(temperature)
         vision_max_tokens = get_vision_max_tokens(max_tokens)
 
-        logger.info(f"调用视觉模型 {vision_model}，处理 {len(valid_screenshots)} 张截图")
+        logger.info(
+            f"调用视觉模型 {vision_model}，处理 {len(valid_screenshots)} 张截图，"
+            f"载荷 {payload_metrics['payload_bytes'] / 1024:.1f}KB "
+            f"(原图 {payload_metrics['original_bytes'] / 1024:.1f}KB)，"
+            f"预处理耗时 {prepare_ms}ms"
+        )
 
         timeout_seconds = min(300, max(60, len(valid_screenshots) * 30))
 
+        request_start = time.perf_counter()
         response = client.chat.completions.create(
             model=vision_model,
             messages=messages,
@@ -87,6 +102,8 @@ def vision_chat(
             max_tokens=vision_max_tokens,
             timeout=timeout_seconds,
         )
+        # 包含载荷上传与模型推理的总耗时
+        payload_metrics["request_ms"] = int((time.perf_counter() - request_start) * 1000)
 
         result_text = response.choices[0].message.content.strip()
 
@@ -96,6 +113,7 @@ def vision_chat(
                 "prompt_tokens": response.usage.prompt_tokens,
                 "completion_tokens": response.usage.completion_tokens,
                 "total_tokens": response.usage.total_tokens,
+                **payload_metrics,
             }
 
             log_token_usage(
@@ -109,16 +127,21 @@ def vision_chat(
                 additional_info={
                     "screenshot_count": len(valid_screenshots),
                     "screenshot_ids": screenshot_ids,
+                    **payload_metrics,
                 },
             )
 
-        logger.info(f"视觉模型分析完成，响应长度: {len(result_text)}")
+        logger.info(
+            f"视觉模型分析完成，响应长度: {len(result_text)}，"
+            f"请求耗时 {payload_metrics['request_ms']}ms"
+        )
 
         return {
             "response": result_text,
             "usage_info": usage_info,
             "model": vision_model,
             "screenshot_count": len(valid_screenshots),
+            "payload_metrics": payload_metrics,
         }
 
     except Exception as e:
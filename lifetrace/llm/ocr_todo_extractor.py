@@ -13,6 +13,7 @@ from typing import Any
 
 from lifetrace.llm.llm_client import LLMClient
 from lifetrace.storage import ocr_mgr, todo_mgr
+from lifetrace.util.llm_response_cache import get_llm_response_cache
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.prompt_loader import get_prompt
 from lifetrace.util.time_parser import calculate_scheduled_time
@@ -20,6 +21,11 @@ from lifetrace.util.time_utils import get_utc_now
 
 logger = get_logger()
 
+# 响应缓存中 OCR 待办提取的功能标识
+OCR_TODO_CACHE_FEATURE = "ocr_todo_extraction"
+# 限流记录的最大条目数，超出后清理过期项
+MAX_THROTTLE_ENTRIES = 1000
+
 
 def _compute_text_hash(text_content: str) -> str | None:
     """对 OCR 文本进行标准化并计算哈希，用于判断是否重复。
@@ -38,16 +44,26 @@ class OCRTodoExtractor:
     def __init__(self, llm_client: LLMClient):
         """Initialize the extractor with an LLM client."""
         self.llm_client = llm_client
-        # 基于 OCR 文本的 LLM 调用缓存与频率控制
-        # key: text_hash, value: {"timestamp": float, "todos_raw": list[dict[str, Any]]}
-        self._ocr_text_cache: dict[str, dict[str, Any]] = {}
-        # 同一 text_hash 的最小 LLM 调用间隔（秒），用于限流
+        # 同一 text_hash 的最小 LLM 调用间隔（秒），仅在响应缓存未启用时用于限流
         self._ocr_text_min_interval_sec: float = 60.0
-        # 纯内存缓存的有效期（秒），过期后即便有缓存仍会重新调用 LLM
-        self._ocr_text_cache_ttl_sec: float = 3600.0
-        # 记录每个 text_hash 上一次真实调用 LLM 的时间戳
+        # 记录每个 text_hash 上一次真实调用 LLM 的时间戳（定期清理过期项，避免无限增长）
         self._ocr_text_last_llm_call: dict[str, float] = {}
 
+    def _is_throttled(self, text_hash: str, now_ts: float) -> bool:
+        """判断相同文本距上次 LLM 调用是否过近"""
+        last_call_ts = self._ocr_text_last_llm_call.get(text_hash)
+        return last_call_ts is not None and now_ts - last_call_ts < self._ocr_text_min_interval_sec
+
+    def _record_llm_call(self, text_hash: str, now_ts: float) -> None:
+        """记录调用时间，并清理已超过限流间隔的旧记录"""
+        if len(self._ocr_text_last_llm_call) >= MAX_THROTTLE_ENTRIES:
+            self._ocr_text_last_llm_call = {
+                key: ts
+                for key, ts in self._ocr_text_last_llm_call.items()
+                if now_ts - ts < self._ocr_text_min_interval_sec
+            }
+        self._ocr_text_last_llm_call[text_hash] = now_ts
+
     def extract_todos(  # noqa: PLR0911, PLR0912, PLR0915, C901
         self,
         ocr_result_id: int,
@@ -97,6 +113,7 @@ class OCRTodoExtractor:
             # 获取当前活跃 Todo 列表，用于提示词
             existing_todos = todo_mgr.get_active_todos_for_prompt(limit=100)
             existing_todos_json = json.dumps(existing_todos, ensure_ascii=False)
+            todos_hash = hashlib.sha256(existing_todos_json.encode("utf-8")).hexdigest()
 
             system_prompt = get_prompt("auto_todo_detection", "system_assistant")
             user_prompt = get_prompt(
@@ -122,93 +139,71 @@ class OCRTodoExtractor:
                 {"role": "user", "content": user_content},
             ]
 
-            # 频率控制与缓存：尽量减少对同一 text_hash 的重复 LLM 调用
+            # 频率控制与缓存：相同 OCR 文本且已有待办列表不变时由持久化响应缓存复用
+            # （已有待办变化后，缓存的响应可能重新创建已完成/删除的待办），
+            # 仅在缓存未启用时按最小间隔进行限流
             now_ts = time.time()
-            cached_entry = self._ocr_text_cache.get(text_hash)
-            todos: list[dict[str, Any]]
-
-            # 如果有有效缓存且未过期，直接复用缓存结果，避免再次调用 LLM
-            if (
-                cached_entry
-                and now_ts - cached_entry.get("timestamp", 0.0) <= self._ocr_text_cache_ttl_sec
+            response_cache = get_llm_response_cache()
+            if not response_cache.is_enabled(OCR_TODO_CACHE_FEATURE) and self._is_throttled(
+                text_hash, now_ts
             ):
                 logger.info(
-                    "基于 OCR 文本待办提取命中缓存，跳过 LLM 调用 "
+                    "距离上次基于相同 OCR 文本的 LLM 调用时间过短，跳过本次调用 "
                     f"(ocr_result_id={ocr_result_id}, text_hash={text_hash})"
                 )
-                todos = cached_entry.get("todos_raw") or []
-            else:
-                # 如果距离上次真实 LLM 调用的时间间隔过短，则进行限流
-                last_call_ts = self._ocr_text_last_llm_call.get(text_hash)
-                if (
-                    last_call_ts is not None
-                    and now_ts - last_call_ts < self._ocr_text_min_interval_sec
-                ):
-                    logger.info(
-                        "距离上次基于相同 OCR 文本的 LLM 调用时间过短，跳过本次调用 "
-                        f"(ocr_result_id={ocr_result_id}, text_hash={text_hash})"
-                    )
-                    # 如果存在旧缓存则复用，否则直接跳过（返回空结果）
-                    if cached_entry and cached_entry.get("todos_raw"):
-                        todos = cached_entry.get("todos_raw") or []
-                    else:
-                        return {
-                            "ocr_result_id": ocr_result_id,
-                            "todos": [],
-                            "skipped": True,
-                            "reason": "too_frequent",
-                            "created_count": 0,
-                            "created_todos": [],
-                        }
-                else:
-                    logger.info("开始基于 OCR 文本调用 LLM 进行待办提取")
-                    response_text = self.llm_client.chat(
-                        messages=messages,
-                        temperature=0.3,
-                        max_tokens=1500,
-                    )
-                    # 记录本次真实 LLM 调用时间
-                    self._ocr_text_last_llm_call[text_hash] = now_ts
-
-                    # 仅做 JSON 解析，并在本地进行去重（基于标题+时间），避免重复创建相同待办
-                    try:
-                        json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
-                        if not json_match:
-                            logger.warning("基于 OCR 文本的 LLM 响应中未找到 JSON，返回空结果")
-                            return {
-                                "ocr_result_id": ocr_result_id,
-                                "todos": [],
-                                "skipped": False,
-                                "error_message": "no_json_in_response",
-                                "created_count": 0,
-                                "created_todos": [],
-                            }
-
-                        json_str = json_match.group(0)
-                        data = json.loads(json_str)
-                        todos = data.get("new_todos") or data.get("todos") or []
-
-                        if not isinstance(todos, list):
-                            logger.warning("LLM 返回的 todos 字段不是列表，返回空结果")
-                            todos = []
-
-                        # 将本次解析结果写入内存缓存
-                        self._ocr_text_cache[text_hash] = {
-                            "timestamp": now_ts,
-                            "todos_raw": todos,
-                        }
-                    except Exception as e:
-                        logger.error(
-                            f"解析基于 OCR 文本的 LLM 响应失败: {e}\n原始响应: {response_text[:200]}"
-                        )
-                        return {
-                            "ocr_result_id": ocr_result_id,
-                            "todos": [],
-                            "skipped": False,
-                            "error_message": "parse_error",
-                            "created_count": 0,
-                            "created_todos": [],
-                        }
+                return {
+                    "ocr_result_id": ocr_result_id,
+                    "todos": [],
+                    "skipped": True,
+                    "reason": "too_frequent",
+                    "created_count": 0,
+                    "created_todos": [],
+                }
+
+            logger.info("开始基于 OCR 文本调用 LLM 进行待办提取")
+            response_text = self.llm_client.chat(
+                messages=messages,
+                temperature=0.3,
+                max_tokens=1500,
+                cache_feature=OCR_TODO_CACHE_FEATURE,
+                cache_key=f"{text_hash}:{todos_hash}",
+            )
+            self._record_llm_call(text_hash, now_ts)
+
+            # 仅做 JSON 解析，并在本地进行去重（基于标题+时间），避免重复创建相同待办
+            todos: list[dict[str, Any]]
+            try:
+                json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
+                if not json_match:
+                    logger.warning("基于 OCR 文本的 LLM 响应中未找到 JSON，返回空结果")
+                    return {
+                        "ocr_result_id": ocr_result_id,
+                        "todos": [],
+                        "skipped": False,
+                        "error_message": "no_json_in_response",
+                        "created_count": 0,
+                        "created_todos": [],
+                    }
+
+                json_str = json_match.group(0)
+                data = json.loads(json_str)
+                todos = data.get("new_todos") or data.get("todos") or []
+
+                if not isinstance(todos, list):
+                    logger.warning("LLM 返回的 todos 字段不是列表，返回空结果")
+                    todos = []
+            except Exception as e:
+                logger.error(
+                    f"解析基于 OCR 文本的 LLM 响应失败: {e}\n原始响应: {response_text[:200]}"
+                )
+                return {
+                    "ocr_result_id": ocr_result_id,
+                    "todos": [],
+                    "skipped": False,
+                    "error_message": "parse_error",
+                    "created_count": 0,
+                    "created_todos": [],
+                }
 
             # 从这里开始，todos 已经就绪（来自缓存或本次 LLM 调用结果）
             # 后续统一执行本地去重与 draft 待办创建逻辑
@@ -300,6 +300,11 @@ class RAGService:
                 "context_builder": "ready",
                 "query_parser": "ready",
             },
+            "context_packing": (
+                self.context_builder.last_packing_report.to_dict()
+                if self.context_builder.last_packing_report
+                else None
+            ),
             "timestamp": get_utc_now().isoformat(),
         }
 
@@ -1,11 +1,21 @@
-"""工具模块 - Agent 工具调用框架"""
+"""工具模块 - Agent 工具调用框架
+
+内置工具由 register_builtin_tools() 注册（AgentService 导入时调用），
+仅导入本包不会加载联网搜索等工具的第三方依赖。
+"""
 
 from lifetrace.llm.tools.base import Tool, ToolResult
 from lifetrace.llm.tools.registry import ToolRegistry
-from lifetrace.llm.tools.web_search_tool import WebSearchTool
 
-# 初始化工具注册表并注册工具
 tool_registry = ToolRegistry()
-tool_registry.register(WebSearchTool())
 
-__all__ = ["Tool", "ToolRegistry", "ToolResult", "tool_registry"]
+
+def register_builtin_tools() -> None:
+    """注册内置工具（已注册时跳过）"""
+    from lifetrace.llm.tools.web_search_tool import WebSearchTool  # noqa: PLC0415
+
+    if tool_registry.get_tool("web_search") is None:
+        tool_registry.register(WebSearchTool())
+
+
+__all__ = ["Tool", "ToolRegistry", "ToolResult", "register_builtin_tools", "tool_registry"]
@@ -1,5 +1,6 @@
 """工具注册表"""
 
+import json
 from typing import ClassVar
 
 from lifetrace.llm.tools.base import Tool
@@ -13,6 +14,8 @@ class ToolRegistry:
 
     _instance: ClassVar["ToolRegistry | None"] = None
     _tools: ClassVar[dict[str, Tool]] = {}
+    # 按可用工具组合缓存的紧凑 JSON Schema（注册新工具时清空）
+    _schema_json_cache: ClassVar[dict[tuple[str, ...], str]] = {}
 
     def __new__(cls):
         if cls._instance is None:
@@ -22,6 +25,7 @@ class ToolRegistry:
     def register(self, tool: Tool):
         """注册工具"""
         self._tools[tool.name] = tool
+        self._schema_json_cache.clear()
         logger.info(f"注册工具: {tool.name}")
 
     def get_tool(self, name: str) -> Tool | None:
@@ -42,3 +46,21 @@ class ToolRegistry:
             }
             for tool in self.get_available_tools()
         ]
+
+    def get_tools_schema_json(self, tools: list[Tool] | None = None) -> str:
+        """获取工具 Schema 的紧凑 JSON（按可用工具组合缓存，避免每轮重复序列化）"""
+        available = tools if tools is not None else self.get_available_tools()
+        cache_key = tuple(tool.name for tool in available)
+        cached = self._schema_json_cache.get(cache_key)
+        if cached is None:
+            schema = [
+                {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "parameters": tool.parameters_schema,
+                }
+                for tool in available
+            ]
+            cached = json.dumps(schema, ensure_ascii=False, separators=(",", ":"))
+            self._schema_json_cache[cache_key] = cached
+        return cached
@@ -291,6 +291,27 @@ class VectorDatabase:
             self.logger.error(f"Failed to delete document {doc_id}: {e}")
             return False
 
+    def delete_documents(self, doc_ids: list[str]) -> bool:
+        """批量删除文档
+
+        Args:
+            doc_ids: 文档唯一标识符列表
+
+        Returns:
+            是否删除成功
+        """
+        if not doc_ids:
+            return True
+        try:
+            if self.collection is None:
+                raise RuntimeError("Vector collection not initialized")
+            self.collection.delete(ids=doc_ids)
+            self.logger.debug(f"Deleted {len(doc_ids)} documents from vector database")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to delete {len(doc_ids)} documents: {e}")
+            return False
+
     def search(
         self, query: str, top_k: int = 10, where: dict[str, Any] | None = None
     ) -> list[dict[str, Any]]:
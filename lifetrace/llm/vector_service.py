@@ -199,6 +199,38 @@ class VectorService:
             )
             return False
 
+    def delete_ocr_results(self, ocr_result_ids: list[int]) -> int:
+        """从向量数据库中批量删除 OCR 结果
+
+        Args:
+            ocr_result_ids: OCR 结果 ID 列表
+
+        Returns:
+            删除的文档数量
+        """
+        if not self.is_enabled() or not ocr_result_ids:
+            return 0
+
+        vector_db = self._require_vector_db()
+        doc_ids = [f"ocr_{ocr_result_id}" for ocr_result_id in ocr_result_ids]
+        return len(doc_ids) if vector_db.delete_documents(doc_ids) else 0
+
+    def delete_events(self, event_ids: list[int]) -> int:
+        """从向量数据库中批量删除事件文档
+
+        Args:
+            event_ids: 事件 ID 列表
+
+        Returns:
+            删除的文档数量
+        """
+        if not self.is_enabled() or not event_ids:
+            return 0
+
+        vector_db = self._require_vector_db()
+        doc_ids = [f"event_{event_id}" for event_id in event_ids]
+        return len(doc_ids) if vector_db.delete_documents(doc_ids) else 0
+
     def _compute_score(self, result: dict[str, Any]) -> float:
         """计算统一的相似度分数"""
         if "rerank_score" in result:
@@ -32,6 +32,7 @@ from lifetrace.storage.models import (  # noqa: F401, E402
     TodoAttachmentRelation,
     TodoTagRelation,
     TokenUsage,
+    TokenUsageDaily,
 )
 from lifetrace.util.path_utils import get_database_path  # noqa: E402
 
@@ -11,6 +11,14 @@
   --start-date DATE 指定开始日期 (YYYY-MM-DD)
   --end-date DATE   指定结束日期 (YYYY-MM-DD)
   --ids ID1,ID2,... 指定特定的 transcription_id 列表
+  --concurrency N   并发提取数（默认 4）
+  --rpm N           每分钟最多 LLM 请求数（默认 60，0 表示不限制）
+  --chunk-chars N   长文本分块大小（字符，默认 6000），分块提取后合并去重
+  --dry-run         只估算调用次数、token 与成本，不调用 LLM
+  --restart         清除进度检查点，从头处理
+
+进度检查点保存在数据目录的 batch_jobs/re_extract_transcriptions.jsonl，中断后重新运行会跳过
+已完成的记录。
 """
 
 import argparse
@@ -19,7 +27,6 @@ import json
 import sys
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
-from typing import Any
 
 # 添加项目根目录到路径（必须在导入之前）
 project_root = Path(__file__).parent.parent.parent
@@ -29,8 +36,12 @@ sys.path.insert(0, str(project_root))
 if True:
     from sqlmodel import select
 
+    from lifetrace.llm.batch_runner import BatchItem, BatchLLMRunner
     from lifetrace.llm.llm_client import LLMClient
-    from lifetrace.services.audio_extraction_service import AudioExtractionService
+    from lifetrace.services.audio_extraction_service import (
+        EXTRACTION_FEATURE_TYPE,
+        AudioExtractionService,
+    )
     from lifetrace.storage import get_session
     from lifetrace.storage.models import Transcription
     from lifetrace.storage.sql_utils import col
@@ -38,6 +49,10 @@ if True:
 
 logger = get_logger()
 
+JOB_NAME = "re_extract_transcriptions"
+# 提取提示词（系统提示 + 格式说明）的大致 token 数，用于成本估算
+EXTRACTION_PROMPT_TOKENS = 900
+
 
 def is_empty_extraction(extracted: str | None) -> bool:
     """检查提取结果是否为空"""
@@ -89,86 +104,29 @@ def needs_extraction(transcription: Transcription) -> tuple[bool, bool]:
     return needs_original, needs_optimized
 
 
-async def re_extract_transcription(
-    transcription: Transcription,
-    extraction_service: AudioExtractionService,
-    needs_original: bool,
-    needs_optimized: bool,
-) -> dict[str, Any]:
-    """重新提取单个转录记录
-
-    Returns:
-        包含提取结果的字典
-    """
-    results = {
-        "transcription_id": transcription.id,
-        "recording_id": transcription.audio_recording_id,
-        "original_extracted": False,
-        "optimized_extracted": False,
-        "errors": [],
-    }
-
-    # 提取原文
-    if needs_original:
-        try:
-            if transcription.id is None:
-                raise ValueError("Transcription must have an id before updating.")
-            logger.info(
-                f"提取原文: transcription_id={transcription.id}, "
-                f"recording_id={transcription.audio_recording_id}, "
-                f"text_length={len(transcription.original_text or '')}"
-            )
-            result = await extraction_service.extract_todos_and_schedules(
-                transcription.original_text or ""
-            )
-            extraction_service.update_extraction(
-                transcription_id=transcription.id,
-                todos=result.get("todos", []),
-                schedules=result.get("schedules", []),
-                optimized=False,
-            )
-            results["original_extracted"] = True
-            logger.info(
-                f"✓ 原文提取完成: transcription_id={transcription.id}, "
-                f"todos={len(result.get('todos', []))}, "
-                f"schedules={len(result.get('schedules', []))}"
-            )
-        except Exception as e:
-            error_msg = f"原文提取失败: {e}"
-            logger.error(f"✗ {error_msg}")
-            results["errors"].append(error_msg)
-
-    # 提取优化文本
-    if needs_optimized:
-        try:
-            if transcription.id is None:
-                raise ValueError("Transcription must have an id before updating.")
-            logger.info(
-                f"提取优化文本: transcription_id={transcription.id}, "
-                f"recording_id={transcription.audio_recording_id}, "
-                f"text_length={len(transcription.optimized_text or '')}"
-            )
-            result = await extraction_service.extract_todos_and_schedules(
-                transcription.optimized_text or ""
-            )
-            extraction_service.update_extraction(
-                transcription_id=transcription.id,
-                todos=result.get("todos", []),
-                schedules=result.get("schedules", []),
-                optimized=True,
-            )
-            results["optimized_extracted"] = True
-            logger.info(
-                f"✓ 优化文本提取完成: transcription_id={transcription.id}, "
-                f"todos={len(result.get('todos', []))}, "
-                f"schedules={len(result.get('schedules', []))}"
-            )
-        except Exception as e:
-            error_msg = f"优化文本提取失败: {e}"
-            logger.error(f"✗ {error_msg}")
-            results["errors"].append(error_msg)
-
-    return results
+def build_batch_items(needs_extraction_list: list[tuple[int, bool, bool]]) -> list[BatchItem]:
+    """把需要提取的记录转换为批处理项（原文与优化文本各一项）"""
+    items: list[BatchItem] = []
+    with get_session() as session:
+        for transcription_id, needs_original, needs_optimized in needs_extraction_list:
+            transcription = session.get(Transcription, transcription_id)
+            if not transcription:
+                logger.warning(f"转录记录不存在: transcription_id={transcription_id}")
+                continue
+            for optimized, needed, text in (
+                (False, needs_original, transcription.original_text),
+                (True, needs_optimized, transcription.optimized_text),
+            ):
+                if needed and text:
+                    kind = "optimized" if optimized else "original"
+                    items.append(
+                        BatchItem(
+                            key=f"{transcription_id}:{kind}",
+                            text=text,
+                            payload={"transcription_id": transcription_id, "optimized": optimized},
+                        )
+                    )
+    return items
 
 
 def parse_date(date_str: str) -> datetime:
@@ -214,6 +172,11 @@ def setup_argument_parser() -> argparse.ArgumentParser:
         type=parse_ids,
         help="指定特定的 transcription_id 列表，用逗号分隔，例如: --ids 1,2,3",
     )
+    parser.add_argument("--concurrency", type=int, default=4, help="并发提取数")
+    parser.add_argument("--rpm", type=float, default=60, help="每分钟最多 LLM 请求数")
+    parser.add_argument("--chunk-chars", type=int, default=6000, help="长文本分块大小（字符）")
+    parser.add_argument("--dry-run", action="store_true", help="只估算成本，不调用 LLM")
+    parser.add_argument("--restart", action="store_true", help="清除进度检查点，从头处理")
     return parser
 
 
@@ -280,57 +243,38 @@ def find_transcriptions_needing_extraction(
 
 
 async def process_extractions(
-    needs_extraction_list: list[tuple[int, bool, bool]],
+    items: list[BatchItem],
     extraction_service: AudioExtractionService,
+    runner: BatchLLMRunner,
 ) -> dict[str, int]:
-    """处理提取任务"""
-    stats = {
-        "total": len(needs_extraction_list),
-        "original_extracted": 0,
-        "optimized_extracted": 0,
-        "errors": 0,
-    }
-
-    # 逐个提取
-    for idx, (transcription_id, needs_original, needs_optimized) in enumerate(
-        needs_extraction_list, 1
-    ):
-        # 重新获取转录记录（在新的会话中）
-        with get_session() as session:
-            transcription = session.get(Transcription, transcription_id)
-            if not transcription:
-                logger.warning(f"转录记录不存在: transcription_id={transcription_id}")
-                continue
+    """并发处理提取任务（长文本分块提取后合并）"""
 
-            logger.info(
-                f"\n[{idx}/{len(needs_extraction_list)}] "
-                f"处理 transcription_id={transcription.id}, "
-                f"recording_id={transcription.audio_recording_id}"
-            )
+    async def extract_chunk(_item: BatchItem, chunk: str) -> dict:
+        return await extraction_service.extract_todos_and_schedules(chunk, raise_on_error=True)
 
-            result = await re_extract_transcription(
-                transcription, extraction_service, needs_original, needs_optimized
-            )
+    def merge(_item: BatchItem, results: list[dict]) -> dict:
+        return extraction_service.merge_extraction_results(results)
 
-            # 在会话内更新统计
-            if result["original_extracted"]:
-                stats["original_extracted"] += 1
-            if result["optimized_extracted"]:
-                stats["optimized_extracted"] += 1
-            if result["errors"]:
-                stats["errors"] += 1
+    def save(item: BatchItem, result: dict) -> dict[str, int]:
+        extraction_service.update_extraction(
+            transcription_id=item.payload["transcription_id"],
+            todos=result["todos"],
+            schedules=result["schedules"],
+            optimized=item.payload["optimized"],
+        )
+        return {"todos": len(result["todos"]), "schedules": len(result["schedules"])}
 
-    return stats
+    return await runner.run(items, map_chunk=extract_chunk, reduce=merge, commit=save)
 
 
 def log_final_stats(stats: dict[str, int]) -> None:
     """记录最终统计信息"""
     logger.info("\n" + "=" * 60)
     logger.info("提取完成统计:")
-    logger.info(f"  总记录数: {stats['total']}")
-    logger.info(f"  原文提取成功: {stats['original_extracted']}")
-    logger.info(f"  优化文本提取成功: {stats['optimized_extracted']}")
-    logger.info(f"  错误数: {stats['errors']}")
+    logger.info(f"  待处理项数: {stats['total']}（已跳过此前完成的 {stats['skipped']} 项）")
+    logger.info(f"  提取成功: {stats['done']}（共 {stats['chunks']} 个文本块）")
+    logger.info(f"  错误数: {stats['failed']}")
+    logger.info(f"  用时: {stats['seconds']} 秒")
     logger.info("=" * 60)
 
 
@@ -349,22 +293,42 @@ async def main():
     llm_client = LLMClient()
     extraction_service = AudioExtractionService(llm_client)
 
+    runner = BatchLLMRunner(
+        JOB_NAME,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        chunk_chars=args.chunk_chars,
+    )
+    if args.restart:
+        runner.checkpoint.reset()
+
     # 检查 LLM 客户端是否可用
-    if not llm_client.is_available():
+    if not args.dry_run and not llm_client.is_available():
         logger.error("LLM 客户端不可用，无法进行提取")
         return
 
     # 查找需要提取的转录记录
     needs_extraction_list = find_transcriptions_needing_extraction(start_date, end_date, args.ids)
+    items = runner.pending(build_batch_items(needs_extraction_list))
 
-    logger.info(f"需要重新提取的记录数: {len(needs_extraction_list)}")
+    logger.info(f"需要重新提取的记录数: {len(needs_extraction_list)}，待处理项数: {len(items)}")
 
-    if len(needs_extraction_list) == 0:
+    if len(items) == 0:
         logger.info("所有记录都已提取完成，无需重新提取")
         return
 
+    if args.dry_run:
+        estimate = runner.estimate(
+            items,
+            model=llm_client.model,
+            prompt_tokens=EXTRACTION_PROMPT_TOKENS,
+            feature_type=EXTRACTION_FEATURE_TYPE,
+        )
+        logger.info(f"试运行成本估算: {json.dumps(estimate, ensure_ascii=False)}")
+        return
+
     # 处理提取任务
-    stats = await process_extractions(needs_extraction_list, extraction_service)
+    stats = await process_extractions(items, extraction_service, runner)
 
     # 输出统计信息
     log_final_stats(stats)
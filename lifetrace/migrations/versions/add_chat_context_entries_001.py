@@ -0,0 +1,142 @@
+"""add_chat_context_entries_001
+
+Revision ID: add_chat_context_entries_001
+Revises: add_token_usage_daily_001
+Create Date: 2026-10-18 12:00:00.000000
+
+Add append-only chat_context_entries table and move chats.context JSON into it.
+"""
+
+import json
+from collections.abc import Sequence
+from datetime import UTC, datetime
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "add_chat_context_entries_001"
+down_revision: str | Sequence[str] | None = "add_token_usage_daily_001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# 与 ChatService.MAX_CONTEXT_LENGTH 一致
+MAX_CONTEXT_LENGTH = 50
+
+
+def _parse_timestamp(value: object, fallback: datetime) -> datetime:
+    """旧上下文的 ISO 时间戳转为 UTC naive datetime（与 DateTime 列的存储格式一致）"""
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return fallback
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(UTC).replace(tzinfo=None)
+    return parsed
+
+
+def _format_timestamp(value: object) -> str:
+    """新表中的 UTC naive 时间还原为旧上下文的 ISO 时间戳（带 +00:00）"""
+    try:
+        parsed = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    except ValueError:
+        return str(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.isoformat()
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    existing_tables = inspector.get_table_names()
+
+    if "chat_context_entries" not in existing_tables:
+        op.create_table(
+            "chat_context_entries",
+            sa.Column("id", sa.Integer(), nullable=False, primary_key=True),
+            sa.Column("session_id", sa.String(length=100), nullable=False),
+            sa.Column("role", sa.String(length=20), nullable=False),
+            sa.Column("content", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+        )
+        op.create_index(
+            "ix_chat_context_entries_session_id_id",
+            "chat_context_entries",
+            ["session_id", "id"],
+        )
+
+    if "chats" not in existing_tables:
+        return
+
+    # 把旧的 JSON 上下文逐条迁入新表，迁移后清空 chats.context
+    rows = connection.execute(
+        sa.text("SELECT session_id, context FROM chats WHERE context IS NOT NULL")
+    ).fetchall()
+    now = datetime.now(UTC).replace(tzinfo=None)
+    entries = []
+    for session_id, context_json in rows:
+        try:
+            context = json.loads(context_json)
+        except (TypeError, json.JSONDecodeError):
+            continue
+        if not isinstance(context, list):
+            continue
+        entries.extend(
+            {
+                "session_id": session_id,
+                "role": str(item.get("role", "user")),
+                "content": str(item.get("content", "")),
+                "created_at": _parse_timestamp(item.get("timestamp"), now),
+            }
+            for item in context[-MAX_CONTEXT_LENGTH:]
+            if isinstance(item, dict)
+        )
+    if entries:
+        table = sa.table(
+            "chat_context_entries",
+            sa.column("session_id", sa.String),
+            sa.column("role", sa.String),
+            sa.column("content", sa.Text),
+            sa.column("created_at", sa.DateTime),
+        )
+        op.bulk_insert(table, entries)
+    if rows:
+        op.execute("UPDATE chats SET context = NULL WHERE context IS NOT NULL")
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    existing_tables = inspector.get_table_names()
+
+    if "chat_context_entries" not in existing_tables:
+        return
+
+    # 删表前把各会话最近的条目重新写回 chats.context（JSON）
+    if "chats" in existing_tables:
+        rows = connection.execute(
+            sa.text(
+                "SELECT session_id, role, content, created_at "
+                "FROM chat_context_entries ORDER BY session_id, id"
+            )
+        ).fetchall()
+        contexts: dict[str, list[dict[str, str]]] = {}
+        for session_id, role, content, created_at in rows:
+            contexts.setdefault(session_id, []).append(
+                {
+                    "role": role,
+                    "content": content or "",
+                    "timestamp": _format_timestamp(created_at),
+                }
+            )
+        for session_id, context in contexts.items():
+            connection.execute(
+                sa.text("UPDATE chats SET context = :context WHERE session_id = :session_id"),
+                {
+                    "context": json.dumps(context[-MAX_CONTEXT_LENGTH:], ensure_ascii=False),
+                    "session_id": session_id,
+                },
+            )
+
+    op.drop_table("chat_context_entries")
@@ -0,0 +1,63 @@
+"""add_notifications_001
+
+Revision ID: add_notifications_001
+Revises: add_chat_context_entries_001
+Create Date: 2026-10-18 14:00:00.000000
+
+Add notifications and dismissed_reminders tables for the persistent notification store.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "add_notifications_001"
+down_revision: str | Sequence[str] | None = "add_chat_context_entries_001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    existing_tables = inspector.get_table_names()
+
+    if "notifications" not in existing_tables:
+        op.create_table(
+            "notifications",
+            sa.Column("id", sa.String(length=200), nullable=False, primary_key=True),
+            sa.Column("title", sa.Text(), nullable=True),
+            sa.Column("content", sa.Text(), nullable=True),
+            sa.Column("timestamp", sa.DateTime(), nullable=False),
+            sa.Column("todo_id", sa.Integer(), nullable=True),
+            sa.Column("schedule_time", sa.DateTime(), nullable=True),
+            sa.Column("deadline", sa.DateTime(), nullable=True),
+            sa.Column("reminder_at", sa.DateTime(), nullable=True),
+            sa.Column("reminder_offset", sa.Integer(), nullable=True),
+        )
+        op.create_index("ix_notifications_timestamp", "notifications", ["timestamp"])
+        op.create_index("ix_notifications_todo_id", "notifications", ["todo_id"])
+
+    if "dismissed_reminders" not in existing_tables:
+        op.create_table(
+            "dismissed_reminders",
+            sa.Column("id", sa.Integer(), nullable=False, primary_key=True),
+            sa.Column("todo_id", sa.Integer(), nullable=False),
+            sa.Column("reminder_at", sa.DateTime(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.UniqueConstraint("todo_id", "reminder_at", name="uq_dismissed_reminders"),
+        )
+        op.create_index("ix_dismissed_reminders_todo_id", "dismissed_reminders", ["todo_id"])
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    existing_tables = inspector.get_table_names()
+
+    if "dismissed_reminders" in existing_tables:
+        op.drop_table("dismissed_reminders")
+    if "notifications" in existing_tables:
+        op.drop_table("notifications")
@@ -0,0 +1,46 @@
+"""add_reminders_001
+
+Revision ID: add_reminders_001
+Revises: add_notifications_001
+Create Date: 2026-10-18 16:00:00.000000
+
+Add reminders table so todo reminders are stored as indexed rows and delivered by a single
+timer job instead of one APScheduler job per reminder offset.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "add_reminders_001"
+down_revision: str | Sequence[str] | None = "add_notifications_001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    if "reminders" not in inspector.get_table_names():
+        op.create_table(
+            "reminders",
+            sa.Column("id", sa.Integer(), nullable=False, primary_key=True),
+            sa.Column("todo_id", sa.Integer(), nullable=False),
+            sa.Column("due_at", sa.DateTime(), nullable=False),
+            sa.Column("schedule_time", sa.DateTime(), nullable=False),
+            sa.Column("reminder_offset", sa.Integer(), nullable=False, server_default="0"),
+            sa.UniqueConstraint("todo_id", "due_at", name="uq_reminders_todo_due_at"),
+        )
+        op.create_index("ix_reminders_todo_id", "reminders", ["todo_id"])
+        op.create_index("ix_reminders_due_at", "reminders", ["due_at"])
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    if "reminders" in inspector.get_table_names():
+        op.drop_table("reminders")
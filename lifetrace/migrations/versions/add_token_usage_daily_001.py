@@ -0,0 +1,80 @@
+"""add_token_usage_daily_001
+
+Revision ID: add_token_usage_daily_001
+Revises: merge_automation_ical_001
+Create Date: 2026-10-18 10:00:00.000000
+
+Add token_usage_daily rollup table and backfill it from token_usage.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "add_token_usage_daily_001"
+down_revision: str | Sequence[str] | None = "merge_automation_ical_001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+    existing_tables = inspector.get_table_names()
+
+    if "token_usage_daily" not in existing_tables:
+        op.create_table(
+            "token_usage_daily",
+            sa.Column("id", sa.Integer(), nullable=False, primary_key=True),
+            sa.Column("day", sa.String(length=10), nullable=False),
+            sa.Column("model", sa.String(length=100), nullable=False),
+            sa.Column("endpoint", sa.String(length=200), nullable=False),
+            sa.Column("feature_type", sa.String(length=50), nullable=False),
+            sa.Column("requests", sa.Integer(), nullable=False),
+            sa.Column("input_tokens", sa.Integer(), nullable=False),
+            sa.Column("output_tokens", sa.Integer(), nullable=False),
+            sa.Column("total_tokens", sa.Integer(), nullable=False),
+            sa.Column("input_cost", sa.Float(), nullable=False),
+            sa.Column("output_cost", sa.Float(), nullable=False),
+            sa.Column("total_cost", sa.Float(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.UniqueConstraint(
+                "day", "model", "endpoint", "feature_type", name="uq_token_usage_daily"
+            ),
+        )
+        op.create_index("ix_token_usage_daily_day", "token_usage_daily", ["day"])
+
+    if "token_usage" not in existing_tables:
+        return
+
+    # 新建库时 create_all 已建好空表，这里统一用历史明细回填（仅在汇总表为空时）
+    has_rollups = connection.execute(sa.text("SELECT 1 FROM token_usage_daily LIMIT 1")).first()
+    if has_rollups is None:
+        op.execute(
+            """
+            INSERT INTO token_usage_daily (
+                day, model, endpoint, feature_type, requests,
+                input_tokens, output_tokens, total_tokens,
+                input_cost, output_cost, total_cost, updated_at
+            )
+            SELECT
+                date(created_at), model,
+                COALESCE(endpoint, 'unknown'), COALESCE(feature_type, 'unknown'),
+                COUNT(*), SUM(input_tokens), SUM(output_tokens), SUM(total_tokens),
+                COALESCE(SUM(input_cost), 0), COALESCE(SUM(output_cost), 0),
+                COALESCE(SUM(total_cost), 0), CURRENT_TIMESTAMP
+            FROM token_usage
+            GROUP BY date(created_at), model,
+                COALESCE(endpoint, 'unknown'), COALESCE(feature_type, 'unknown')
+            """
+        )
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    inspector = sa.inspect(connection)
+
+    if "token_usage_daily" in inspector.get_table_names():
+        op.drop_table("token_usage_daily")
@@ -18,6 +18,8 @@ class LocalExporterConfig:
     traces_dir: str = "traces/"
     max_files: int = 100
     pretty_print: bool = True
+    flush_interval_sec: float = 1.0
+    cleanup_interval_sec: float = 300.0
 
 
 @dataclass
@@ -67,6 +69,8 @@ def get_observability_config() -> ObservabilityConfig:
         traces_dir=local_settings.get("traces_dir", "traces/"),
         max_files=local_settings.get("max_files", 100),
         pretty_print=local_settings.get("pretty_print", True),
+        flush_interval_sec=local_settings.get("flush_interval_sec", 1.0),
+        cleanup_interval_sec=local_settings.get("cleanup_interval_sec", 300.0),
     )
 
     # 解析 phoenix 配置
@@ -5,22 +5,25 @@
 - Cursor 友好：结构化 JSON，便于 AI 分析
 - 人类可读：格式化输出，清晰的字段命名
 - 日志精简：Terminal 只输出一行摘要
-- 按会话聚合：同一 session 的所有 trace 保存在同一个文件中
+- 按会话聚合：同一 session 的所有 trace 追加到同一个 JSONL 文件中
+- 异步批量写入：export 只做聚合与入队，由后台线程批量落盘，定时清理旧文件
 """
 
 from __future__ import annotations
 
-import contextlib
 import importlib
 import json
 import os
+import queue
 import threading
+import time
 from collections import defaultdict
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Any
 
 from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
 
+from lifetrace.observability.trace_store import TraceStore
 from lifetrace.util.base_paths import get_user_data_dir
 from lifetrace.util.logging_config import get_logger
 
@@ -54,6 +57,9 @@ OPENINFERENCE_LLM_TOKEN_COUNT_COMPLETION = "llm.token_count.completion"  # nosec
 OPENINFERENCE_TOOL_NAME = "tool.name"
 OPENINFERENCE_TOOL_PARAMETERS = "tool.parameters"
 
+# 后台写入线程每批最多处理的 trace 数
+WRITE_BATCH_SIZE = 100
+
 
 def _coerce_int(value: Any) -> int:
     try:
@@ -65,12 +71,12 @@ def _coerce_int(value: Any) -> int:
 class LocalFileExporter(SpanExporter):
     """本地 JSON 文件导出器
 
-    将 traces 写入本地 JSON 文件，支持：
-    - 按 session_id 聚合：同一会话的所有 trace 保存在同一个文件中
+    将 traces 写入本地文件，支持：
+    - 按 session_id 聚合：同一会话的所有 trace 追加到同一个 JSONL 文件，摘要单独存放
     - 按 trace_id 聚合 spans（当无 session_id 时）
-    - 格式化输出便于阅读
+    - 后台线程批量写入，export 不阻塞在磁盘 I/O 上
     - Terminal 摘要输出
-    - 自动清理旧文件
+    - 定时清理旧文件
     """
 
     def __init__(
@@ -79,26 +85,37 @@ class LocalFileExporter(SpanExporter):
         max_files: int = 100,
         pretty_print: bool = True,
         summary_only: bool = True,
+        flush_interval_sec: float = 1.0,
+        cleanup_interval_sec: float = 300.0,
     ):
         """初始化导出器
 
         Args:
             traces_dir: trace 文件存储目录（相对于 base_dir）
             max_files: 最大保留文件数
-            pretty_print: 是否格式化 JSON 输出
+            pretty_print: 是否格式化 JSON 输出（独立 trace 文件与会话摘要）
             summary_only: Terminal 是否只输出摘要
+            flush_interval_sec: 后台线程等待新 trace 的最长时间（秒）
+            cleanup_interval_sec: 清理旧文件的间隔（秒）
         """
         self.traces_dir = traces_dir
         self.max_files = max_files
         self.pretty_print = pretty_print
         self.summary_only = summary_only
+        self.flush_interval_sec = flush_interval_sec
+        self.cleanup_interval_sec = cleanup_interval_sec
         self._lock = threading.Lock()
 
         # 用于聚合同一 trace 的 spans
         self._pending_traces: dict[str, list[ReadableSpan]] = defaultdict(list)
 
-        # session_id -> 文件路径的映射（内存缓存）
-        self._session_files: dict[str, Path] = {}
+        self._store = TraceStore(self._get_traces_path(), pretty_print=pretty_print)
+        self._queue: queue.Queue[tuple[dict[str, Any], str | None] | None] = queue.Queue()
+        self._last_cleanup = 0.0
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="trace-file-writer", daemon=True
+        )
+        self._writer.start()
 
     def _get_traces_path(self) -> Path:
         """获取 traces 目录路径"""
@@ -106,57 +123,6 @@ class LocalFileExporter(SpanExporter):
         traces_path.mkdir(parents=True, exist_ok=True)
         return traces_path
 
-    def _get_session_file_path(self, session_id: str) -> Path:
-        """获取 session 文件路径
-
-        如果已有该 session 的文件，返回现有路径；否则创建新路径。
-        文件名格式：session_{session_id}_{创建时间}.json
-        """
-        # 检查内存缓存
-        if session_id in self._session_files:
-            return self._session_files[session_id]
-
-        traces_path = self._get_traces_path()
-
-        # 查找已有的 session 文件
-        existing_files = list(traces_path.glob(f"session_{session_id}_*.json"))
-        if existing_files:
-            # 使用最新的文件
-            filepath = max(existing_files, key=lambda f: f.stat().st_mtime)
-            self._session_files[session_id] = filepath
-            return filepath
-
-        # 创建新文件路径
-        timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
-        filename = f"session_{session_id}_{timestamp}.json"
-        filepath = traces_path / filename
-        self._session_files[session_id] = filepath
-        return filepath
-
-    def _load_session_data(self, filepath: Path) -> dict[str, Any]:
-        """加载已有的 session 数据"""
-        if not filepath.exists():
-            return {}
-        try:
-            with open(filepath, encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError) as e:
-            logger.warning(f"加载 session 文件失败: {e}")
-            return {}
-
-    def _save_session_data(self, filepath: Path, data: dict[str, Any]) -> bool:
-        """保存 session 数据"""
-        try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                if self.pretty_print:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-                else:
-                    json.dump(data, f, ensure_ascii=False)
-            return True
-        except OSError as e:
-            logger.error(f"保存 session 文件失败: {e}")
-            return False
-
     def _extract_span_kind(self, span: ReadableSpan) -> str:
         """提取 span 类型"""
         attrs = dict(span.attributes or {})
@@ -289,120 +255,53 @@ class LocalFileExporter(SpanExporter):
             "span_count": len(spans),
         }
 
-    def _write_to_file(
-        self, trace_data: dict[str, Any], session_id: str | None = None
-    ) -> str | None:
-        """将 trace 数据写入 JSON 文件
-
-        Args:
-            trace_data: 聚合后的 trace 数据
-            session_id: 会话 ID，如果提供则追加到 session 文件
-
-        Returns:
-            写入的文件路径，失败返回 None
-        """
-        if not trace_data:
-            return None
+    # ===== 后台写入 =====
 
-        # 如果有 session_id，追加到 session 文件
-        if session_id:
-            return self._write_to_session_file(trace_data, session_id)
-
-        # 否则，每个 trace 一个文件（原有行为）
-        traces_path = self._get_traces_path()
-        trace_id = trace_data.get("trace_id", "unknown")
-        timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
-        filename = f"{timestamp}_{trace_id}.json"
-        filepath = traces_path / filename
-
-        try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                if self.pretty_print:
-                    json.dump(trace_data, f, ensure_ascii=False, indent=2)
+    def _writer_loop(self) -> None:
+        """后台写入线程：批量取出 trace，按会话分组追加写入，并定时清理旧文件"""
+        stopping = False
+        while not stopping:
+            batch: list[tuple[dict[str, Any], str | None]] = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval_sec)
+                if item is None:
+                    stopping = True
                 else:
-                    json.dump(trace_data, f, ensure_ascii=False)
-
-            # 清理旧文件
-            self._cleanup_old_files(traces_path)
-
-            return str(filepath)
-        except Exception as e:
-            logger.error(f"写入 trace 文件失败: {e}")
-            return None
-
-    def _write_to_session_file(self, trace_data: dict[str, Any], session_id: str) -> str | None:
-        """将 trace 数据追加到 session 文件
-
-        Session 文件格式：
-        {
-            "session_id": "xxx",
-            "created_at": "2026-01-23T08:27:03Z",
-            "updated_at": "2026-01-23T08:30:00Z",
-            "traces": [...],
-            "summary": {...}
-        }
-        """
-        filepath = self._get_session_file_path(session_id)
-
-        try:
-            # 加载已有数据或创建新结构
-            session_data = self._load_session_data(filepath)
-            if not session_data:
-                session_data = {
-                    "session_id": session_id,
-                    "created_at": datetime.now(UTC).isoformat(),
-                    "traces": [],
-                    "summary": {
-                        "total_duration_ms": 0,
-                        "tool_count": 0,
-                        "llm_count": 0,
-                        "trace_count": 0,
-                        "status": "success",
-                    },
-                }
-
-            # 追加 trace
-            session_data["traces"].append(trace_data)
-            session_data["updated_at"] = datetime.now(UTC).isoformat()
-
-            # 更新摘要
-            summary = session_data["summary"]
-            summary["total_duration_ms"] += trace_data.get("duration_ms", 0)
-            summary["tool_count"] += len(trace_data.get("tool_calls", []))
-            summary["llm_count"] += len(trace_data.get("llm_calls", []))
-            summary["trace_count"] = len(session_data["traces"])
-            if trace_data.get("status") == "error":
-                summary["status"] = "error"
-
-            # 保存
-            if self._save_session_data(filepath, session_data):
-                # 清理旧文件
-                self._cleanup_old_files(self._get_traces_path())
-                return str(filepath)
-            return None
-        except Exception as e:
-            logger.error(f"写入 session 文件失败: {e}")
-            return None
-
-    def _cleanup_old_files(self, traces_path: Path) -> None:
-        """清理超出限制的旧文件
+                    batch.append(item)
+                while not stopping and len(batch) < WRITE_BATCH_SIZE:
+                    item = self._queue.get_nowait()
+                    if item is None:
+                        stopping = True
+                    else:
+                        batch.append(item)
+            except queue.Empty:
+                pass
 
-        Args:
-            traces_path: traces 目录路径
-        """
-        try:
-            json_files = sorted(
-                traces_path.glob("*.json"),
-                key=lambda f: f.stat().st_mtime,
-                reverse=True,
-            )
+            try:
+                if batch:
+                    self._write_batch(batch)
+                if time.monotonic() - self._last_cleanup >= self.cleanup_interval_sec:
+                    self._last_cleanup = time.monotonic()
+                    self._store.cleanup(self.max_files)
+            except Exception as e:
+                logger.error(f"写入 trace 文件失败: {e}")
+            finally:
+                for _ in range(len(batch) + (1 if stopping else 0)):
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: list[tuple[dict[str, Any], str | None]]) -> None:
+        by_session: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        for trace_data, session_id in batch:
+            if session_id:
+                by_session[session_id].append(trace_data)
+                continue
+            filepath = str(self._store.write_trace_file(trace_data))
+            self._print_summary(trace_data, filepath, session_id=None)
 
-            if len(json_files) > self.max_files:
-                for old_file in json_files[self.max_files :]:
-                    with contextlib.suppress(OSError):
-                        old_file.unlink()
-        except Exception as e:
-            logger.debug(f"清理旧文件失败: {e}")
+        for session_id, traces in by_session.items():
+            filepath = str(self._store.append_session_traces(session_id, traces))
+            for trace_data in traces:
+                self._print_summary(trace_data, filepath, session_id)
 
     def _print_summary(
         self,
@@ -497,11 +396,10 @@ class LocalFileExporter(SpanExporter):
                         # 合并之前缓存的 spans
                         all_spans = self._pending_traces.pop(trace_id, []) + trace_spans
 
-                        # 聚合并写入
+                        # 聚合后交给后台线程写入
                         trace_data = self._aggregate_spans(all_spans)
                         if trace_data:
-                            filepath = self._write_to_file(trace_data, session_id)
-                            self._print_summary(trace_data, filepath, session_id)
+                            self._queue.put((trace_data, session_id))
                     else:
                         # 缓存非根 spans，等待完整 trace
                         self._pending_traces[trace_id].extend(trace_spans)
@@ -512,27 +410,30 @@ class LocalFileExporter(SpanExporter):
                 return SpanExportResult.FAILURE
 
     def shutdown(self) -> None:
-        """关闭导出器，处理剩余的 spans"""
+        """关闭导出器，写出剩余的 spans 并停止后台线程"""
         with self._lock:
             # 导出所有缓存的 traces（shutdown 时无法获取 session_id，使用独立文件）
             for _trace_id, spans in self._pending_traces.items():
                 if spans:
                     trace_data = self._aggregate_spans(spans)
                     if trace_data:
-                        filepath = self._write_to_file(trace_data, session_id=None)
-                        self._print_summary(trace_data, filepath, session_id=None)
+                        self._queue.put((trace_data, None))
             self._pending_traces.clear()
-            self._session_files.clear()
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join(timeout=10)
+        self._store.forget_sessions()
 
     def force_flush(self, timeout_millis: int = 30000) -> bool:
-        """强制刷新
+        """等待后台线程写完已入队的 trace
 
         Args:
             timeout_millis: 超时时间（毫秒）
 
         Returns:
-            是否成功
+            是否在超时前写完
         """
-        # 对于文件导出器，export 已经是同步的，不需要特殊处理
-        _ = timeout_millis
-        return True
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: self._queue.unfinished_tasks == 0, timeout=timeout_millis / 1000
+            )
@@ -195,6 +195,8 @@ def setup_observability() -> bool:
                     max_files=config.local.max_files,
                     pretty_print=config.local.pretty_print,
                     summary_only=config.terminal.summary_only,
+                    flush_interval_sec=config.local.flush_interval_sec,
+                    cleanup_interval_sec=config.local.cleanup_interval_sec,
                 )
                 tracer_provider.add_span_processor(batch_span_processor_class(file_exporter))
                 logger.info(f"Observability: 本地文件导出已启用 -> {config.local.traces_dir}")
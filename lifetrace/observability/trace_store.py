@@ -0,0 +1,233 @@
+"""本地 trace 存储
+
+会话 trace 采用追加写的 JSONL 格式，每次导出只追加新行，不再重写整个文件：
+
+- session_{session_id}_{创建时间}.jsonl          每行一个 trace
+- session_{session_id}_{创建时间}.summary.json   会话摘要（小文件，按批更新）
+- {时间}_{trace_id}.json                          无会话的独立 trace
+
+同时提供按会话分页/流式读取，供前端查看；兼容旧版整文件 JSON 会话格式。
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import threading
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+
+from lifetrace.util.file_cache import atomic_write_bytes
+from lifetrace.util.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+logger = get_logger()
+
+TRACE_LINES_SUFFIX = ".jsonl"
+SUMMARY_SUFFIX = ".summary.json"
+
+
+def _empty_summary() -> dict[str, Any]:
+    return {
+        "total_duration_ms": 0,
+        "tool_count": 0,
+        "llm_count": 0,
+        "trace_count": 0,
+        "status": "success",
+    }
+
+
+def _is_summary_file(path: Path) -> bool:
+    return path.name.endswith(SUMMARY_SUFFIX)
+
+
+def _summary_path(trace_file: Path) -> Path:
+    return trace_file.with_name(trace_file.name.removesuffix(trace_file.suffix) + SUMMARY_SUFFIX)
+
+
+class TraceStore:
+    """trace 文件读写（写入由单个后台线程完成，读取可并发）"""
+
+    def __init__(self, traces_path: Path, pretty_print: bool = True):
+        self.traces_path = traces_path
+        self.pretty_print = pretty_print
+        self._session_files: dict[str, Path] = {}
+        self._lock = threading.Lock()
+
+    # ===== 写入 =====
+
+    def session_file(self, session_id: str) -> Path:
+        """获取会话的 JSONL 文件路径（已有文件时复用最新的一个）"""
+        with self._lock:
+            if session_id in self._session_files:
+                return self._session_files[session_id]
+            existing = list(self.traces_path.glob(f"session_{session_id}_*{TRACE_LINES_SUFFIX}"))
+            if existing:
+                filepath = max(existing, key=lambda f: f.stat().st_mtime)
+            else:
+                timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+                filepath = (
+                    self.traces_path / f"session_{session_id}_{timestamp}{TRACE_LINES_SUFFIX}"
+                )
+            self._session_files[session_id] = filepath
+            return filepath
+
+    def append_session_traces(self, session_id: str, traces: list[dict[str, Any]]) -> Path:
+        """将一批 trace 追加到会话文件，并更新摘要文件"""
+        filepath = self.session_file(session_id)
+        self.traces_path.mkdir(parents=True, exist_ok=True)
+        lines = "".join(json.dumps(trace, ensure_ascii=False) + "\n" for trace in traces)
+        with open(filepath, "a", encoding="utf-8") as f:
+            f.write(lines)
+        self._update_summary(filepath, session_id, traces)
+        return filepath
+
+    def _update_summary(
+        self, filepath: Path, session_id: str, traces: list[dict[str, Any]]
+    ) -> None:
+        summary_path = _summary_path(filepath)
+        data = self._load_json(summary_path) or {
+            "session_id": session_id,
+            "created_at": datetime.now(UTC).isoformat(),
+            "trace_file": filepath.name,
+            "summary": _empty_summary(),
+        }
+        summary = data["summary"]
+        for trace in traces:
+            summary["total_duration_ms"] += trace.get("duration_ms", 0)
+            summary["tool_count"] += len(trace.get("tool_calls", []))
+            summary["llm_count"] += len(trace.get("llm_calls", []))
+            summary["trace_count"] += 1
+            if trace.get("status") == "error":
+                summary["status"] = "error"
+        summary["total_duration_ms"] = round(summary["total_duration_ms"], 2)
+        data["updated_at"] = datetime.now(UTC).isoformat()
+        atomic_write_bytes(summary_path, self._dumps(data).encode("utf-8"))
+
+    def write_trace_file(self, trace_data: dict[str, Any]) -> Path:
+        """无会话的 trace 单独写入一个文件"""
+        trace_id = trace_data.get("trace_id", "unknown")
+        timestamp = datetime.now(UTC).strftime("%Y%m%d_%H%M%S")
+        filepath = self.traces_path / f"{timestamp}_{trace_id}.json"
+        atomic_write_bytes(filepath, self._dumps(trace_data).encode("utf-8"))
+        return filepath
+
+    def _dumps(self, data: dict[str, Any]) -> str:
+        if self.pretty_print:
+            return json.dumps(data, ensure_ascii=False, indent=2)
+        return json.dumps(data, ensure_ascii=False)
+
+    def forget_sessions(self) -> None:
+        """清空会话文件路径缓存"""
+        with self._lock:
+            self._session_files.clear()
+
+    # ===== 清理 =====
+
+    def cleanup(self, max_files: int) -> int:
+        """保留最新的 max_files 个 trace 文件（会话文件连同摘要一起删除），返回删除数"""
+        entries = []
+        for path in self.traces_path.glob("*.json*"):
+            if _is_summary_file(path) or path.suffix not in (".json", TRACE_LINES_SUFFIX):
+                continue
+            with contextlib.suppress(OSError):
+                entries.append((path.stat().st_mtime, path))
+        entries.sort(key=lambda item: item[0], reverse=True)
+
+        removed = 0
+        for _, path in entries[max_files:]:
+            with contextlib.suppress(OSError):
+                path.unlink()
+                removed += 1
+            if path.suffix == TRACE_LINES_SUFFIX:
+                with contextlib.suppress(OSError):
+                    _summary_path(path).unlink()
+        if removed:
+            with self._lock:
+                self._session_files = {
+                    sid: path for sid, path in self._session_files.items() if path.exists()
+                }
+            logger.debug(f"已清理 {removed} 个旧 trace 文件")
+        return removed
+
+    # ===== 读取 =====
+
+    def list_sessions(self, offset: int = 0, limit: int = 50) -> dict[str, Any]:
+        """按更新时间倒序分页列出会话摘要"""
+        files = []
+        for path in self.traces_path.glob("session_*"):
+            if path.suffix == TRACE_LINES_SUFFIX or (
+                path.suffix == ".json" and not _is_summary_file(path)
+            ):
+                with contextlib.suppress(OSError):
+                    files.append((path.stat().st_mtime, path))
+        files.sort(key=lambda item: item[0], reverse=True)
+
+        sessions = []
+        for _, path in files[offset : offset + limit]:
+            if path.suffix == TRACE_LINES_SUFFIX:
+                data = self._load_json(_summary_path(path)) or {}
+            else:
+                data = self._load_json(path) or {}
+                data.pop("traces", None)
+            data.setdefault("summary", _empty_summary())
+            data["file"] = path.name
+            sessions.append(data)
+        return {"total": len(files), "offset": offset, "limit": limit, "sessions": sessions}
+
+    def find_session_file(self, session_id: str) -> Path | None:
+        """查找会话的 trace 文件（优先 JSONL，其次旧版 JSON）"""
+        for suffix in (TRACE_LINES_SUFFIX, ".json"):
+            candidates = [
+                path
+                for path in self.traces_path.glob(f"session_{session_id}_*{suffix}")
+                if not _is_summary_file(path)
+            ]
+            if candidates:
+                return max(candidates, key=lambda f: f.stat().st_mtime)
+        return None
+
+    def iter_session_traces(self, session_id: str) -> Iterator[dict[str, Any]]:
+        """逐条读取会话 trace（JSONL 文件流式读取，不整体加载）"""
+        filepath = self.find_session_file(session_id)
+        if filepath is None:
+            return
+        if filepath.suffix != TRACE_LINES_SUFFIX:
+            yield from (self._load_json(filepath) or {}).get("traces", [])
+            return
+        with open(filepath, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # 进程异常退出可能留下半行，跳过
+                    continue
+
+    def read_session_traces(
+        self, session_id: str, offset: int = 0, limit: int = 50
+    ) -> list[dict[str, Any]]:
+        """分页读取会话 trace"""
+        traces = []
+        for index, trace in enumerate(self.iter_session_traces(session_id)):
+            if index < offset:
+                continue
+            if len(traces) >= limit:
+                break
+            traces.append(trace)
+        return traces
+
+    @staticmethod
+    def _load_json(path: Path) -> dict[str, Any] | None:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"读取 trace 文件失败 {path}: {e}")
+            return None
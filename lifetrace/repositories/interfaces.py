@@ -34,8 +34,9 @@ class IChatRepository(ABC):
         chat_type: str | None = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """列出聊天会话"""
+        """列出聊天会话（提供 cursor 时按游标分页，忽略 offset）"""
         pass
 
     @abstractmethod
@@ -81,26 +82,30 @@ class IChatRepository(ABC):
         self,
         chat_type: str | None = None,
         limit: int = 10,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """获取聊天会话摘要列表"""
+        """获取聊天会话摘要列表（提供 cursor 时按游标分页）"""
         pass
 
     @abstractmethod
-    def get_chat_context(self, session_id: str) -> str | None:
-        """获取会话上下文（JSON 字符串）"""
+    def append_context_entry(
+        self, session_id: str, role: str, content: str, keep_last: int
+    ) -> dict[str, Any] | None:
+        """追加一条会话上下文，只保留最近 keep_last 条
+
+        Returns:
+            新增的上下文条目（role/content/timestamp），失败时返回 None
+        """
         pass
 
     @abstractmethod
-    def update_chat_context(self, session_id: str, context: str) -> bool:
-        """更新会话上下文
-
-        Args:
-            session_id: 会话ID
-            context: JSON 格式的上下文字符串
+    def get_context_entries(self, session_id: str, limit: int) -> list[dict[str, Any]]:
+        """获取会话最近 limit 条上下文（按时间正序）"""
+        pass
 
-        Returns:
-            是否更新成功
-        """
+    @abstractmethod
+    def clear_context_entries(self, session_id: str) -> bool:
+        """清空会话上下文"""
         pass
 
 
@@ -118,8 +123,10 @@ class ITodoRepository(ABC):
         pass
 
     @abstractmethod
-    def list_todos(self, limit: int, offset: int, status: str | None) -> list[dict[str, Any]]:
-        """获取todo列表"""
+    def list_todos(
+        self, limit: int, offset: int, status: str | None, cursor: str | None = None
+    ) -> list[dict[str, Any]]:
+        """获取todo列表（提供 cursor 时按游标分页，忽略 offset）"""
         pass
 
     @abstractmethod
@@ -229,8 +236,9 @@ class IEventRepository(ABC):
         start_date: datetime | None,
         end_date: datetime | None,
         app_name: str | None,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """获取事件列表"""
+        """获取事件列表（提供 cursor 时按游标分页，忽略 offset）"""
         pass
 
     @abstractmethod
@@ -283,8 +291,9 @@ class IActivityRepository(ABC):
         offset: int,
         start_date: datetime | None,
         end_date: datetime | None,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """获取活动列表"""
+        """获取活动列表（提供 cursor 时按游标分页，忽略 offset）"""
         pass
 
     @abstractmethod
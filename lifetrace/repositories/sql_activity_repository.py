@@ -26,12 +26,14 @@ class SqlActivityRepository(IActivityRepository):
         offset: int,
         start_date: datetime | None,
         end_date: datetime | None,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
         return self._manager.get_activities(
             limit=limit,
             offset=offset,
             start_date=start_date,
             end_date=end_date,
+            cursor=cursor,
         )
 
     def count_activities(
@@ -41,11 +41,13 @@ class SqlChatRepository(IChatRepository):
         chat_type: str | None = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
         return self._manager.list_chats(
             chat_type=chat_type,
             limit=limit,
             offset=offset,
+            cursor=cursor,
         )
 
     def update_chat_title(self, session_id: str, title: str) -> bool:
@@ -91,14 +93,21 @@ class SqlChatRepository(IChatRepository):
         self,
         chat_type: str | None = None,
         limit: int = 10,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
         return self._manager.get_chat_summaries(
             chat_type=chat_type,
             limit=limit,
+            cursor=cursor,
         )
 
-    def get_chat_context(self, session_id: str) -> str | None:
-        return self._manager.get_chat_context(session_id)
+    def append_context_entry(
+        self, session_id: str, role: str, content: str, keep_last: int
+    ) -> dict[str, Any] | None:
+        return self._manager.append_context_entry(session_id, role, content, keep_last)
+
+    def get_context_entries(self, session_id: str, limit: int) -> list[dict[str, Any]]:
+        return self._manager.get_context_entries(session_id, limit)
 
-    def update_chat_context(self, session_id: str, context: str) -> bool:
-        return self._manager.update_chat_context(session_id, context)
+    def clear_context_entries(self, session_id: str) -> bool:
+        return self._manager.clear_context_entries(session_id)
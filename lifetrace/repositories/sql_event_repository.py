@@ -28,6 +28,7 @@ class SqlEventRepository(IEventRepository):
         start_date: datetime | None,
         end_date: datetime | None,
         app_name: str | None,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
         return self._manager.list_events(
             limit=limit,
@@ -35,6 +36,7 @@ class SqlEventRepository(IEventRepository):
             start_date=start_date,
             end_date=end_date,
             app_name=app_name,
+            cursor=cursor,
         )
 
     def count_events(
@@ -23,8 +23,10 @@ class SqlTodoRepository(ITodoRepository):
     def get_by_uid(self, uid: str) -> dict[str, Any] | None:
         return self._manager.get_todo_by_uid(uid)
 
-    def list_todos(self, limit: int, offset: int, status: str | None) -> list[dict[str, Any]]:
-        return self._manager.list_todos(limit=limit, offset=offset, status=status)
+    def list_todos(
+        self, limit: int, offset: int, status: str | None, cursor: str | None = None
+    ) -> list[dict[str, Any]]:
+        return self._manager.list_todos(limit=limit, offset=offset, status=status, cursor=cursor)
 
     def count(self, status: str | None) -> int:
         return self._manager.count_todos(status=status)
@@ -12,6 +12,7 @@ from lifetrace.schemas.activity import (
     ManualActivityCreateResponse,
 )
 from lifetrace.services.activity_service import ActivityService
+from lifetrace.storage.pagination import InvalidCursorError
 from lifetrace.util.logging_config import get_logger
 
 logger = get_logger()
@@ -25,9 +26,10 @@ async def list_activities(
     offset: int = Query(0, ge=0),
     start_date: str | None = Query(None),
     end_date: str | None = Query(None),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
     service: ActivityService = Depends(get_activity_service),
 ):
-    """获取活动列表（活动=聚合的事件窗口）"""
+    """获取活动列表（活动=聚合的事件窗口），提供 cursor 时按游标分页"""
     try:
         start_dt = datetime.fromisoformat(start_date) if start_date else None
         end_dt = datetime.fromisoformat(end_date) if end_date else None
@@ -37,7 +39,10 @@ async def list_activities(
             offset=offset,
             start_date=start_dt,
             end_date=end_dt,
+            cursor=cursor,
         )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         logger.error(f"获取活动列表失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e)) from e
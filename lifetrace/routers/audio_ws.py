@@ -17,6 +17,7 @@ from typing import TYPE_CHECKING, Any
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from starlette.websockets import WebSocketState
 
+from lifetrace.services.realtime_nlp import RealtimeNlpConfig, RealtimeNlpEngine
 from lifetrace.util.time_utils import get_utc_now
 
 if TYPE_CHECKING:
@@ -187,13 +188,18 @@ def _create_realtime_nlp_handler(  # noqa: C901
     audio_service,
     is_connected_ref: list[bool],
     task_set: set[asyncio.Task],
-    throttle_seconds: float = 8.0,
+    config: RealtimeNlpConfig | None = None,
 ):
-    """Realtime optimize/extract during recording (only on final sentences)."""
+    """Realtime optimize/extract during recording (only on final sentences).
+
+    Each run only sends the new final sentences (plus a sliding context window) to the LLM;
+    see `lifetrace.services.realtime_nlp`.
+    """
+    engine = RealtimeNlpEngine(audio_service, config)
+    throttle_seconds = engine.config.throttle_seconds
 
     class _RealtimeNlpThrottler:
         def __init__(self):
-            self._buffer = ""
             self._last_emit = 0.0
             self._pending: asyncio.Task | None = None
 
@@ -217,64 +223,57 @@ def _create_realtime_nlp_handler(  # noqa: C901
                 is_connected_ref[0] = False
                 logger.warning(f"Failed to send {name} to client: {e}")
 
-        async def _compute(self, text_snapshot: str) -> tuple[str, dict[str, Any]]:
-            optimized = text_snapshot
-            extracted: dict[str, Any] = {"todos": [], "schedules": []}
-            try:
-                optimized = await audio_service.optimize_transcription_text(text_snapshot)
-            except Exception as e:
-                logger.error(f"实时优化失败: {e}")
-            try:
-                extracted = await audio_service.extraction_service.extract_todos_and_schedules(
-                    text_snapshot
-                )
-            except Exception as e:
-                logger.error(f"实时提取失败: {e}")
-            return optimized, extracted
-
         async def _run_once(self) -> None:
-            text_snapshot = self._buffer.strip()
-            if not text_snapshot:
+            result = await engine.run_once()
+            if result is None:
+                if engine.pending_count:
+                    # token 预算不足或本批次处理失败：稍后重试
+                    self._schedule(max(throttle_seconds, engine.seconds_until_ready()))
                 return
-            optimized, extracted = await self._compute(text_snapshot)
 
-            preview = optimized.replace("\n", " ")[:200]
-            todos_preview = extracted.get("todos", [])
-            schedules_preview = extracted.get("schedules", [])
-            logger.info("实时优化/提取完成，准备推送给前端")
-            logger.info(f"优化预览: {preview}")
-            logger.info(f"提取结果: todos={todos_preview}, schedules={schedules_preview}")
+            logger.info(
+                f"实时优化/提取完成（估算 {result['estimated_tokens']} tokens），准备推送给前端"
+            )
+            logger.info(f"优化预览: {result['delta'].replace(chr(10), ' ')[:200]}")
+            logger.info(f"提取结果: todos={result['todos']}, schedules={result['schedules']}")
 
-            await self._send("OptimizedTextChanged", {"text": optimized})
+            await self._send("OptimizedTextChanged", {"text": result["text"]})
             await self._send(
                 "ExtractionChanged",
-                {"todos": extracted.get("todos", []), "schedules": extracted.get("schedules", [])},
+                {
+                    "todos": result["todos"],
+                    "schedules": result["schedules"],
+                    "summary": result["summary"],
+                },
             )
+            if engine.pending_count and is_connected_ref[0]:
+                self._schedule(max(throttle_seconds, engine.seconds_until_ready()))
 
         async def _debounced_run(self, delay: float) -> None:
             try:
                 await asyncio.sleep(delay)
-                await self._run_once()
             finally:
                 self._pending = None
+            self._last_emit = asyncio.get_event_loop().time()
+            await self._run_once()
+
+        def _schedule(self, delay: float) -> None:
+            if self._pending is None:
+                self._pending = _track_task(task_set, self._debounced_run(delay))
 
         def on_final_sentence(self, text: str) -> None:
             if not text:
                 return
-            if self._buffer:
-                self._buffer += "\n"
-            self._buffer += text.strip()
+            engine.add_sentence(text)
 
             now = asyncio.get_event_loop().time()
             elapsed = now - self._last_emit
-            if elapsed >= throttle_seconds:
+            if elapsed >= throttle_seconds and self._pending is None:
                 self._last_emit = now
                 _track_task(task_set, self._run_once())
                 return
 
-            if self._pending is None:
-                delay = max(0.0, throttle_seconds - elapsed)
-                self._pending = _track_task(task_set, self._debounced_run(delay))
+            self._schedule(max(0.0, throttle_seconds - elapsed))
 
         def cancel(self) -> None:
             if self._pending and not self._pending.done():
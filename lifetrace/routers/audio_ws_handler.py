@@ -12,6 +12,8 @@ import json
 
 from fastapi import WebSocket, WebSocketDisconnect
 
+from lifetrace.services.asr_local import select_asr_backend
+from lifetrace.services.realtime_nlp import RealtimeNlpConfig
 from lifetrace.util.time_utils import get_utc_now
 
 
@@ -53,7 +55,9 @@ async def _run_transcription_stream(*, ctx: _RunTranscriptionStreamContext) -> N
         segment_timestamps_ref=ctx.segment_timestamps_ref,
         should_segment_ref=ctx.should_segment_ref,
     )
-    await ctx.asr_client.transcribe_stream(
+    # audio.asr.backend=local 时使用本地 CPU 识别，否则使用远程 Fun-ASR
+    asr_client = select_asr_backend(ctx.asr_client)
+    await asr_client.transcribe_stream(
         audio_stream=audio_stream,
         on_result=ctx.on_result,
         on_error=ctx.on_error,
@@ -380,7 +384,8 @@ async def _create_nlp_handler(
         audio_service=audio_service,
         is_connected_ref=state["is_connected_ref"],
         task_set=state["task_set"],
-        throttle_seconds=8.0,
+        # 会话级覆盖：/ws?nlp_throttle_seconds=...&nlp_tokens_per_minute=...
+        config=RealtimeNlpConfig.from_settings(websocket.query_params),
     )
 
 
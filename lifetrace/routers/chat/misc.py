@@ -7,6 +7,7 @@ from fastapi import Depends, HTTPException, Query
 from lifetrace.core.dependencies import get_chat_service, get_rag_service
 from lifetrace.schemas.chat import AddMessageRequest, NewChatRequest, NewChatResponse
 from lifetrace.services.chat_service import ChatService
+from lifetrace.storage.pagination import InvalidCursorError
 from lifetrace.util.time_utils import get_utc_now
 
 from .base import logger, router
@@ -94,11 +95,17 @@ async def clear_chat_session(
 async def get_chat_history(
     session_id: str | None = Query(None),
     chat_type: str | None = Query(None, description="聊天类型过滤：event, project, general"),
+    limit: int = Query(20, ge=1, le=200, description="会话摘要数量"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
     chat_service: ChatService = Depends(get_chat_service),
 ):
     """获取聊天历史记录（从数据库读取）"""
     try:
-        return chat_service.get_chat_history(session_id=session_id, chat_type=chat_type)
+        return chat_service.get_chat_history(
+            session_id=session_id, chat_type=chat_type, limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         logger.error(f"获取聊天历史失败: {e}")
         raise HTTPException(status_code=500, detail="获取聊天历史失败") from e
@@ -127,6 +134,22 @@ async def get_supported_query_types():
         raise HTTPException(status_code=500, detail="获取查询类型失败") from e
 
 
+@router.get("/agno/metrics")
+async def get_agno_agent_metrics():
+    """获取 Agno Agent 实例池指标（命中率、构建耗时、首 token 延迟）"""
+    agent_pool = importlib.import_module("lifetrace.llm.agent_pool")
+    if not agent_pool.get_agno_agent_pool.cache_info().currsize:
+        return {"enabled": False}
+    return {"enabled": True, **agent_pool.get_agno_agent_pool().metrics()}
+
+
+@router.get("/agent/metrics")
+async def get_agent_metrics():
+    """获取 Agent 模式的工具调用方式与每轮端到端耗时统计"""
+    agent_tool_calling = importlib.import_module("lifetrace.llm.agent_tool_calling")
+    return agent_tool_calling.get_agent_metrics()
+
+
 @router.get("/agno/tools")
 async def get_available_agno_tools():
     """获取可用的 Agno Agent 工具列表
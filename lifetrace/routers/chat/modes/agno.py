@@ -6,11 +6,8 @@ from typing import Any
 
 from fastapi.responses import StreamingResponse
 
-from lifetrace.llm.agno_agent import (
-    TOOL_EVENT_PREFIX,
-    TOOL_EVENT_SUFFIX,
-    AgnoAgentService,
-)
+from lifetrace.llm.agent_pool import get_agno_agent_pool, make_pool_key
+from lifetrace.llm.agno_agent import TOOL_EVENT_PREFIX, TOOL_EVENT_SUFFIX
 from lifetrace.schemas.chat import ChatMessage
 from lifetrace.services.chat_service import ChatService
 from lifetrace.util.logging_config import get_logger
@@ -91,6 +88,32 @@ def _build_external_tools_config(
     return config
 
 
+def _resolve_workspace_path(
+    external_tools: list[str], workspace_path: str | None, lang: str
+) -> tuple[str | None, str | None]:
+    """确定本地类工具使用的工作区，返回 (workspace_path, 错误信息)"""
+    # 本地类工具需要 workspace_path，如果未提供则使用用户 home 目录
+    local_tools = {"file", "local_fs", "shell"}
+    needs_workspace = bool(local_tools & set(external_tools))
+
+    if needs_workspace and not workspace_path:
+        # 使用用户 home 目录作为默认工作区
+        workspace_path = str(Path.home())
+        logger.info(f"[stream][agno] 未指定 workspace_path，使用默认值: {workspace_path}")
+
+    # 如果提供了 workspace_path，验证其有效性
+    if workspace_path:
+        is_valid, validation_error = validate_workspace_path(workspace_path)
+        if not is_valid:
+            err = (
+                f"工作区验证失败: {validation_error}"
+                if lang == "zh"
+                else f"Workspace validation failed: {validation_error}"
+            )
+            return workspace_path, err
+    return workspace_path, None
+
+
 def create_agno_streaming_response(
     message: ChatMessage,
     chat_service: ChatService,
@@ -113,27 +136,11 @@ def create_agno_streaming_response(
     logger.info(f"[stream] 进入 Agno 模式, lang={lang}")
 
     external_tools = message.external_tools or []
-    workspace_path = message.workspace_path
-
-    # 本地类工具需要 workspace_path，如果未提供则使用用户 home 目录
-    local_tools = {"file", "local_fs", "shell"}
-    needs_workspace = bool(local_tools & set(external_tools))
-
-    if needs_workspace and not workspace_path:
-        # 使用用户 home 目录作为默认工作区
-        workspace_path = str(Path.home())
-        logger.info(f"[stream][agno] 未指定 workspace_path，使用默认值: {workspace_path}")
-
-    # 如果提供了 workspace_path，验证其有效性
-    if workspace_path:
-        is_valid, validation_error = validate_workspace_path(workspace_path)
-        if not is_valid:
-            err = (
-                f"工作区验证失败: {validation_error}"
-                if lang == "zh"
-                else f"Workspace validation failed: {validation_error}"
-            )
-            return make_error_streaming_response(err, session_id)
+    workspace_path, workspace_error = _resolve_workspace_path(
+        external_tools, message.workspace_path, lang
+    )
+    if workspace_error:
+        return make_error_streaming_response(workspace_error, session_id)
 
     # 构建外部工具配置
     external_tools_config = _build_external_tools_config(
@@ -155,13 +162,16 @@ def create_agno_streaming_response(
         content=user_input_for_storage,
     )
 
-    # 创建 Agno Agent 服务
-    agno_service = AgnoAgentService(
-        lang=lang,
-        selected_tools=message.selected_tools,
-        external_tools=external_tools if external_tools else None,
-        external_tools_config=external_tools_config if external_tools_config else None,
+    # 从实例池借出 Agno Agent 服务（相同语言与工具配置的实例跨请求复用）
+    pool = get_agno_agent_pool()
+    pool_key = make_pool_key(
+        lang, message.selected_tools, external_tools, external_tools_config or None
     )
+    try:
+        agno_service, pool_generation = pool.acquire(pool_key)
+    except Exception as e:
+        logger.error(f"[stream][agno] Agent 初始化失败: {e}")
+        return make_error_streaming_response(f"Agno Agent 处理失败: {e!s}", session_id)
 
     # 获取对话历史
     conversation_history = get_conversation_history(
@@ -173,10 +183,13 @@ def create_agno_streaming_response(
         tool_events: list[dict[str, Any]] = []
         pending_tool_chunk = ""
         try:
-            for chunk in agno_service.stream_response(
-                message=message.message,
-                conversation_history=conversation_history,
-                session_id=session_id,
+            for chunk in pool.stream_with_metrics(
+                agno_service.stream_response(
+                    message=message.message,
+                    conversation_history=conversation_history,
+                    session_id=session_id,
+                ),
+                is_content=lambda c: not c.startswith(TOOL_EVENT_PREFIX),
             ):
                 yield chunk
                 cleaned, pending_tool_chunk, parsed_events = _strip_tool_events(
@@ -206,6 +219,8 @@ def create_agno_streaming_response(
         except Exception as e:
             logger.error(f"[stream][agno] 生成失败: {e}")
             yield f"Agno Agent 处理失败: {e!s}"
+        finally:
+            pool.release(pool_key, agno_service, pool_generation)
 
     headers = {
         "Cache-Control": "no-cache",
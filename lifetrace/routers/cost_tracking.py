@@ -35,7 +35,7 @@ async def get_cost_stats(days: int = Query(30, description="统计天数")):
         # 获取价格配置
         token_logger = get_token_logger()
         try:
-            input_price, output_price = token_logger._get_model_price(current_model)
+            input_price, output_price = token_logger.get_model_price(current_model)
         except Exception:
             input_price, output_price = 0.0, 0.0
 
@@ -87,6 +87,7 @@ async def get_cost_stats(days: int = Query(30, description="统计天数")):
                 "feature_costs": feature_costs,
                 "model_costs": model_costs,
                 "daily_costs": daily_costs,
+                "cache_stats": stats.get("cache_stats", {}),
                 "start_date": (now - timedelta(days=days)).strftime("%Y-%m-%d"),
                 "end_date": now.strftime("%Y-%m-%d"),
             },
@@ -106,7 +107,7 @@ async def get_cost_config():
         current_model = settings.llm.model
         token_logger = get_token_logger()
         try:
-            input_price, output_price = token_logger._get_model_price(current_model)
+            input_price, output_price = token_logger.get_model_price(current_model)
         except Exception:
             input_price, output_price = 0.0, 0.0
 
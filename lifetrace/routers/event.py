@@ -7,6 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from lifetrace.core.dependencies import get_event_service
 from lifetrace.schemas.event import EventDetailResponse, EventListResponse
 from lifetrace.services.event_service import EventService
+from lifetrace.storage.pagination import InvalidCursorError
 from lifetrace.util.logging_config import get_logger
 
 logger = get_logger()
@@ -21,9 +22,13 @@ async def list_events(
     start_date: str | None = Query(None),
     end_date: str | None = Query(None),
     app_name: str | None = Query(None),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor"),
     service: EventService = Depends(get_event_service),
 ):
-    """获取事件列表（事件=前台应用使用阶段），用于事件级别展示与检索，同时返回总数"""
+    """获取事件列表（事件=前台应用使用阶段），用于事件级别展示与检索，同时返回总数
+
+    提供 cursor 时按游标分页（忽略 offset，不返回总数），适合时间线无限滚动。
+    """
     try:
         start_dt = datetime.fromisoformat(start_date) if start_date else None
         end_dt = datetime.fromisoformat(end_date) if end_date else None
@@ -34,7 +39,10 @@ async def list_events(
             start_date=start_dt,
             end_date=end_dt,
             app_name=app_name,
+            cursor=cursor,
         )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         logger.error(f"获取事件列表失败: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
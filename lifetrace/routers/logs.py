@@ -1,9 +1,14 @@
 """日志相关路由"""
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import PlainTextResponse
+import asyncio
+import json
+from pathlib import Path
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
 from lifetrace.util.base_paths import get_user_logs_dir
+from lifetrace.util.log_reader import LogFilter, read_entries_after, read_entries_before, tail_text
 from lifetrace.util.logging_config import get_logger
 
 logger = get_logger()
@@ -13,6 +18,30 @@ router = APIRouter(prefix="/api/logs", tags=["logs"])
 # 常量定义
 BYTES_PER_KB = 1024  # 字节到KB的转换因子
 MAX_LOG_LINES = 1000  # 返回日志的最大行数
+MAX_PAGE_ENTRIES = 1000  # 分页接口单页最大记录数
+FOLLOW_POLL_INTERVAL = 0.5  # follow 模式检查文件增长的间隔（秒）
+FOLLOW_HEARTBEAT_INTERVAL = 15  # follow 模式心跳间隔（秒），防止代理断开空闲连接
+
+
+def _resolve_log_file(file: str) -> Path:
+    """解析日志文件路径并做安全检查"""
+    logs_dir = get_user_logs_dir()
+    log_file = logs_dir / file
+
+    # 安全检查：确保文件在logs目录内
+    if not log_file.resolve().is_relative_to(logs_dir.resolve()):
+        raise HTTPException(status_code=400, detail="无效的文件路径")
+
+    if not log_file.exists():
+        raise HTTPException(status_code=404, detail="日志文件不存在")
+    return log_file
+
+
+def _build_filter(level: str | None, keyword: str | None) -> LogFilter:
+    try:
+        return LogFilter(level=level, keyword=keyword)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.get("/files")
@@ -54,29 +83,91 @@ async def get_log_files():
 
 @router.get("/content", response_class=PlainTextResponse)
 async def get_log_content(file: str = Query(..., description="日志文件相对路径")):
-    """获取日志文件内容"""
+    """获取日志文件最后 MAX_LOG_LINES 行（从文件末尾反向读取，不加载整个文件）"""
     try:
-        # 使用配置中的日志目录
-        logs_dir = get_user_logs_dir()
-
-        log_file = logs_dir / file
-
-        # 安全检查：确保文件在logs目录内
-        if not str(log_file.resolve()).startswith(str(logs_dir.resolve())):
-            raise HTTPException(status_code=400, detail="无效的文件路径")
-
-        if not log_file.exists():
-            raise HTTPException(status_code=404, detail="日志文件不存在")
-
-        # 读取文件内容
-        with open(log_file, encoding="utf-8") as f:
-            lines = f.readlines()
-            # 只返回最后 MAX_LOG_LINES 行，避免内存问题
-            if len(lines) > MAX_LOG_LINES:
-                lines = lines[-MAX_LOG_LINES:]
-            return "".join(lines)
+        return tail_text(_resolve_log_file(file), MAX_LOG_LINES)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"读取日志文件失败: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/entries")
+async def get_log_entries(
+    file: str = Query(..., description="日志文件相对路径"),
+    before: int | None = Query(None, ge=0, description="向前翻页：读取该字节偏移之前的记录"),
+    after: int | None = Query(None, ge=0, description="向后翻页：读取该字节偏移之后的记录"),
+    limit: int = Query(200, ge=1, le=MAX_PAGE_ENTRIES, description="最多返回的记录数"),
+    level: str | None = Query(None, description="最低日志级别，如 WARNING"),
+    keyword: str | None = Query(None, description="关键字（不区分大小写）"),
+):
+    """按字节偏移游标分页读取日志记录
+
+    不传 before/after 时返回文件末尾的最新记录；向前翻页使用返回的 prev_cursor 作为 before，
+    向后翻页使用 next_cursor 作为 after。异常堆栈等续行归属于其前面的日志记录。
+    """
+    log_file = _resolve_log_file(file)
+    log_filter = _build_filter(level, keyword)
+    try:
+        if after is not None:
+            return await asyncio.to_thread(read_entries_after, log_file, after, limit, log_filter)
+        result = await asyncio.to_thread(read_entries_before, log_file, before, limit, log_filter)
+        # 最新一页的后续新增内容从文件末尾开始读取
+        result["next_cursor"] = before if before is not None else result["file_size"]
+        return result
+    except Exception as e:
+        logger.error(f"读取日志记录失败: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/follow")
+async def follow_log(
+    request: Request,
+    file: str = Query(..., description="日志文件相对路径"),
+    offset: int | None = Query(None, ge=0, description="起始字节偏移，默认从文件末尾开始"),
+    level: str | None = Query(None, description="最低日志级别，如 WARNING"),
+    keyword: str | None = Query(None, description="关键字（不区分大小写）"),
+    last_event_id: str | None = Header(None, alias="Last-Event-ID"),
+):
+    """以 SSE 推送日志文件的新增记录
+
+    通过字节偏移跟踪已推送的位置，只读取新增部分；事件 id 为下一次读取的偏移，
+    断线重连时浏览器会通过 Last-Event-ID 自动从该位置继续。
+    """
+    log_file = _resolve_log_file(file)
+    log_filter = _build_filter(level, keyword)
+    if last_event_id and last_event_id.isdigit():
+        offset = int(last_event_id)
+    if offset is None:
+        offset = log_file.stat().st_size
+
+    async def _events():
+        cursor = offset
+        idle = 0.0
+        while not await request.is_disconnected():
+            try:
+                size = log_file.stat().st_size
+            except OSError:
+                break
+            if size != cursor:
+                result = await asyncio.to_thread(
+                    read_entries_after, log_file, cursor, MAX_PAGE_ENTRIES, log_filter
+                )
+                cursor = result["next_cursor"]
+                if result["entries"]:
+                    idle = 0.0
+                    payload = json.dumps(result["entries"], ensure_ascii=False)
+                    yield f"id: {cursor}\nevent: entries\ndata: {payload}\n\n"
+                    continue
+            if idle >= FOLLOW_HEARTBEAT_INTERVAL:
+                idle = 0.0
+                yield ": heartbeat\n\n"
+            await asyncio.sleep(FOLLOW_POLL_INTERVAL)
+            idle += FOLLOW_POLL_INTERVAL
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
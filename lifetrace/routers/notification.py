@@ -1,9 +1,18 @@
 """通知相关路由"""
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
 
-from lifetrace.storage.notification_storage import clear_notification, get_notifications
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from lifetrace.storage.notification_storage import (
+    clear_notification,
+    get_notification_store,
+    get_notifications,
+)
 from lifetrace.util.logging_config import get_logger
+from lifetrace.util.settings import settings
 
 logger = get_logger()
 
@@ -36,6 +45,40 @@ async def get_notification():
         raise HTTPException(status_code=500, detail=f"获取通知失败: {e!s}") from e
 
 
+@router.get("/stream")
+async def stream_notifications(request: Request):
+    """以 SSE 推送通知列表
+
+    连接建立时推送一次完整列表，此后每当通知增删（提醒触发、用户删除、过期淘汰）时推送最新的
+    完整列表（event: notifications，data 与 GET /api/notifications 相同，id 为版本号）；
+    空闲时按 notifications.stream_heartbeat_seconds 发送心跳注释。
+    """
+    store = get_notification_store()
+    heartbeat = float(settings.get("notifications.stream_heartbeat_seconds", 15))
+
+    async def _events():
+        with store.subscribe() as changed:
+            sent_version = None
+            while not await request.is_disconnected():
+                # 先清除再读取快照：读取之后的变更一定会再次唤醒
+                changed.clear()
+                version, notifications = await asyncio.to_thread(store.snapshot)
+                if version != sent_version:
+                    sent_version = version
+                    payload = json.dumps(notifications, ensure_ascii=False)
+                    yield f"id: {version}\nevent: notifications\ndata: {payload}\n\n"
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=heartbeat)
+                except TimeoutError:
+                    yield ": heartbeat\n\n"
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.delete("/{notification_id}")
 async def delete_notification(notification_id: str):
     """
@@ -26,6 +26,7 @@ class JobInfo(BaseModel):
     trigger: str
     next_run_time: str | None = None
     pending: bool = False
+    executor: str | None = None
 
 
 class JobListResponse(BaseModel):
@@ -35,6 +36,34 @@ class JobListResponse(BaseModel):
     jobs: list[JobInfo]
 
 
+class TimingStats(BaseModel):
+    """耗时统计（毫秒）"""
+
+    avg_ms: float | None = None
+    max_ms: float = 0.0
+    last_ms: float | None = None
+
+
+class JobMetricsInfo(BaseModel):
+    """任务运行指标"""
+
+    job_id: str
+    runs: int = 0
+    errors: int = 0
+    misses: int = 0
+    skipped: int = 0
+    last_run_at: str | None = None
+    run: TimingStats
+    lag: TimingStats
+
+
+class JobMetricsResponse(BaseModel):
+    """任务运行指标列表响应"""
+
+    total: int
+    jobs: list[JobMetricsInfo]
+
+
 class JobOperationRequest(BaseModel):
     """任务操作请求"""
 
@@ -73,6 +102,7 @@ async def get_all_jobs():
                 trigger=str(job.trigger),
                 next_run_time=(job.next_run_time.isoformat() if job.next_run_time else None),
                 pending=job.next_run_time is not None,
+                executor=job.executor,
             )
             job_list.append(job_info)
 
@@ -99,6 +129,7 @@ async def get_job_detail(job_id: str):
             trigger=str(job.trigger),
             next_run_time=(job.next_run_time.isoformat() if job.next_run_time else None),
             pending=job.next_run_time is not None,
+            executor=job.executor,
         )
     except HTTPException:
         raise
@@ -107,6 +138,19 @@ async def get_job_detail(job_id: str):
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@router.get("/metrics", response_model=JobMetricsResponse)
+async def get_job_metrics(job_id: str | None = None):
+    """获取任务运行指标（运行耗时、触发延迟、错过与跳过次数），可按任务ID过滤"""
+    try:
+        metrics = get_scheduler_manager().metrics.snapshot(job_id)
+        return JobMetricsResponse(
+            total=len(metrics), jobs=[JobMetricsInfo(**item) for item in metrics]
+        )
+    except Exception as e:
+        logger.error(f"获取任务指标失败: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 @router.post("/jobs/{job_id}/pause", response_model=JobOperationResponse)
 async def pause_job(job_id: str):
     """暂停指定任务"""
@@ -303,6 +347,8 @@ def _sync_job_enabled_to_config(job_id: str, enabled: bool):
         "recorder_job": "jobs.recorder.enabled",
         "ocr_job": "jobs.ocr.enabled",
         "clean_data_job": "jobs.clean_data.enabled",
+        "screenshot_transcoder_job": "jobs.screenshot_transcoder.enabled",
+        "db_maintenance_job": "jobs.db_maintenance.enabled",
         "activity_aggregator_job": "jobs.activity_aggregator.enabled",
         "todo_recorder_job": "jobs.todo_recorder.enabled",
         "proactive_ocr_job": "jobs.proactive_ocr.enabled",
@@ -350,6 +396,8 @@ def _sync_job_interval_to_config(
         "recorder_job": "jobs.recorder.interval",
         "ocr_job": "jobs.ocr.interval",
         "clean_data_job": "jobs.clean_data.interval",
+        "screenshot_transcoder_job": "jobs.screenshot_transcoder.interval",
+        "db_maintenance_job": "jobs.db_maintenance.interval",
         "activity_aggregator_job": "jobs.activity_aggregator.interval",
         "todo_recorder_job": "jobs.todo_recorder.interval",
         "proactive_ocr_job": "jobs.proactive_ocr.interval",
@@ -1,30 +1,65 @@
 """截图相关路由"""
 
+import hashlib
+import json
 import os
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response
 
 from lifetrace.schemas.screenshot import ScreenshotResponse
+from lifetrace.services.thumbnail_service import get_thumbnail_service
 from lifetrace.storage import get_session, screenshot_mgr
 from lifetrace.storage.models import OCRResult
+from lifetrace.storage.pagination import SCREENSHOT_KEYSET, InvalidCursorError
 from lifetrace.util.logging_config import get_logger
+from lifetrace.util.screenshot_codec import guess_image_mime_type
 
 logger = get_logger()
 
 router = APIRouter(prefix="/api/screenshots", tags=["screenshot"])
 
+# 允许浏览器长期缓存；截图可能被后台转码并以同一 URL 改写，因此不标记 immutable，
+# 过期后凭 ETag 重新验证
+IMAGE_CACHE_CONTROL = "private, max-age=604800"
+# 一次雪碧图请求最多包含的截图数量
+MAX_SPRITE_SCREENSHOTS = 100
+
+
+def _is_not_modified(request: Request, etag: str) -> bool:
+    """检查 If-None-Match 是否命中当前 ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates or "*" in candidates
+
+
+def _get_available_screenshot(screenshot_id: int) -> dict:
+    """获取截图记录，不存在返回 404，文件已被清理返回 410"""
+    screenshot = screenshot_mgr.get_screenshot_by_id(screenshot_id)
+    if not screenshot:
+        raise HTTPException(status_code=404, detail="截图不存在")
+    if screenshot.get("file_deleted", False):
+        raise HTTPException(status_code=410, detail="文件已被清理")
+    return screenshot
+
 
 @router.get("", response_model=list[ScreenshotResponse])
 async def get_screenshots(
+    response: Response,
     limit: int = Query(50, ge=1, le=200),
     offset: int = Query(0, ge=0),
     start_date: str | None = Query(None),
     end_date: str | None = Query(None),
     app_name: str | None = Query(None),
+    cursor: str | None = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
 ):
-    """获取截图列表"""
+    """获取截图列表
+
+    提供 cursor 时按游标分页（忽略 offset）；本页已满时通过响应头 X-Next-Cursor 返回下一页游标。
+    """
     try:
         # 解析日期
         start_dt = None
@@ -42,15 +77,83 @@ async def get_screenshots(
             app_name=app_name,
             limit=limit,
             offset=offset,  # 新增offset参数
+            cursor=cursor,
         )
 
+        next_cursor = SCREENSHOT_KEYSET.next_cursor(results, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return [ScreenshotResponse(**result) for result in results]
 
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         logger.error(f"获取截图列表失败: {e}")
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@router.get("/pending")
+async def get_pending_screenshots():
+    """获取录制器写缓冲中尚未写入数据库的截图与事件切换"""
+    from lifetrace.storage.recorder_write_buffer import (  # noqa: PLC0415
+        get_recorder_write_buffer,
+    )
+
+    return {"items": get_recorder_write_buffer().pending()}
+
+
+@router.get("/thumbnails/sprite")
+def get_thumbnail_sprite(
+    request: Request,
+    ids: str = Query(..., description="逗号分隔的截图ID列表"),
+    size: str = Query("small", description="缩略图尺寸名称"),
+    columns: int = Query(10, ge=1, le=50),
+):
+    """将一页截图的缩略图拼接为一张 WebP 雪碧图（同步函数，图像处理在线程池中执行）
+
+    单元格为 size 对应边长的正方形，第 i 张图位于第 i % columns 列、第 i // columns 行；
+    实际位置与尺寸通过响应头 X-Sprite-Layout（JSON）返回，缺失的截图不会出现在其中。
+    """
+    try:
+        screenshot_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="ids 必须是逗号分隔的整数") from e
+    if not screenshot_ids:
+        raise HTTPException(status_code=400, detail="ids 不能为空")
+    if len(screenshot_ids) > MAX_SPRITE_SCREENSHOTS:
+        raise HTTPException(status_code=400, detail=f"一次最多拼接{MAX_SPRITE_SCREENSHOTS}张截图")
+
+    service = get_thumbnail_service()
+    try:
+        screenshots = []
+        etags = []
+        for screenshot_id in screenshot_ids:
+            screenshot = screenshot_mgr.get_screenshot_by_id(screenshot_id)
+            if not screenshot or screenshot.get("file_deleted", False):
+                # 占位，保持网格位置与请求顺序一致
+                screenshots.append({"id": screenshot_id, "file_path": None})
+                etags.append("-")
+                continue
+            screenshots.append(screenshot)
+            etags.append(service.compute_etag(screenshot, size))
+
+        digest = hashlib.sha1(f"{columns}|{'|'.join(etags)}".encode()).hexdigest()[:16]
+        etag = f'"sprite-{digest}"'
+        headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+        if _is_not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        data, cells = service.build_sprite(screenshots, size, columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        logger.error(f"生成缩略图雪碧图失败: {e}")
+        raise HTTPException(status_code=500, detail="服务器内部错误") from e
+
+    headers["X-Sprite-Layout"] = json.dumps([cell.to_dict() for cell in cells])
+    return Response(content=data, media_type="image/webp", headers=headers)
+
+
 @router.get("/{screenshot_id}")
 async def get_screenshot(screenshot_id: int):
     """获取单个截图详情"""
@@ -104,10 +207,12 @@ async def get_screenshot_image(screenshot_id: int):
             logger.warning(f"截图文件不存在: screenshot_id={screenshot_id}, path={file_path}")
             raise HTTPException(status_code=404, detail="图片文件不存在")
 
+        extension = os.path.splitext(file_path)[1].lower() or ".png"
         return FileResponse(
             file_path,
-            media_type="image/png",
-            filename=f"screenshot_{screenshot_id}.png",
+            media_type=guess_image_mime_type(file_path),
+            filename=f"screenshot_{screenshot_id}{extension}",
+            headers={"Cache-Control": IMAGE_CACHE_CONTROL},
         )
 
     except HTTPException:
@@ -117,6 +222,35 @@ async def get_screenshot_image(screenshot_id: int):
         raise HTTPException(status_code=500, detail="服务器内部错误") from e
 
 
+@router.get("/{screenshot_id}/thumbnail")
+def get_screenshot_thumbnail(
+    request: Request,
+    screenshot_id: int,
+    size: str = Query("small", description="缩略图尺寸名称"),
+):
+    """获取截图的 WebP 缩略图（首次请求时生成并缓存），支持 ETag 条件请求
+
+    同步函数：缩略图生成涉及阻塞的图像解码与编码，由 FastAPI 放到线程池中执行。
+    """
+    screenshot = _get_available_screenshot(screenshot_id)
+    service = get_thumbnail_service()
+    try:
+        etag = service.compute_etag(screenshot, size)
+        headers = {"ETag": etag, "Cache-Control": IMAGE_CACHE_CONTROL}
+        if _is_not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        path = service.get_thumbnail(screenshot, size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except Exception as e:
+        logger.error(f"获取截图缩略图时发生错误: {e}")
+        raise HTTPException(status_code=500, detail="服务器内部错误") from e
+
+    if path is None:
+        raise HTTPException(status_code=404, detail="图片文件不存在")
+    return FileResponse(path, media_type="image/webp", headers=headers)
+
+
 @router.get("/{screenshot_id}/path")
 async def get_screenshot_path(screenshot_id: int):
     """获取截图文件路径"""
@@ -8,10 +8,13 @@ from lifetrace.schemas.stats import StatisticsResponse
 from lifetrace.schemas.system import (
     CapabilitiesResponse,
     ProcessInfo,
+    StartupProfileResponse,
     SystemResourcesResponse,
 )
+from lifetrace.util.import_profiler import get_startup_report
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.path_utils import get_database_path, get_screenshots_dir
+from lifetrace.util.screenshot_codec import list_screenshot_files
 from lifetrace.util.time_utils import get_utc_now
 
 logger = get_logger()
@@ -107,10 +110,9 @@ def _get_storage_info() -> dict:
     screenshots_count = 0
 
     if screenshots_path.exists():
-        for file_path in screenshots_path.glob("*.png"):
-            if file_path.is_file():
-                screenshots_size_mb += file_path.stat().st_size / BYTES_PER_MB
-                screenshots_count += 1
+        for file_path in list_screenshot_files(screenshots_path):
+            screenshots_size_mb += file_path.stat().st_size / BYTES_PER_MB
+            screenshots_count += 1
 
     return {
         "database_mb": db_size_mb,
@@ -142,6 +144,24 @@ async def cleanup_old_data(days: int = Query(30, ge=1)):
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@router.post("/screenshot-storage/evaluate")
+def evaluate_screenshot_storage(
+    sample_size: int = Query(20, ge=1, le=200),
+    codec: str | None = Query(None, description="目标格式，默认使用 screenshot_storage.codec"),
+):
+    """在 PNG 截图样本上评估存储格式的空间节省与 OCR 文本差异（不修改任何文件）"""
+    from lifetrace.jobs.screenshot_transcoder import get_screenshot_transcoder  # noqa: PLC0415
+    from lifetrace.util.screenshot_codec import SUPPORTED_CODECS  # noqa: PLC0415
+
+    if codec is not None and codec not in SUPPORTED_CODECS:
+        raise HTTPException(status_code=400, detail=f"不支持的格式，可选: {SUPPORTED_CODECS}")
+    try:
+        return get_screenshot_transcoder().evaluate_sample(sample_size, codec)
+    except Exception as e:
+        logger.error(f"评估截图存储格式失败: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
 @router.get("/system-resources", response_model=SystemResourcesResponse)
 async def get_system_resources():
     """获取系统资源使用情况"""
@@ -187,3 +207,46 @@ async def get_system_resources():
 async def get_capabilities():
     """获取后端模块能力状态"""
     return get_capabilities_report()
+
+
+@router.get("/startup-profile", response_model=StartupProfileResponse)
+async def get_startup_profile(top: int = Query(30, ge=1, le=500, description="返回最慢的模块数")):
+    """获取启动阶段耗时；以 --profile-imports 启动时附带导入耗时分析"""
+    return get_startup_report(top)
+
+
+@router.get("/database/maintenance")
+async def get_database_maintenance_status():
+    """获取数据库结构指纹与性能索引构建状态"""
+    from lifetrace.storage import db_base  # noqa: PLC0415
+
+    return db_base.schema_status()
+
+
+@router.post("/database/maintenance/indexes")
+async def build_database_indexes():
+    """在后台创建缺失的性能索引（已在运行时只返回当前进度）"""
+    from lifetrace.storage import db_base  # noqa: PLC0415
+
+    started = db_base.index_builder.start_background()
+    return {"started": started, **db_base.schema_status()}
+
+
+@router.get("/statistics/database")
+def get_database_statistics():
+    """获取数据库大小、空闲页、碎片率及各维护操作的上次执行情况"""
+    from lifetrace.jobs.db_maintenance import get_db_maintenance_instance  # noqa: PLC0415
+
+    return get_db_maintenance_instance().status()
+
+
+@router.post("/database/maintenance/run")
+def run_database_maintenance():
+    """立即执行一次数据库维护（忽略空闲判断与间隔，仍受单次时长上限约束）"""
+    from lifetrace.jobs.db_maintenance import get_db_maintenance_instance  # noqa: PLC0415
+
+    try:
+        return get_db_maintenance_instance().execute(force=True)
+    except Exception as e:
+        logger.error(f"执行数据库维护失败: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
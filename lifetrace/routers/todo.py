@@ -21,6 +21,7 @@ from lifetrace.schemas.todo import (
     TodoUpdate,
 )
 from lifetrace.services.icalendar_service import ICalendarService
+from lifetrace.storage.pagination import InvalidCursorError
 from lifetrace.util.path_utils import get_attachments_dir
 
 if TYPE_CHECKING:
@@ -39,10 +40,14 @@ async def list_todos(
     limit: int = Query(200, ge=1, le=2000, description="返回数量限制"),
     offset: int = Query(0, ge=0, description="偏移量"),
     status: str | None = Query(None, description="状态筛选：active/completed/canceled"),
+    cursor: str | None = Query(None, description="上一页返回的 next_cursor（提供时忽略 offset）"),
     service: TodoService = Depends(get_todo_service),
 ):
     """获取待办列表"""
-    return service.list_todos(limit, offset, status)
+    try:
+        return service.list_todos(limit, offset, status, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.get("/{todo_id}", response_model=TodoResponse)
@@ -0,0 +1,62 @@
+"""Agent trace 查看路由（读取本地文件导出器写入的 trace）"""
+
+import json
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from lifetrace.observability.config import get_observability_config, get_traces_directory
+from lifetrace.observability.trace_store import TraceStore
+from lifetrace.util.logging_config import get_logger
+
+logger = get_logger()
+
+router = APIRouter(prefix="/api/traces", tags=["traces"])
+
+MAX_PAGE_SIZE = 200  # 单页最大条数
+
+
+def _get_store() -> TraceStore:
+    config = get_observability_config()
+    return TraceStore(get_traces_directory(), pretty_print=config.local.pretty_print)
+
+
+@router.get("/sessions")
+async def list_trace_sessions(
+    offset: int = Query(0, ge=0, description="偏移量"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE, description="每页会话数"),
+):
+    """按更新时间倒序分页列出会话摘要"""
+    try:
+        return _get_store().list_sessions(offset=offset, limit=limit)
+    except Exception as e:
+        logger.error(f"获取 trace 会话列表失败: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/sessions/{session_id}")
+async def get_session_traces(
+    session_id: str,
+    offset: int = Query(0, ge=0, description="偏移量"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE, description="每页 trace 数"),
+):
+    """分页获取会话中的 trace"""
+    store = _get_store()
+    if store.find_session_file(session_id) is None:
+        raise HTTPException(status_code=404, detail="会话 trace 不存在")
+    traces = store.read_session_traces(session_id, offset=offset, limit=limit)
+    return {"session_id": session_id, "offset": offset, "limit": limit, "traces": traces}
+
+
+@router.get("/sessions/{session_id}/stream")
+async def stream_session_traces(session_id: str):
+    """以 NDJSON 流式返回会话中的全部 trace"""
+    store = _get_store()
+    if store.find_session_file(session_id) is None:
+        raise HTTPException(status_code=404, detail="会话 trace 不存在")
+
+    def _iter_lines():
+        for trace in store.iter_session_traces(session_id):
+            yield json.dumps(trace, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(_iter_lines(), media_type="application/x-ndjson")
@@ -16,7 +16,8 @@ class ActivityResponse(BaseModel):
 
 class ActivityListResponse(BaseModel):
     activities: list[ActivityResponse]
-    total_count: int
+    total_count: int | None = None  # 游标分页（非首页）时不统计总数
+    next_cursor: str | None = None
 
 
 class ActivityEventsResponse(BaseModel):
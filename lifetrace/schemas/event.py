@@ -34,7 +34,8 @@ class EventListResponse(BaseModel):
     """事件列表响应，包含事件列表和总数"""
 
     events: list[EventResponse]
-    total_count: int
+    total_count: int | None = None  # 游标分页（非首页）时不统计总数
+    next_cursor: str | None = None
 
     class Config:
         from_attributes = True
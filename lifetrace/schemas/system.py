@@ -30,3 +30,10 @@ class CapabilitiesResponse(BaseModel):
     available_modules: list[str]
     disabled_modules: list[str]
     missing_deps: dict[str, list[str]]
+
+
+class StartupProfileResponse(BaseModel):
+    profiling_enabled: bool
+    stages_ms: dict[str, float]
+    uptime_ms: float
+    imports: dict[str, Any] | None = None
@@ -207,8 +207,9 @@ class TodoResponse(BaseModel):
 class TodoListResponse(BaseModel):
     """Todo 列表响应模型"""
 
-    total: int = Field(..., description="总数")
+    total: int | None = Field(None, description="总数（游标分页时不统计）")
     todos: list[TodoResponse] = Field(..., description="待办列表")
+    next_cursor: str | None = Field(None, description="下一页游标，没有更多时为空")
 
 
 class TodoReorderItem(BaseModel):
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""本地 ASR 实时率（RTF）基准测试
+
+Usage:
+    # 使用 16kHz 单声道 16bit WAV 文件
+    python -m lifetrace.scripts.benchmark_asr --wav sample.wav --engine faster_whisper
+
+    # 未提供 WAV 时合成一段“说话 + 停顿”交替的测试音频（适合 mock 引擎测试流水线开销）
+    python -m lifetrace.scripts.benchmark_asr --engine mock --seconds 60 --workers 4
+"""
+
+import argparse
+import json
+import wave
+
+import numpy as np
+
+from lifetrace.services.asr_local import LocalASRClient, benchmark_real_time_factor
+
+SAMPLE_RATE = 16000
+SPEECH_SECONDS = 3.0
+PAUSE_SECONDS = 1.5
+TONE_HZ = 220.0
+TONE_AMPLITUDE = 8000
+
+
+def load_wav(path: str) -> tuple[bytes, int]:
+    """读取 PCM16 单声道 WAV"""
+    with wave.open(path, "rb") as f:
+        if f.getnchannels() != 1 or f.getsampwidth() != 2:  # noqa: PLR2004
+            raise SystemExit("仅支持单声道 16bit WAV")
+        return f.readframes(f.getnframes()), f.getframerate()
+
+
+def synthesize(seconds: float, sample_rate: int = SAMPLE_RATE) -> bytes:
+    """合成说话（正弦波）与停顿（静音）交替的音频"""
+    period = SPEECH_SECONDS + PAUSE_SECONDS
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    speaking = (t % period) < SPEECH_SECONDS
+    wave_data = TONE_AMPLITUDE * np.sin(2 * np.pi * TONE_HZ * t) * speaking
+    return wave_data.astype("<i2").tobytes()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地 ASR 实时率基准测试")
+    parser.add_argument("--engine", default="faster_whisper", help="faster_whisper | mock")
+    parser.add_argument("--model", default="small", help="faster-whisper 模型")
+    parser.add_argument("--wav", help="16kHz 单声道 16bit WAV 文件")
+    parser.add_argument("--seconds", type=float, default=30.0, help="合成音频时长（秒）")
+    parser.add_argument("--workers", type=int, default=2, help="并行解码数")
+    parser.add_argument("--pool", default="thread", choices=["thread", "process"])
+    parser.add_argument("--chunk-ms", type=int, default=100, help="送入音频的块大小（毫秒）")
+    args = parser.parse_args()
+
+    if args.wav:
+        pcm, sample_rate = load_wav(args.wav)
+    else:
+        pcm, sample_rate = synthesize(args.seconds), SAMPLE_RATE
+
+    params = {"model": args.model} if args.engine == "faster_whisper" else {}
+    client = LocalASRClient(
+        args.engine,
+        params,
+        sample_rate=sample_rate,
+        max_workers=args.workers,
+        pool=args.pool,
+    )
+    try:
+        report = benchmark_real_time_factor(client, pcm, chunk_ms=args.chunk_ms)
+    finally:
+        client.shutdown()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
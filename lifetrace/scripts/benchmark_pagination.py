@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""事件列表分页基准测试：OFFSET 与游标（keyset）分页的每页耗时
+
+在临时 SQLite 数据库中生成事件与截图，分别用 OFFSET 和游标取第 1 页与第 N 页，
+OFFSET 的耗时随页码线性增长，游标分页的每页耗时基本不变。
+
+Usage:
+    python -m lifetrace.scripts.benchmark_pagination
+    python -m lifetrace.scripts.benchmark_pagination --events 200000 --page-size 20 --page 10000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert, text
+from sqlmodel import Session, SQLModel
+
+from lifetrace.storage.event_queries import list_events
+from lifetrace.storage.models import Event, Screenshot
+from lifetrace.storage.pagination import EVENT_KEYSET
+from lifetrace.storage.schema_manager import PERFORMANCE_INDEXES
+
+BATCH_SIZE = 10000
+SCREENSHOTS_PER_EVENT = 3
+INDEX_TABLES = {"events", "screenshots"}
+
+
+class _BenchDatabase:
+    """list_events 只需要 get_session，不初始化完整的 DatabaseBase（会读取配置中的数据库路径）"""
+
+    def __init__(self, db_path: Path):
+        self.engine = create_engine(f"sqlite:///{db_path}")
+
+    @contextmanager
+    def get_session(self):
+        with Session(self.engine) as session:
+            yield session
+
+
+def seed(db: _BenchDatabase, event_count: int) -> None:
+    """批量写入事件（每个事件若干截图），并建立性能索引"""
+    SQLModel.metadata.create_all(db.engine, tables=[Event.__table__, Screenshot.__table__])
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    with db.engine.begin() as conn:
+        for batch_start in range(0, event_count, BATCH_SIZE):
+            ids = range(batch_start + 1, min(event_count, batch_start + BATCH_SIZE) + 1)
+            conn.execute(
+                insert(Event.__table__),
+                [
+                    {
+                        "id": i,
+                        "app_name": f"app-{i % 17}",
+                        "window_title": f"window {i}",
+                        # 每两个事件共用一个开始时间，覆盖排序键相同时的决胜逻辑
+                        "start_time": start + timedelta(seconds=30 * (i // 2)),
+                        "status": "done",
+                    }
+                    for i in ids
+                ],
+            )
+            conn.execute(
+                insert(Screenshot.__table__),
+                [
+                    {
+                        "file_path": f"/tmp/{i}-{n}.png",
+                        "file_hash": f"{i}-{n}",
+                        "file_size": 0,
+                        "width": 0,
+                        "height": 0,
+                        "event_id": i,
+                        "is_processed": True,
+                        "file_deleted": False,
+                        "created_at": start + timedelta(seconds=30 * (i // 2) + n),
+                    }
+                    for i in ids
+                    for n in range(SCREENSHOTS_PER_EVENT)
+                ],
+            )
+        for spec in PERFORMANCE_INDEXES:
+            if spec.table in INDEX_TABLES:
+                conn.execute(text(spec.create_sql))
+
+
+def _timed(fn, repeat: int) -> tuple[float, list]:
+    """返回多次运行的最短耗时（毫秒）与最后一次结果"""
+    best = float("inf")
+    result: list = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 2), result
+
+
+def walk_to_page(db: _BenchDatabase, page_size: int, page: int) -> str | None:
+    """按游标翻到第 page 页，返回该页的游标（第 1 页为 None）"""
+    cursor = None
+    for _ in range(page - 1):
+        items = list_events(db, limit=page_size, cursor=cursor)
+        cursor = EVENT_KEYSET.next_cursor(items, page_size)
+        if cursor is None:
+            break
+    return cursor
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="事件列表 OFFSET / 游标分页基准测试")
+    parser.add_argument("--events", type=int, default=200000, help="生成的事件数量")
+    parser.add_argument("--page-size", type=int, default=20, help="每页条数")
+    parser.add_argument("--page", type=int, default=10000, help="对比的深页页码")
+    parser.add_argument("--repeat", type=int, default=5, help="每项测量次数（取最短）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = _BenchDatabase(Path(tmp) / "bench.db")
+        started = time.perf_counter()
+        seed(db, args.events)
+        seed_seconds = round(time.perf_counter() - started, 1)
+
+        deep_offset = (args.page - 1) * args.page_size
+        deep_cursor = walk_to_page(db, args.page_size, args.page)
+
+        report: dict = {"events": args.events, "page_size": args.page_size, "seed_s": seed_seconds}
+        for label, offset in (("page_1", 0), (f"page_{args.page}", deep_offset)):
+            ms, _ = _timed(
+                lambda o=offset: list_events(db, limit=args.page_size, offset=o), args.repeat
+            )
+            report[f"offset_{label}_ms"] = ms
+        for label, cursor in (("page_1", None), (f"page_{args.page}", deep_cursor)):
+            ms, items = _timed(
+                lambda c=cursor: list_events(db, limit=args.page_size, cursor=c), args.repeat
+            )
+            report[f"cursor_{label}_ms"] = ms
+            report[f"cursor_{label}_first_id"] = items[0]["id"] if items else None
+        db.engine.dispose()
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
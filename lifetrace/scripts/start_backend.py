@@ -136,6 +136,11 @@ def main():
         default="dev",
         help="Server mode: dev (development) or build (packaged app)",
     )
+    parser.add_argument(
+        "--profile-imports",
+        action="store_true",
+        help="Record per-module import time during startup (see /api/startup-profile)",
+    )
 
     args = parser.parse_args()
 
@@ -17,6 +17,11 @@ from lifetrace.core.module_registry import (
 from lifetrace.jobs.job_manager import get_job_manager
 from lifetrace.services.config_service import is_llm_configured
 from lifetrace.util.base_paths import get_user_logs_dir
+from lifetrace.util.import_profiler import (
+    PROFILE_IMPORTS_FLAG,
+    get_import_profiler,
+    mark_startup_stage,
+)
 from lifetrace.util.logging_config import get_logger, setup_logging
 from lifetrace.util.settings import settings
 
@@ -35,6 +40,10 @@ async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     # 启动逻辑
     logger.info("Web服务器启动")
+    mark_startup_stage("lifespan_started")
+    profiler = get_import_profiler()
+    if profiler.installed:
+        logger.info(f"启动导入耗时分析:\n{profiler.format_report()}")
 
     # 初始化任务管理器
     manager = get_job_manager()
@@ -67,6 +76,15 @@ async def lifespan(app: FastAPI):
     if manager:
         manager.stop_all()
 
+    # 写入缓冲中的录制器元数据与 token 使用记录
+    from lifetrace.storage.recorder_write_buffer import (  # noqa: PLC0415
+        shutdown_recorder_write_buffer,
+    )
+    from lifetrace.util.token_usage_logger import shutdown_token_logger  # noqa: PLC0415
+
+    shutdown_recorder_write_buffer()
+    shutdown_token_logger()
+
 
 app = FastAPI(
     title="FreeTodo API",
@@ -74,6 +92,7 @@ app = FastAPI(
     version="0.1.2",
     lifespan=lifespan,
 )
+mark_startup_stage("app_created")
 
 
 def get_cors_origins() -> list[str]:
@@ -147,6 +166,7 @@ async def _register_deferred_modules(app: FastAPI) -> None:
         if registered:
             app.state.registered_modules.update(registered)
         await asyncio.sleep(0)
+    mark_startup_stage("deferred_modules_registered")
     logger.info("延迟模块加载完成")
 
 
@@ -170,6 +190,7 @@ async def _verify_llm_connection_async() -> None:
 
 # 注册按配置启用的路由
 _register_priority_modules(app)
+mark_startup_stage("priority_modules_registered")
 
 
 def find_available_port(host: str, start_port: int, max_attempts: int = 100) -> int:
@@ -226,6 +247,11 @@ def parse_args():
         default="dev",
         help="服务器模式：dev（开发模式）或 build（打包模式）",
     )
+    parser.add_argument(
+        PROFILE_IMPORTS_FLAG,
+        action="store_true",
+        help="记录启动时各模块的导入耗时（报告写入日志，并可通过 /api/startup-profile 查看）",
+    )
     return parser.parse_args()
 
 
@@ -254,8 +280,9 @@ if __name__ == "__main__":
     if actual_port != server_port:
         logger.info(f"注意: 原始端口 {server_port} 已被占用，已自动切换到 {actual_port}")
 
+    # 非热重载时直接传入 app 对象，避免 uvicorn 以 lifetrace.server 再次导入本模块
     uvicorn.run(
-        "lifetrace.server:app",
+        "lifetrace.server:app" if server_debug else app,
         host=server_host,
         port=actual_port,
         reload=server_debug,
@@ -1,5 +1,28 @@
-"""服务层 - 业务逻辑服务"""
+"""服务层 - 业务逻辑服务
 
-from lifetrace.services.config_service import ConfigService
+子模块按需懒加载：导入 `lifetrace.services.xxx` 时不会连带加载其他服务及其依赖
+（LLM 客户端、openai 等），缩短后端冷启动时间。
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING
 
 __all__ = ["ConfigService"]
+
+_LAZY_EXPORTS: dict[str, str] = {"ConfigService": "lifetrace.services.config_service"}
+
+if TYPE_CHECKING:
+    from lifetrace.services.config_service import ConfigService
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is not None:
+        return getattr(importlib.import_module(module_name), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals().keys()) | set(_LAZY_EXPORTS))
@@ -16,6 +16,7 @@ from lifetrace.schemas.activity import (
     ManualActivityCreateRequest,
     ManualActivityCreateResponse,
 )
+from lifetrace.storage.pagination import ACTIVITY_KEYSET
 from lifetrace.util.logging_config import get_logger
 
 logger = get_logger()
@@ -38,10 +39,11 @@ class ActivityService:
         offset: int,
         start_date: datetime | None,
         end_date: datetime | None,
+        cursor: str | None = None,
     ) -> ActivityListResponse:
-        """获取活动列表"""
+        """获取活动列表（提供 cursor 时按游标分页，不再统计总数）"""
         logger.info(
-            f"获取活动列表 - 参数: limit={limit}, offset={offset}, "
+            f"获取活动列表 - 参数: limit={limit}, offset={offset}, cursor={bool(cursor)}, "
             f"start_date={start_date}, end_date={end_date}"
         )
 
@@ -50,11 +52,14 @@ class ActivityService:
             offset=offset,
             start_date=start_date,
             end_date=end_date,
+            cursor=cursor,
         )
-        total_count = self.activity_repo.count_activities(
-            start_date=start_date,
-            end_date=end_date,
-        )
+        total_count = None
+        if not cursor:
+            total_count = self.activity_repo.count_activities(
+                start_date=start_date,
+                end_date=end_date,
+            )
 
         logger.info(
             f"获取活动列表 - 结果: activities_count={len(activities)}, total_count={total_count}"
@@ -63,6 +68,7 @@ class ActivityService:
         return ActivityListResponse(
             activities=[ActivityResponse(**a) for a in activities],
             total_count=total_count,
+            next_cursor=ACTIVITY_KEYSET.next_cursor(activities, limit),
         )
 
     def get_activity_events(self, activity_id: int) -> ActivityEventsResponse:
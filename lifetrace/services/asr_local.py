@@ -0,0 +1,288 @@
+"""本地 CPU 语音识别后端
+
+与 ASRClient（阿里云 Fun-ASR）提供相同的 transcribe_stream(audio_stream, on_result, on_error)
+接口，可离线运行：
+- VadChunker 把音频流切成语音片段（见 asr_vad）
+- 解码器在线程池/进程池中运行，不阻塞事件循环；多个句子可并行解码，结果按顺序回调
+- 中间结果（is_final=False）同一时间最多解码一个，解码未完成时新的中间片段直接丢弃，
+  因此部分结果的延迟有上限，不会在高负载时堆积
+- 解码器可插拔：faster_whisper（需安装 faster-whisper）或 mock（测试用）
+
+通过 audio.asr.backend 选择后端：dashscope（默认，远程）或 local。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.settings import settings
+
+from .asr_vad import BYTES_PER_SAMPLE, SpeechSegment, VadChunker, VadConfig
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable
+
+logger = get_logger()
+
+INT16_FULL_SCALE = 32768.0
+WHISPER_SAMPLE_RATE = 16000
+BACKEND_LOCAL = "local"
+
+# 进程池模式下每个工作进程各自持有一个解码器（模型只在进程启动时加载一次）
+_worker_state: dict[str, LocalASRDecoder] = {}
+
+
+class LocalASRDecoder(ABC):
+    """本地解码器基类：把一段 PCM16LE 单声道音频解码为文本"""
+
+    @abstractmethod
+    def decode(self, pcm: bytes, sample_rate: int) -> str:
+        """解码音频片段，返回识别文本（无内容时返回空字符串）"""
+
+
+class MockASRDecoder(LocalASRDecoder):
+    """测试用解码器：按片段时长返回固定格式的文本，可模拟解码耗时"""
+
+    def __init__(self, delay_seconds: float = 0.0, **_kwargs):
+        self.delay_seconds = delay_seconds
+
+    def decode(self, pcm: bytes, sample_rate: int) -> str:
+        if self.delay_seconds:
+            time.sleep(self.delay_seconds)
+        duration = len(pcm) / BYTES_PER_SAMPLE / sample_rate
+        return f"语音{duration:.1f}秒"
+
+
+class FasterWhisperDecoder(LocalASRDecoder):
+    """基于 faster-whisper（CTranslate2）的 CPU 解码器"""
+
+    def __init__(
+        self,
+        model: str = "small",
+        compute_type: str = "int8",
+        language: str | None = "zh",
+        cpu_threads: int = 0,
+        beam_size: int = 1,
+        **_kwargs,
+    ):
+        try:
+            from faster_whisper import WhisperModel  # noqa: PLC0415
+        except ImportError as e:
+            raise RuntimeError(
+                "本地 ASR 需要安装 faster-whisper：pip install faster-whisper"
+            ) from e
+
+        self.language = language or None
+        self.beam_size = beam_size
+        self.model = WhisperModel(
+            model, device="cpu", compute_type=compute_type, cpu_threads=cpu_threads
+        )
+
+    def decode(self, pcm: bytes, sample_rate: int) -> str:
+        audio = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / INT16_FULL_SCALE
+        if sample_rate != WHISPER_SAMPLE_RATE:
+            # Whisper 要求 16kHz 输入，线性插值重采样
+            positions = np.arange(0, len(audio), sample_rate / WHISPER_SAMPLE_RATE)
+            audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+        segments, _info = self.model.transcribe(
+            audio,
+            language=self.language,
+            beam_size=self.beam_size,
+            vad_filter=False,  # 已由 VadChunker 分段
+            condition_on_previous_text=False,
+        )
+        return "".join(segment.text for segment in segments).strip()
+
+
+DECODERS: dict[str, type[LocalASRDecoder]] = {
+    "faster_whisper": FasterWhisperDecoder,
+    "mock": MockASRDecoder,
+}
+
+
+def create_decoder(engine: str, params: dict[str, Any] | None = None) -> LocalASRDecoder:
+    """按名称创建解码器"""
+    if engine not in DECODERS:
+        raise ValueError(f"未知的本地 ASR 引擎: {engine}，可选: {', '.join(DECODERS)}")
+    return DECODERS[engine](**(params or {}))
+
+
+def _init_worker(engine: str, params: dict[str, Any]) -> None:
+    _worker_state["decoder"] = create_decoder(engine, params)
+
+
+def _decode_in_worker(pcm: bytes, sample_rate: int) -> str:
+    return _worker_state["decoder"].decode(pcm, sample_rate)
+
+
+class LocalASRClient:
+    """本地语音识别客户端（接口与 ASRClient.transcribe_stream 一致）"""
+
+    def __init__(
+        self,
+        engine: str = "mock",
+        params: dict[str, Any] | None = None,
+        *,
+        sample_rate: int = 16000,
+        vad_config: VadConfig | None = None,
+        max_workers: int = 2,
+        pool: str = "thread",
+    ):
+        self.engine = engine
+        self.sample_rate = sample_rate
+        self.vad_config = vad_config or VadConfig()
+        self.pool = pool
+        if pool == "process":
+            self._decoder = None
+            self._executor: Executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(engine, params or {}),
+            )
+        else:
+            # 线程池共享同一个解码器（CTranslate2 解码时释放 GIL）
+            self._decoder = create_decoder(engine, params)
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="LocalASR"
+            )
+
+    def _submit(self, segment: SpeechSegment) -> asyncio.Future[str]:
+        loop = asyncio.get_running_loop()
+        if self._decoder is None:
+            return loop.run_in_executor(
+                self._executor, _decode_in_worker, segment.pcm, segment.sample_rate
+            )
+        return loop.run_in_executor(
+            self._executor, self._decoder.decode, segment.pcm, segment.sample_rate
+        )
+
+    async def transcribe_stream(
+        self,
+        audio_stream: AsyncIterator[bytes],
+        on_result: Callable[[str, bool], None],
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> None:
+        """实时语音识别流式转录
+
+        Args:
+            audio_stream: PCM16LE 单声道音频数据流
+            on_result: 识别结果回调函数，接收 (text: str, is_final: bool) 参数
+            on_error: 错误回调函数，接收 (error: Exception) 参数
+        """
+        chunker = VadChunker(self.sample_rate, self.vad_config)
+        results: asyncio.Queue[tuple[bool, asyncio.Future[str]] | None] = asyncio.Queue()
+        partial_in_flight: list[asyncio.Future[str] | None] = [None]
+
+        def dispatch(segments: list[SpeechSegment]) -> None:
+            for segment in segments:
+                if not segment.is_final:
+                    in_flight = partial_in_flight[0]
+                    if in_flight is not None and not in_flight.done():
+                        continue  # 上一个中间结果尚未解码完成，丢弃过时的中间片段
+                    partial_in_flight[0] = self._submit(segment)
+                    results.put_nowait((False, partial_in_flight[0]))
+                else:
+                    results.put_nowait((True, self._submit(segment)))
+
+        emitter = asyncio.create_task(self._emit_results(results, on_result, on_error))
+        try:
+            async for chunk in audio_stream:
+                if chunk:
+                    dispatch(chunker.feed(chunk))
+            dispatch(chunker.flush())
+        except Exception as e:
+            logger.error(f"本地 ASR 读取音频流失败: {e}", exc_info=True)
+            if on_error:
+                on_error(e)
+        finally:
+            results.put_nowait(None)
+            await emitter
+
+    async def _emit_results(
+        self,
+        results: asyncio.Queue[tuple[bool, asyncio.Future[str]] | None],
+        on_result: Callable[[str, bool], None],
+        on_error: Callable[[Exception], None] | None,
+    ) -> None:
+        """按提交顺序等待解码结果并回调"""
+        while (item := await results.get()) is not None:
+            is_final, future = item
+            try:
+                text = (await future).strip()
+            except Exception as e:
+                logger.error(f"本地 ASR 解码失败: {e}")
+                if on_error and is_final:
+                    on_error(e)
+                continue
+            if text:
+                on_result(text, is_final)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def benchmark_real_time_factor(
+    client: LocalASRClient, pcm: bytes, chunk_ms: int = 100
+) -> dict[str, Any]:
+    """测量实时率（RTF = 处理耗时 / 音频时长，小于 1 表示快于实时）
+
+    音频按 chunk_ms 切块尽快送入，统计从开始到最后一个结果返回的总耗时。
+    """
+    chunk_bytes = client.sample_rate * chunk_ms // 1000 * BYTES_PER_SAMPLE
+    results: list[tuple[str, bool]] = []
+
+    async def stream():
+        for offset in range(0, len(pcm), chunk_bytes):
+            yield pcm[offset : offset + chunk_bytes]
+
+    async def run() -> None:
+        await client.transcribe_stream(stream(), lambda text, final: results.append((text, final)))
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    audio_seconds = len(pcm) / BYTES_PER_SAMPLE / client.sample_rate
+    return {
+        "engine": client.engine,
+        "pool": client.pool,
+        "audio_seconds": round(audio_seconds, 3),
+        "processing_seconds": round(elapsed, 3),
+        "rtf": round(elapsed / audio_seconds, 4) if audio_seconds else None,
+        "final_results": sum(1 for _, final in results if final),
+        "partial_results": sum(1 for _, final in results if not final),
+    }
+
+
+@lru_cache(maxsize=1)
+def get_local_asr_client() -> LocalASRClient:
+    """获取本地 ASR 客户端单例（按 audio.asr.local 配置创建）"""
+    return LocalASRClient(
+        settings.get("audio.asr.local.engine", "faster_whisper"),
+        dict(settings.get("audio.asr.local.params", {}) or {}),
+        sample_rate=settings.get("audio.asr.sample_rate", 16000),
+        vad_config=VadConfig.from_settings(),
+        max_workers=settings.get("audio.asr.local.max_workers", 2),
+        pool=settings.get("audio.asr.local.pool", "thread"),
+    )
+
+
+def reset_local_asr_client() -> None:
+    """配置变更后丢弃本地 ASR 客户端（下次使用时按新配置重建）"""
+    if get_local_asr_client.cache_info().currsize:
+        get_local_asr_client().shutdown()
+        get_local_asr_client.cache_clear()
+
+
+def select_asr_backend(remote_client: Any) -> Any:
+    """按 audio.asr.backend 返回本次转录使用的客户端"""
+    if settings.get("audio.asr.backend", "dashscope") == BACKEND_LOCAL:
+        return get_local_asr_client()
+    return remote_client
@@ -0,0 +1,148 @@
+"""基于能量的流式 VAD 分段器
+
+把 PCM16LE 单声道音频流切成语音片段，供本地 ASR 后端解码：
+- 按 frame_ms 分帧计算 RMS，连续 speech_start_ms 的有声帧视为开始说话（保留 pre_roll_ms 的前导音频）
+- 静音达到 max_sentence_silence_ms 时结束当前句子，输出 is_final 片段（去掉尾部静音）
+- 句子超过 max_segment_seconds 时强制切分，保证单次解码的音频长度有上限
+- 说话过程中每隔 partial_interval_ms 输出一次当前句子的中间片段，用于低延迟的部分结果
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+
+from lifetrace.util.settings import settings
+
+BYTES_PER_SAMPLE = 2
+
+
+@dataclass
+class VadConfig:
+    """VAD 分段参数"""
+
+    frame_ms: int = 30
+    energy_threshold: float = 300.0  # int16 RMS 阈值，低于视为静音
+    speech_start_ms: int = 90
+    pre_roll_ms: int = 300
+    max_sentence_silence_ms: int = 1300
+    max_segment_seconds: float = 15.0
+    partial_interval_ms: int = 1000
+
+    @classmethod
+    def from_settings(cls) -> VadConfig:
+        """读取 audio.asr.local.vad 配置（静音阈值沿用 audio.asr.max_sentence_silence）"""
+        defaults = cls()
+        return cls(
+            frame_ms=settings.get("audio.asr.local.vad.frame_ms", defaults.frame_ms),
+            energy_threshold=settings.get(
+                "audio.asr.local.vad.energy_threshold", defaults.energy_threshold
+            ),
+            speech_start_ms=settings.get(
+                "audio.asr.local.vad.speech_start_ms", defaults.speech_start_ms
+            ),
+            pre_roll_ms=settings.get("audio.asr.local.vad.pre_roll_ms", defaults.pre_roll_ms),
+            max_sentence_silence_ms=settings.get(
+                "audio.asr.max_sentence_silence", defaults.max_sentence_silence_ms
+            ),
+            max_segment_seconds=settings.get(
+                "audio.asr.local.vad.max_segment_seconds", defaults.max_segment_seconds
+            ),
+            partial_interval_ms=settings.get(
+                "audio.asr.local.vad.partial_interval_ms", defaults.partial_interval_ms
+            ),
+        )
+
+
+@dataclass
+class SpeechSegment:
+    """一段待解码的语音"""
+
+    index: int  # 句子序号（同一句的中间片段与最终片段序号相同）
+    pcm: bytes
+    is_final: bool
+    sample_rate: int
+
+    @property
+    def duration_seconds(self) -> float:
+        return len(self.pcm) / BYTES_PER_SAMPLE / self.sample_rate
+
+
+class VadChunker:
+    """流式 VAD 分段器（非线程安全，每个转录流一个实例）"""
+
+    def __init__(self, sample_rate: int = 16000, config: VadConfig | None = None):
+        self.sample_rate = sample_rate
+        self.config = config or VadConfig()
+        self._frame_bytes = sample_rate * self.config.frame_ms // 1000 * BYTES_PER_SAMPLE
+        self._remainder = b""
+        self._pre_roll: deque[bytes] = deque(
+            maxlen=max(1, self.config.pre_roll_ms // self.config.frame_ms)
+        )
+        self._frames: list[bytes] = []
+        self._in_speech = False
+        self._voiced_ms = 0
+        self._silence_ms = 0
+        self._since_partial_ms = 0
+        self._index = 0
+
+    def _is_voiced(self, frame: bytes) -> bool:
+        samples = np.frombuffer(frame, dtype="<i2").astype(np.float32)
+        return float(np.sqrt(np.mean(samples * samples))) >= self.config.energy_threshold
+
+    def feed(self, pcm: bytes) -> list[SpeechSegment]:
+        """输入一段音频，返回因此产生的片段"""
+        data = self._remainder + pcm
+        usable = len(data) - len(data) % self._frame_bytes
+        self._remainder = data[usable:]
+        segments: list[SpeechSegment] = []
+        for offset in range(0, usable, self._frame_bytes):
+            segment = self._process_frame(data[offset : offset + self._frame_bytes])
+            if segment is not None:
+                segments.append(segment)
+        return segments
+
+    def flush(self) -> list[SpeechSegment]:
+        """音频流结束：输出未结束的句子"""
+        self._remainder = b""
+        if not self._in_speech or not self._frames:
+            return []
+        return [self._finish(trailing_silence_frames=0)]
+
+    def _process_frame(self, frame: bytes) -> SpeechSegment | None:
+        config = self.config
+        voiced = self._is_voiced(frame)
+        if not self._in_speech:
+            self._pre_roll.append(frame)
+            self._voiced_ms = self._voiced_ms + config.frame_ms if voiced else 0
+            if self._voiced_ms >= config.speech_start_ms:
+                self._in_speech = True
+                self._frames = list(self._pre_roll)
+                self._pre_roll.clear()
+                self._silence_ms = 0
+                self._since_partial_ms = 0
+            return None
+
+        self._frames.append(frame)
+        self._silence_ms = 0 if voiced else self._silence_ms + config.frame_ms
+        self._since_partial_ms += config.frame_ms
+        if self._silence_ms >= config.max_sentence_silence_ms:
+            return self._finish(trailing_silence_frames=self._silence_ms // config.frame_ms)
+        if len(self._frames) * config.frame_ms >= config.max_segment_seconds * 1000:
+            return self._finish(trailing_silence_frames=0)
+        if self._since_partial_ms >= config.partial_interval_ms and self._silence_ms == 0:
+            self._since_partial_ms = 0
+            return SpeechSegment(self._index, b"".join(self._frames), False, self.sample_rate)
+        return None
+
+    def _finish(self, trailing_silence_frames: int) -> SpeechSegment:
+        frames = self._frames[: len(self._frames) - trailing_silence_frames] or self._frames
+        segment = SpeechSegment(self._index, b"".join(frames), True, self.sample_rate)
+        self._index += 1
+        self._frames = []
+        self._in_speech = False
+        self._voiced_ms = 0
+        self._silence_ms = 0
+        return segment
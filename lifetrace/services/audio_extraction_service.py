@@ -3,6 +3,7 @@
 处理音频转录文本的待办和日程提取逻辑。
 """
 
+import asyncio
 import hashlib
 import json
 from typing import Any
@@ -15,9 +16,13 @@ from lifetrace.storage.models import Transcription
 from lifetrace.storage.sql_utils import col
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.prompt_loader import get_prompt
+from lifetrace.util.token_usage_logger import log_token_usage
 
 logger = get_logger()
 
+# TokenUsage 中转录提取调用的功能类型（批处理成本估算按此查询历史输出比例）
+EXTRACTION_FEATURE_TYPE = "transcription_extraction"
+
 
 class AudioExtractionService:
     """音频提取服务"""
@@ -49,7 +54,7 @@ class AudioExtractionService:
         digest = hashlib.sha1(base.encode("utf-8"), usedforsecurity=False).hexdigest()[:16]
         return f"{prefix}_{digest}"
 
-    def _enrich_extracted_items(self, prefix: str, items: list[dict]) -> list[dict]:
+    def enrich_extracted_items(self, prefix: str, items: list[dict]) -> list[dict]:
         """丰富提取项，添加缺失字段
 
         Args:
@@ -103,20 +108,20 @@ class AudioExtractionService:
                 if optimized:
                     if todos is not None:
                         transcription.extracted_todos_optimized = json.dumps(
-                            self._enrich_extracted_items("todo", todos), ensure_ascii=False
+                            self.enrich_extracted_items("todo", todos), ensure_ascii=False
                         )
                     if schedules is not None:
                         transcription.extracted_schedules_optimized = json.dumps(
-                            self._enrich_extracted_items("schedule", schedules), ensure_ascii=False
+                            self.enrich_extracted_items("schedule", schedules), ensure_ascii=False
                         )
                 else:
                     if todos is not None:
                         transcription.extracted_todos = json.dumps(
-                            self._enrich_extracted_items("todo", todos), ensure_ascii=False
+                            self.enrich_extracted_items("todo", todos), ensure_ascii=False
                         )
                     if schedules is not None:
                         transcription.extracted_schedules = json.dumps(
-                            self._enrich_extracted_items("schedule", schedules), ensure_ascii=False
+                            self.enrich_extracted_items("schedule", schedules), ensure_ascii=False
                         )
                 transcription.extraction_status = "completed"
                 session.commit()
@@ -261,8 +266,8 @@ class AudioExtractionService:
             todos, schedules = self._load_extraction_from_transcription(transcription, optimized)
 
             # Backfill missing fields for legacy stored items (and persist)
-            todos = self._enrich_extracted_items("todo", todos)
-            schedules = self._enrich_extracted_items("schedule", schedules)
+            todos = self.enrich_extracted_items("todo", todos)
+            schedules = self.enrich_extracted_items("schedule", schedules)
 
             todo_by_id, todo_by_dedupe = self._build_item_lookup_maps(todos)
             sched_by_id, sched_by_dedupe = self._build_item_lookup_maps(schedules)
@@ -284,17 +289,24 @@ class AudioExtractionService:
 
             return {"updated": updated}
 
-    def _load_extraction_prompts(self, text: str) -> tuple[str, str]:
+    def _load_extraction_prompts(
+        self, text: str, incremental: dict[str, Any] | None = None
+    ) -> tuple[str, str]:
         """加载提取提示词
 
         Args:
             text: 转录文本
+            incremental: 实时增量提取的上下文（context/summary/summary_max_chars），可选
 
         Returns:
             (system_prompt, user_prompt) 元组
         """
         system_prompt = get_prompt("transcription_extraction", "system_assistant")
         user_prompt = get_prompt("transcription_extraction", "user_prompt", text=text)
+        if user_prompt and incremental:
+            user_prompt += get_prompt(
+                "transcription_extraction", "incremental_suffix", **incremental
+            )
 
         if not system_prompt or not user_prompt:
             logger.warning("无法加载提取提示词，使用默认提示词")
@@ -363,11 +375,19 @@ class AudioExtractionService:
 
         return result
 
-    async def extract_todos_and_schedules(self, text: str) -> dict[str, Any]:
+    async def extract_todos_and_schedules(
+        self,
+        text: str,
+        incremental: dict[str, Any] | None = None,
+        raise_on_error: bool = False,
+    ) -> dict[str, Any]:
         """从转录文本中提取待办和日程
 
         Args:
             text: 转录文本
+            incremental: 实时增量提取的上下文（context/summary/summary_max_chars），
+                提供时结果中额外包含更新后的滚动摘要 summary
+            raise_on_error: 失败时抛出异常而不是返回空结果（批处理据此判断是否重试）
 
         Returns:
             包含todos和schedules的字典
@@ -378,14 +398,16 @@ class AudioExtractionService:
                 return {"todos": [], "schedules": []}
 
             # 加载提示词
-            system_prompt, user_prompt = self._load_extraction_prompts(text)
+            system_prompt, user_prompt = self._load_extraction_prompts(text, incremental)
 
             # 调用 LLM
             client = self.llm_client
             client._initialize_client()
 
             openai_client = client._get_client()
-            response = openai_client.chat.completions.create(
+            # 同步 SDK 调用放到线程中执行，避免阻塞事件循环（批处理可并发提取）
+            response = await asyncio.to_thread(
+                openai_client.chat.completions.create,
                 model=client.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -393,6 +415,15 @@ class AudioExtractionService:
                 ],
                 temperature=0.3,
             )
+            if getattr(response, "usage", None):
+                log_token_usage(
+                    model=client.model,
+                    input_tokens=response.usage.prompt_tokens,
+                    output_tokens=response.usage.completion_tokens,
+                    endpoint="transcription_extraction",
+                    response_type="extraction",
+                    feature_type=EXTRACTION_FEATURE_TYPE,
+                )
 
             # 解析响应
             result_text = (response.choices[0].message.content or "").strip()
@@ -404,4 +435,24 @@ class AudioExtractionService:
             return result
         except Exception as e:
             logger.error(f"提取待办和日程失败: {e}")
+            if raise_on_error:
+                raise
             return {"todos": [], "schedules": []}
+
+    def merge_extraction_results(self, results: list[dict[str, Any]]) -> dict[str, Any]:
+        """合并分块提取的结果（按 dedupe_key 去重，保留首次出现的顺序）
+
+        Args:
+            results: 各文本块的提取结果
+
+        Returns:
+            合并后的 todos/schedules
+        """
+        merged: dict[str, Any] = {}
+        for kind, prefix in (("todos", "todo"), ("schedules", "schedule")):
+            items = [item for result in results for item in result.get(kind) or []]
+            unique: dict[str, dict] = {}
+            for item in self.enrich_extracted_items(prefix, items):
+                unique.setdefault(item["dedupe_key"], item)
+            merged[kind] = list(unique.values())
+        return merged
@@ -24,6 +24,9 @@ from lifetrace.util.time_utils import get_utc_now, to_local
 
 logger = get_logger()
 
+# 代码块至少包含开头与结尾的 ``` 两行
+MIN_CODE_BLOCK_LINES = 2
+
 
 class AudioService:
     """音频服务"""
@@ -493,11 +496,15 @@ class AudioService:
         except Exception as e:
             logger.error(f"自动提取待办和日程失败 (optimized={optimized}): {e}")
 
-    async def optimize_transcription_text(self, text: str) -> str:
+    async def optimize_transcription_text(
+        self, text: str, context: str | None = None, raise_on_error: bool = False
+    ) -> str:
         """使用LLM优化转录文本
 
         Args:
             text: 原始转录文本
+            context: 已处理的上文（实时增量优化时提供，仅作语境参考）
+            raise_on_error: 失败时抛出异常而不是返回原文（实时处理据此保留批次重试）
 
         Returns:
             优化后的文本
@@ -510,6 +517,10 @@ class AudioService:
             # 从配置文件加载提示词
             system_prompt = get_prompt("transcription_optimization", "system_assistant")
             user_prompt = get_prompt("transcription_optimization", "user_prompt", text=text)
+            if user_prompt and context:
+                user_prompt += get_prompt(
+                    "transcription_optimization", "incremental_suffix", context=context
+                )
 
             if not system_prompt or not user_prompt:
                 logger.warning("无法加载优化提示词，使用默认提示词")
@@ -519,29 +530,25 @@ class AudioService:
             client = self.llm_client
             client._initialize_client()
 
-            openai_client = client._get_client()
-            response = openai_client.chat.completions.create(
-                model=client.model,
+            response_text = client.chat(
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt},
                 ],
                 temperature=0.3,
+                cache_feature="audio_optimization",
             )
 
-            optimized_text = (response.choices[0].message.content or "").strip()
-            # 移除可能的markdown代码块标记
-            if optimized_text.startswith("```"):
-                lines = optimized_text.split("\n")
-                if lines[0].startswith("```"):
-                    min_lines_for_code_block = 2
-                    if len(lines) > min_lines_for_code_block:
-                        optimized_text = "\n".join(lines[1:-1])
-                optimized_text = optimized_text.strip()
-
+            optimized_text = response_text.strip()
+            # 移除可能的markdown代码块标记（首行 ``` 与末行）
+            lines = optimized_text.split("\n")
+            if optimized_text.startswith("```") and len(lines) > MIN_CODE_BLOCK_LINES:
+                optimized_text = "\n".join(lines[1:-1]).strip()
             return optimized_text
         except Exception as e:
             logger.error(f"优化转录文本失败: {e}")
+            if raise_on_error:
+                raise
             return text
 
     @property
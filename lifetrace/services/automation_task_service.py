@@ -13,7 +13,7 @@ from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
-from lifetrace.jobs.scheduler import get_scheduler_manager
+from lifetrace.jobs.scheduler import PERSISTENT_JOBSTORE, get_scheduler_manager
 from lifetrace.storage import automation_task_mgr
 from lifetrace.storage.notification_storage import add_notification
 from lifetrace.util.logging_config import get_logger
@@ -148,6 +148,7 @@ class AutomationTaskService:
             name=task.get("name") or self._job_id(task["id"]),
             replace_existing=True,
             kwargs={"task_id": task["id"]},
+            jobstore=PERSISTENT_JOBSTORE,
         )
 
     def _execute_task(self, task: dict[str, Any]) -> bool:
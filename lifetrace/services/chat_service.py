@@ -1,16 +1,19 @@
 """Chat 业务逻辑层
 
 处理 Chat 相关的业务逻辑，包含会话管理和消息处理。
-会话上下文存储在数据库中，不再使用内存存储。
+会话上下文以只追加的条目存储在数据库中（chat_context_entries），
+热点会话的上下文缓存在进程内 LRU 中，写入时先写数据库再同步更新缓存（写穿）。
 """
 
-import json
+import threading
 import uuid
+from collections import OrderedDict
 from typing import Any
 
 from lifetrace.repositories.interfaces import IChatRepository
+from lifetrace.storage.pagination import CHAT_KEYSET
 from lifetrace.util.logging_config import get_logger
-from lifetrace.util.time_utils import get_utc_now
+from lifetrace.util.settings import settings
 
 logger = get_logger()
 
@@ -18,6 +21,68 @@ logger = get_logger()
 MAX_CONTEXT_LENGTH = 50
 
 
+class SessionContextCache:
+    """热点会话上下文的进程内 LRU 缓存（ChatService 按请求创建，缓存为模块级共享）
+
+    未命中时从数据库加载，期间若有追加或失效发生，加载结果可能已过期，
+    因此用写入版本号判断：版本变化或已有更新的缓存时不回填。
+    """
+
+    def __init__(self, max_sessions: int = 128):
+        self.max_sessions = max(1, max_sessions)
+        self._entries: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+
+    def get(self, session_id: str) -> list[dict[str, Any]] | None:
+        with self._lock:
+            context = self._entries.get(session_id)
+            if context is None:
+                return None
+            self._entries.move_to_end(session_id)
+            return list(context)
+
+    def version(self) -> int:
+        """当前写入版本号（每次追加或失效递增），从数据库加载前读取"""
+        with self._lock:
+            return self._version
+
+    def put(self, session_id: str, context: list[dict[str, Any]]) -> None:
+        with self._lock:
+            self._version += 1
+            self._store(session_id, context)
+
+    def fill(self, session_id: str, context: list[dict[str, Any]], version: int) -> None:
+        """回填从数据库加载的上下文（加载期间有写入或已被其他请求回填时跳过）"""
+        with self._lock:
+            if self._version == version and session_id not in self._entries:
+                self._store(session_id, context)
+
+    def append(self, session_id: str, entry: dict[str, Any], keep_last: int) -> None:
+        """已缓存的会话追加条目（未缓存的会话下次读取时从数据库加载）"""
+        with self._lock:
+            self._version += 1
+            context = self._entries.get(session_id)
+            if context is not None:
+                context.append(entry)
+                del context[:-keep_last]
+                self._entries.move_to_end(session_id)
+
+    def evict(self, session_id: str) -> None:
+        with self._lock:
+            self._version += 1
+            self._entries.pop(session_id, None)
+
+    def _store(self, session_id: str, context: list[dict[str, Any]]) -> None:
+        self._entries[session_id] = list(context)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self.max_sessions:
+            self._entries.popitem(last=False)
+
+
+_context_cache = SessionContextCache(settings.get("chat.context_cache_size", 128))
+
+
 class ChatService:
     """Chat 业务逻辑层"""
 
@@ -42,14 +107,18 @@ class ChatService:
         Returns:
             会话ID
         """
+        reuse_session = bool(session_id)
         if not session_id:
             session_id = self.generate_session_id()
 
         # 确保会话在数据库中存在
         self.ensure_chat_exists(session_id, chat_type="general")
 
-        # 初始化空上下文
-        self.repository.update_chat_context(session_id, json.dumps([]))
+        # 初始化空上下文（新生成的会话 ID 不可能有旧条目，无需访问数据库）
+        if reuse_session:
+            self.clear_session_context(session_id)
+        else:
+            _context_cache.put(session_id, [])
 
         logger.info(f"创建新会话: {session_id}")
         return session_id
@@ -63,13 +132,16 @@ class ChatService:
         Returns:
             是否清除成功
         """
-        result = self.repository.update_chat_context(session_id, json.dumps([]))
+        result = self.repository.clear_context_entries(session_id)
         if result:
+            _context_cache.put(session_id, [])
             logger.info(f"清除会话上下文: {session_id}")
+        else:
+            _context_cache.evict(session_id)
         return result
 
     def get_session_context(self, session_id: str) -> list[dict[str, Any]]:
-        """获取会话上下文
+        """获取会话上下文（最近 MAX_CONTEXT_LENGTH 条）
 
         Args:
             session_id: 会话ID
@@ -77,41 +149,29 @@ class ChatService:
         Returns:
             上下文消息列表
         """
-        context_json = self.repository.get_chat_context(session_id)
-        if context_json:
-            try:
-                return json.loads(context_json)
-            except json.JSONDecodeError:
-                logger.warning(f"会话上下文 JSON 解析失败: {session_id}")
-                return []
-        return []
+        context = _context_cache.get(session_id)
+        if context is None:
+            version = _context_cache.version()
+            context = self.repository.get_context_entries(session_id, MAX_CONTEXT_LENGTH)
+            _context_cache.fill(session_id, context, version)
+        return context
 
     def add_to_session_context(self, session_id: str, role: str, content: str):
-        """添加消息到会话上下文
+        """添加消息到会话上下文（只追加一行，不重写整个上下文）
 
         Args:
             session_id: 会话ID
             role: 消息角色（user, assistant, system）
             content: 消息内容
         """
-        # 获取当前上下文
-        context = self.get_session_context(session_id)
-
-        # 添加新消息
-        context.append(
-            {
-                "role": role,
-                "content": content,
-                "timestamp": get_utc_now().isoformat(),
-            }
+        entry = self.repository.append_context_entry(
+            session_id, role, content, keep_last=MAX_CONTEXT_LENGTH
         )
-
-        # 限制上下文长度，避免数据过大
-        if len(context) > MAX_CONTEXT_LENGTH:
-            context = context[-MAX_CONTEXT_LENGTH:]
-
-        # 保存到数据库
-        self.repository.update_chat_context(session_id, json.dumps(context, ensure_ascii=False))
+        if entry is None:
+            # 写入失败时丢弃缓存，避免缓存与数据库不一致
+            _context_cache.evict(session_id)
+            return
+        _context_cache.append(session_id, entry, keep_last=MAX_CONTEXT_LENGTH)
 
     # ===== 数据库会话管理 =====
 
@@ -160,12 +220,14 @@ class ChatService:
         chat_type: str | None = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """列出聊天会话"""
+        """列出聊天会话（提供 cursor 时按游标分页）"""
         return self.repository.list_chats(
             chat_type=chat_type,
             limit=limit,
             offset=offset,
+            cursor=cursor,
         )
 
     def update_chat_title(self, session_id: str, title: str) -> bool:
@@ -174,6 +236,7 @@ class ChatService:
 
     def delete_chat(self, session_id: str) -> bool:
         """删除聊天会话及其所有消息"""
+        _context_cache.evict(session_id)
         return self.repository.delete_chat(session_id)
 
     # ===== 消息管理 =====
@@ -218,11 +281,13 @@ class ChatService:
         self,
         chat_type: str | None = None,
         limit: int = 10,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
         """获取聊天会话摘要列表"""
         return self.repository.get_chat_summaries(
             chat_type=chat_type,
             limit=limit,
+            cursor=cursor,
         )
 
     # ===== 历史记录 =====
@@ -231,8 +296,10 @@ class ChatService:
         self,
         session_id: str | None = None,
         chat_type: str | None = None,
+        limit: int = 20,
+        cursor: str | None = None,
     ) -> dict[str, Any]:
-        """获取聊天历史记录"""
+        """获取聊天历史记录（会话摘要支持游标分页，next_cursor 为空表示没有更多）"""
         if session_id:
             # 返回指定会话的历史记录
             messages = self.repository.get_messages(session_id)
@@ -243,5 +310,11 @@ class ChatService:
             }
         else:
             # 返回所有会话的摘要信息
-            sessions_info = self.repository.get_chat_summaries(chat_type=chat_type, limit=20)
-            return {"sessions": sessions_info, "message": "所有会话摘要"}
+            sessions_info = self.repository.get_chat_summaries(
+                chat_type=chat_type, limit=limit, cursor=cursor
+            )
+            return {
+                "sessions": sessions_info,
+                "next_cursor": CHAT_KEYSET.next_cursor(sessions_info, limit),
+                "message": "所有会话摘要",
+            }
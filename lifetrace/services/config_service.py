@@ -8,8 +8,6 @@ from typing import Any
 import yaml
 
 from lifetrace.jobs.scheduler import get_scheduler_manager
-from lifetrace.llm.llm_client import LLMClient
-from lifetrace.services.asr_client import ASRClient
 from lifetrace.util.base_paths import get_config_dir, get_user_config_dir
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.settings import reload_settings, settings
@@ -47,6 +45,8 @@ JOB_ENABLED_CONFIG_TO_JOB_ID = {
     "jobs.recorder.enabled": "recorder_job",
     "jobs.ocr.enabled": "ocr_job",
     "jobs.clean_data.enabled": "clean_data_job",
+    "jobs.screenshot_transcoder.enabled": "screenshot_transcoder_job",
+    "jobs.db_maintenance.enabled": "db_maintenance_job",
     "jobs.activity_aggregator.enabled": "activity_aggregator_job",
     "jobs.todo_recorder.enabled": "todo_recorder_job",
     "jobs.audio_recording.enabled": "audio_recording_job",
@@ -54,6 +54,8 @@ JOB_ENABLED_CONFIG_TO_JOB_ID = {
     "jobs_recorder_enabled": "recorder_job",
     "jobs_ocr_enabled": "ocr_job",
     "jobs_clean_data_enabled": "clean_data_job",
+    "jobs_screenshot_transcoder_enabled": "screenshot_transcoder_job",
+    "jobs_db_maintenance_enabled": "db_maintenance_job",
     "jobs_activity_aggregator_enabled": "activity_aggregator_job",
     "jobs_todo_recorder_enabled": "todo_recorder_job",
     "jobs_audio_recording_enabled": "audio_recording_job",
@@ -268,12 +270,16 @@ class ConfigService:
                 "api_key": settings.audio.asr.api_key,
                 "base_url": settings.audio.asr.base_url,
                 "model": settings.audio.asr.model,
+                "backend": settings.get("audio.asr.backend", "dashscope"),
+                "local": dict(settings.get("audio.asr.local", {}) or {}),
             }
         except Exception:
             return {
                 "api_key": None,
                 "base_url": None,
                 "model": None,
+                "backend": None,
+                "local": {},
             }
 
     def get_config_for_frontend(self) -> dict[str, Any]:
@@ -491,6 +497,8 @@ class ConfigService:
                 logger.info(f"LLM 配置状态已更新: {status}")
 
                 # 重新初始化 LLM 客户端单例（所有服务共享此实例）
+                from lifetrace.llm.llm_client import LLMClient  # noqa: PLC0415
+
                 llm_client = LLMClient()
                 client_available = llm_client.reinitialize()
                 logger.info(f"LLM 客户端已重新初始化 - 可用: {client_available}")
@@ -505,6 +513,11 @@ class ConfigService:
                 else:
                     logger.warning("LLM 客户端重新初始化后不可用，请检查配置")
 
+                # 已构建的 Agno Agent 持有旧的模型配置，使实例池失效
+                from lifetrace.llm.agent_pool import invalidate_agno_agent_pool  # noqa: PLC0415
+
+                invalidate_agno_agent_pool("LLM 配置变更")
+
                 logger.info("LLM 配置热加载完成")
             except Exception as e:
                 logger.error(f"热加载 LLM 客户端失败: {e}", exc_info=True)
@@ -547,8 +560,12 @@ class ConfigService:
 
             try:
                 # 重新初始化 ASR 客户端单例
+                from lifetrace.services.asr_client import ASRClient  # noqa: PLC0415
+                from lifetrace.services.asr_local import reset_local_asr_client  # noqa: PLC0415
+
                 asr_client = ASRClient()
                 asr_client.reinitialize()
+                reset_local_asr_client()
                 logger.info(
                     f"ASR 客户端热加载成功 - "
                     f"API Key: {asr_client.api_key[:10] if asr_client.api_key else 'None'}..., "
@@ -12,6 +12,7 @@ from fastapi import HTTPException
 from lifetrace.repositories.interfaces import IEventRepository, IOcrRepository
 from lifetrace.schemas.event import EventDetailResponse, EventListResponse, EventResponse
 from lifetrace.schemas.screenshot import ScreenshotResponse
+from lifetrace.storage.pagination import EVENT_KEYSET
 from lifetrace.util.logging_config import get_logger
 
 logger = get_logger()
@@ -31,10 +32,11 @@ class EventService:
         start_date: datetime | None,
         end_date: datetime | None,
         app_name: str | None,
+        cursor: str | None = None,
     ) -> EventListResponse:
-        """获取事件列表"""
+        """获取事件列表（提供 cursor 时按游标分页，不再统计总数）"""
         logger.info(
-            f"获取事件列表 - 参数: limit={limit}, offset={offset}, "
+            f"获取事件列表 - 参数: limit={limit}, offset={offset}, cursor={bool(cursor)}, "
             f"start_date={start_date}, end_date={end_date}, app_name={app_name}"
         )
 
@@ -44,18 +46,22 @@ class EventService:
             start_date=start_date,
             end_date=end_date,
             app_name=app_name,
+            cursor=cursor,
         )
-        total_count = self.event_repo.count_events(
-            start_date=start_date,
-            end_date=end_date,
-            app_name=app_name,
-        )
+        total_count = None
+        if not cursor:
+            total_count = self.event_repo.count_events(
+                start_date=start_date,
+                end_date=end_date,
+                app_name=app_name,
+            )
 
         logger.info(f"获取事件列表 - 结果: events_count={len(events)}, total_count={total_count}")
 
         return EventListResponse(
             events=[EventResponse(**e) for e in events],
             total_count=total_count,
+            next_cursor=EVENT_KEYSET.next_cursor(events, limit),
         )
 
     def count_events(
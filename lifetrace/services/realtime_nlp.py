@@ -0,0 +1,232 @@
+"""
+实时转录的增量 NLP（优化 + 待办/日程提取）
+
+录音过程中每隔 throttle_seconds 处理一次新增的最终句子，而不是把整段转录反复发给 LLM：
+- 只把尚未处理的句子（最多 max_new_sentences 句）作为本轮输入，
+  之前的 context_sentences 句作为滑动上下文，仅供理解语境
+- 提取时附带滚动摘要，LLM 返回更新后的摘要（不超过 summary_max_chars 字）
+- 新提取的待办/日程按 AudioExtractionService 的稳定 ID 合并，重复提取不会产生重复项
+- 每分钟的 token 用量（估算）不超过 tokens_per_minute，超出时推迟到窗口有余量再处理
+
+配置来自 audio.realtime_nlp，可被 WebSocket 连接的 nlp_* 查询参数按会话覆盖。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Any
+
+from lifetrace.llm.context_packer import approximate_token_count
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.settings import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+
+logger = get_logger()
+
+BUDGET_WINDOW_SECONDS = 60.0
+# 系统提示词与提取格式说明等固定开销（估算）
+PROMPT_OVERHEAD_TOKENS = 800
+OVERRIDE_PREFIX = "nlp_"
+
+
+@dataclass
+class RealtimeNlpConfig:
+    """实时 NLP 配置（单个录音会话）"""
+
+    throttle_seconds: float = 8.0
+    context_sentences: int = 6
+    max_new_sentences: int = 20
+    summary_max_chars: int = 300
+    tokens_per_minute: int = 6000
+
+    @classmethod
+    def from_settings(cls, overrides: Mapping[str, Any] | None = None) -> RealtimeNlpConfig:
+        """读取 audio.realtime_nlp 配置，overrides 中的 nlp_<字段> 按会话覆盖
+
+        Args:
+            overrides: 会话级覆盖（如 WebSocket 查询参数），无法解析的值忽略
+        """
+        config = cls()
+        for field in fields(cls):
+            caster = type(getattr(config, field.name))
+            value = settings.get(f"audio.realtime_nlp.{field.name}", getattr(config, field.name))
+            raw = (overrides or {}).get(f"{OVERRIDE_PREFIX}{field.name}")
+            if raw is not None:
+                try:
+                    value = caster(raw)
+                except (TypeError, ValueError):
+                    logger.warning(f"忽略无效的实时 NLP 参数 {field.name}={raw!r}")
+            setattr(config, field.name, max(caster(value), caster(0)))
+        return config
+
+
+class TokenBudget:
+    """滑动 60 秒窗口内的 token 预算（limit <= 0 表示不限制）"""
+
+    def __init__(self, tokens_per_minute: int, clock: Callable[[], float] = time.monotonic):
+        self.limit = tokens_per_minute
+        self._clock = clock
+        self._spent: deque[tuple[float, int]] = deque()
+
+    def _expire(self, now: float) -> None:
+        while self._spent and now - self._spent[0][0] >= BUDGET_WINDOW_SECONDS:
+            self._spent.popleft()
+
+    def used(self) -> int:
+        self._expire(self._clock())
+        return sum(tokens for _, tokens in self._spent)
+
+    def _fits(self, used: int, tokens: int) -> bool:
+        # 窗口为空时总是放行，避免单轮开销超过上限时永远无法处理
+        return self.limit <= 0 or used == 0 or used + tokens <= self.limit
+
+    def allows(self, tokens: int) -> bool:
+        return self._fits(self.used(), tokens)
+
+    def seconds_until(self, tokens: int) -> float:
+        """预算足够处理 tokens 还需等待的秒数"""
+        now = self._clock()
+        self._expire(now)
+        used = sum(spent for _, spent in self._spent)
+        if self._fits(used, tokens):
+            return 0.0
+        for at, spent in self._spent:
+            used -= spent
+            if self._fits(used, tokens):
+                return max(0.0, at + BUDGET_WINDOW_SECONDS - now)
+        return 0.0
+
+    def consume(self, tokens: int) -> None:
+        self._spent.append((self._clock(), tokens))
+
+
+class RealtimeNlpEngine:
+    """单个录音会话的增量优化/提取状态"""
+
+    def __init__(
+        self,
+        audio_service,
+        config: RealtimeNlpConfig | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.audio_service = audio_service
+        self.config = config or RealtimeNlpConfig.from_settings()
+        self.budget = TokenBudget(self.config.tokens_per_minute, clock)
+        self.sentences: list[str] = []
+        self.optimized_chunks: list[str] = []
+        self.summary = ""
+        self.todos: dict[str, dict] = {}
+        self.schedules: dict[str, dict] = {}
+        self._processed = 0
+        self._lock = asyncio.Lock()
+
+    def add_sentence(self, text: str) -> None:
+        text = (text or "").strip()
+        if text:
+            self.sentences.append(text)
+
+    @property
+    def pending_count(self) -> int:
+        return len(self.sentences) - self._processed
+
+    def _next_batch(self) -> tuple[list[str], str]:
+        """本轮的新句子与滑动上下文"""
+        start = self._processed
+        batch = self.sentences[start : start + max(1, self.config.max_new_sentences)]
+        context = self.sentences[max(0, start - self.config.context_sentences) : start]
+        return batch, "\n".join(context)
+
+    def _estimate_cost(self, new_text: str, context: str) -> int:
+        # 优化与提取各发送一次新文本和上下文，输出约为新文本加摘要
+        return (
+            PROMPT_OVERHEAD_TOKENS
+            + 3 * approximate_token_count(new_text)
+            + 2 * approximate_token_count(context)
+            + 2 * approximate_token_count(self.summary)
+        )
+
+    def seconds_until_ready(self) -> float:
+        """处理下一批还需等待的秒数（受 token 预算限制）"""
+        batch, context = self._next_batch()
+        if not batch:
+            return 0.0
+        return self.budget.seconds_until(self._estimate_cost("\n".join(batch), context))
+
+    async def run_once(self) -> dict[str, Any] | None:
+        """处理一批新句子，返回最新的完整结果
+
+        没有新句子、预算不足或优化/提取失败时返回 None；失败的批次保留，下一轮重新处理。
+        """
+        async with self._lock:
+            batch, context = self._next_batch()
+            if not batch:
+                return None
+            new_text = "\n".join(batch)
+            cost = self._estimate_cost(new_text, context)
+            if not self.budget.allows(cost):
+                logger.debug(f"实时 NLP 预算不足（已用 {self.budget.used()} tokens），推迟处理")
+                return None
+            self.budget.consume(cost)
+
+            computed = await self._compute(new_text, context)
+            if computed is None:
+                return None
+            optimized, extracted = computed
+            self._processed += len(batch)
+            self.optimized_chunks.append(optimized)
+            summary = extracted.get("summary")
+            if isinstance(summary, str) and summary.strip():
+                self.summary = summary.strip()[: self.config.summary_max_chars]
+            self._merge("todo", self.todos, extracted.get("todos"))
+            self._merge("schedule", self.schedules, extracted.get("schedules"))
+            return {
+                "text": "\n".join(self.optimized_chunks),
+                "delta": optimized,
+                "todos": list(self.todos.values()),
+                "schedules": list(self.schedules.values()),
+                "summary": self.summary,
+                "estimated_tokens": cost,
+            }
+
+    async def _compute(self, new_text: str, context: str) -> tuple[str, dict[str, Any]] | None:
+        """优化并提取一批新文本，任一步骤失败时返回 None"""
+        try:
+            optimized = (
+                await self.audio_service.optimize_transcription_text(
+                    new_text, context=context, raise_on_error=True
+                )
+            ).strip() or new_text
+        except Exception as e:
+            logger.error(f"实时优化失败，保留本批次待重试: {e}")
+            return None
+        try:
+            extracted = await self.audio_service.extraction_service.extract_todos_and_schedules(
+                new_text,
+                incremental={
+                    "context": context or "（无）",
+                    "summary": self.summary or "（无）",
+                    "summary_max_chars": self.config.summary_max_chars,
+                },
+                raise_on_error=True,
+            )
+        except Exception as e:
+            logger.error(f"实时提取失败，保留本批次待重试: {e}")
+            return None
+        return optimized, extracted
+
+    def _merge(self, prefix: str, store: dict[str, dict], items: Any) -> None:
+        """按稳定 ID 合并新提取项（同一 ID 以最新结果为准，保留首次出现的顺序）"""
+        if not isinstance(items, list):
+            return
+        # 实时提取偶尔缺少 source_text，以标题代替，保证稳定 ID 不为空
+        prepared = [
+            {"source_text": item.get("title"), **item} for item in items if isinstance(item, dict)
+        ]
+        service = self.audio_service.extraction_service
+        for item in service.enrich_extracted_items(prefix, prepared):
+            store[item["id"]] = item
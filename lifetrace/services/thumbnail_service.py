@@ -0,0 +1,246 @@
+"""截图缩略图服务
+
+为时间线、搜索结果等预览场景生成多尺寸 WebP 缩略图：
+
+- 按需（首次请求时）或在截图保存后异步生成
+- 存储在按截图 ID 分片的缓存目录中，超出容量上限时按最久未使用淘汰
+- 基于原图哈希与生成参数计算 ETag，供 HTTP 条件请求使用
+- 支持将一页结果拼接为一张雪碧图，减少请求数
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+
+from lifetrace.util.file_cache import atomic_write_bytes, prune_cache_dir, touch
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.path_utils import get_thumbnails_dir
+from lifetrace.util.settings import settings
+
+logger = get_logger()
+
+DEFAULT_SIZES = {"small": 160, "medium": 320, "large": 640}
+# 分片目录数量（按截图 ID 取模）
+SHARD_COUNT = 256
+# 每生成多少个缩略图检查一次缓存目录容量
+CACHE_PRUNE_INTERVAL = 50
+# 雪碧图空白单元格的背景色
+SPRITE_BACKGROUND = (0, 0, 0, 0)
+# WebP 图像单边的最大像素数
+WEBP_MAX_DIMENSION = 16383
+
+
+@dataclass
+class SpriteCell:
+    """雪碧图中单张缩略图的位置"""
+
+    screenshot_id: int
+    x: int
+    y: int
+    width: int
+    height: int
+
+    def to_dict(self) -> dict[str, int]:
+        return {
+            "screenshot_id": self.screenshot_id,
+            "x": self.x,
+            "y": self.y,
+            "width": self.width,
+            "height": self.height,
+        }
+
+
+class ThumbnailService:
+    """缩略图生成与缓存服务（线程安全）"""
+
+    def __init__(self, cache_dir: Path | str):
+        self.cache_dir = Path(cache_dir)
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+
+    # ===== 配置 =====
+
+    def _config(self) -> dict[str, Any]:
+        config = settings.get("thumbnails") or {}
+        if hasattr(config, "to_dict"):
+            config = config.to_dict()
+        return config
+
+    def get_sizes(self) -> dict[str, int]:
+        """可用的缩略图尺寸（名称 -> 最大边长）"""
+        sizes = self._config().get("sizes") or DEFAULT_SIZES
+        return {str(name): int(px) for name, px in sizes.items()}
+
+    def _quality(self) -> int:
+        return min(max(int(self._config().get("quality", 75)), 1), 100)
+
+    def _resolve_size(self, size_name: str) -> int:
+        sizes = self.get_sizes()
+        if size_name not in sizes:
+            raise ValueError(f"不支持的缩略图尺寸: {size_name}，可选: {', '.join(sizes)}")
+        return sizes[size_name]
+
+    # ===== 路径与 ETag =====
+
+    def thumbnail_path(self, screenshot_id: int, size_name: str) -> Path:
+        """缩略图缓存路径（按截图 ID 分片）"""
+        shard = f"{screenshot_id % SHARD_COUNT:02x}"
+        return self.cache_dir / shard / f"{screenshot_id}_{size_name}.webp"
+
+    def compute_etag(self, screenshot: dict[str, Any], size_name: str) -> str:
+        """根据原图哈希（缺失时用文件 mtime）与生成参数计算 ETag"""
+        source = screenshot.get("file_hash") or ""
+        if not source:
+            try:
+                source = str(os.stat(screenshot["file_path"]).st_mtime_ns)
+            except OSError:
+                source = "missing"
+        max_px = self._resolve_size(size_name)
+        return f'"{source[:16]}-{size_name}{max_px}-q{self._quality()}"'
+
+    # ===== 生成 =====
+
+    def get_thumbnail(self, screenshot: dict[str, Any], size_name: str) -> Path | None:
+        """获取缩略图文件路径，缓存未命中时生成；原图不存在时返回 None"""
+        max_px = self._resolve_size(size_name)
+        path = self.thumbnail_path(screenshot["id"], size_name)
+        if path.exists() and path.stat().st_mtime >= self._source_mtime(screenshot):
+            touch(path)
+            return path
+        file_path = screenshot.get("file_path")
+        if not file_path or not os.path.exists(file_path):
+            return None
+        with Image.open(file_path) as image:
+            data = self._render(image, max_px)
+        self._write(path, data)
+        return path
+
+    def generate_all(self, screenshot: dict[str, Any]) -> int:
+        """为截图生成全部尺寸的缩略图（只解码一次原图），返回生成的数量"""
+        file_path = screenshot.get("file_path")
+        if not file_path or not os.path.exists(file_path):
+            return 0
+        generated = 0
+        with Image.open(file_path) as image:
+            image.load()
+            for size_name, max_px in sorted(self.get_sizes().items(), key=lambda item: -item[1]):
+                path = self.thumbnail_path(screenshot["id"], size_name)
+                if path.exists():
+                    continue
+                self._write(path, self._render(image, max_px))
+                generated += 1
+        return generated
+
+    def _render(self, image: Image.Image, max_px: int) -> bytes:
+        thumb = image.copy()
+        thumb.thumbnail((max_px, max_px), Image.Resampling.LANCZOS)
+        if thumb.mode not in ("RGB", "RGBA"):
+            thumb = thumb.convert("RGB")
+        buffer = io.BytesIO()
+        thumb.save(buffer, format="WEBP", quality=self._quality(), method=4)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _source_mtime(screenshot: dict[str, Any]) -> float:
+        try:
+            return os.stat(screenshot["file_path"]).st_mtime
+        except (OSError, KeyError, TypeError):
+            return 0.0
+
+    def _write(self, path: Path, data: bytes) -> None:
+        atomic_write_bytes(path, data)
+        with self._lock:
+            self._writes_since_prune += 1
+            if self._writes_since_prune < CACHE_PRUNE_INTERVAL:
+                return
+            self._writes_since_prune = 0
+        self.prune_cache()
+
+    # ===== 雪碧图 =====
+
+    def build_sprite(
+        self, screenshots: list[dict[str, Any]], size_name: str, columns: int
+    ) -> tuple[bytes, list[SpriteCell]]:
+        """将多张缩略图按网格拼接为一张 WebP 雪碧图
+
+        每个单元格为 max_px × max_px，第 i 张图位于 (i % columns, i // columns)，
+        缩略图贴在单元格左上角。
+
+        Returns:
+            (雪碧图字节, 各缩略图位置列表)
+
+        Raises:
+            ValueError: 尺寸名称未知，或拼接后的宽/高超出 WebP 上限
+        """
+        max_px = self._resolve_size(size_name)
+        columns = max(1, min(columns, len(screenshots) or 1))
+        rows = max(1, -(-len(screenshots) // columns))
+        if max(columns, rows) * max_px > WEBP_MAX_DIMENSION:
+            raise ValueError(
+                f"雪碧图尺寸 {columns * max_px}x{rows * max_px} 超出 WebP 上限 "
+                f"{WEBP_MAX_DIMENSION}px，请调整 columns 或减少截图数量"
+            )
+        sprite = Image.new("RGBA", (columns * max_px, rows * max_px), SPRITE_BACKGROUND)
+        cells: list[SpriteCell] = []
+        for index, screenshot in enumerate(screenshots):
+            if not screenshot.get("file_path"):
+                continue
+            path = self.get_thumbnail(screenshot, size_name)
+            if path is None:
+                continue
+            x, y = (index % columns) * max_px, (index // columns) * max_px
+            with Image.open(path) as thumb:
+                sprite.paste(thumb.convert("RGBA"), (x, y))
+                cells.append(SpriteCell(screenshot["id"], x, y, thumb.width, thumb.height))
+        buffer = io.BytesIO()
+        sprite.save(buffer, format="WEBP", quality=self._quality(), method=4)
+        return buffer.getvalue(), cells
+
+    # ===== 清理 =====
+
+    def delete_thumbnails(self, screenshot_id: int) -> int:
+        """删除截图的全部缩略图（原图被清理时调用），返回删除的文件数"""
+        removed = 0
+        for size_name in self.get_sizes():
+            path = self.thumbnail_path(screenshot_id, size_name)
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning(f"删除缩略图失败 {path}: {e}")
+        return removed
+
+    def prune_cache(self) -> int:
+        """缓存目录超出容量上限时删除最久未使用的缩略图"""
+        max_mb = float(self._config().get("cache_max_mb", 500))
+        return prune_cache_dir(self.cache_dir, int(max_mb * 1024 * 1024), recursive=True)
+
+
+def generate_thumbnails_async(screenshot: dict[str, Any]) -> None:
+    """截图保存后在后台线程生成缩略图（需启用 thumbnails.generate_on_capture）"""
+    if not settings.get("thumbnails.generate_on_capture", False):
+        return
+
+    def _generate():
+        try:
+            get_thumbnail_service().generate_all(screenshot)
+        except Exception as e:
+            logger.warning(f"截图 {screenshot.get('id')} 缩略图生成失败: {e}")
+
+    threading.Thread(target=_generate, daemon=True).start()
+
+
+@lru_cache(maxsize=1)
+def get_thumbnail_service() -> ThumbnailService:
+    """获取缩略图服务单例"""
+    return ThumbnailService(get_thumbnails_dir())
@@ -14,6 +14,7 @@ from lifetrace.storage.notification_storage import (
     clear_dismissed_mark,
     clear_notification_by_todo_id,
 )
+from lifetrace.storage.pagination import TODO_KEYSET
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.time_utils import get_utc_now
 
@@ -54,11 +55,17 @@ class TodoService:
         todo = self.repository.get_by_uid(uid)
         return TodoResponse(**todo) if todo else None
 
-    def list_todos(self, limit: int, offset: int, status: str | None) -> dict[str, Any]:
-        """获取 Todo 列表"""
-        todos = self.repository.list_todos(limit, offset, status)
-        total = self.repository.count(status)
-        return {"total": total, "todos": [TodoResponse(**t) for t in todos]}
+    def list_todos(
+        self, limit: int, offset: int, status: str | None, cursor: str | None = None
+    ) -> dict[str, Any]:
+        """获取 Todo 列表（提供 cursor 时按游标分页，不再统计总数）"""
+        todos = self.repository.list_todos(limit, offset, status, cursor=cursor)
+        total = None if cursor else self.repository.count(status)
+        return {
+            "total": total,
+            "todos": [TodoResponse(**t) for t in todos],
+            "next_cursor": TODO_KEYSET.next_cursor(todos, limit),
+        }
 
     def create_todo(self, data: TodoCreate) -> TodoResponse:
         """创建 Todo"""
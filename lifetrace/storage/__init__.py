@@ -24,6 +24,7 @@ __all__ = [
     "get_session",
     "journal_mgr",
     "ocr_mgr",
+    "reminder_mgr",
     "screenshot_mgr",
     "stats_mgr",
     "todo_mgr",
@@ -42,6 +43,7 @@ if TYPE_CHECKING:
         get_session,
         journal_mgr,
         ocr_mgr,
+        reminder_mgr,
         screenshot_mgr,
         stats_mgr,
         todo_mgr,
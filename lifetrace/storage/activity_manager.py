@@ -7,6 +7,7 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from lifetrace.storage.database_base import DatabaseBase
 from lifetrace.storage.models import Activity, ActivityEventRelation, Event
+from lifetrace.storage.pagination import ACTIVITY_KEYSET
 from lifetrace.storage.sql_utils import col
 from lifetrace.util.logging_config import get_logger
 
@@ -108,14 +109,16 @@ class ActivityManager:
         offset: int = 0,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
         """查询活动列表
 
         Args:
             limit: 返回数量限制
-            offset: 偏移量
+            offset: 偏移量（提供 cursor 时忽略）
             start_date: 开始日期
             end_date: 结束日期
+            cursor: 上一页返回的游标
 
         Returns:
             活动列表
@@ -128,8 +131,10 @@ class ActivityManager:
                 if end_date:
                     q = q.filter(col(Activity.start_time) <= end_date)
 
-                q = q.order_by(col(Activity.start_time).desc()).offset(offset).limit(limit)
-                activities = q.all()
+                q = ACTIVITY_KEYSET.apply(q, cursor)
+                if not cursor and offset:
+                    q = q.offset(offset)
+                activities = q.limit(limit).all()
 
                 results: list[dict[str, Any]] = []
                 for activity in activities:
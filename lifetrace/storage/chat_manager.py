@@ -2,10 +2,12 @@
 
 from typing import Any
 
+from sqlalchemy import delete, func, select
 from sqlalchemy.exc import SQLAlchemyError
 
 from lifetrace.storage.database_base import DatabaseBase
-from lifetrace.storage.models import Chat, Message
+from lifetrace.storage.models import Chat, ChatContextEntry, Message
+from lifetrace.storage.pagination import CHAT_KEYSET
 from lifetrace.storage.sql_utils import col
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.time_utils import get_utc_now
@@ -94,13 +96,15 @@ class ChatManager:
         chat_type: str | None = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """列出聊天会话
+        """列出聊天会话（按最后活跃时间倒序）
 
         Args:
             chat_type: 聊天类型过滤（可选）
             limit: 返回数量限制
-            offset: 偏移量
+            offset: 偏移量（提供 cursor 时忽略）
+            cursor: 上一页返回的游标
         """
         try:
             with self.db_base.get_session() as session:
@@ -109,15 +113,10 @@ class ChatManager:
                 if chat_type:
                     q = q.filter(col(Chat.chat_type) == chat_type)
 
-                chats = (
-                    q.order_by(
-                        col(Chat.last_message_at).desc().nullslast(),
-                        col(Chat.created_at).desc(),
-                    )
-                    .offset(offset)
-                    .limit(limit)
-                    .all()
-                )
+                q = CHAT_KEYSET.apply(q, cursor)
+                if not cursor and offset:
+                    q = q.offset(offset)
+                chats = q.limit(limit).all()
 
                 return [
                     {
@@ -160,6 +159,7 @@ class ChatManager:
                 if chat:
                     # 删除该会话的所有消息
                     session.query(Message).filter_by(chat_id=chat.id).delete()
+                    session.query(ChatContextEntry).filter_by(session_id=session_id).delete()
                     # 删除会话
                     session.delete(chat)
                     session.flush()
@@ -311,99 +311,119 @@ class ChatManager:
         self,
         chat_type: str | None = None,
         limit: int = 10,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """获取聊天会话摘要列表（包含消息数量）
+        """获取聊天会话摘要列表（包含消息数量，按最后活跃时间倒序）
 
         Args:
             chat_type: 聊天类型过滤（可选）
             limit: 返回数量限制
+            cursor: 上一页返回的游标
         """
         try:
             with self.db_base.get_session() as session:
-                q = session.query(Chat)
+                # 消息数量用一次 GROUP BY 子查询统计，避免每个会话单独 COUNT
+                counts = (
+                    select(col(Message.chat_id), func.count().label("message_count"))
+                    .group_by(col(Message.chat_id))
+                    .subquery()
+                )
+                q = session.query(Chat, func.coalesce(counts.c.message_count, 0)).outerjoin(
+                    counts, counts.c.chat_id == col(Chat.id)
+                )
 
                 if chat_type:
                     q = q.filter(col(Chat.chat_type) == chat_type)
 
-                chats = (
-                    q.order_by(
-                        col(Chat.last_message_at).desc().nullslast(),
-                        col(Chat.created_at).desc(),
-                    )
-                    .limit(limit)
-                    .all()
-                )
-
-                summaries = []
-                for chat in chats:
-                    message_count = session.query(Message).filter_by(chat_id=chat.id).count()
-                    summaries.append(
-                        {
-                            "session_id": chat.session_id,
-                            "chat_type": chat.chat_type,
-                            "title": chat.title,
-                            "context_id": chat.context_id,
-                            "created_at": chat.created_at,
-                            "last_active": chat.last_message_at or chat.created_at,
-                            "message_count": message_count,
-                        }
-                    )
+                rows = CHAT_KEYSET.apply(q, cursor).limit(limit).all()
 
-                return summaries
+                return [
+                    {
+                        "session_id": chat.session_id,
+                        "chat_type": chat.chat_type,
+                        "title": chat.title,
+                        "context_id": chat.context_id,
+                        "created_at": chat.created_at,
+                        "last_active": chat.last_message_at or chat.created_at,
+                        "message_count": message_count,
+                    }
+                    for chat, message_count in rows
+                ]
         except SQLAlchemyError as e:
             logger.error(f"获取聊天会话摘要失败: {e}")
             return []
 
     # ===== 会话上下文管理 =====
 
-    def get_chat_context(self, session_id: str) -> str | None:
-        """获取会话上下文（JSON 字符串）
+    def append_context_entry(
+        self, session_id: str, role: str, content: str, keep_last: int
+    ) -> dict[str, Any] | None:
+        """追加一条会话上下文（只插入一行），并删除该会话最近 keep_last 条之前的旧条目
 
         Args:
             session_id: 会话ID
+            role: 消息角色
+            content: 消息内容
+            keep_last: 保留的最近条目数
 
         Returns:
-            上下文 JSON 字符串，如果不存在则返回 None
+            新增的上下文条目，失败时返回 None
         """
         try:
             with self.db_base.get_session() as session:
-                chat = session.query(Chat).filter_by(session_id=session_id).first()
-                if chat:
-                    return chat.context
-                return None
+                entry = ChatContextEntry(session_id=session_id, role=role, content=content)
+                session.add(entry)
+                session.flush()
+                # 第 keep_last 新的条目 id 作为下界（条目不足时子查询为 NULL，不删除）
+                boundary = (
+                    select(col(ChatContextEntry.id))
+                    .where(col(ChatContextEntry.session_id) == session_id)
+                    .order_by(col(ChatContextEntry.id).desc())
+                    .offset(max(keep_last, 1) - 1)
+                    .limit(1)
+                    .scalar_subquery()
+                )
+                session.execute(
+                    delete(ChatContextEntry).where(
+                        col(ChatContextEntry.session_id) == session_id,
+                        col(ChatContextEntry.id) < boundary,
+                    )
+                )
+                return _context_entry_to_dict(entry)
         except SQLAlchemyError as e:
-            logger.error(f"获取会话上下文失败: {e}")
+            logger.error(f"追加会话上下文失败: {e}")
             return None
 
-    def update_chat_context(self, session_id: str, context: str) -> bool:
-        """更新会话上下文
-
-        Args:
-            session_id: 会话ID
-            context: JSON 格式的上下文字符串
+    def get_context_entries(self, session_id: str, limit: int) -> list[dict[str, Any]]:
+        """获取会话最近 limit 条上下文（按时间正序）"""
+        try:
+            with self.db_base.get_session() as session:
+                entries = (
+                    session.query(ChatContextEntry)
+                    .filter(col(ChatContextEntry.session_id) == session_id)
+                    .order_by(col(ChatContextEntry.id).desc())
+                    .limit(limit)
+                    .all()
+                )
+                return [_context_entry_to_dict(entry) for entry in reversed(entries)]
+        except SQLAlchemyError as e:
+            logger.error(f"获取会话上下文失败: {e}")
+            return []
 
-        Returns:
-            是否更新成功
-        """
+    def clear_context_entries(self, session_id: str) -> bool:
+        """清空会话上下文"""
         try:
             with self.db_base.get_session() as session:
-                chat = session.query(Chat).filter_by(session_id=session_id).first()
-                if chat:
-                    chat.context = context
-                    chat.updated_at = get_utc_now()
-                    session.flush()
-                    return True
-                else:
-                    # 如果会话不存在，自动创建
-                    chat = Chat(
-                        session_id=session_id,
-                        chat_type="general",
-                        context=context,
-                    )
-                    session.add(chat)
-                    session.flush()
-                    logger.info(f"自动创建会话并设置上下文: {session_id}")
-                    return True
+                session.query(ChatContextEntry).filter_by(session_id=session_id).delete()
+                return True
         except SQLAlchemyError as e:
-            logger.error(f"更新会话上下文失败: {e}")
+            logger.error(f"清除会话上下文失败: {e}")
             return False
+
+
+def _context_entry_to_dict(entry: ChatContextEntry) -> dict[str, Any]:
+    return {
+        "role": entry.role,
+        "content": entry.content,
+        "timestamp": entry.created_at.isoformat(),
+    }
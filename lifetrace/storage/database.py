@@ -9,6 +9,7 @@ from lifetrace.storage.database_base import DatabaseBase
 from lifetrace.storage.event_manager import EventManager
 from lifetrace.storage.journal_manager import JournalManager
 from lifetrace.storage.ocr_manager import OCRManager
+from lifetrace.storage.reminder_manager import ReminderManager
 from lifetrace.storage.screenshot_manager import ScreenshotManager
 from lifetrace.storage.stats_manager import StatsManager
 from lifetrace.storage.todo_manager import TodoManager
@@ -29,6 +30,7 @@ stats_mgr = StatsManager(db_base)
 journal_mgr = JournalManager(db_base)
 activity_mgr = ActivityManager(db_base)
 automation_task_mgr = AutomationTaskManager(db_base)
+reminder_mgr = ReminderManager(db_base)
 
 # ===== 向后兼容：保留原有的接口 =====
 engine = db_base.engine
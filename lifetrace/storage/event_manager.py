@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 
 from lifetrace.storage.database_base import DatabaseBase
 from lifetrace.storage.models import Event, Screenshot
+from lifetrace.storage.recorder_write_buffer import flush_pending_writes
 from lifetrace.storage.sql_utils import col
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.time_utils import get_utc_now
@@ -69,6 +70,7 @@ class EventManager:
 
     def get_active_event(self) -> int | None:
         """获取当前活跃的事件ID"""
+        flush_pending_writes()
         try:
             with self.db_base.get_session() as session:
                 last_event = self._get_last_open_event(session)
@@ -79,6 +81,86 @@ class EventManager:
             logger.error(f"获取活跃事件失败: {e}")
             return None
 
+    def resolve_event(
+        self,
+        session: Session,
+        app_name: str | None,
+        window_title: str | None,
+        timestamp: datetime,
+    ) -> tuple[int | None, int | None]:
+        """在给定会话中复用或创建事件，返回 (事件ID, 被关闭的旧事件ID)"""
+        last_event = self._get_last_open_event(session)
+        closed_event_id = None
+
+        if last_event:
+            logger.info(
+                f"🔍 检查事件复用 - 旧事件ID: {last_event.id}, "
+                f"旧应用: '{last_event.app_name}', 新应用: '{app_name}', "
+                f"旧标题: '{last_event.window_title}', 新标题: '{window_title}'"
+            )
+            should_reuse = self._should_reuse_event(
+                old_app=last_event.app_name,
+                old_title=last_event.window_title,
+                new_app=app_name,
+                new_title=window_title,
+            )
+            logger.info(f"📊 事件复用判断结果: {should_reuse}")
+
+            if should_reuse:
+                logger.info(f"♻️  复用事件 {last_event.id}（不关闭）")
+                return last_event.id, None
+            last_event.end_time = timestamp
+            closed_event_id = last_event.id
+            session.flush()
+            logger.info(
+                f"🔚 关闭旧事件 {closed_event_id}: {last_event.app_name} - {last_event.window_title}"
+            )
+        else:
+            logger.info("❌ 没有找到未结束的事件，需要创建新事件")
+
+        new_event = Event(app_name=app_name, window_title=window_title, start_time=timestamp)
+        session.add(new_event)
+        session.flush()
+        logger.info(f"✨ 创建新事件 {new_event.id}: {app_name} - {window_title} (end_time=NULL)")
+        return new_event.id, closed_event_id
+
+    def close_open_event(self, session: Session, end_time: datetime) -> int | None:
+        """在给定会话中结束当前事件，返回被结束的事件ID"""
+        last_event = self._get_last_open_event(session)
+        if last_event and last_event.end_time is None:
+            last_event.end_time = end_time
+            session.flush()
+            return last_event.id
+        return None
+
+    def link_screenshot(self, session: Session, screenshot_id: int, event_id: int) -> bool:
+        """在给定会话中将截图关联到事件（新事件转为 processing）"""
+        screenshot = session.query(Screenshot).filter(col(Screenshot.id) == screenshot_id).first()
+        if not screenshot:
+            logger.warning(f"截图 {screenshot_id} 不存在")
+            return False
+
+        event = session.query(Event).filter(col(Event.id) == event_id).first()
+        if not event:
+            logger.warning(f"事件 {event_id} 不存在")
+            return False
+
+        screenshot.event_id = event_id
+        if event.status == "new":
+            event.status = "processing"
+        session.flush()
+        logger.debug(f"截图 {screenshot_id} 已添加到事件 {event_id}，事件状态: {event.status}")
+        return True
+
+    def trigger_event_summary(self, event_id: int) -> None:
+        """异步生成已结束事件的摘要"""
+        try:
+            logger.info(f"📝 触发已关闭事件 {event_id} 的摘要生成")
+            summary_module = importlib.import_module("lifetrace.llm.event_summary_service")
+            summary_module.generate_event_summary_async(event_id)
+        except Exception as e:
+            logger.error(f"触发事件摘要生成失败: {e}")
+
     def get_or_create_event(
         self,
         app_name: str | None,
@@ -87,59 +169,14 @@ class EventManager:
     ) -> int | None:
         """按当前前台应用和窗口标题维护事件"""
         try:
-            closed_event_id = None
-
             with self.db_base.get_session() as session:
-                now_ts = timestamp or get_utc_now()
-                last_event = self._get_last_open_event(session)
-
-                if last_event:
-                    logger.info(
-                        f"🔍 检查事件复用 - 旧事件ID: {last_event.id}, "
-                        f"旧应用: '{last_event.app_name}', 新应用: '{app_name}', "
-                        f"旧标题: '{last_event.window_title}', 新标题: '{window_title}'"
-                    )
-                    should_reuse = self._should_reuse_event(
-                        old_app=last_event.app_name,
-                        old_title=last_event.window_title,
-                        new_app=app_name,
-                        new_title=window_title,
-                    )
-                    logger.info(f"📊 事件复用判断结果: {should_reuse}")
-
-                    if should_reuse:
-                        session.flush()
-                        logger.info(f"♻️  复用事件 {last_event.id}（不关闭）")
-                        return last_event.id
-                    else:
-                        last_event.end_time = now_ts
-                        closed_event_id = last_event.id
-                        session.flush()
-                        logger.info(
-                            f"🔚 关闭旧事件 {closed_event_id}: {last_event.app_name} - {last_event.window_title}"
-                        )
-                else:
-                    logger.info("❌ 没有找到未结束的事件，需要创建新事件")
-
-                new_event = Event(app_name=app_name, window_title=window_title, start_time=now_ts)
-                session.add(new_event)
-                session.flush()
-                new_event_id = new_event.id
-                logger.info(
-                    f"✨ 创建新事件 {new_event_id}: {app_name} - {window_title} (end_time=NULL)"
+                event_id, closed_event_id = self.resolve_event(
+                    session, app_name, window_title, timestamp or get_utc_now()
                 )
 
             if closed_event_id:
-                try:
-                    logger.info(f"📝 触发已关闭事件 {closed_event_id} 的摘要生成")
-                    summary_module = importlib.import_module("lifetrace.llm.event_summary_service")
-                    summary_module.generate_event_summary_async(closed_event_id)
-                except Exception as e:
-                    logger.error(f"触发事件摘要生成失败: {e}")
-            else:
-                logger.info(f"✅ 无需生成摘要（新事件 {new_event_id}，无旧事件关闭）")
-
-            return new_event_id
+                self.trigger_event_summary(closed_event_id)
+            return event_id
         except SQLAlchemyError as e:
             logger.error(f"获取或创建事件失败: {e}")
             return None
@@ -147,21 +184,11 @@ class EventManager:
     def close_active_event(self, end_time: datetime | None = None) -> bool:
         """主动结束当前事件"""
         try:
-            closed_event_id = None
             with self.db_base.get_session() as session:
-                last_event = self._get_last_open_event(session)
-                if last_event and last_event.end_time is None:
-                    last_event.end_time = end_time or get_utc_now()
-                    closed_event_id = last_event.id
-                    session.flush()
+                closed_event_id = self.close_open_event(session, end_time or get_utc_now())
 
             if closed_event_id:
-                try:
-                    summary_module = importlib.import_module("lifetrace.llm.event_summary_service")
-                    summary_module.generate_event_summary_async(closed_event_id)
-                except Exception as e:
-                    logger.error(f"触发事件摘要生成失败: {e}")
-
+                self.trigger_event_summary(closed_event_id)
             return closed_event_id is not None
         except SQLAlchemyError as e:
             logger.error(f"结束事件失败: {e}")
@@ -239,28 +266,7 @@ class EventManager:
         """将截图添加到指定事件"""
         try:
             with self.db_base.get_session() as session:
-                screenshot = (
-                    session.query(Screenshot).filter(col(Screenshot.id) == screenshot_id).first()
-                )
-                if not screenshot:
-                    logger.warning(f"截图 {screenshot_id} 不存在")
-                    return False
-
-                event = session.query(Event).filter(col(Event.id) == event_id).first()
-                if not event:
-                    logger.warning(f"事件 {event_id} 不存在")
-                    return False
-
-                screenshot.event_id = event_id
-
-                if event.status == "new":
-                    event.status = "processing"
-
-                session.flush()
-                logger.debug(
-                    f"截图 {screenshot_id} 已添加到事件 {event_id}，事件状态: {event.status}"
-                )
-                return True
+                return self.link_screenshot(session, screenshot_id, event_id)
         except SQLAlchemyError as e:
             logger.error(f"添加截图到事件失败: {e}")
             return False
@@ -300,9 +306,11 @@ class EventManager:
         start_date: datetime | None = None,
         end_date: datetime | None = None,
         app_name: str | None = None,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
         """列出事件摘要"""
-        return list_events(self.db_base, limit, offset, start_date, end_date, app_name)
+        flush_pending_writes()
+        return list_events(self.db_base, limit, offset, start_date, end_date, app_name, cursor)
 
     def count_events(
         self,
@@ -311,6 +319,7 @@ class EventManager:
         app_name: str | None = None,
     ) -> int:
         """统计事件总数"""
+        flush_pending_writes()
         return count_events(self.db_base, start_date, end_date, app_name)
 
     def get_event_screenshots(self, event_id: int) -> list[dict[str, Any]]:
@@ -326,6 +335,7 @@ class EventManager:
         limit: int = 50,
     ) -> list[dict[str, Any]]:
         """搜索事件"""
+        flush_pending_writes()
         return search_events_simple(self.db_base, query, start_date, end_date, app_name, limit)
 
     def get_event_summary(self, event_id: int) -> dict[str, Any] | None:
@@ -6,17 +6,48 @@
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy import text
+from sqlalchemy import func, text
 from sqlalchemy.exc import SQLAlchemyError
 
 from lifetrace.storage.database_base import DatabaseBase
 from lifetrace.storage.models import Event, OCRResult, Screenshot
+from lifetrace.storage.pagination import EVENT_KEYSET
 from lifetrace.storage.sql_utils import col
 from lifetrace.util.logging_config import get_logger
 
 logger = get_logger()
 
 
+def _screenshot_stats(session, event_ids: list[int]) -> dict[int, tuple[int, int]]:
+    """一次分组查询得到每个事件的 (首张截图ID, 截图数量)"""
+    if not event_ids:
+        return {}
+    rows = (
+        session.query(
+            col(Screenshot.event_id), func.min(col(Screenshot.id)), func.count(col(Screenshot.id))
+        )
+        .filter(col(Screenshot.event_id).in_(event_ids))
+        .group_by(col(Screenshot.event_id))
+        .all()
+    )
+    return {event_id: (first_id, count) for event_id, first_id, count in rows}
+
+
+def _event_summary(ev: Event, stats: dict[int, tuple[int, int]]) -> dict[str, Any]:
+    first_screenshot_id, screenshot_count = stats.get(ev.id or 0, (None, 0))
+    return {
+        "id": ev.id,
+        "app_name": ev.app_name,
+        "window_title": ev.window_title,
+        "start_time": ev.start_time,
+        "end_time": ev.end_time,
+        "screenshot_count": screenshot_count,
+        "first_screenshot_id": first_screenshot_id,
+        "ai_title": ev.ai_title,
+        "ai_summary": ev.ai_summary,
+    }
+
+
 def list_events(
     db_base: DatabaseBase,
     limit: int = 50,
@@ -24,8 +55,12 @@ def list_events(
     start_date: datetime | None = None,
     end_date: datetime | None = None,
     app_name: str | None = None,
+    cursor: str | None = None,
 ) -> list[dict[str, Any]]:
-    """列出事件摘要（包含首张截图ID与截图数量）"""
+    """列出事件摘要（包含首张截图ID与截图数量）
+
+    提供 cursor 时按游标分页（忽略 offset），截图统计对整页一次分组查询。
+    """
     try:
         with db_base.get_session() as session:
             q = session.query(Event)
@@ -36,34 +71,13 @@ def list_events(
             if app_name:
                 q = q.filter(col(Event.app_name).like(f"%{app_name}%"))
 
-            q = q.order_by(col(Event.start_time).desc()).offset(offset).limit(limit)
-            events = q.all()
+            q = EVENT_KEYSET.apply(q, cursor)
+            if not cursor and offset:
+                q = q.offset(offset)
+            events = q.limit(limit).all()
 
-            results: list[dict[str, Any]] = []
-            for ev in events:
-                first_shot = (
-                    session.query(Screenshot)
-                    .filter(col(Screenshot.event_id) == ev.id)
-                    .order_by(col(Screenshot.created_at).asc())
-                    .first()
-                )
-                shot_count = (
-                    session.query(Screenshot).filter(col(Screenshot.event_id) == ev.id).count()
-                )
-                results.append(
-                    {
-                        "id": ev.id,
-                        "app_name": ev.app_name,
-                        "window_title": ev.window_title,
-                        "start_time": ev.start_time,
-                        "end_time": ev.end_time,
-                        "screenshot_count": shot_count,
-                        "first_screenshot_id": (first_shot.id if first_shot else None),
-                        "ai_title": ev.ai_title,
-                        "ai_summary": ev.ai_summary,
-                    }
-                )
-            return results
+            stats = _screenshot_stats(session, [ev.id for ev in events if ev.id is not None])
+            return [_event_summary(ev, stats) for ev in events]
     except SQLAlchemyError as e:
         logger.error(f"列出事件失败: {e}")
         return []
@@ -201,24 +215,7 @@ def get_event_summary(db_base: DatabaseBase, event_id: int) -> dict[str, Any] |
             ev = session.query(Event).filter(col(Event.id) == event_id).first()
             if not ev:
                 return None
-            first_shot = (
-                session.query(Screenshot)
-                .filter(col(Screenshot.event_id) == ev.id)
-                .order_by(col(Screenshot.created_at).asc())
-                .first()
-            )
-            shot_count = session.query(Screenshot).filter(col(Screenshot.event_id) == ev.id).count()
-            return {
-                "id": ev.id,
-                "app_name": ev.app_name,
-                "window_title": ev.window_title,
-                "start_time": ev.start_time,
-                "end_time": ev.end_time,
-                "screenshot_count": shot_count,
-                "first_screenshot_id": first_shot.id if first_shot else None,
-                "ai_title": ev.ai_title,
-                "ai_summary": ev.ai_summary,
-            }
+            return _event_summary(ev, _screenshot_stats(session, [event_id]))
     except SQLAlchemyError as e:
         logger.error(f"获取事件摘要失败: {e}")
         return None
@@ -236,38 +233,12 @@ def get_events_by_ids(db_base: DatabaseBase, event_ids: list[int]) -> list[dict[
                 return []
 
             event_map = {ev.id: ev for ev in events}
-
-            results = []
-            for event_id in event_ids:
-                ev = event_map.get(event_id)
-                if not ev:
-                    continue
-
-                first_shot = (
-                    session.query(Screenshot)
-                    .filter(col(Screenshot.event_id) == ev.id)
-                    .order_by(col(Screenshot.created_at).asc())
-                    .first()
-                )
-                shot_count = (
-                    session.query(Screenshot).filter(col(Screenshot.event_id) == ev.id).count()
-                )
-
-                results.append(
-                    {
-                        "id": ev.id,
-                        "app_name": ev.app_name,
-                        "window_title": ev.window_title,
-                        "start_time": ev.start_time,
-                        "end_time": ev.end_time,
-                        "screenshot_count": shot_count,
-                        "first_screenshot_id": first_shot.id if first_shot else None,
-                        "ai_title": ev.ai_title,
-                        "ai_summary": ev.ai_summary,
-                    }
-                )
-
-            return results
+            stats = _screenshot_stats(session, list(event_map))
+            return [
+                _event_summary(event_map[event_id], stats)
+                for event_id in event_ids
+                if event_id in event_map
+            ]
     except SQLAlchemyError as e:
         logger.error(f"批量获取事件摘要失败: {e}")
         return []
@@ -9,6 +9,7 @@ from datetime import datetime
 from typing import ClassVar
 from uuid import uuid4
 
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import Column, Field, SQLModel, Text
 
 from lifetrace.util.time_utils import get_utc_now
@@ -341,6 +342,22 @@ class Message(TimestampMixin, table=True):
         return f"<Message(id={self.id}, chat_id={self.chat_id}, role={self.role})>"
 
 
+class ChatContextEntry(SQLModel, table=True):
+    """会话上下文条目（只追加，读取时按 id 倒序取最近 N 条）"""
+
+    __tablename__: ClassVar[str] = "chat_context_entries"
+    __table_args__ = (Index("ix_chat_context_entries_session_id_id", "session_id", "id"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    session_id: str = Field(max_length=100)  # 会话ID
+    role: str = Field(max_length=20)  # 消息角色：user, assistant, system
+    content: str = Field(sa_column=Column(Text))  # 消息内容
+    created_at: datetime = Field(default_factory=get_utc_time)
+
+    def __repr__(self):
+        return f"<ChatContextEntry(id={self.id}, session_id={self.session_id}, role={self.role})>"
+
+
 class TokenUsage(TimestampMixin, table=True):
     """Token使用量记录模型"""
 
@@ -364,6 +381,82 @@ class TokenUsage(TimestampMixin, table=True):
         return f"<TokenUsage(id={self.id}, model={self.model}, total_tokens={self.total_tokens})>"
 
 
+class TokenUsageDaily(SQLModel, table=True):
+    """Token使用量日汇总模型（按 日期+模型+端点+功能类型 聚合，写入 TokenUsage 时同步累加）"""
+
+    __tablename__: ClassVar[str] = "token_usage_daily"
+    __table_args__ = (
+        UniqueConstraint("day", "model", "endpoint", "feature_type", name="uq_token_usage_daily"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    day: str = Field(max_length=10, index=True)  # UTC 日期（YYYY-MM-DD）
+    model: str = Field(max_length=100)  # 使用的模型名称
+    endpoint: str = Field(max_length=200)  # API端点（缺失时为 unknown）
+    feature_type: str = Field(max_length=50)  # 功能类型（缺失时为 unknown）
+    requests: int = 0  # 请求次数
+    input_tokens: int = 0  # 输入token数量
+    output_tokens: int = 0  # 输出token数量
+    total_tokens: int = 0  # 总token数量
+    input_cost: float = 0.0  # 输入成本（元）
+    output_cost: float = 0.0  # 输出成本（元）
+    total_cost: float = 0.0  # 总成本（元）
+    updated_at: datetime = Field(default_factory=get_utc_time)
+
+    def __repr__(self):
+        return f"<TokenUsageDaily(day={self.day}, model={self.model}, requests={self.requests})>"
+
+
+class Notification(SQLModel, table=True):
+    """应用内通知（内存索引的持久化副本，重启后恢复）"""
+
+    __tablename__: ClassVar[str] = "notifications"
+
+    id: str = Field(primary_key=True, max_length=200)  # 通知唯一标识符（用于去重）
+    title: str = Field(sa_column=Column(Text))  # 通知标题
+    content: str = Field(sa_column=Column(Text))  # 通知内容
+    timestamp: datetime = Field(index=True)  # 通知时间
+    todo_id: int | None = Field(default=None, index=True)  # 关联的待办ID
+    schedule_time: datetime | None = None  # 待办时间点
+    deadline: datetime | None = None  # 待办截止时间（旧字段）
+    reminder_at: datetime | None = None  # 提醒触发时间
+    reminder_offset: int | None = None  # 提醒偏移分钟数
+
+    def __repr__(self):
+        return f"<Notification(id={self.id}, todo_id={self.todo_id})>"
+
+
+class DismissedReminder(SQLModel, table=True):
+    """用户已取消的提醒（防止同一提醒时间重复通知）"""
+
+    __tablename__: ClassVar[str] = "dismissed_reminders"
+    __table_args__ = (UniqueConstraint("todo_id", "reminder_at", name="uq_dismissed_reminders"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    todo_id: int = Field(index=True)  # 待办ID
+    reminder_at: datetime  # 被取消的提醒时间
+    created_at: datetime = Field(default_factory=get_utc_time)
+
+    def __repr__(self):
+        return f"<DismissedReminder(todo_id={self.todo_id}, reminder_at={self.reminder_at})>"
+
+
+class Reminder(SQLModel, table=True):
+    """待办提醒（由单个定时任务按 due_at 顺序投递，投递后删除）"""
+
+    __tablename__: ClassVar[str] = "reminders"
+    __table_args__ = (UniqueConstraint("todo_id", "due_at", name="uq_reminders_todo_due_at"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    todo_id: int = Field(index=True)  # 待办ID
+    due_at: datetime = Field(index=True)  # 提醒触发时间
+    schedule_time: datetime  # 待办时间点（计算剩余时间、判断错过的提醒是否仍有意义）
+    reminder_offset: int = 0  # 提醒偏移分钟数
+
+    def __repr__(self):
+        return f"<Reminder(todo_id={self.todo_id}, due_at={self.due_at})>"
+
+
 class Activity(TimestampMixin, table=True):
     """活动模型（聚合15分钟内的事件）"""
 
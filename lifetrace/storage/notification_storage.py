@@ -1,18 +1,38 @@
-"""通知存储模块 - 使用内存存储通知，支持去重"""
+"""通知存储模块 - 内存索引 + SQLite 持久化，支持去重
 
-from datetime import datetime
-from typing import Any
+- 内存中按 id 与 todo_id 建索引，并维护按时间排序的列表，读取无需每次排序或线性扫描
+- 所有读写持锁（调度器线程池与 API 处理函数会并发访问），写入同时落库，重启后从数据库恢复
+- 超过 notifications.ttl_hours 的通知与超出 notifications.max_entries 的最旧通知会被淘汰
+- 每次变更递增版本号并唤醒订阅者，/api/notifications/stream 据此推送给前端
+"""
 
+from __future__ import annotations
+
+import asyncio
+import bisect
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import delete, select
+
+from lifetrace.storage.models import DismissedReminder, Notification
+from lifetrace.storage.sql_utils import col
 from lifetrace.util.logging_config import get_logger
-from lifetrace.util.time_utils import naive_as_utc
+from lifetrace.util.settings import settings
+from lifetrace.util.time_utils import get_utc_now, naive_as_utc
 
-logger = get_logger()
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+    from contextlib import AbstractContextManager
+
+    from sqlmodel import Session
 
-# 内存存储：使用字典存储通知，key 为唯一标识符
-_notifications: dict[str, dict[str, Any]] = {}
+logger = get_logger()
 
-# 已取消通知跟踪：记录用户已取消的提醒（todo_id -> reminder_at set）
-_dismissed_notifications: dict[int, set[str]] = {}
+_OPTIONAL_TIME_FIELDS = ("schedule_time", "deadline", "reminder_at")
 
 
 def _parse_iso_datetime(value: str | None) -> datetime | None:
@@ -29,6 +49,305 @@ def _build_reminder_key(reminder_at: datetime) -> str:
     return naive_as_utc(reminder_at).isoformat()
 
 
+def _default_session_factory() -> AbstractContextManager[Session]:
+    from lifetrace.storage import get_session  # noqa: PLC0415
+
+    return get_session()
+
+
+def _row_to_dict(row: Notification) -> dict[str, Any]:
+    notification: dict[str, Any] = {
+        "id": row.id,
+        "title": row.title,
+        "content": row.content,
+        "timestamp": row.timestamp.isoformat(),
+    }
+    if row.todo_id is not None:
+        notification["todo_id"] = row.todo_id
+    for field in _OPTIONAL_TIME_FIELDS:
+        value = getattr(row, field)
+        if value is not None:
+            notification[field] = value.isoformat()
+    if row.reminder_offset is not None:
+        notification["reminder_offset"] = row.reminder_offset
+    return notification
+
+
+def _dict_to_row(notification: dict[str, Any]) -> Notification:
+    return Notification(
+        id=notification["id"],
+        title=notification["title"],
+        content=notification["content"],
+        timestamp=_parse_iso_datetime(notification["timestamp"]) or get_utc_now(),
+        todo_id=notification.get("todo_id"),
+        schedule_time=_parse_iso_datetime(notification.get("schedule_time")),
+        deadline=_parse_iso_datetime(notification.get("deadline")),
+        reminder_at=_parse_iso_datetime(notification.get("reminder_at")),
+        reminder_offset=notification.get("reminder_offset"),
+    )
+
+
+class NotificationStore:
+    """线程安全的通知存储（内存索引为数据库的完整副本）"""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AbstractContextManager[Session]] | None = None,
+        max_entries: int | None = None,
+        ttl_hours: float | None = None,
+    ):
+        self._session_factory = session_factory or _default_session_factory
+        if max_entries is None:
+            max_entries = settings.get("notifications.max_entries", 500)
+        if ttl_hours is None:
+            ttl_hours = settings.get("notifications.ttl_hours", 168)
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = timedelta(hours=float(ttl_hours))
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._by_id: dict[str, dict[str, Any]] = {}
+        # todo_id -> 通知ID（dict 保持插入顺序）
+        self._by_todo: dict[int, dict[str, None]] = {}
+        # (通知时间, 通知ID) 升序，最新的在末尾
+        self._order: list[tuple[datetime, str]] = []
+        # 已取消的提醒：todo_id -> reminder_at 键集合
+        self._dismissed: dict[int, set[str]] = {}
+        self._subscribers: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self.version = 0
+
+    # ===== 持久化 =====
+
+    def _write(self, action: str, fn: Callable[[Session], Any]) -> None:
+        """写入数据库；失败时只记录日志，内存索引仍然生效"""
+        try:
+            with self._session_factory() as session:
+                fn(session)
+        except Exception as e:
+            logger.warning(f"通知持久化失败（{action}）: {e}")
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                self._load()
+            except Exception as e:
+                logger.warning(f"从数据库恢复通知失败，仅使用内存存储: {e}")
+
+    def _load(self) -> None:
+        cutoff = get_utc_now() - self.ttl
+        with self._session_factory() as session:
+            rows = session.scalars(
+                select(Notification)
+                .where(col(Notification.timestamp) >= cutoff)
+                .order_by(col(Notification.timestamp).desc())
+                .limit(self.max_entries)
+            ).all()
+            kept = [row.id for row in rows]
+            # 过期与超出上限的旧通知直接删除
+            session.execute(delete(Notification).where(col(Notification.id).not_in(kept)))
+            session.execute(
+                delete(DismissedReminder).where(col(DismissedReminder.reminder_at) < cutoff)
+            )
+            for row in reversed(rows):
+                self._index(_row_to_dict(row))
+            for mark in session.scalars(select(DismissedReminder)).all():
+                self._dismissed.setdefault(mark.todo_id, set()).add(
+                    _build_reminder_key(mark.reminder_at)
+                )
+        if rows:
+            logger.info(f"从数据库恢复 {len(rows)} 条通知")
+
+    # ===== 内存索引（调用方持锁） =====
+
+    def _index(self, notification: dict[str, Any]) -> None:
+        notification_id = notification["id"]
+        self._by_id[notification_id] = notification
+        todo_id = notification.get("todo_id")
+        if todo_id is not None:
+            self._by_todo.setdefault(todo_id, {})[notification_id] = None
+        timestamp = _parse_iso_datetime(notification["timestamp"]) or get_utc_now()
+        bisect.insort(self._order, (timestamp, notification_id))
+
+    def _unindex(self, notification_id: str) -> dict[str, Any] | None:
+        notification = self._by_id.pop(notification_id, None)
+        if notification is None:
+            return None
+        todo_id = notification.get("todo_id")
+        ids = self._by_todo.get(todo_id) if todo_id is not None else None
+        if ids is not None:
+            ids.pop(notification_id, None)
+            if not ids:
+                del self._by_todo[todo_id]
+        timestamp = _parse_iso_datetime(notification["timestamp"]) or get_utc_now()
+        position = bisect.bisect_left(self._order, (timestamp, notification_id))
+        if position < len(self._order) and self._order[position][1] == notification_id:
+            del self._order[position]
+        else:
+            self._order = [entry for entry in self._order if entry[1] != notification_id]
+        return notification
+
+    def _evict(self) -> None:
+        """淘汰过期及超出容量的最旧通知"""
+        cutoff = get_utc_now() - self.ttl
+        evicted: list[str] = []
+        while self._order and (len(self._order) > self.max_entries or self._order[0][0] < cutoff):
+            _, notification_id = self._order[0]
+            self._unindex(notification_id)
+            evicted.append(notification_id)
+        if evicted:
+            logger.debug(f"淘汰 {len(evicted)} 条旧通知")
+            self._write(
+                "淘汰",
+                lambda s: s.execute(delete(Notification).where(col(Notification.id).in_(evicted))),
+            )
+            self._changed()
+
+    def _changed(self) -> None:
+        self.version += 1
+        for loop, event in list(self._subscribers):
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # 事件循环已关闭
+                self._subscribers.discard((loop, event))
+
+    # ===== 公共接口 =====
+
+    def add(self, notification: dict[str, Any]) -> bool:
+        self._ensure_loaded()
+        with self._lock:
+            if notification["id"] in self._by_id:
+                return False
+            self._index(notification)
+            self._write("添加", lambda s: s.merge(_dict_to_row(notification)))
+            self._changed()
+            self._evict()
+            return True
+
+    def list_notifications(self) -> list[dict[str, Any]]:
+        """所有通知（按时间倒序）"""
+        return self.snapshot()[1]
+
+    def snapshot(self) -> tuple[int, list[dict[str, Any]]]:
+        """(版本号, 按时间倒序的通知列表)"""
+        self._ensure_loaded()
+        with self._lock:
+            self._evict()
+            return self.version, [self._by_id[nid] for _, nid in reversed(self._order)]
+
+    def get(self, notification_id: str) -> dict[str, Any] | None:
+        self._ensure_loaded()
+        with self._lock:
+            return self._by_id.get(notification_id)
+
+    def count(self) -> int:
+        self._ensure_loaded()
+        with self._lock:
+            return len(self._by_id)
+
+    def by_todo(self, todo_id: int) -> list[dict[str, Any]]:
+        self._ensure_loaded()
+        with self._lock:
+            return [self._by_id[nid] for nid in self._by_todo.get(todo_id, {})]
+
+    def remove(self, notification_id: str, *, dismiss: bool = True) -> bool:
+        """删除通知；dismiss 为真时把对应提醒时间标记为已取消，防止重复提醒"""
+        self._ensure_loaded()
+        with self._lock:
+            notification = self._unindex(notification_id)
+            if notification is None:
+                return False
+            todo_id = notification.get("todo_id")
+            reminder_at = _parse_iso_datetime(
+                notification.get("reminder_at")
+                or notification.get("schedule_time")
+                or notification.get("deadline")
+            )
+            mark = None
+            if dismiss and todo_id is not None and reminder_at is not None:
+                self._dismissed.setdefault(todo_id, set()).add(_build_reminder_key(reminder_at))
+                mark = DismissedReminder(todo_id=todo_id, reminder_at=reminder_at)
+                logger.debug(
+                    "标记通知为已取消: todo_id=%s, reminder_at=%s",
+                    todo_id,
+                    reminder_at.isoformat(),
+                )
+
+            def _persist(session: Session) -> None:
+                session.execute(delete(Notification).where(col(Notification.id) == notification_id))
+                if (
+                    mark is not None
+                    and not session.scalars(
+                        select(DismissedReminder).where(
+                            col(DismissedReminder.todo_id) == mark.todo_id,
+                            col(DismissedReminder.reminder_at) == mark.reminder_at,
+                        )
+                    ).first()
+                ):
+                    session.add(mark)
+
+            self._write("删除", _persist)
+            self._changed()
+            return True
+
+    def remove_by_todo(self, todo_id: int) -> int:
+        with self._lock:
+            ids = [notification["id"] for notification in self.by_todo(todo_id)]
+            return sum(1 for notification_id in ids if self.remove(notification_id))
+
+    def clear(self) -> int:
+        self._ensure_loaded()
+        with self._lock:
+            count = len(self._by_id)
+            self._by_id.clear()
+            self._by_todo.clear()
+            self._order.clear()
+            self._write("清空", lambda s: s.execute(delete(Notification)))
+            self._changed()
+            return count
+
+    def is_dismissed(self, todo_id: int, reminder_at: datetime) -> bool:
+        self._ensure_loaded()
+        with self._lock:
+            dismissed = self._dismissed.get(todo_id)
+            return bool(dismissed) and _build_reminder_key(reminder_at) in dismissed
+
+    def clear_dismissed(self, todo_id: int) -> bool:
+        self._ensure_loaded()
+        with self._lock:
+            if self._dismissed.pop(todo_id, None) is None:
+                return False
+            self._write(
+                "清除已取消标记",
+                lambda s: s.execute(
+                    delete(DismissedReminder).where(col(DismissedReminder.todo_id) == todo_id)
+                ),
+            )
+            return True
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Event]:
+        """订阅变更（在事件循环中使用）：任意线程修改通知后 set 返回的 Event"""
+        entry = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._subscribers.add(entry)
+        try:
+            yield entry[1]
+        finally:
+            with self._lock:
+                self._subscribers.discard(entry)
+
+
+@lru_cache(maxsize=1)
+def get_notification_store() -> NotificationStore:
+    """获取通知存储单例（首次访问时从数据库恢复）"""
+    return NotificationStore()
+
+
 def add_notification(  # noqa: PLR0913
     notification_id: str,
     title: str,
@@ -57,10 +376,6 @@ def add_notification(  # noqa: PLR0913
     Returns:
         bool: 如果通知已存在（去重），返回 False；否则返回 True
     """
-    if notification_id in _notifications:
-        logger.debug(f"通知已存在，跳过: {notification_id}")
-        return False
-
     notification: dict[str, Any] = {
         "id": notification_id,
         "title": title,
@@ -83,7 +398,9 @@ def add_notification(  # noqa: PLR0913
     if reminder_offset is not None:
         notification["reminder_offset"] = reminder_offset
 
-    _notifications[notification_id] = notification
+    if not get_notification_store().add(notification):
+        logger.debug(f"通知已存在，跳过: {notification_id}")
+        return False
     logger.info(f"添加通知: {notification_id} - {title}")
     return True
 
@@ -101,13 +418,7 @@ def get_latest_notification() -> dict[str, Any] | None:
 
 def get_notifications() -> list[dict[str, Any]]:
     """获取所有通知（按时间倒序）"""
-    if not _notifications:
-        return []
-    return sorted(
-        _notifications.values(),
-        key=lambda x: x.get("timestamp", ""),
-        reverse=True,
-    )
+    return get_notification_store().list_notifications()
 
 
 def get_notification(notification_id: str) -> dict[str, Any] | None:
@@ -120,7 +431,7 @@ def get_notification(notification_id: str) -> dict[str, Any] | None:
     Returns:
         通知字典，如果不存在则返回 None
     """
-    return _notifications.get(notification_id)
+    return get_notification_store().get(notification_id)
 
 
 def clear_notification(notification_id: str) -> bool:
@@ -133,31 +444,10 @@ def clear_notification(notification_id: str) -> bool:
     Returns:
         如果通知存在并已清除，返回 True；否则返回 False
     """
-    if notification_id in _notifications:
-        notification = _notifications[notification_id]
-        todo_id = notification.get("todo_id")
-        reminder_at = _parse_iso_datetime(
-            notification.get("reminder_at")
-            or notification.get("schedule_time")
-            or notification.get("deadline")
-        )
-        if todo_id is not None and reminder_at is not None:
-            key = _build_reminder_key(reminder_at)
-            existing = _dismissed_notifications.get(todo_id)
-            if existing is None:
-                existing = set()
-                _dismissed_notifications[todo_id] = existing
-            existing.add(key)
-            logger.debug(
-                "标记通知为已取消: todo_id=%s, reminder_at=%s",
-                todo_id,
-                reminder_at.isoformat(),
-            )
-
-        del _notifications[notification_id]
+    removed = get_notification_store().remove(notification_id)
+    if removed:
         logger.debug(f"清除通知: {notification_id}")
-        return True
-    return False
+    return removed
 
 
 def clear_all_notifications() -> int:
@@ -167,8 +457,7 @@ def clear_all_notifications() -> int:
     Returns:
         清除的通知数量
     """
-    count = len(_notifications)
-    _notifications.clear()
+    count = get_notification_store().clear()
     logger.info(f"清除所有通知，共 {count} 条")
     return count
 
@@ -180,12 +469,12 @@ def get_notification_count() -> int:
     Returns:
         通知数量
     """
-    return len(_notifications)
+    return get_notification_store().count()
 
 
 def get_notifications_by_todo_id(todo_id: int) -> list[dict[str, Any]]:
     """根据待办ID查找所有通知"""
-    return [n for n in _notifications.values() if n.get("todo_id") == todo_id]
+    return get_notification_store().by_todo(todo_id)
 
 
 def get_notification_by_todo_id(todo_id: int) -> dict[str, Any] | None:
@@ -196,21 +485,12 @@ def get_notification_by_todo_id(todo_id: int) -> dict[str, Any] | None:
 
 def clear_notification_by_todo_id(todo_id: int) -> int:
     """根据待办ID清除所有通知"""
-    notifications = get_notifications_by_todo_id(todo_id)
-    removed = 0
-    for notification in notifications:
-        notification_id = notification.get("id")
-        if notification_id and clear_notification(notification_id):
-            removed += 1
-    return removed
+    return get_notification_store().remove_by_todo(todo_id)
 
 
 def is_notification_dismissed(todo_id: int, reminder_at: datetime) -> bool:
     """检查指定待办的提醒时间是否已被取消"""
-    dismissed = _dismissed_notifications.get(todo_id)
-    if not dismissed:
-        return False
-    return _build_reminder_key(reminder_at) in dismissed
+    return get_notification_store().is_dismissed(todo_id, reminder_at)
 
 
 def clear_dismissed_mark(todo_id: int) -> None:
@@ -220,6 +500,5 @@ def clear_dismissed_mark(todo_id: int) -> None:
     Args:
         todo_id: 待办ID
     """
-    if todo_id in _dismissed_notifications:
-        del _dismissed_notifications[todo_id]
+    if get_notification_store().clear_dismissed(todo_id):
         logger.debug(f"清除已取消标记: todo_id={todo_id}")
@@ -0,0 +1,127 @@
+"""
+游标（keyset）分页
+
+OFFSET 分页需要先扫描并丢弃前 offset 行，时间线滚动到深处时每页耗时线性增长。
+keyset 分页记住上一页最后一行的排序键，下一页用 `(排序键, id) < (上一页末行)` 直接定位，
+配合 (排序键, id) 复合索引，任意深度的每页成本相同。
+
+- 列表按排序键降序（最新在前），id 等唯一列作为并列时的决胜键，保证顺序稳定
+- 游标是不透明字符串（base64url 编码的 JSON，包含列表名与末行键值），客户端原样回传
+- 每页返回的条目数等于 limit 时才返回 next_cursor
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import func, tuple_
+
+from lifetrace.storage.models import Activity, Chat, Event, Screenshot, Todo
+from lifetrace.storage.sql_utils import col
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+_DATETIME_TAG = "$dt"
+
+
+class InvalidCursorError(ValueError):
+    """游标无法解析或不属于当前列表"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {_DATETIME_TAG: value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and _DATETIME_TAG in value:
+        return datetime.fromisoformat(value[_DATETIME_TAG])
+    return value
+
+
+def encode_cursor(name: str, values: Sequence[Any]) -> str:
+    payload = json.dumps(
+        {"k": name, "v": [_encode_value(v) for v in values]}, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(name: str, cursor: str, size: int) -> list[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = [_decode_value(v) for v in payload["v"]]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+        raise InvalidCursorError("无效的分页游标") from e
+    if payload.get("k") != name or len(values) != size:
+        raise InvalidCursorError("分页游标不属于该列表")
+    return values
+
+
+@dataclass(frozen=True)
+class KeysetSpec:
+    """一个列表的 keyset 定义
+
+    Attributes:
+        name: 列表名（写入游标，防止游标跨列表使用）
+        columns: 排序键的 SQL 表达式（降序，最后一个须唯一）
+        key: 从结果字典中取出与 columns 对应的键值
+    """
+
+    name: str
+    columns: tuple[Any, ...]
+    key: Callable[[dict[str, Any]], tuple[Any, ...]]
+
+    def order_by(self) -> list[Any]:
+        return [column.desc() for column in self.columns]
+
+    def after(self, cursor: str) -> Any:
+        """游标之后（更旧）的行的过滤条件"""
+        values = decode_cursor(self.name, cursor, len(self.columns))
+        return tuple_(*self.columns) < tuple_(*values)
+
+    def apply(self, query: Any, cursor: str | None) -> Any:
+        """为查询加上排序（及游标条件）"""
+        if cursor:
+            query = query.filter(self.after(cursor))
+        return query.order_by(*self.order_by())
+
+    def next_cursor(self, items: Sequence[dict[str, Any]], limit: int) -> str | None:
+        """本页满 limit 条时，以末行键值生成下一页游标"""
+        if not items or len(items) < limit:
+            return None
+        return encode_cursor(self.name, self.key(items[-1]))
+
+
+EVENT_KEYSET = KeysetSpec(
+    "events", (col(Event.start_time), col(Event.id)), lambda e: (e["start_time"], e["id"])
+)
+ACTIVITY_KEYSET = KeysetSpec(
+    "activities",
+    (col(Activity.start_time), col(Activity.id)),
+    lambda a: (a["start_time"], a["id"]),
+)
+SCREENSHOT_KEYSET = KeysetSpec(
+    "screenshots",
+    (col(Screenshot.created_at), col(Screenshot.id)),
+    lambda s: (s["created_at"], s["id"]),
+)
+TODO_KEYSET = KeysetSpec(
+    "todos", (col(Todo.created_at), col(Todo.id)), lambda t: (t["created_at"], t["id"])
+)
+# 会话按最后活跃时间（无消息时为创建时间）排序，session_id 唯一
+CHAT_KEYSET = KeysetSpec(
+    "chats",
+    (func.coalesce(col(Chat.last_message_at), col(Chat.created_at)), col(Chat.session_id)),
+    lambda c: (
+        c.get("last_active") or c.get("last_message_at") or c["created_at"],
+        c["session_id"],
+    ),
+)
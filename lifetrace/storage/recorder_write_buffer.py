@@ -0,0 +1,375 @@
+"""
+录制器元数据延迟批量写入（write-behind）
+
+每次截图原本分别提交三个事务：插入截图、获取/创建事件、关联截图与事件，多屏幕、
+1~2 秒的截图间隔下会持续产生写入抖动。这里把截图行、事件切换/结束与关联放入内存缓冲，
+每 flush_interval_ms 毫秒或累计 max_items 条时在一个事务内写入。
+
+- 崩溃安全：条目入队前先追加到小型日志（JSON Lines），提交成功后从日志中移除；
+  启动时重放日志中未提交的条目（已入库的截图按文件路径跳过，不会重复处理）
+- 读己之写：截图/事件的列表与统计查询在读取前调用 flush_pending_writes()；
+  pending() 可直接查看尚未写入的条目
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+from lifetrace.storage.models import Screenshot
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.path_utils import get_database_path
+from lifetrace.util.settings import settings
+from lifetrace.util.time_utils import get_utc_now
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from sqlmodel import Session
+
+    from lifetrace.storage.database_base import DatabaseBase
+    from lifetrace.storage.event_manager import EventManager
+    from lifetrace.storage.screenshot_manager import ScreenshotManager
+
+logger = get_logger()
+
+JOURNAL_FILENAME = "recorder_journal.jsonl"
+OP_SCREENSHOT = "screenshot"
+OP_CLOSE_EVENT = "close_event"
+# 连续写入失败超过该次数的条目被丢弃（数据库长时间不可用时避免无限积压）
+MAX_WRITE_ATTEMPTS = 30
+
+
+@dataclass
+class PendingWrite:
+    """一条待写入的录制器元数据"""
+
+    seq: int
+    op: str
+    timestamp: datetime
+    payload: dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+    # 提交后的回调（缩略图、待办检测等），不写入日志，重放的条目没有回调
+    on_committed: Callable[[dict[str, Any]], None] | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "op": self.op,
+            "timestamp": self.timestamp.isoformat(),
+            "payload": self.payload,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PendingWrite:
+        return cls(
+            seq=int(data["seq"]),
+            op=data["op"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            payload=data.get("payload") or {},
+        )
+
+
+class RecorderWriteBuffer:
+    """录制器元数据写缓冲"""
+
+    def __init__(
+        self,
+        db_base: DatabaseBase,
+        screenshot_mgr: ScreenshotManager,
+        event_mgr: EventManager,
+        journal_path: Path | None = None,
+        flush_interval_ms: float | None = None,
+        max_items: int | None = None,
+    ):
+        self.db_base = db_base
+        self.screenshot_mgr = screenshot_mgr
+        self.event_mgr = event_mgr
+        self.journal_path = journal_path or get_database_path().parent / JOURNAL_FILENAME
+        self.flush_interval = (
+            flush_interval_ms
+            if flush_interval_ms is not None
+            else settings.get("jobs.recorder.params.write_buffer.flush_interval_ms", 1000)
+        ) / 1000
+        self.max_items = max(
+            1,
+            int(
+                max_items
+                if max_items is not None
+                else settings.get("jobs.recorder.params.write_buffer.max_items", 10)
+            ),
+        )
+        self._items: list[PendingWrite] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.replay_journal()
+        atexit.register(self.close)
+
+    # ===== 入队 =====
+
+    def add_screenshot(
+        self,
+        file_path: str,
+        file_hash: str,
+        width: int,
+        height: int,
+        metadata: dict[str, Any],
+        timestamp: datetime,
+        on_committed: Callable[[dict[str, Any]], None] | None = None,
+    ) -> None:
+        """截图行 + 事件复用/切换 + 关联，提交后以 {screenshot_id, event_id, ...} 调用回调"""
+        payload = {
+            "file_path": file_path,
+            "file_hash": file_hash,
+            "width": width,
+            "height": height,
+            "screen_id": metadata.get("screen_id", 0),
+            "app_name": metadata.get("app_name"),
+            "window_title": metadata.get("window_title"),
+        }
+        self._enqueue(OP_SCREENSHOT, timestamp, payload, on_committed)
+
+    def close_active_event(self, timestamp: datetime | None = None) -> None:
+        """结束当前事件（与已缓冲的事件切换保持先后顺序）"""
+        self._enqueue(OP_CLOSE_EVENT, timestamp or get_utc_now(), {}, None)
+
+    def _enqueue(
+        self,
+        op: str,
+        timestamp: datetime,
+        payload: dict[str, Any],
+        on_committed: Callable[[dict[str, Any]], None] | None,
+    ) -> None:
+        with self._lock:
+            self._seq += 1
+            item = PendingWrite(self._seq, op, timestamp, payload, on_committed=on_committed)
+        if self.flush_interval <= 0:
+            # 关闭缓冲：立即写入
+            committed = self._commit([item])
+            if committed:
+                self._run_callbacks(committed)
+            return
+        with self._lock:
+            self._append_journal(item)
+            self._items.append(item)
+            pending = len(self._items)
+        self._ensure_thread()
+        if pending >= self.max_items:
+            self._wakeup.set()
+
+    def pending(self) -> list[dict[str, Any]]:
+        """尚未写入数据库的条目"""
+        with self._lock:
+            return [item.to_dict() for item in self._items]
+
+    # ===== 日志 =====
+
+    def _append_journal(self, item: PendingWrite) -> None:
+        try:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(item.to_dict(), ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"写入录制器日志失败（该条目崩溃后无法恢复）: {e}")
+
+    def _rewrite_journal(self) -> None:
+        """日志只保留仍在缓冲中的条目（调用方持有 _lock）"""
+        try:
+            if not self._items:
+                self.journal_path.unlink(missing_ok=True)
+                return
+            tmp_path = self.journal_path.with_suffix(".tmp")
+            tmp_path.write_text(
+                "".join(
+                    json.dumps(item.to_dict(), ensure_ascii=False) + "\n" for item in self._items
+                ),
+                encoding="utf-8",
+            )
+            os.replace(tmp_path, self.journal_path)
+        except OSError as e:
+            logger.warning(f"更新录制器日志失败: {e}")
+
+    def replay_journal(self) -> int:
+        """写入上次退出前未提交的条目，返回重放条数"""
+        if not self.journal_path.exists():
+            return 0
+        items = []
+        for line in self.journal_path.read_text(encoding="utf-8").splitlines():
+            try:
+                items.append(PendingWrite.from_dict(json.loads(line)))
+            except (ValueError, KeyError) as e:
+                # 崩溃时可能留下写了一半的最后一行
+                logger.warning(f"跳过无法解析的录制器日志行: {e}")
+        committed = self._commit(items) if items else []
+        if committed is None:
+            logger.error(f"重放录制器日志失败，保留日志待下次启动重试: {self.journal_path}")
+            return 0
+        failed = [item for item, result in committed if result is None]
+        with self._lock:
+            self._requeue(failed)
+            self._rewrite_journal()
+        if self._items:
+            self._ensure_thread()
+        self._run_callbacks(committed)
+        self._seq = max((item.seq for item in items), default=0)
+        if items:
+            logger.info(f"已重放录制器日志中未提交的 {len(items)} 条元数据")
+        return len(items)
+
+    # ===== 写入 =====
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._flush_loop, name="RecorderWriteBuffer", daemon=True
+            )
+            self._thread.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """在一个事务内写入缓冲中的全部条目，返回写入条数"""
+        with self._flush_lock:
+            with self._lock:
+                items, self._items = self._items, []
+            if not items:
+                return 0
+            committed = self._commit(items)
+            if committed is None:
+                failed, committed = items, []
+            else:
+                failed = [item for item, result in committed if result is None]
+            with self._lock:
+                # 失败的条目放回缓冲并保留在日志中，等待下次重试
+                self._requeue(failed)
+                self._rewrite_journal()
+        self._run_callbacks(committed)
+        return len(items) - len(failed)
+
+    def _requeue(self, failed: list[PendingWrite]) -> None:
+        """把写入失败的条目放回缓冲队首；超过 MAX_WRITE_ATTEMPTS 次的丢弃（调用方持有 _lock）"""
+        retry = []
+        for item in failed:
+            item.attempts += 1
+            if item.attempts < MAX_WRITE_ATTEMPTS:
+                retry.append(item)
+        if len(retry) < len(failed):
+            logger.error(f"丢弃 {len(failed) - len(retry)} 条多次写入失败的录制器元数据")
+        self._items = retry + self._items
+
+    def _commit(
+        self, items: list[PendingWrite]
+    ) -> list[tuple[PendingWrite, dict[str, Any] | None]] | None:
+        """写入一批条目；整批失败时逐条重试以隔离坏条目，全部失败时返回 None"""
+        try:
+            with self.db_base.get_session() as session:
+                return [(item, self._apply(session, item)) for item in items]
+        except Exception as e:
+            if len(items) == 1:
+                logger.error(f"写入录制器元数据失败: {e}")
+                return None
+            logger.warning(f"批量写入 {len(items)} 条录制器元数据失败，逐条重试: {e}")
+        results = []
+        for item in items:
+            single = self._commit([item])
+            results.append((item, single[0][1] if single else None))
+        if all(result is None for _, result in results):
+            # 数据库不可用：整批等待下次重试
+            return None
+        # 部分条目失败：结果为 None，由调用方放回缓冲重试，不阻塞其余条目
+        return results
+
+    def _apply(self, session: Session, item: PendingWrite) -> dict[str, Any]:
+        if item.op == OP_CLOSE_EVENT:
+            return {"closed_event_id": self.event_mgr.close_open_event(session, item.timestamp)}
+
+        payload = item.payload
+        existing = session.query(Screenshot.id).filter_by(file_path=payload["file_path"]).first()
+        if existing:
+            # 重放时该截图已在崩溃前提交
+            return {"screenshot_id": existing[0], "event_id": None, "closed_event_id": None}
+
+        screenshot_id, _ = self.screenshot_mgr.insert_screenshot(
+            session,
+            payload["file_path"],
+            payload["file_hash"],
+            payload["width"],
+            payload["height"],
+            metadata={
+                "screen_id": payload["screen_id"],
+                "app_name": payload["app_name"],
+                "window_title": payload["window_title"],
+                "created_at": item.timestamp,
+            },
+        )
+        event_id, closed_event_id = self.event_mgr.resolve_event(
+            session, payload["app_name"], payload["window_title"], item.timestamp
+        )
+        if screenshot_id and event_id:
+            self.event_mgr.link_screenshot(session, screenshot_id, event_id)
+        return {
+            "screenshot_id": screenshot_id,
+            "event_id": event_id,
+            "closed_event_id": closed_event_id,
+        }
+
+    def _run_callbacks(self, results: list[tuple[PendingWrite, dict[str, Any] | None]]) -> None:
+        for item, result in results:
+            if result is None:
+                continue
+            if result.get("closed_event_id"):
+                self.event_mgr.trigger_event_summary(result["closed_event_id"])
+            if item.on_committed is not None:
+                try:
+                    item.on_committed(result)
+                except Exception as e:
+                    logger.error(f"录制器元数据提交回调失败: {e}", exc_info=True)
+
+    def close(self) -> None:
+        """停止后台线程并写入剩余条目"""
+        self._stop_event.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self._thread = None
+        self.flush()
+
+
+@lru_cache(maxsize=1)
+def get_recorder_write_buffer() -> RecorderWriteBuffer:
+    """获取录制器写缓冲单例（首次创建时重放未提交的日志）"""
+    from lifetrace.storage import db_base, event_mgr, screenshot_mgr  # noqa: PLC0415
+
+    return RecorderWriteBuffer(db_base, screenshot_mgr, event_mgr)
+
+
+def flush_pending_writes() -> None:
+    """读取截图/事件前写入缓冲中的条目（缓冲未创建时不做任何事）"""
+    if get_recorder_write_buffer.cache_info().currsize:
+        get_recorder_write_buffer().flush()
+
+
+def shutdown_recorder_write_buffer() -> None:
+    """写入剩余条目并停止后台线程（仅在缓冲已创建时）"""
+    if get_recorder_write_buffer.cache_info().currsize:
+        get_recorder_write_buffer().close()
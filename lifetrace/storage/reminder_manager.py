@@ -0,0 +1,108 @@
+"""待办提醒管理器 - reminders 表的读写（按 due_at 索引）"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from lifetrace.storage.models import Reminder
+from lifetrace.storage.sql_utils import col
+from lifetrace.util.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+logger = get_logger()
+
+
+def _to_dict(reminder: Reminder) -> dict[str, Any]:
+    return {
+        "id": reminder.id,
+        "todo_id": reminder.todo_id,
+        "due_at": reminder.due_at,
+        "schedule_time": reminder.schedule_time,
+        "reminder_offset": reminder.reminder_offset,
+    }
+
+
+class ReminderManager:
+    """提醒表管理类
+
+    每条提醒是一行 (todo_id, due_at, schedule_time, reminder_offset)；
+    待办变更时只替换该待办的行，到期提醒由 pop_due 一次取出并删除。
+    """
+
+    def __init__(self, db_base):
+        self.db_base = db_base
+
+    def replace_for_todo(self, todo_id: int, reminders: list[dict[str, Any]]) -> bool:
+        """用新计算的提醒替换指定待办的所有提醒（同一事务）"""
+        try:
+            with self.db_base.get_session() as session:
+                session.execute(delete(Reminder).where(col(Reminder.todo_id) == todo_id))
+                session.add_all(Reminder(**reminder) for reminder in reminders)
+            return True
+        except SQLAlchemyError as e:
+            logger.error(f"更新待办提醒失败: todo_id={todo_id}, {e}")
+            return False
+
+    def delete_for_todo(self, todo_id: int) -> int:
+        try:
+            with self.db_base.get_session() as session:
+                result = session.execute(delete(Reminder).where(col(Reminder.todo_id) == todo_id))
+                return result.rowcount or 0
+        except SQLAlchemyError as e:
+            logger.error(f"删除待办提醒失败: todo_id={todo_id}, {e}")
+            return 0
+
+    def replace_all(self, reminders: list[dict[str, Any]]) -> int:
+        """重建整张提醒表（启动同步时使用），返回写入的行数"""
+        try:
+            with self.db_base.get_session() as session:
+                session.execute(delete(Reminder))
+                if reminders:
+                    session.execute(Reminder.__table__.insert(), reminders)
+            return len(reminders)
+        except SQLAlchemyError as e:
+            logger.error(f"重建提醒表失败: {e}")
+            return 0
+
+    def clear(self) -> int:
+        return self.replace_all([]) if self.count() else 0
+
+    def pop_due(self, now: datetime) -> list[dict[str, Any]]:
+        """取出并删除所有 due_at <= now 的提醒（含错过的），按触发时间升序"""
+        try:
+            with self.db_base.get_session() as session:
+                due = session.scalars(
+                    select(Reminder)
+                    .where(col(Reminder.due_at) <= now)
+                    .order_by(col(Reminder.due_at), col(Reminder.id))
+                ).all()
+                if due:
+                    session.execute(
+                        delete(Reminder).where(col(Reminder.id).in_([r.id for r in due]))
+                    )
+                return [_to_dict(reminder) for reminder in due]
+        except SQLAlchemyError as e:
+            logger.error(f"读取到期提醒失败: {e}")
+            return []
+
+    def next_due_at(self) -> datetime | None:
+        """最近一条提醒的触发时间（走 due_at 索引）"""
+        try:
+            with self.db_base.get_session() as session:
+                return session.scalar(select(func.min(col(Reminder.due_at))))
+        except SQLAlchemyError as e:
+            logger.error(f"读取下一条提醒失败: {e}")
+            return None
+
+    def count(self) -> int:
+        try:
+            with self.db_base.get_session() as session:
+                return session.scalar(select(func.count(col(Reminder.id)))) or 0
+        except SQLAlchemyError as e:
+            logger.error(f"统计提醒失败: {e}")
+            return 0
@@ -0,0 +1,328 @@
+"""数据库结构管理
+
+把建表/迁移与索引创建移出启动关键路径：
+
+- 结构指纹：由模型元数据与 Alembic 迁移脚本内容计算，迁移成功后写入 schema_state 表；
+  下次启动指纹一致时直接跳过 create_all 与 Alembic 升级
+- 性能索引：缺失的索引由后台线程逐个创建并报告进度，全部完成后记录索引指纹，
+  之后的启动无需再逐表检查
+- 维护入口：`python -m lifetrace.storage.schema_manager` 与 /api/database/maintenance 接口
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import text
+from sqlmodel import SQLModel
+
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.time_utils import get_utc_now
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection, Engine
+
+logger = get_logger()
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[1] / "migrations"
+SCHEMA_STATE_TABLE = "schema_state"
+SCHEMA_FINGERPRINT_KEY = "schema_fingerprint"
+INDEX_FINGERPRINT_KEY = "index_fingerprint"
+# 后台建索引时每个索引之间的停顿（秒），让出写锁给正常请求
+INDEX_BUILD_PAUSE_SECONDS = 0.5
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """性能索引定义"""
+
+    name: str
+    table: str
+    columns: tuple[str, ...]
+    unique: bool = False
+
+    @property
+    def create_sql(self) -> str:
+        unique = "UNIQUE " if self.unique else ""
+        columns = ", ".join(f'"{column}"' for column in self.columns)
+        return f'CREATE {unique}INDEX IF NOT EXISTS {self.name} ON "{self.table}"({columns})'
+
+
+PERFORMANCE_INDEXES: tuple[IndexSpec, ...] = (
+    IndexSpec("idx_ocr_results_screenshot_id", "ocr_results", ("screenshot_id",)),
+    IndexSpec("idx_screenshots_created_at", "screenshots", ("created_at",)),
+    # keyset 分页：(排序键, id) 复合索引，游标定位与排序都走索引
+    # （screenshots/activities 的单列索引末尾已隐含 rowid 即 id，无需再建复合索引）
+    IndexSpec("idx_events_start_time_id", "events", ("start_time", "id")),
+    IndexSpec("idx_todos_created_at_id", "todos", ("created_at", "id")),
+    IndexSpec("idx_screenshots_file_hash", "screenshots", ("file_hash",)),
+    IndexSpec("idx_screenshots_app_name", "screenshots", ("app_name",)),
+    IndexSpec("idx_screenshots_event_id", "screenshots", ("event_id",)),
+    IndexSpec("idx_todos_parent_todo_id", "todos", ("parent_todo_id",)),
+    IndexSpec("idx_todos_status", "todos", ("status",)),
+    IndexSpec("idx_todos_deleted_at", "todos", ("deleted_at",)),
+    IndexSpec("idx_todos_priority", "todos", ("priority",)),
+    IndexSpec("idx_todos_uid", "todos", ("uid",)),
+    IndexSpec("idx_todos_order", "todos", ("order",)),
+    IndexSpec("idx_attachments_file_hash", "attachments", ("file_hash",)),
+    IndexSpec("idx_attachments_deleted_at", "attachments", ("deleted_at",)),
+    IndexSpec("idx_todo_attachment_relations_todo_id", "todo_attachment_relations", ("todo_id",)),
+    IndexSpec(
+        "idx_todo_attachment_relations_attachment_id",
+        "todo_attachment_relations",
+        ("attachment_id",),
+    ),
+    IndexSpec("idx_tags_tag_name_unique", "tags", ("tag_name",), unique=True),
+    IndexSpec("idx_tags_deleted_at", "tags", ("deleted_at",)),
+    IndexSpec("idx_todo_tag_relations_todo_id", "todo_tag_relations", ("todo_id",)),
+    IndexSpec("idx_todo_tag_relations_tag_id", "todo_tag_relations", ("tag_id",)),
+    IndexSpec("idx_journals_date", "journals", ("date",)),
+    IndexSpec("idx_journals_deleted_at", "journals", ("deleted_at",)),
+    IndexSpec("idx_journals_uid", "journals", ("uid",)),
+    IndexSpec("idx_journal_tag_relations_journal_id", "journal_tag_relations", ("journal_id",)),
+    IndexSpec("idx_journal_tag_relations_tag_id", "journal_tag_relations", ("tag_id",)),
+    IndexSpec("idx_journal_todo_relations_journal_id", "journal_todo_relations", ("journal_id",)),
+    IndexSpec("idx_journal_todo_relations_todo_id", "journal_todo_relations", ("todo_id",)),
+    IndexSpec(
+        "idx_journal_activity_relations_journal_id", "journal_activity_relations", ("journal_id",)
+    ),
+    IndexSpec(
+        "idx_journal_activity_relations_activity_id", "journal_activity_relations", ("activity_id",)
+    ),
+    IndexSpec("idx_activities_start_time", "activities", ("start_time",)),
+    IndexSpec("idx_activities_end_time", "activities", ("end_time",)),
+    IndexSpec(
+        "idx_activity_event_relations_activity_id", "activity_event_relations", ("activity_id",)
+    ),
+    IndexSpec("idx_activity_event_relations_event_id", "activity_event_relations", ("event_id",)),
+    IndexSpec("idx_chats_session_id", "chats", ("session_id",)),
+    IndexSpec("idx_messages_chat_id", "messages", ("chat_id",)),
+    # 音频相关索引
+    IndexSpec("idx_audio_recordings_start_time", "audio_recordings", ("start_time",)),
+    IndexSpec("idx_audio_recordings_status", "audio_recordings", ("status",)),
+    IndexSpec("idx_audio_recordings_deleted_at", "audio_recordings", ("deleted_at",)),
+    IndexSpec("idx_transcriptions_audio_recording_id", "transcriptions", ("audio_recording_id",)),
+    IndexSpec("idx_transcriptions_extraction_status", "transcriptions", ("extraction_status",)),
+)
+
+
+def compute_schema_fingerprint() -> str:
+    """根据模型元数据与迁移脚本内容计算结构指纹"""
+    import lifetrace.storage.models  # noqa: F401, PLC0415  确保所有表已注册到 metadata
+
+    digest = hashlib.sha256()
+    for table in sorted(SQLModel.metadata.tables.values(), key=lambda t: t.name):
+        digest.update(f"table:{table.name}\n".encode())
+        for column in table.columns:
+            digest.update(f"{column.name}:{column.type!r}:{column.nullable}\n".encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(f"index:{index.name}\n".encode())
+    for path in sorted((MIGRATIONS_DIR / "versions").glob("*.py")):
+        digest.update(f"migration:{path.name}\n".encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def compute_index_fingerprint(schema_fingerprint: str) -> str:
+    digest = hashlib.sha256(schema_fingerprint.encode())
+    for spec in PERFORMANCE_INDEXES:
+        digest.update(f"{spec.create_sql}\n".encode())
+    return digest.hexdigest()
+
+
+class SchemaState:
+    """schema_state 键值表（记录结构/索引指纹）"""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def get(self, key: str) -> str | None:
+        try:
+            with self.engine.connect() as conn:
+                row = conn.execute(
+                    text(f"SELECT value FROM {SCHEMA_STATE_TABLE} WHERE key = :key"),
+                    {"key": key},
+                ).first()
+        except Exception:
+            # 旧数据库尚无该表
+            return None
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {SCHEMA_STATE_TABLE} "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at TEXT NOT NULL)"
+                )
+            )
+            conn.execute(
+                text(
+                    f"INSERT INTO {SCHEMA_STATE_TABLE} (key, value, updated_at) "
+                    "VALUES (:key, :value, :updated_at) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+                    "updated_at = excluded.updated_at"
+                ),
+                {"key": key, "value": value, "updated_at": get_utc_now().isoformat()},
+            )
+
+
+def _table_columns(conn: Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(text(f'PRAGMA table_info("{table}")')).fetchall()}
+
+
+def plan_missing_indexes(
+    conn: Connection, specs: tuple[IndexSpec, ...] = PERFORMANCE_INDEXES
+) -> tuple[list[IndexSpec], list[dict[str, str]]]:
+    """找出需要创建的索引；表或列不存在的索引跳过（只查询涉及缺失索引的表）"""
+    existing = {
+        row[0]
+        for row in conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type='index' AND name IS NOT NULL")
+        ).fetchall()
+    }
+    columns_cache: dict[str, set[str]] = {}
+    missing: list[IndexSpec] = []
+    skipped: list[dict[str, str]] = []
+    for spec in specs:
+        if spec.name in existing:
+            continue
+        if spec.table not in columns_cache:
+            columns_cache[spec.table] = _table_columns(conn, spec.table)
+        columns = columns_cache[spec.table]
+        if not columns:
+            skipped.append({"index": spec.name, "reason": f"表 {spec.table} 不存在"})
+        elif absent := [column for column in spec.columns if column not in columns]:
+            skipped.append(
+                {"index": spec.name, "reason": f"列 {absent} 在表 {spec.table} 中不存在"}
+            )
+        else:
+            missing.append(spec)
+    return missing, skipped
+
+
+class IndexBuilder:
+    """性能索引构建器（可同步执行，也可在后台线程中逐个创建并报告进度）"""
+
+    def __init__(self, engine: Engine, state: SchemaState, schema_fingerprint: str):
+        self.engine = engine
+        self.state = state
+        self.fingerprint = compute_index_fingerprint(schema_fingerprint)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._status: dict[str, Any] = {"state": "idle"}
+
+    def is_up_to_date(self) -> bool:
+        return self.state.get(INDEX_FINGERPRINT_KEY) == self.fingerprint
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            status = dict(self._status)
+        status["up_to_date"] = self.is_up_to_date()
+        return status
+
+    def _update(self, **changes: Any) -> None:
+        with self._lock:
+            self._status.update(changes)
+
+    def start_background(self) -> bool:
+        """在后台线程中创建缺失索引；已在运行时返回 False"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(
+                target=self.run,
+                kwargs={"pause": INDEX_BUILD_PAUSE_SECONDS},
+                name="IndexBuilder",
+                daemon=True,
+            )
+            self._thread.start()
+        return True
+
+    def run(self, pause: float = 0.0) -> dict[str, Any]:
+        """创建缺失的性能索引，返回最终状态"""
+        with self.engine.connect() as conn:
+            missing, skipped = plan_missing_indexes(conn)
+        self._update(
+            state="running",
+            total=len(missing),
+            completed=0,
+            current=None,
+            created=[],
+            skipped=skipped,
+            failed={},
+            started_at=get_utc_now().isoformat(),
+            finished_at=None,
+        )
+        created: list[dict[str, Any]] = []
+        failed: dict[str, str] = {}
+        for position, spec in enumerate(missing, start=1):
+            self._update(
+                current={
+                    "index": spec.name,
+                    "table": spec.table,
+                    "rows_estimate": self._estimate_rows(spec.table),
+                    "started_at": get_utc_now().isoformat(),
+                }
+            )
+            logger.info(f"正在创建性能索引 {spec.name} ({position}/{len(missing)})")
+            start = time.perf_counter()
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(text(spec.create_sql))
+                created.append(
+                    {"index": spec.name, "seconds": round(time.perf_counter() - start, 3)}
+                )
+            except Exception as e:
+                failed[spec.name] = str(e)
+                logger.warning(f"创建性能索引 {spec.name} 失败: {e}")
+            self._update(completed=position, created=list(created), failed=dict(failed))
+            if pause and position < len(missing):
+                time.sleep(pause)
+
+        if not failed:
+            self.state.set(INDEX_FINGERPRINT_KEY, self.fingerprint)
+        if created or skipped:
+            logger.info(
+                f"性能索引检查完成：创建 {len(created)} 个，跳过 {len(skipped)} 个（表/列不存在）"
+            )
+        self._update(
+            state="failed" if failed else "done",
+            current=None,
+            finished_at=get_utc_now().isoformat(),
+        )
+        return self.status()
+
+    def _estimate_rows(self, table: str) -> int | None:
+        """用 MAX(rowid) 估算行数（不做全表 COUNT）"""
+        try:
+            with self.engine.connect() as conn:
+                return conn.execute(text(f'SELECT MAX(rowid) FROM "{table}"')).scalar()
+        except Exception:
+            return None
+
+
+def main() -> None:
+    """命令行维护入口：强制执行迁移并同步创建缺失索引"""
+    parser = argparse.ArgumentParser(description="LifeTrace 数据库结构维护")
+    parser.add_argument("--status", action="store_true", help="只输出指纹与缺失索引，不做修改")
+    args = parser.parse_args()
+
+    from lifetrace.storage.database_base import DatabaseBase  # noqa: PLC0415
+
+    db_base = DatabaseBase(auto_build_indexes=False)
+    if args.status:
+        print(db_base.schema_status())
+        return
+    db_base.run_schema_maintenance()
+    print(db_base.schema_status())
+
+
+if __name__ == "__main__":
+    main()
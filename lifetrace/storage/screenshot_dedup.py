@@ -0,0 +1,193 @@
+"""
+截图去重索引
+为截图入库与录制去重提供内存索引，避免每次截图都查询数据库：
+
+- ScreenshotHashIndex：布隆过滤器 + 最近哈希 LRU，绝大多数新截图无需查询 file_hash
+- PerceptualHashIndex：基于 BK 树的最近感知哈希（phash）近邻查询，用于跨屏幕近似去重
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from lifetrace.util.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+logger = get_logger()
+
+# 布隆过滤器目标误判率
+BLOOM_FALSE_POSITIVE_RATE = 0.01
+# 布隆过滤器最小容量，避免空库启动后频繁重建
+BLOOM_MIN_CAPACITY = 100_000
+
+
+class BloomFilter:
+    """简单的布隆过滤器（双重哈希生成 k 个位置）"""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_FALSE_POSITIVE_RATE):
+        self.capacity = max(capacity, 1)
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, value: str) -> Iterable[int]:
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, value: str) -> None:
+        for pos in self._positions(value):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, value: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+
+class ScreenshotHashIndex:
+    """截图文件哈希索引（线程安全）
+
+    - 最近哈希 LRU 命中时直接返回对应截图 ID（调用方需确认记录仍存在）
+    - 布隆过滤器判定“一定不存在”时跳过数据库查询
+    - 首次使用时通过 loader 一次性加载全部哈希；插入数超出容量时下次使用前重建
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[str]], lru_size: int = 4096):
+        self._loader = loader
+        self._lru_size = lru_size
+        self._recent: OrderedDict[str, int] = OrderedDict()
+        self._bloom: BloomFilter | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_bloom(self) -> BloomFilter:
+        bloom = self._bloom
+        if bloom is not None and bloom.count <= bloom.capacity:
+            return bloom
+        hashes = [value for value in self._loader() if value]
+        bloom = BloomFilter(max(len(hashes) * 2, BLOOM_MIN_CAPACITY))
+        for value in hashes:
+            bloom.add(value)
+        logger.debug(f"截图哈希布隆过滤器已加载 {len(hashes)} 条记录")
+        self._bloom = bloom
+        return bloom
+
+    def lookup(self, file_hash: str) -> tuple[int | None, bool]:
+        """查询哈希
+
+        Returns:
+            (最近缓存中的截图 ID, 是否可能存在于数据库)
+        """
+        with self._lock:
+            screenshot_id = self._recent.get(file_hash)
+            if screenshot_id is not None:
+                self._recent.move_to_end(file_hash)
+                return screenshot_id, True
+            return None, file_hash in self._ensure_bloom()
+
+    def add(self, file_hash: str, screenshot_id: int) -> None:
+        """记录新入库（或哈希已变更）的截图"""
+        if not file_hash:
+            return
+        with self._lock:
+            self._recent[file_hash] = screenshot_id
+            self._recent.move_to_end(file_hash)
+            while len(self._recent) > self._lru_size:
+                self._recent.popitem(last=False)
+            if self._bloom is not None:
+                self._bloom.add(file_hash)
+
+    def discard(self, file_hash: str) -> None:
+        """从最近缓存中移除（布隆过滤器不支持删除，误判只会多查一次数据库）"""
+        with self._lock:
+            self._recent.pop(file_hash, None)
+
+
+class _BKNode:
+    __slots__ = ("children", "value")
+
+    def __init__(self, value: int):
+        self.value = value
+        self.children: dict[int, _BKNode] = {}
+
+
+class BKTree:
+    """以汉明距离为度量的 BK 树"""
+
+    def __init__(self):
+        self._root: _BKNode | None = None
+        self.size = 0
+
+    def add(self, value: int) -> None:
+        self.size += 1
+        if self._root is None:
+            self._root = _BKNode(value)
+            return
+        node = self._root
+        while True:
+            distance = (node.value ^ value).bit_count()
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _BKNode(value)
+                return
+            node = child
+
+    def find_within(self, value: int, max_distance: int) -> int | None:
+        """返回距离不超过 max_distance 的任一最近值的距离，不存在时返回 None"""
+        if self._root is None:
+            return None
+        best: int | None = None
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = (node.value ^ value).bit_count()
+            if distance <= max_distance and (best is None or distance < best):
+                best = distance
+                if best == 0:
+                    return 0
+            for edge, child in node.children.items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        return best
+
+
+class PerceptualHashIndex:
+    """最近感知哈希的近邻索引（线程安全）
+
+    BK 树不支持删除，因此按两代滚动：当前代写满 window/2 后成为上一代，
+    查询同时覆盖两代，内存中最多保留最近 window 个哈希。
+    """
+
+    def __init__(self, window: int = 512):
+        self._generation_size = max(window // 2, 1)
+        self._current = BKTree()
+        self._previous = BKTree()
+        self._lock = threading.Lock()
+
+    def add(self, phash_hex: str) -> None:
+        value = int(phash_hex, 16)
+        with self._lock:
+            if self._current.size >= self._generation_size:
+                self._previous, self._current = self._current, BKTree()
+            self._current.add(value)
+
+    def find_within(self, phash_hex: str, max_distance: int) -> int | None:
+        """返回最近哈希中与之距离不超过 max_distance 的最小距离，不存在时返回 None"""
+        value = int(phash_hex, 16)
+        with self._lock:
+            distances = [
+                d
+                for d in (
+                    self._current.find_within(value, max_distance),
+                    self._previous.find_within(value, max_distance),
+                )
+                if d is not None
+            ]
+        return min(distances) if distances else None
@@ -5,9 +5,13 @@ from datetime import datetime
 from typing import Any
 
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
 
 from lifetrace.storage.database_base import DatabaseBase
 from lifetrace.storage.models import OCRResult, Screenshot
+from lifetrace.storage.pagination import SCREENSHOT_KEYSET
+from lifetrace.storage.recorder_write_buffer import flush_pending_writes
+from lifetrace.storage.screenshot_dedup import ScreenshotHashIndex
 from lifetrace.storage.sql_utils import col
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.settings import settings
@@ -21,6 +25,79 @@ class ScreenshotManager:
 
     def __init__(self, db_base: DatabaseBase):
         self.db_base = db_base
+        self.hash_index = ScreenshotHashIndex(
+            self._load_all_file_hashes,
+            lru_size=int(settings.get("jobs.recorder.params.dedup_cache_size", 4096)),
+        )
+
+    def _load_all_file_hashes(self) -> list[str]:
+        """加载全部截图哈希（供去重布隆过滤器初始化）"""
+        with self.db_base.get_session() as session:
+            return [row[0] for row in session.query(Screenshot.file_hash).yield_per(10000)]
+
+    def _find_duplicate_hash(self, session, file_hash: str) -> int | None:
+        """查找相同哈希的截图：先查最近缓存，布隆过滤器判定可能存在时再查数据库"""
+        cached_id, maybe_exists = self.hash_index.lookup(file_hash)
+        if cached_id is not None:
+            if session.get(Screenshot, cached_id) is not None:
+                return cached_id
+            self.hash_index.discard(file_hash)
+        if not maybe_exists:
+            return None
+        row = session.query(Screenshot.id).filter_by(file_hash=file_hash).first()
+        return row[0] if row else None
+
+    def insert_screenshot(
+        self,
+        session: Session,
+        file_path: str,
+        file_hash: str,
+        width: int,
+        height: int,
+        metadata: dict[str, Any] | None = None,
+    ) -> tuple[int | None, bool]:
+        """在给定会话中插入截图记录，返回 (截图ID, 是否新建)
+
+        相同路径或（开启去重时）相同哈希的截图已存在时直接返回已有记录的ID。
+        metadata 除 add_screenshot 支持的键外，还可包含 created_at（截图时间）。
+        """
+        metadata = metadata or {}
+
+        # 首先检查是否已存在相同路径的截图
+        existing_path = session.query(Screenshot).filter_by(file_path=file_path).first()
+        if existing_path:
+            logger.debug(f"跳过重复路径截图: {file_path}")
+            return existing_path.id, False
+
+        # 检查是否已存在相同哈希的截图
+        if file_hash and settings.get("jobs.recorder.params.deduplicate"):
+            existing_id = self._find_duplicate_hash(session, file_hash)
+            if existing_id is not None:
+                logger.debug(f"跳过重复哈希截图: {file_path}")
+                return existing_id, False
+
+        file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+
+        screenshot = Screenshot(
+            file_path=file_path,
+            file_hash=file_hash,
+            file_size=file_size,
+            width=width,
+            height=height,
+            screen_id=metadata.get("screen_id", 0),
+            app_name=metadata.get("app_name"),
+            window_title=metadata.get("window_title"),
+            event_id=metadata.get("event_id"),
+        )
+        if metadata.get("created_at"):
+            screenshot.created_at = metadata["created_at"]
+
+        session.add(screenshot)
+        session.flush()  # 获取ID
+
+        self.hash_index.add(file_hash, screenshot.id)
+        logger.debug(f"添加截图记录: {screenshot.id}")
+        return screenshot.id, True
 
     def add_screenshot(
         self,
@@ -43,46 +120,12 @@ class ScreenshotManager:
                 - window_title: 窗口标题
                 - event_id: 事件ID
         """
-        if metadata is None:
-            metadata = {}
-
-        screen_id = metadata.get("screen_id", 0)
-        app_name = metadata.get("app_name")
-        window_title = metadata.get("window_title")
-        event_id = metadata.get("event_id")
         try:
             with self.db_base.get_session() as session:
-                # 首先检查是否已存在相同路径的截图
-                existing_path = session.query(Screenshot).filter_by(file_path=file_path).first()
-                if existing_path:
-                    logger.debug(f"跳过重复路径截图: {file_path}")
-                    return existing_path.id
-
-                # 检查是否已存在相同哈希的截图
-                existing_hash = session.query(Screenshot).filter_by(file_hash=file_hash).first()
-                if existing_hash and settings.get("jobs.recorder.params.deduplicate"):
-                    logger.debug(f"跳过重复哈希截图: {file_path}")
-                    return existing_hash.id
-
-                file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-
-                screenshot = Screenshot(
-                    file_path=file_path,
-                    file_hash=file_hash,
-                    file_size=file_size,
-                    width=width,
-                    height=height,
-                    screen_id=screen_id,
-                    app_name=app_name,
-                    window_title=window_title,
-                    event_id=event_id,
+                screenshot_id, _ = self.insert_screenshot(
+                    session, file_path, file_hash, width, height, metadata
                 )
-
-                session.add(screenshot)
-                session.flush()  # 获取ID
-
-                logger.debug(f"添加截图记录: {screenshot.id}")
-                return screenshot.id
+                return screenshot_id
 
         except SQLAlchemyError as e:
             logger.error(f"添加截图记录失败: {e}")
@@ -117,6 +160,7 @@ class ScreenshotManager:
 
     def get_screenshot_by_path(self, file_path: str) -> dict | None:
         """根据文件路径获取截图"""
+        flush_pending_writes()
         try:
             with self.db_base.get_session() as session:
                 screenshot = session.query(Screenshot).filter_by(file_path=file_path).first()
@@ -141,6 +185,17 @@ class ScreenshotManager:
             logger.error(f"根据路径获取截图失败: {e}")
             return None
 
+    def get_all_file_paths(self, batch_size: int = 10000) -> set[str]:
+        """一次性加载全部截图文件路径（只查询路径列，分批读取）"""
+        flush_pending_writes()
+        try:
+            with self.db_base.get_session() as session:
+                rows = session.query(Screenshot.file_path).yield_per(batch_size)
+                return {row[0] for row in rows}
+        except SQLAlchemyError as e:
+            logger.error(f"加载截图路径失败: {e}")
+            raise
+
     def update_screenshot_processed(self, screenshot_id: int):
         """更新截图处理状态"""
         try:
@@ -164,6 +219,7 @@ class ScreenshotManager:
         Returns:
             截图总数
         """
+        flush_pending_writes()
         try:
             with self.db_base.get_session() as session:
                 query = session.query(Screenshot)
@@ -184,8 +240,10 @@ class ScreenshotManager:
         app_name: str | None = None,
         limit: int = 50,
         offset: int = 0,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
-        """搜索截图"""
+        """搜索截图（提供 cursor 时按游标分页，忽略 offset）"""
+        flush_pending_writes()
         try:
             with self.db_base.get_session() as session:
                 # 基础查询
@@ -206,13 +264,11 @@ class ScreenshotManager:
                 if query:
                     query_obj = query_obj.filter(col(OCRResult.text_content).like(f"%{query}%"))
 
-                # 应用分页：先排序，再应用offset和limit
-                results = (
-                    query_obj.order_by(col(Screenshot.created_at).desc())
-                    .offset(offset)
-                    .limit(limit)
-                    .all()
-                )
+                # 应用分页：先排序（游标分页时从游标之后开始），再应用offset和limit
+                query_obj = SCREENSHOT_KEYSET.apply(query_obj, cursor)
+                if not cursor and offset:
+                    query_obj = query_obj.offset(offset)
+                results = query_obj.limit(limit).all()
 
                 # 格式化结果
                 formatted_results = []
@@ -246,6 +302,7 @@ class ScreenshotManager:
         Returns:
             截图列表
         """
+        flush_pending_writes()
         try:
             with self.db_base.get_session() as session:
                 screenshots = (
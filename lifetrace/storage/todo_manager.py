@@ -8,6 +8,7 @@ from typing import TYPE_CHECKING, Any
 from sqlalchemy.exc import SQLAlchemyError
 
 from lifetrace.storage.models import Tag, Todo, TodoAttachmentRelation, TodoTagRelation
+from lifetrace.storage.pagination import TODO_KEYSET
 from lifetrace.storage.sql_utils import col
 from lifetrace.storage.todo_manager_attachments import TodoAttachmentMixin
 from lifetrace.storage.todo_manager_ical import TodoIcalMixin
@@ -36,6 +37,37 @@ class TodoManager(TodoAttachmentMixin, TodoIcalMixin):
         )
         return [r[0] for r in rows if r and r[0]]
 
+    def _get_tags_for_todos(self, session, todo_ids: list[int]) -> dict[int, list[str]]:
+        """一次查询取出一页 todo 的标签"""
+        tags: dict[int, list[str]] = {todo_id: [] for todo_id in todo_ids}
+        if not todo_ids:
+            return tags
+        rows = (
+            session.query(col(TodoTagRelation.todo_id), col(Tag.tag_name))
+            .join(Tag, col(TodoTagRelation.tag_id) == col(Tag.id))
+            .filter(col(TodoTagRelation.todo_id).in_(todo_ids))
+            .all()
+        )
+        for todo_id, tag_name in rows:
+            if tag_name:
+                tags[todo_id].append(tag_name)
+        return tags
+
+    def _todos_to_dicts(self, session, todos: list[Todo]) -> list[dict[str, Any]]:
+        """批量序列化（标签与附件各一次查询，而不是每个 todo 各两次）"""
+        todo_ids = [t.id for t in todos if t.id is not None]
+        tags = self._get_tags_for_todos(session, todo_ids)
+        attachments = self._get_attachments_for_todos(session, todo_ids)
+        return [
+            self._todo_to_dict(
+                session,
+                t,
+                tags=tags.get(t.id or 0, []),
+                attachments=attachments.get(t.id or 0, []),
+            )
+            for t in todos
+        ]
+
     def get_todo_context(self, todo_id: int) -> dict[str, Any] | None:
         """获取任务的所有相关上下文（父任务链、同级任务、子任务）"""
         try:
@@ -129,6 +161,7 @@ class TodoManager(TodoAttachmentMixin, TodoIcalMixin):
         limit: int = 200,
         offset: int = 0,
         status: str | None = None,
+        cursor: str | None = None,
     ) -> list[dict[str, Any]]:
         try:
             with self.db_base.get_session() as session:
@@ -140,8 +173,11 @@ class TodoManager(TodoAttachmentMixin, TodoIcalMixin):
                 if status:
                     q = q.filter(col(Todo.status) == status)
 
-                todos = q.order_by(col(Todo.created_at).desc()).offset(offset).limit(limit).all()
-                return [self._todo_to_dict(session, t) for t in todos]
+                q = TODO_KEYSET.apply(q, cursor)
+                if not cursor and offset:
+                    q = q.offset(offset)
+                todos = q.limit(limit).all()
+                return self._todos_to_dicts(session, todos)
         except SQLAlchemyError as e:
             logger.error(f"列出 todo 失败: {e}")
             return []
@@ -22,6 +22,15 @@ class TodoAttachmentMixin:
     db_base: DatabaseBase
 
     def _get_todo_attachments(self, session, todo_id: int) -> list[dict[str, Any]]:
+        return self._get_attachments_for_todos(session, [todo_id]).get(todo_id, [])
+
+    def _get_attachments_for_todos(
+        self, session, todo_ids: list[int]
+    ) -> dict[int, list[dict[str, Any]]]:
+        """一次查询取出多个 todo 的附件"""
+        attachments: dict[int, list[dict[str, Any]]] = {todo_id: [] for todo_id in todo_ids}
+        if not todo_ids:
+            return attachments
         rows = (
             session.query(Attachment, TodoAttachmentRelation)
             .join(
@@ -29,22 +38,23 @@ class TodoAttachmentMixin:
                 col(TodoAttachmentRelation.attachment_id) == col(Attachment.id),
             )
             .filter(
-                col(TodoAttachmentRelation.todo_id) == todo_id,
+                col(TodoAttachmentRelation.todo_id).in_(todo_ids),
                 col(TodoAttachmentRelation.deleted_at).is_(None),
             )
             .all()
         )
-        return [
-            {
-                "id": attachment.id,
-                "file_name": attachment.file_name,
-                "file_path": attachment.file_path,
-                "file_size": attachment.file_size,
-                "mime_type": attachment.mime_type,
-                "source": relation.source,
-            }
-            for attachment, relation in rows
-        ]
+        for attachment, relation in rows:
+            attachments[relation.todo_id].append(
+                {
+                    "id": attachment.id,
+                    "file_name": attachment.file_name,
+                    "file_path": attachment.file_path,
+                    "file_size": attachment.file_size,
+                    "mime_type": attachment.mime_type,
+                    "source": relation.source,
+                }
+            )
+        return attachments
 
     def add_todo_attachment(
         self,
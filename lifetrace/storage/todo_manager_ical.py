@@ -51,7 +51,14 @@ class TodoIcalMixin:
 
         def _set_todo_tags(self, session, todo_id: int, tags: list[str]) -> None: ...
 
-    def _todo_to_dict(self, session, todo: Todo) -> dict[str, Any]:
+    def _todo_to_dict(
+        self,
+        session,
+        todo: Todo,
+        *,
+        tags: list[str] | None = None,
+        attachments: list[dict[str, Any]] | None = None,
+    ) -> dict[str, Any]:
         todo_id = todo.id
         if todo_id is None:
             raise ValueError("Todo must have an id before serialization.")
@@ -110,8 +117,12 @@ class TodoIcalMixin:
             ),
             "rrule": getattr(todo, "rrule", None),
             "order": getattr(todo, "order", 0),
-            "tags": self._get_todo_tags(session, todo_id),
-            "attachments": self._get_todo_attachments(session, todo_id),
+            "tags": tags if tags is not None else self._get_todo_tags(session, todo_id),
+            "attachments": (
+                attachments
+                if attachments is not None
+                else self._get_todo_attachments(session, todo_id)
+            ),
             "related_activities": _safe_int_list(todo.related_activities),
             "source_type": getattr(todo, "source_type", None),
             "source_key": getattr(todo, "source_key", None),
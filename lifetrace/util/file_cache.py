@@ -0,0 +1,70 @@
+"""
+磁盘文件缓存工具
+供视觉载荷缓存、缩略图缓存等按目录容量上限淘汰的文件缓存复用
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import threading
+from typing import TYPE_CHECKING
+
+from lifetrace.util.logging_config import get_logger
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+logger = get_logger()
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """先写临时文件再原子替换，避免并发读取到半截文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}-{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def touch(path: Path) -> None:
+    """刷新文件修改时间，淘汰时按最久未使用处理"""
+    with contextlib.suppress(OSError):
+        os.utime(path)
+
+
+def prune_cache_dir(cache_dir: Path, max_bytes: int, recursive: bool = False) -> int:
+    """目录总大小超出上限时按修改时间从旧到新删除文件
+
+    Args:
+        cache_dir: 缓存目录
+        max_bytes: 容量上限（字节）
+        recursive: 是否包含子目录（分片目录）
+
+    Returns:
+        删除的文件数
+    """
+    if not cache_dir.exists():
+        return 0
+    paths = cache_dir.rglob("*") if recursive else cache_dir.iterdir()
+    entries = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if path.is_file():
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries, key=lambda item: item[0]):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    if removed:
+        logger.debug(f"缓存目录 {cache_dir} 淘汰 {removed} 个文件")
+    return removed
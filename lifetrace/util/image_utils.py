@@ -1,72 +1,33 @@
 """图片处理工具函数"""
 
-import base64
 import os
 from typing import Any
 
-from lifetrace.storage import screenshot_mgr
-from lifetrace.util.logging_config import get_logger
-
-logger = get_logger()
+from lifetrace.util.screenshot_codec import IMAGE_MIME_TYPES
+from lifetrace.util.vision_image_pipeline import get_vision_image_pipeline
 
 
 def get_screenshot_base64(screenshot_id: int) -> str | None:
     """
-    从数据库读取截图并转换为base64编码
+    读取截图并转换为视觉模型使用的base64编码
+
+    图片会经过视觉预处理管线（缩放、重新编码、可选 ROI 裁切、磁盘缓存），
+    处理参数见配置 llm.vision_image。
 
     Args:
         screenshot_id: 截图ID
 
     Returns:
-        base64编码的图片字符串（格式：data:image/png;base64,{base64_str}），
+        base64编码的图片字符串（格式：data:{mime_type};base64,{base64_str}），
         如果截图不存在或读取失败则返回None
     """
-    try:
-        # 从数据库获取截图信息
-        screenshot = screenshot_mgr.get_screenshot_by_id(screenshot_id)
-        if not screenshot:
-            logger.warning(f"截图 {screenshot_id} 不存在")
-            return None
-
-        file_path = screenshot.get("file_path")
-        if not file_path:
-            logger.warning(f"截图 {screenshot_id} 没有文件路径")
-            return None
-
-        # 检查文件是否存在
-        if not os.path.exists(file_path):
-            logger.warning(f"截图文件不存在: {file_path}")
-            return None
-
-        # 读取文件并转换为base64
-        with open(file_path, "rb") as f:
-            image_data = f.read()
-
-        # 转换为base64
-        base64_str = base64.b64encode(image_data).decode("utf-8")
-
-        # 根据文件扩展名确定MIME类型
-        file_ext = os.path.splitext(file_path)[1].lower()
-        mime_type_map = {
-            ".png": "image/png",
-            ".jpg": "image/jpeg",
-            ".jpeg": "image/jpeg",
-            ".gif": "image/gif",
-            ".webp": "image/webp",
-        }
-        mime_type = mime_type_map.get(file_ext, "image/png")
-
-        # 返回data URI格式
-        return f"data:{mime_type};base64,{base64_str}"
-
-    except Exception as e:
-        logger.error(f"读取截图 {screenshot_id} 并转换为base64失败: {e}")
-        return None
+    prepared = get_vision_image_pipeline().prepare(screenshot_id)
+    return prepared.data_uri if prepared else None
 
 
 def get_screenshots_base64(screenshot_ids: list[int]) -> list[dict[str, Any]]:
     """
-    批量获取截图的base64编码
+    批量获取截图的base64编码（多张截图并行处理）
 
     Args:
         screenshot_ids: 截图ID列表
@@ -75,13 +36,22 @@ def get_screenshots_base64(screenshot_ids: list[int]) -> list[dict[str, Any]]:
         包含截图信息的列表，每个元素包含：
         - screenshot_id: 截图ID
         - base64_data: base64编码的图片字符串（如果成功）
+        - payload_bytes / original_bytes / cached: 载荷大小、原图大小与是否命中缓存（如果成功）
         - error: 错误信息（如果失败）
     """
     results = []
-    for screenshot_id in screenshot_ids:
-        base64_data = get_screenshot_base64(screenshot_id)
-        if base64_data:
-            results.append({"screenshot_id": screenshot_id, "base64_data": base64_data})
+    prepared_list = get_vision_image_pipeline().prepare_many(screenshot_ids)
+    for screenshot_id, prepared in zip(screenshot_ids, prepared_list, strict=True):
+        if prepared:
+            results.append(
+                {
+                    "screenshot_id": screenshot_id,
+                    "base64_data": prepared.data_uri,
+                    "payload_bytes": prepared.payload_bytes,
+                    "original_bytes": prepared.original_bytes,
+                    "cached": prepared.cached,
+                }
+            )
         else:
             results.append(
                 {
@@ -102,6 +72,6 @@ def validate_image_format(file_path: str) -> bool:
     Returns:
         如果格式支持返回True，否则返回False
     """
-    supported_formats = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+    supported_formats = set(IMAGE_MIME_TYPES)
     file_ext = os.path.splitext(file_path)[1].lower()
     return file_ext in supported_formats
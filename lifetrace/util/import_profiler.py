@@ -0,0 +1,219 @@
+"""
+启动性能分析
+
+- 导入耗时分析：与 `python -X importtime` 相同的口径（self / cumulative），但在进程内记录，
+  打包后的应用（PyInstaller）同样可用。通过 `--profile-imports` 命令行参数或
+  LIFETRACE_PROFILE_IMPORTS=1 环境变量启用（在 lifetrace 包导入时安装，覆盖其后的所有导入）
+- 启动阶段打点：记录应用创建、路由注册等关键阶段距进程启动的耗时，始终开启
+
+本模块只依赖标准库，避免自身成为启动开销。
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from importlib.machinery import ModuleSpec
+    from types import ModuleType
+
+PROFILE_IMPORTS_FLAG = "--profile-imports"
+PROFILE_IMPORTS_ENV = "LIFETRACE_PROFILE_IMPORTS"
+
+# 模块导入时的时间基准（lifetrace 包导入时即加载本模块，接近进程启动）
+_BASE_WALL_TIME = time.time()
+
+
+def _process_start_time() -> float:
+    """进程启动的墙钟时间（psutil 不可用时退化为本模块加载时间）"""
+    try:
+        import psutil  # noqa: PLC0415
+
+        return psutil.Process().create_time()
+    except Exception:
+        return _BASE_WALL_TIME
+
+
+@dataclass
+class ImportTiming:
+    """单个模块的导入耗时（毫秒）"""
+
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+class _TimingLoader:
+    """包装模块加载器，记录 exec_module 耗时；其余属性透传给原加载器"""
+
+    def __init__(self, loader: Any, profiler: ImportProfiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec: ModuleSpec) -> ModuleType | None:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        # 还原为原加载器，避免 importlib.resources 等按加载器类型判断的逻辑受影响
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._profiler.measure(module.__name__, self._loader.exec_module, module)
+
+
+class _ProfilingFinder:
+    """位于 sys.meta_path 首位的查找器：委托其余查找器定位模块，再包装其加载器"""
+
+    def __init__(self, profiler: ImportProfiler):
+        self._profiler = profiler
+
+    def find_spec(
+        self, fullname: str, path: Sequence[str] | None, target: ModuleType | None = None
+    ) -> ModuleSpec | None:
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimingLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+
+class ImportProfiler:
+    """进程内导入耗时分析器"""
+
+    def __init__(self):
+        self._finder = _ProfilingFinder(self)
+        self._local = threading.local()
+        self._timings: list[ImportTiming] = []
+        self._lock = threading.Lock()
+
+    @property
+    def installed(self) -> bool:
+        return self._finder in sys.meta_path
+
+    def install(self) -> None:
+        if not self.installed:
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self) -> None:
+        if self.installed:
+            sys.meta_path.remove(self._finder)
+
+    def measure(self, module: str, func: Callable[[ModuleType], None], arg: ModuleType) -> None:
+        """执行模块代码并记录耗时（子模块耗时计入父模块 cumulative，不计入 self）"""
+        stack: list[float] = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            func(arg)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            timing = ImportTiming(
+                module=module,
+                self_ms=round((elapsed - children) * 1000, 3),
+                cumulative_ms=round(elapsed * 1000, 3),
+                depth=len(stack),
+            )
+            with self._lock:
+                self._timings.append(timing)
+
+    def timings(self) -> list[ImportTiming]:
+        """按完成顺序返回（与 -X importtime 一致：子模块在父模块之前）"""
+        with self._lock:
+            return list(self._timings)
+
+    def report(self, top: int = 30) -> dict[str, Any]:
+        timings = self.timings()
+        packages: dict[str, float] = {}
+        for timing in timings:
+            package = timing.module.split(".", 1)[0]
+            packages[package] = packages.get(package, 0.0) + timing.self_ms
+        slowest = sorted(timings, key=lambda t: t.cumulative_ms, reverse=True)[:top]
+        heaviest_packages = sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        return {
+            "module_count": len(timings),
+            "total_ms": round(sum(t.cumulative_ms for t in timings if t.depth == 0), 1),
+            "slowest_modules": [asdict(t) for t in slowest],
+            "packages": [
+                {"package": name, "self_ms": round(ms, 1)} for name, ms in heaviest_packages[:top]
+            ],
+        }
+
+    def format_report(self, top: int = 30) -> str:
+        """生成与 -X importtime 类似的文本报告"""
+        report = self.report(top)
+        lines = [
+            f"导入模块 {report['module_count']} 个，顶层导入累计 {report['total_ms']:.1f} ms",
+            "  cumulative(ms) |  self(ms) | module",
+        ]
+        lines.extend(
+            f"{t['cumulative_ms']:>16.1f} | {t['self_ms']:>9.1f} | {'  ' * t['depth']}{t['module']}"
+            for t in report["slowest_modules"]
+        )
+        lines.append("按顶层包汇总 self(ms):")
+        lines.extend(f"{p['self_ms']:>16.1f} | {p['package']}" for p in report["packages"])
+        return "\n".join(lines)
+
+
+_profiler = ImportProfiler()
+_startup_stages: dict[str, float] = {}
+
+
+def get_import_profiler() -> ImportProfiler:
+    return _profiler
+
+
+def is_profiling_requested(argv: Sequence[str] | None = None) -> bool:
+    """是否通过命令行参数或环境变量请求了导入耗时分析"""
+    argv = sys.argv if argv is None else argv
+    env_value = os.environ.get(PROFILE_IMPORTS_ENV, "").strip().lower()
+    return PROFILE_IMPORTS_FLAG in argv or env_value in ("1", "true", "yes")
+
+
+def install_if_requested() -> bool:
+    if is_profiling_requested():
+        _profiler.install()
+        return True
+    return False
+
+
+def mark_startup_stage(stage: str) -> None:
+    """记录启动阶段（同名阶段只记录第一次）"""
+    _startup_stages.setdefault(stage, time.time())
+
+
+def get_startup_report(top: int = 30) -> dict[str, Any]:
+    """启动阶段耗时（距进程启动，毫秒）+ 导入耗时分析（启用时）"""
+    process_start = _process_start_time()
+    stages = {
+        stage: round((timestamp - process_start) * 1000, 1)
+        for stage, timestamp in sorted(_startup_stages.items(), key=lambda item: item[1])
+    }
+    report: dict[str, Any] = {
+        "profiling_enabled": _profiler.installed,
+        "stages_ms": stages,
+        "uptime_ms": round((time.time() - process_start) * 1000, 1),
+    }
+    if _profiler.installed:
+        report["imports"] = _profiler.report(top)
+    return report
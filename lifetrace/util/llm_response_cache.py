@@ -0,0 +1,322 @@
+"""
+LLM 响应缓存模块
+对确定性的 LLM 任务（意图分类、查询解析、OCR 待办提取、事件摘要等）的响应做持久化缓存。
+
+- 缓存键：(model, prompt hash, temperature, feature)
+- 存储：独立的 SQLite 文件（默认 data/llm_cache.db），避免与主库写锁竞争
+- 淘汰：按 TTL 过期 + 按最大条目数淘汰最久未访问的记录
+- 统计：按天/功能记录命中、未命中次数与节省的 token 数，供 TokenUsage 统计使用
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.path_utils import get_llm_cache_path
+from lifetrace.util.settings import settings
+from lifetrace.util.time_utils import get_utc_now
+
+logger = get_logger()
+
+# 每写入多少条记录执行一次过期清理与容量淘汰
+EVICTION_CHECK_INTERVAL = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    cache_key TEXT PRIMARY KEY,
+    feature TEXT NOT NULL,
+    model TEXT NOT NULL,
+    temperature REAL,
+    response TEXT NOT NULL,
+    input_tokens INTEGER NOT NULL DEFAULT 0,
+    output_tokens INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_accessed_at REAL NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_last_accessed
+    ON llm_response_cache(last_accessed_at);
+CREATE INDEX IF NOT EXISTS idx_llm_response_cache_created_at
+    ON llm_response_cache(created_at);
+CREATE TABLE IF NOT EXISTS llm_cache_stats (
+    day TEXT NOT NULL,
+    feature TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0,
+    tokens_saved INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, feature)
+);
+"""
+
+
+def build_cache_key(
+    model: str,
+    prompt: str | list[dict[str, Any]],
+    temperature: float | None,
+    feature: str,
+) -> str:
+    """根据 (model, prompt hash, temperature, feature) 计算缓存键
+
+    Args:
+        model: 模型名称
+        prompt: 提示词文本或 messages 列表
+        temperature: 温度参数
+        feature: 功能标识（如 intent_classification）
+
+    Returns:
+        缓存键（sha256 十六进制字符串）
+    """
+    if not isinstance(prompt, str):
+        prompt = json.dumps(prompt, ensure_ascii=False, sort_keys=True)
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    temp_str = "none" if temperature is None else f"{float(temperature):.4f}"
+    raw = f"{model}\x1f{prompt_hash}\x1f{temp_str}\x1f{feature}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """基于 SQLite 的 LLM 响应缓存（线程安全）"""
+
+    def __init__(self, db_path: Path | str):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._writes_since_eviction = 0
+
+    # ===== 配置 =====
+
+    def _config(self) -> dict[str, Any]:
+        config = settings.get("llm.response_cache") or {}
+        if hasattr(config, "to_dict"):
+            config = config.to_dict()
+        return config
+
+    def is_enabled(self, feature: str | None) -> bool:
+        """检查指定功能是否启用了响应缓存"""
+        if not feature:
+            return False
+        config = self._config()
+        if not config.get("enabled", False):
+            return False
+        features = config.get("features") or []
+        return feature in features
+
+    def _ttl_seconds(self) -> float:
+        return float(self._config().get("ttl_seconds", 7 * 24 * 3600))
+
+    def _max_entries(self) -> int:
+        return int(self._config().get("max_entries", 5000))
+
+    # ===== 连接管理 =====
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        """关闭底层连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ===== 读写接口 =====
+
+    def get(
+        self,
+        *,
+        feature: str,
+        model: str,
+        prompt: str | list[dict[str, Any]],
+        temperature: float | None,
+    ) -> str | None:
+        """查询缓存，命中时返回缓存的响应文本，同时记录命中/未命中统计"""
+        if not self.is_enabled(feature):
+            return None
+        key = build_cache_key(model, prompt, temperature, feature)
+        now_ts = time.time()
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                row = conn.execute(
+                    "SELECT response, input_tokens, output_tokens, created_at "
+                    "FROM llm_response_cache WHERE cache_key = ?",
+                    (key,),
+                ).fetchone()
+                if row is not None and now_ts - row[3] > self._ttl_seconds():
+                    conn.execute("DELETE FROM llm_response_cache WHERE cache_key = ?", (key,))
+                    row = None
+                if row is None:
+                    self._record_stat(conn, feature, hit=False, tokens_saved=0)
+                    conn.commit()
+                    return None
+                conn.execute(
+                    "UPDATE llm_response_cache SET last_accessed_at = ?, "
+                    "hit_count = hit_count + 1 WHERE cache_key = ?",
+                    (now_ts, key),
+                )
+                self._record_stat(conn, feature, hit=True, tokens_saved=row[1] + row[2])
+                conn.commit()
+            logger.debug(f"LLM 响应缓存命中: feature={feature}, model={model}")
+            return row[0]
+        except Exception as e:
+            logger.warning(f"读取 LLM 响应缓存失败: {e}")
+            return None
+
+    def set(
+        self,
+        *,
+        feature: str,
+        model: str,
+        prompt: str | list[dict[str, Any]],
+        temperature: float | None,
+        response: str,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+    ) -> None:
+        """写入缓存（空响应不缓存）"""
+        if not response or not self.is_enabled(feature):
+            return
+        key = build_cache_key(model, prompt, temperature, feature)
+        now_ts = time.time()
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_response_cache (cache_key, feature, model, "
+                    "temperature, response, input_tokens, output_tokens, created_at, "
+                    "last_accessed_at, hit_count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                    (
+                        key,
+                        feature,
+                        model,
+                        temperature,
+                        response,
+                        int(input_tokens or 0),
+                        int(output_tokens or 0),
+                        now_ts,
+                        now_ts,
+                    ),
+                )
+                self._writes_since_eviction += 1
+                if self._writes_since_eviction >= EVICTION_CHECK_INTERVAL:
+                    self._evict(conn, now_ts)
+                    self._writes_since_eviction = 0
+                conn.commit()
+        except Exception as e:
+            logger.warning(f"写入 LLM 响应缓存失败: {e}")
+
+    def evict(self) -> int:
+        """立即执行过期清理与容量淘汰，返回删除的条目数"""
+        with self._lock:
+            conn = self._get_conn()
+            removed = self._evict(conn, time.time())
+            conn.commit()
+            return removed
+
+    def clear(self, feature: str | None = None) -> int:
+        """清空缓存（可按功能清空），返回删除的条目数"""
+        with self._lock:
+            conn = self._get_conn()
+            if feature:
+                cursor = conn.execute(
+                    "DELETE FROM llm_response_cache WHERE feature = ?", (feature,)
+                )
+            else:
+                cursor = conn.execute("DELETE FROM llm_response_cache")
+            conn.commit()
+            return cursor.rowcount
+
+    def _evict(self, conn: sqlite3.Connection, now_ts: float) -> int:
+        removed = conn.execute(
+            "DELETE FROM llm_response_cache WHERE created_at < ?",
+            (now_ts - self._ttl_seconds(),),
+        ).rowcount
+        total = conn.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+        overflow = total - self._max_entries()
+        if overflow > 0:
+            removed += conn.execute(
+                "DELETE FROM llm_response_cache WHERE cache_key IN ("
+                "SELECT cache_key FROM llm_response_cache "
+                "ORDER BY last_accessed_at ASC LIMIT ?)",
+                (overflow,),
+            ).rowcount
+        if removed:
+            logger.debug(f"LLM 响应缓存淘汰 {removed} 条记录")
+        return removed
+
+    # ===== 统计 =====
+
+    @staticmethod
+    def _record_stat(
+        conn: sqlite3.Connection, feature: str, *, hit: bool, tokens_saved: int
+    ) -> None:
+        day = get_utc_now().strftime("%Y-%m-%d")
+        conn.execute(
+            "INSERT INTO llm_cache_stats (day, feature, hits, misses, tokens_saved) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT(day, feature) DO UPDATE SET "
+            "hits = hits + excluded.hits, misses = misses + excluded.misses, "
+            "tokens_saved = tokens_saved + excluded.tokens_saved",
+            (day, feature, 1 if hit else 0, 0 if hit else 1, tokens_saved),
+        )
+
+    def get_stats(self, days: int = 30) -> dict[str, Any]:
+        """获取最近 N 天的缓存命中统计"""
+        stats: dict[str, Any] = {
+            "hits": 0,
+            "misses": 0,
+            "hit_rate": 0.0,
+            "tokens_saved": 0,
+            "entries": 0,
+            "feature_stats": {},
+        }
+        start_day = (get_utc_now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        try:
+            with self._lock:
+                conn = self._get_conn()
+                rows = conn.execute(
+                    "SELECT feature, SUM(hits), SUM(misses), SUM(tokens_saved) "
+                    "FROM llm_cache_stats WHERE day >= ? GROUP BY feature",
+                    (start_day,),
+                ).fetchall()
+                stats["entries"] = conn.execute(
+                    "SELECT COUNT(*) FROM llm_response_cache"
+                ).fetchone()[0]
+        except Exception as e:
+            logger.warning(f"读取 LLM 响应缓存统计失败: {e}")
+            return stats
+
+        for feature, hits, misses, tokens_saved in rows:
+            stats["feature_stats"][feature] = {
+                "hits": hits or 0,
+                "misses": misses or 0,
+                "tokens_saved": tokens_saved or 0,
+            }
+            stats["hits"] += hits or 0
+            stats["misses"] += misses or 0
+            stats["tokens_saved"] += tokens_saved or 0
+        lookups = stats["hits"] + stats["misses"]
+        if lookups:
+            stats["hit_rate"] = round(stats["hits"] / lookups, 4)
+        return stats
+
+
+@lru_cache(maxsize=1)
+def get_llm_response_cache() -> LLMResponseCache:
+    """获取全局 LLM 响应缓存实例"""
+    return LLMResponseCache(get_llm_cache_path())
@@ -0,0 +1,194 @@
+"""
+日志文件读取工具
+为日志查看接口提供按字节偏移的高效读取，避免把整个日志文件读入内存：
+
+- 从文件末尾反向分块读取（tail）
+- 基于字节偏移游标的双向分页
+- 服务端按级别/关键字过滤（异常堆栈等续行归属于其前面的日志记录）
+- 从指定偏移读取新增的完整行，供 follow 模式推送
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+# 反向读取的块大小
+BLOCK_SIZE = 64 * 1024
+# 单次请求最多扫描的字节数（过滤条件很严格时避免扫描整个大文件，调用方可用游标继续）
+MAX_SCAN_BYTES = 16 * 1024 * 1024
+
+LEVEL_ORDER = ("TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL")
+# 文件日志格式：{time:YYYY-MM-DD HH:mm:ss.SSS} | {level} | {file}:{line} | {message}
+_HEADER_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(?:\.\d+)? \| ([A-Z]+)\s*\|")
+
+
+@dataclass
+class LogFilter:
+    """日志过滤条件"""
+
+    level: str | None = None  # 最低级别
+    keyword: str | None = None  # 关键字（不区分大小写）
+
+    def __post_init__(self):
+        if self.level:
+            self.level = self.level.upper()
+            if self.level not in LEVEL_ORDER:
+                raise ValueError(f"不支持的日志级别: {self.level}")
+        self.keyword = self.keyword.lower() if self.keyword else None
+
+    def matches(self, level: str | None, text: str) -> bool:
+        if self.level:
+            if level not in LEVEL_ORDER:
+                return False
+            if LEVEL_ORDER.index(level) < LEVEL_ORDER.index(self.level):
+                return False
+        return not self.keyword or self.keyword in text.lower()
+
+
+def parse_level(line: str) -> str | None:
+    """解析日志行的级别，续行（如异常堆栈）返回 None"""
+    match = _HEADER_PATTERN.match(line)
+    return match.group(1) if match else None
+
+
+def _entry(offset: int, lines: list[str]) -> dict[str, Any]:
+    return {"offset": offset, "level": parse_level(lines[0]), "text": "\n".join(lines)}
+
+
+def _iter_lines_reverse(f: BinaryIO, end: int) -> Iterator[tuple[int, bytes]]:
+    """从 end 处向前逐行读取，返回 (行起始偏移, 行内容)"""
+    pos = end
+    tail = b""
+    while pos > 0:
+        read = min(BLOCK_SIZE, pos)
+        pos -= read
+        f.seek(pos)
+        data = f.read(read) + tail
+        parts = data.split(b"\n")
+        tail = parts[0]
+        offset = pos + len(data)
+        for part in reversed(parts[1:]):
+            offset -= len(part)
+            yield offset, part
+            offset -= 1
+    if end > 0:
+        yield 0, tail
+
+
+def read_entries_before(
+    path: Path,
+    before: int | None = None,
+    limit: int = 200,
+    log_filter: LogFilter | None = None,
+) -> dict[str, Any]:
+    """读取 before 偏移之前的最后 limit 条日志记录（按时间正序返回）
+
+    Returns:
+        {"entries", "prev_cursor", "has_more", "file_size"}；
+        prev_cursor 为已扫描到的最早记录的偏移，作为下一页的 before
+    """
+    log_filter = log_filter or LogFilter()
+    matched: list[dict[str, Any]] = []
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        end = size if before is None else max(0, min(before, size))
+        cursor = end
+        pending: list[str] = []  # 尚未找到所属记录头的续行（倒序）
+        for offset, raw in _iter_lines_reverse(f, end):
+            text = raw.decode("utf-8", errors="replace").rstrip("\r")
+            if not text:
+                continue
+            if parse_level(text) is None and offset > 0:
+                pending.append(text)
+                continue
+            entry = _entry(offset, [text, *reversed(pending)])
+            pending = []
+            cursor = offset
+            if log_filter.matches(entry["level"], entry["text"]):
+                matched.append(entry)
+                if len(matched) >= limit:
+                    break
+            if end - cursor >= MAX_SCAN_BYTES:
+                break
+        else:
+            cursor = 0
+
+    matched.reverse()
+    return {"entries": matched, "prev_cursor": cursor, "has_more": cursor > 0, "file_size": size}
+
+
+def read_entries_after(
+    path: Path,
+    after: int,
+    limit: int = 200,
+    log_filter: LogFilter | None = None,
+) -> dict[str, Any]:
+    """读取 after 偏移之后的日志记录（只读取完整的行）
+
+    Returns:
+        {"entries", "next_cursor", "has_more", "file_size"}；
+        next_cursor 为已消费的最后一个完整行之后的偏移，作为下一页的 after
+    """
+    log_filter = log_filter or LogFilter()
+    matched: list[dict[str, Any]] = []
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        # 文件被截断或重建时从头读取
+        position = after if 0 <= after <= size else 0
+        f.seek(position)
+        cursor = position
+        record: list[str] = []
+        record_offset = position
+        has_more = False
+
+        def _flush() -> None:
+            if record:
+                entry = _entry(record_offset, record)
+                if log_filter.matches(entry["level"], entry["text"]):
+                    matched.append(entry)
+
+        while True:
+            raw = f.readline()
+            if not raw.endswith(b"\n"):
+                break  # EOF 或正在写入的半行
+            text = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+            if text and (parse_level(text) is not None or not record):
+                _flush()
+                if len(matched) >= limit or cursor - position >= MAX_SCAN_BYTES:
+                    record = []
+                    has_more = True
+                    break
+                record = [text]
+                record_offset = cursor
+            elif text:
+                record.append(text)
+            cursor += len(raw)
+        _flush()
+
+    return {
+        "entries": matched,
+        "next_cursor": cursor,
+        "has_more": has_more,
+        "file_size": size,
+    }
+
+
+def tail_text(path: Path, max_lines: int) -> str:
+    """返回文件最后 max_lines 行（反向分块读取）"""
+    lines: list[str] = []
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        for _, raw in _iter_lines_reverse(f, size):
+            if not lines and not raw:
+                continue  # 文件末尾的换行
+            lines.append(raw.decode("utf-8", errors="replace"))
+            if len(lines) >= max_lines:
+                break
+    lines.reverse()
+    return "\n".join(lines) + ("\n" if lines else "")
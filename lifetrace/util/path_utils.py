@@ -76,6 +76,42 @@ def get_vector_db_dir() -> Path:
     return Path(persist_dir)
 
 
+def get_llm_cache_path() -> Path:
+    """获取 LLM 响应缓存数据库路径
+
+    Returns:
+        Path: LLM 响应缓存数据库文件的绝对路径
+    """
+    db_path = settings.get("llm.response_cache.database_path", "llm_cache.db")
+    if not os.path.isabs(db_path):
+        return base_paths.get_user_data_dir() / db_path
+    return Path(db_path)
+
+
+def get_vision_cache_dir() -> Path:
+    """获取视觉图片载荷缓存目录
+
+    Returns:
+        Path: 视觉图片缓存目录的绝对路径
+    """
+    cache_dir = settings.get("llm.vision_image.cache_dir", "cache/vision_images")
+    if not os.path.isabs(cache_dir):
+        return base_paths.get_user_data_dir() / cache_dir
+    return Path(cache_dir)
+
+
+def get_thumbnails_dir() -> Path:
+    """获取截图缩略图缓存目录
+
+    Returns:
+        Path: 缩略图缓存目录的绝对路径
+    """
+    thumbnails_dir = settings.get("thumbnails.cache_dir", "cache/thumbnails")
+    if not os.path.isabs(thumbnails_dir):
+        return base_paths.get_user_data_dir() / thumbnails_dir
+    return Path(thumbnails_dir)
+
+
 def get_log_dir() -> Path:
     """获取日志目录（替代原有 log_path 属性）
 
@@ -0,0 +1,131 @@
+"""
+截图存储格式模块
+统一管理截图落盘的编码格式（PNG / WebP 无损 / WebP 有损 / AVIF）、扩展名与 MIME 类型，
+供录制器、转码任务与图片接口共用。
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, features
+
+from lifetrace.util.file_cache import atomic_write_bytes
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.settings import settings
+
+logger = get_logger()
+
+SUPPORTED_CODECS = ("png", "webp_lossless", "webp", "avif")
+CODEC_EXTENSIONS = {
+    "png": ".png",
+    "webp_lossless": ".webp",
+    "webp": ".webp",
+    "avif": ".avif",
+}
+# 截图目录中可能出现的全部图片扩展名（含历史 PNG 与外部导入的 JPEG）
+SCREENSHOT_EXTENSIONS = (".png", ".webp", ".avif", ".jpg", ".jpeg")
+IMAGE_MIME_TYPES = {
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+}
+
+
+@lru_cache(maxsize=1)
+def is_avif_supported() -> bool:
+    """检查当前 Pillow 是否支持 AVIF 编码（Pillow 11.3+ 内置，或安装 pillow-avif-plugin）"""
+    try:
+        if features.check("avif"):
+            return True
+    except ValueError:
+        # 旧版本 Pillow 不认识 avif 特性名
+        pass
+    try:
+        import pillow_avif  # noqa: F401, PLC0415
+    except ImportError:
+        return False
+    return True
+
+
+def get_screenshot_codec() -> str:
+    """读取配置的截图编码格式，不可用时回退（AVIF -> WebP 有损，未知 -> PNG）"""
+    codec = str(settings.get("screenshot_storage.codec", "png")).lower()
+    if codec not in SUPPORTED_CODECS:
+        _warn_once(f"不支持的截图编码格式 {codec}，使用 png")
+        return "png"
+    if codec == "avif" and not is_avif_supported():
+        _warn_once("当前 Pillow 不支持 AVIF 编码，截图改用 WebP 有损格式保存")
+        return "webp"
+    return codec
+
+
+@lru_cache(maxsize=8)
+def _warn_once(message: str) -> None:
+    logger.warning(message)
+
+
+def get_screenshot_extension(codec: str | None = None) -> str:
+    """获取编码格式对应的文件扩展名（含点号）"""
+    return CODEC_EXTENSIONS[codec or get_screenshot_codec()]
+
+
+def get_screenshot_quality() -> int:
+    """有损编码质量（1-100）"""
+    return min(max(int(settings.get("screenshot_storage.quality", 80)), 1), 100)
+
+
+def guess_image_mime_type(file_path: str | Path) -> str:
+    """根据扩展名推断图片 MIME 类型，未知时按 PNG 处理"""
+    return IMAGE_MIME_TYPES.get(os.path.splitext(str(file_path))[1].lower(), "image/png")
+
+
+def encode_screenshot(image: Image.Image, codec: str, quality: int | None = None) -> bytes:
+    """按指定格式编码截图
+
+    Args:
+        image: PIL 图片
+        codec: 编码格式（见 SUPPORTED_CODECS）
+        quality: 有损编码质量，默认读取配置
+
+    Returns:
+        编码后的图片字节
+    """
+    quality = quality if quality is not None else get_screenshot_quality()
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    if codec == "webp_lossless":
+        # method=4 在压缩率与编码耗时之间折中（6 最慢）
+        image.save(buffer, format="WEBP", lossless=True, quality=100, method=4)
+    elif codec == "webp":
+        image.save(buffer, format="WEBP", quality=quality, method=4)
+    elif codec == "avif":
+        image.save(buffer, format="AVIF", quality=quality)
+    else:
+        image.save(buffer, format="PNG", compress_level=6)
+    return buffer.getvalue()
+
+
+def save_rgb_screenshot(rgb: bytes, size: tuple[int, int], file_path: str, codec: str) -> None:
+    """将原始 RGB 截图数据按指定格式编码并写入磁盘"""
+    image = Image.frombytes("RGB", size, rgb)
+    atomic_write_bytes(Path(file_path), encode_screenshot(image, codec))
+
+
+def list_screenshot_files(directory: str | Path) -> list[Path]:
+    """列出目录下所有支持格式的截图文件（不递归）"""
+    path = Path(directory)
+    if not path.exists():
+        return []
+    return [
+        file_path
+        for file_path in path.iterdir()
+        if file_path.is_file() and file_path.suffix.lower() in SCREENSHOT_EXTENSIONS
+    ]
@@ -99,6 +99,13 @@ settings = Dynaconf(
         Validator("database_path", default="lifetrace.db"),
         Validator("screenshots_dir", default="screenshots/"),
         Validator("attachments_dir", default="attachments/"),
+        # 截图存储格式
+        Validator("screenshot_storage.codec", default="png"),
+        Validator("screenshot_storage.quality", default=80, is_type_of=int),
+        # 缩略图配置
+        Validator("thumbnails.quality", default=75, is_type_of=int),
+        Validator("thumbnails.cache_dir", default="cache/thumbnails"),
+        Validator("thumbnails.generate_on_capture", default=False, is_type_of=bool),
         # 日志配置
         Validator("logging.level", default="INFO"),
         Validator("logging.log_path", default="logs/"),
@@ -122,6 +129,19 @@ settings = Dynaconf(
         Validator("llm.vision_model", default="qwen3-vl-plus"),
         Validator("llm.temperature", default=0.7),
         Validator("llm.max_tokens", default=2048, is_type_of=int),
+        Validator("llm.context_budget.max_tokens", default=6000, is_type_of=int),
+        Validator("llm.context_budget.per_record_max_tokens", default=200, is_type_of=int),
+        Validator("llm.context_budget.tokenizer", default="auto"),
+        Validator("llm.response_cache.enabled", default=True, is_type_of=bool),
+        Validator("llm.response_cache.database_path", default="llm_cache.db"),
+        Validator("llm.response_cache.ttl_seconds", default=604800, is_type_of=int),
+        Validator("llm.response_cache.max_entries", default=5000, is_type_of=int),
+        Validator("llm.vision_image.max_dimension", default=1600, is_type_of=int),
+        Validator("llm.vision_image.format", default="jpeg"),
+        Validator("llm.vision_image.quality", default=80, is_type_of=int),
+        Validator("llm.vision_image.use_roi", default=False, is_type_of=bool),
+        Validator("llm.vision_image.cache_dir", default="cache/vision_images"),
+        Validator("llm.vision_image.max_workers", default=4, is_type_of=int),
         # Tavily 配置（联网搜索）
         Validator("tavily.api_key", default="YOUR_TAVILY_API_KEY_HERE"),
         Validator("tavily.search_depth", default="basic"),
@@ -3,19 +3,23 @@ Token使用量记录器
 记录LLM API调用的token使用情况，便于后续统计分析
 """
 
-from datetime import timedelta
+import atexit
+import threading
 from functools import lru_cache
 from typing import Any
 
 from lifetrace.storage import get_session
-from lifetrace.storage.models import TokenUsage
-from lifetrace.storage.sql_utils import col
+from lifetrace.util.llm_response_cache import get_llm_response_cache
 from lifetrace.util.logging_config import get_logger
 from lifetrace.util.settings import settings
 from lifetrace.util.time_utils import get_utc_now
+from lifetrace.util.token_usage_stats import query_usage_stats, write_usage_batch
 
 logger = get_logger()
 
+# 写入失败时缓冲中最多保留的记录数
+MAX_BUFFERED_RECORDS = 10000
+
 
 def _resolve_model_price(
     model: str,
@@ -68,12 +72,35 @@ def _resolve_model_price(
 
 
 class TokenUsageLogger:
-    """Token使用量记录器"""
+    """Token使用量记录器
 
-    def __init__(self):
-        pass
+    记录先进入内存缓冲，由后台线程按时间间隔或缓冲条数批量写入数据库，
+    避免每次 LLM 调用都单独开启事务与截图等热路径争用写锁。
+    """
 
-    def _get_model_price(self, model: str, input_tokens: int | None = None) -> tuple[float, float]:
+    def __init__(self, flush_interval: float | None = None, batch_size: int | None = None):
+        self.flush_interval = float(
+            flush_interval
+            if flush_interval is not None
+            else settings.get("llm.token_usage.flush_interval", 5)
+        )
+        self.batch_size = max(
+            1,
+            int(
+                batch_size
+                if batch_size is not None
+                else settings.get("llm.token_usage.batch_size", 50)
+            ),
+        )
+        self._buffer: list[dict[str, Any]] = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+        atexit.register(self.close)
+
+    def get_model_price(self, model: str, input_tokens: int | None = None) -> tuple[float, float]:
         """获取模型价格（元/千token）
 
         Args:
@@ -143,7 +170,7 @@ class TokenUsageLogger:
 
         try:
             # 计算成本
-            input_price, output_price = self._get_model_price(model, input_tokens)
+            input_price, output_price = self.get_model_price(model, input_tokens)
             input_cost = (input_tokens / 1000) * input_price
             output_cost = (output_tokens / 1000) * output_price
             total_cost = input_cost + output_cost
@@ -158,25 +185,25 @@ class TokenUsageLogger:
                 )
                 query_length = len(user_query)
 
-            # 写入数据库
-            with get_session() as session:
-                token_usage = TokenUsage(
-                    model=model,
-                    input_tokens=input_tokens,
-                    output_tokens=output_tokens,
-                    total_tokens=input_tokens + output_tokens,
-                    endpoint=endpoint,
-                    response_type=response_type,
-                    feature_type=feature_type,
-                    user_query_preview=user_query_preview,
-                    query_length=query_length,
-                    input_cost=input_cost,
-                    output_cost=output_cost,
-                    total_cost=total_cost,
-                    created_at=get_utc_now(),
-                )
-                session.add(token_usage)
-                session.flush()
+            now = get_utc_now()
+            self._enqueue(
+                {
+                    "model": model,
+                    "input_tokens": input_tokens,
+                    "output_tokens": output_tokens,
+                    "total_tokens": input_tokens + output_tokens,
+                    "endpoint": endpoint,
+                    "response_type": response_type,
+                    "feature_type": feature_type,
+                    "user_query_preview": user_query_preview,
+                    "query_length": query_length,
+                    "input_cost": input_cost,
+                    "output_cost": output_cost,
+                    "total_cost": total_cost,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
 
             # 记录到标准日志
             logger.info(
@@ -188,9 +215,76 @@ class TokenUsageLogger:
             # 记录错误但不影响主流程
             logger.error(f"Failed to log token usage: {e}")
 
+    # ===== 批量写入 =====
+
+    def _enqueue(self, row: dict[str, Any]) -> None:
+        if self.flush_interval <= 0:
+            # 关闭缓冲：立即写入
+            self._write_rows([row])
+            return
+        with self._buffer_lock:
+            self._buffer.append(row)
+            pending = len(self._buffer)
+        self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._buffer_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._flush_loop, name="TokenUsageWriter", daemon=True
+            )
+            self._thread.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """将缓冲中的记录写入数据库，返回写入条数"""
+        with self._flush_lock:
+            with self._buffer_lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return 0
+            if not self._write_rows(rows):
+                # 写入失败时放回缓冲等待下次重试（超过上限的最旧记录被丢弃）
+                with self._buffer_lock:
+                    self._buffer = (rows + self._buffer)[-MAX_BUFFERED_RECORDS:]
+                return 0
+            return len(rows)
+
+    def _write_rows(self, rows: list[dict[str, Any]]) -> bool:
+        try:
+            with get_session() as session:
+                write_usage_batch(session, rows)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to write token usage batch ({len(rows)} records): {e}")
+            return False
+
+    def close(self) -> None:
+        """停止后台线程并写入剩余记录"""
+        self._stop_event.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self._thread = None
+        self.flush()
+
+    # ===== 统计 =====
+
     def get_usage_stats(self, days: int = 30) -> dict[str, Any]:
         """
-        获取token使用统计
+        获取token使用统计（SQL 聚合 + 日汇总表）
 
         Args:
             days: 统计最近多少天的数据
@@ -199,106 +293,13 @@ class TokenUsageLogger:
             统计结果字典
         """
         try:
-            stats = {
-                "total_input_tokens": 0,
-                "total_output_tokens": 0,
-                "total_tokens": 0,
-                "total_requests": 0,
-                "total_cost": 0.0,
-                "model_stats": {},
-                "endpoint_stats": {},
-                "feature_stats": {},
-                "daily_stats": {},
-            }
-
-            end_date = get_utc_now()
-            start_date = end_date - timedelta(days=days)
-
-            # 从数据库查询
+            # 先写入缓冲中的记录，保证统计包含最新请求
+            self.flush()
             with get_session() as session:
-                # 查询时间范围内的所有记录
-                records = (
-                    session.query(TokenUsage)
-                    .filter(col(TokenUsage.created_at) >= start_date)
-                    .filter(col(TokenUsage.created_at) <= end_date)
-                    .all()
-                )
+                stats = query_usage_stats(session, days)
 
-                for record in records:
-                    # 更新总计
-                    stats["total_input_tokens"] += record.input_tokens
-                    stats["total_output_tokens"] += record.output_tokens
-                    stats["total_tokens"] += record.total_tokens
-                    stats["total_cost"] += record.total_cost
-                    stats["total_requests"] += 1
-
-                    # 按模型统计
-                    model = record.model
-                    if model not in stats["model_stats"]:
-                        stats["model_stats"][model] = {
-                            "input_tokens": 0,
-                            "output_tokens": 0,
-                            "total_tokens": 0,
-                            "requests": 0,
-                            "input_cost": 0.0,
-                            "output_cost": 0.0,
-                            "total_cost": 0.0,
-                        }
-                    stats["model_stats"][model]["input_tokens"] += record.input_tokens
-                    stats["model_stats"][model]["output_tokens"] += record.output_tokens
-                    stats["model_stats"][model]["total_tokens"] += record.total_tokens
-                    stats["model_stats"][model]["input_cost"] += record.input_cost
-                    stats["model_stats"][model]["output_cost"] += record.output_cost
-                    stats["model_stats"][model]["total_cost"] += record.total_cost
-                    stats["model_stats"][model]["requests"] += 1
-
-                    # 按端点统计
-                    endpoint = record.endpoint or "unknown"
-                    if endpoint not in stats["endpoint_stats"]:
-                        stats["endpoint_stats"][endpoint] = {
-                            "input_tokens": 0,
-                            "output_tokens": 0,
-                            "total_tokens": 0,
-                            "requests": 0,
-                            "total_cost": 0.0,
-                        }
-                    stats["endpoint_stats"][endpoint]["input_tokens"] += record.input_tokens
-                    stats["endpoint_stats"][endpoint]["output_tokens"] += record.output_tokens
-                    stats["endpoint_stats"][endpoint]["total_tokens"] += record.total_tokens
-                    stats["endpoint_stats"][endpoint]["total_cost"] += record.total_cost
-                    stats["endpoint_stats"][endpoint]["requests"] += 1
-
-                    # 按功能类型统计
-                    feature_type = record.feature_type or "unknown"
-                    if feature_type not in stats["feature_stats"]:
-                        stats["feature_stats"][feature_type] = {
-                            "input_tokens": 0,
-                            "output_tokens": 0,
-                            "total_tokens": 0,
-                            "requests": 0,
-                            "total_cost": 0.0,
-                        }
-                    stats["feature_stats"][feature_type]["input_tokens"] += record.input_tokens
-                    stats["feature_stats"][feature_type]["output_tokens"] += record.output_tokens
-                    stats["feature_stats"][feature_type]["total_tokens"] += record.total_tokens
-                    stats["feature_stats"][feature_type]["total_cost"] += record.total_cost
-                    stats["feature_stats"][feature_type]["requests"] += 1
-
-                    # 按日期统计
-                    date_str = record.created_at.strftime("%Y-%m-%d")
-                    if date_str not in stats["daily_stats"]:
-                        stats["daily_stats"][date_str] = {
-                            "input_tokens": 0,
-                            "output_tokens": 0,
-                            "total_tokens": 0,
-                            "requests": 0,
-                            "total_cost": 0.0,
-                        }
-                    stats["daily_stats"][date_str]["input_tokens"] += record.input_tokens
-                    stats["daily_stats"][date_str]["output_tokens"] += record.output_tokens
-                    stats["daily_stats"][date_str]["total_tokens"] += record.total_tokens
-                    stats["daily_stats"][date_str]["total_cost"] += record.total_cost
-                    stats["daily_stats"][date_str]["requests"] += 1
+            # LLM 响应缓存命中统计（命中的请求不会产生 TokenUsage 记录）
+            stats["cache_stats"] = get_llm_response_cache().get_stats(days=days)
 
             return stats
 
@@ -321,6 +322,12 @@ def setup_token_logger() -> TokenUsageLogger:
     return get_token_logger()
 
 
+def shutdown_token_logger() -> None:
+    """写入缓冲中的记录并停止后台线程（仅在记录器已创建时）"""
+    if get_token_logger.cache_info().currsize:
+        get_token_logger().close()
+
+
 def log_token_usage(model: str, input_tokens: int, output_tokens: int, **kwargs):
     """便捷函数：记录token使用量
 
@@ -0,0 +1,173 @@
+"""
+Token使用量的批量写入与 SQL 聚合统计
+
+- 明细表 token_usage 批量插入，同一事务内把增量累加到日汇总表 token_usage_daily
+- 统计时完整的天直接读取日汇总表，只有窗口起始的不完整那一天用明细表 GROUP BY，
+  查询量为 O(天数 × 模型/端点/功能组合数)，与请求条数无关
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, time, timedelta
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import func, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from lifetrace.storage.models import TokenUsage, TokenUsageDaily
+from lifetrace.storage.sql_utils import col
+from lifetrace.util.time_utils import get_utc_now
+
+if TYPE_CHECKING:
+    from sqlmodel import Session
+
+UNKNOWN_KEY = "unknown"
+SUM_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "total_tokens",
+    "input_cost",
+    "output_cost",
+    "total_cost",
+)
+
+
+def _day_of(created_at: datetime) -> str:
+    """UTC 日期字符串（与 SQLite date(created_at) 一致）"""
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(UTC)
+    return created_at.strftime("%Y-%m-%d")
+
+
+def _rollup_key(row: dict[str, Any]) -> tuple[str, str, str, str]:
+    return (
+        _day_of(row["created_at"]),
+        row["model"],
+        row.get("endpoint") or UNKNOWN_KEY,
+        row.get("feature_type") or UNKNOWN_KEY,
+    )
+
+
+def write_usage_batch(session: Session, rows: list[dict[str, Any]]) -> None:
+    """批量插入明细记录，并累加到日汇总表"""
+    if not rows:
+        return
+    session.execute(insert(TokenUsage), rows)
+
+    deltas: dict[tuple[str, str, str, str], dict[str, Any]] = {}
+    for row in rows:
+        delta = deltas.setdefault(_rollup_key(row), {"requests": 0, **dict.fromkeys(SUM_FIELDS, 0)})
+        delta["requests"] += 1
+        for field in SUM_FIELDS:
+            delta[field] += row.get(field) or 0
+
+    now = get_utc_now()
+    for (day, model, endpoint, feature_type), delta in deltas.items():
+        stmt = sqlite_insert(TokenUsageDaily).values(
+            day=day,
+            model=model,
+            endpoint=endpoint,
+            feature_type=feature_type,
+            updated_at=now,
+            **delta,
+        )
+        increments = {
+            field: getattr(TokenUsageDaily, field) + getattr(stmt.excluded, field)
+            for field in ("requests", *SUM_FIELDS)
+        }
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["day", "model", "endpoint", "feature_type"],
+                set_={**increments, "updated_at": now},
+            )
+        )
+
+
+def _empty_bucket(with_split_cost: bool = False) -> dict[str, Any]:
+    bucket: dict[str, Any] = {
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "total_tokens": 0,
+        "requests": 0,
+    }
+    if with_split_cost:
+        bucket["input_cost"] = 0.0
+        bucket["output_cost"] = 0.0
+    bucket["total_cost"] = 0.0
+    return bucket
+
+
+def _accumulate(stats: dict[str, Any], row: Any) -> None:
+    """把一行分组结果累加到各维度统计中"""
+    stats["total_input_tokens"] += row.input_tokens or 0
+    stats["total_output_tokens"] += row.output_tokens or 0
+    stats["total_tokens"] += row.total_tokens or 0
+    stats["total_cost"] += row.total_cost or 0.0
+    stats["total_requests"] += row.requests
+
+    targets = (
+        ("model_stats", row.model, True),
+        ("endpoint_stats", row.endpoint, False),
+        ("feature_stats", row.feature_type, False),
+        ("daily_stats", row.day, False),
+    )
+    for group, key, with_split_cost in targets:
+        bucket = stats[group].setdefault(key, _empty_bucket(with_split_cost))
+        for field in bucket:
+            value = row.requests if field == "requests" else getattr(row, field)
+            bucket[field] += value or 0
+
+
+def query_usage_stats(session: Session, days: int) -> dict[str, Any]:
+    """统计最近 days 天的 token 使用量（按模型/端点/功能/日期）"""
+    stats: dict[str, Any] = {
+        "total_input_tokens": 0,
+        "total_output_tokens": 0,
+        "total_tokens": 0,
+        "total_requests": 0,
+        "total_cost": 0.0,
+        "model_stats": {},
+        "endpoint_stats": {},
+        "feature_stats": {},
+        "daily_stats": {},
+    }
+
+    start_date = get_utc_now() - timedelta(days=days)
+    first_full_day = start_date.date() + timedelta(days=1)
+
+    # 窗口起始的不完整那一天：明细表按日期/维度分组
+    day = func.date(col(TokenUsage.created_at))
+    endpoint = func.coalesce(col(TokenUsage.endpoint), UNKNOWN_KEY)
+    feature_type = func.coalesce(col(TokenUsage.feature_type), UNKNOWN_KEY)
+    partial_rows = (
+        session.query(
+            day.label("day"),
+            col(TokenUsage.model).label("model"),
+            endpoint.label("endpoint"),
+            feature_type.label("feature_type"),
+            func.count().label("requests"),
+            *(func.sum(getattr(TokenUsage, field)).label(field) for field in SUM_FIELDS),
+        )
+        .filter(col(TokenUsage.created_at) >= start_date)
+        .filter(col(TokenUsage.created_at) < datetime.combine(first_full_day, time(), UTC))
+        .group_by(day, col(TokenUsage.model), endpoint, feature_type)
+        .all()
+    )
+
+    # 完整的天：日汇总表已按 (day, model, endpoint, feature_type) 唯一
+    daily_rows = (
+        session.query(
+            col(TokenUsageDaily.day).label("day"),
+            col(TokenUsageDaily.model).label("model"),
+            col(TokenUsageDaily.endpoint).label("endpoint"),
+            col(TokenUsageDaily.feature_type).label("feature_type"),
+            col(TokenUsageDaily.requests).label("requests"),
+            *(getattr(TokenUsageDaily, field).label(field) for field in SUM_FIELDS),
+        )
+        .filter(col(TokenUsageDaily.day) >= first_full_day.isoformat())
+        .all()
+    )
+
+    for row in (*partial_rows, *daily_rows):
+        _accumulate(stats, row)
+    return stats
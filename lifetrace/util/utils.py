@@ -440,12 +440,14 @@ def format_file_size(size_bytes: int) -> str:
     return f"{size_value:.1f} {size_names[i]}"
 
 
-def get_screenshot_filename(screen_id: int = 0, timestamp: datetime | None = None) -> str:
-    """生成截图文件名"""
+def get_screenshot_filename(
+    screen_id: int = 0, timestamp: datetime | None = None, extension: str = ".png"
+) -> str:
+    """生成截图文件名（extension 含点号，由截图存储格式决定）"""
     if timestamp is None:
         timestamp = get_utc_now()
 
-    return f"screen_{screen_id}_{timestamp.strftime('%Y%m%d_%H%M%S_%f')[:-3]}.png"
+    return f"screen_{screen_id}_{timestamp.strftime('%Y%m%d_%H%M%S_%f')[:-3]}{extension}"
 
 
 def cleanup_old_files(directory: str, max_days: int):
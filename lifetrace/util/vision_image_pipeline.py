@@ -0,0 +1,291 @@
+"""
+视觉图片预处理管线
+为视觉模型调用准备截图载荷，替代直接读取全分辨率 PNG 再做 base64 编码的方式：
+
+- 按最大边长等比缩放，并以 JPEG/WebP 按配置质量重新编码
+- 可选：对微信/飞书截图使用主动 OCR 的先验配置裁切聊天区域（ROI）
+- 磁盘缓存：按 (截图ID, 文件 mtime/大小, 处理参数) 缓存处理后的载荷
+- 多图请求并行处理
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from PIL import Image
+
+from lifetrace.util.file_cache import atomic_write_bytes, prune_cache_dir, touch
+from lifetrace.util.logging_config import get_logger
+from lifetrace.util.path_utils import get_vision_cache_dir
+from lifetrace.util.screenshot_codec import guess_image_mime_type
+from lifetrace.util.settings import settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+logger = get_logger()
+
+# 每写入多少个缓存文件检查一次缓存目录容量
+CACHE_PRUNE_INTERVAL = 20
+ENCODED_MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+
+@dataclass(frozen=True)
+class VisionImageOptions:
+    """图片处理参数"""
+
+    max_dimension: int = 1600
+    format: str = "jpeg"  # jpeg / webp / original（原样透传）
+    quality: int = 80
+    use_roi: bool = False
+
+    def cache_token(self) -> str:
+        """参与缓存键计算的参数串"""
+        return f"{self.max_dimension}:{self.format}:{self.quality}:{int(self.use_roi)}"
+
+
+@dataclass
+class PreparedImage:
+    """处理后的图片载荷"""
+
+    screenshot_id: int
+    data_uri: str
+    mime_type: str
+    original_bytes: int
+    payload_bytes: int
+    cached: bool = False
+    roi_applied: bool = False
+
+
+def encode_image(image: Image.Image, options: VisionImageOptions) -> bytes:
+    """按参数缩放并重新编码图片
+
+    Args:
+        image: PIL 图片
+        options: 处理参数
+
+    Returns:
+        编码后的图片字节
+    """
+    if options.max_dimension > 0 and max(image.size) > options.max_dimension:
+        image = image.copy()
+        image.thumbnail((options.max_dimension, options.max_dimension), Image.Resampling.LANCZOS)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    if options.format == "webp":
+        image.save(buffer, format="WEBP", quality=options.quality, method=4)
+    else:
+        image.save(buffer, format="JPEG", quality=options.quality, optimize=True)
+    return buffer.getvalue()
+
+
+def _crop_roi(image: Image.Image, screenshot: dict[str, Any]) -> Image.Image | None:
+    """使用主动 OCR 的应用先验裁切聊天区域，非微信/飞书截图返回 None"""
+    # 延迟导入：proactive_ocr 包会间接导入 LLM 模块，顶层导入会形成循环依赖
+    import numpy as np  # noqa: PLC0415
+
+    from lifetrace.jobs.proactive_ocr.models import AppType, BBox, WindowMeta  # noqa: PLC0415
+    from lifetrace.jobs.proactive_ocr.roi import get_roi_extractor  # noqa: PLC0415
+    from lifetrace.jobs.proactive_ocr.router import get_router  # noqa: PLC0415
+
+    window = WindowMeta(
+        hwnd=0,
+        title=screenshot.get("window_title") or "",
+        process_name=screenshot.get("app_name") or "",
+        pid=0,
+        rect=BBox(x=0, y=0, width=image.width, height=image.height),
+    )
+    app_type, _ = get_router().identify_app(window)
+    if app_type == AppType.UNKNOWN:
+        return None
+    cropped, _ = get_roi_extractor().extract_chat_region(np.asarray(image.convert("RGB")), app_type)
+    return Image.fromarray(cropped)
+
+
+def _default_lookup(screenshot_id: int) -> dict[str, Any] | None:
+    from lifetrace.storage import screenshot_mgr  # noqa: PLC0415
+
+    return screenshot_mgr.get_screenshot_by_id(screenshot_id)
+
+
+class VisionImagePipeline:
+    """视觉图片预处理管线（线程安全）"""
+
+    def __init__(
+        self,
+        cache_dir: Path | str | None,
+        lookup: Callable[[int], dict[str, Any] | None] | None = None,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._lookup = lookup or _default_lookup
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+
+    # ===== 配置 =====
+
+    def _config(self) -> dict[str, Any]:
+        config = settings.get("llm.vision_image") or {}
+        if hasattr(config, "to_dict"):
+            config = config.to_dict()
+        return config
+
+    def get_options(self) -> VisionImageOptions:
+        """从配置读取当前处理参数"""
+        config = self._config()
+        image_format = str(config.get("format", "jpeg")).lower()
+        if image_format not in ("jpeg", "webp", "original"):
+            logger.warning(f"不支持的视觉图片格式 {image_format}，回退为 jpeg")
+            image_format = "jpeg"
+        return VisionImageOptions(
+            max_dimension=int(config.get("max_dimension", 1600)),
+            format=image_format,
+            quality=min(max(int(config.get("quality", 80)), 1), 100),
+            use_roi=bool(config.get("use_roi", False)),
+        )
+
+    # ===== 单图处理 =====
+
+    def prepare(
+        self, screenshot_id: int, options: VisionImageOptions | None = None
+    ) -> PreparedImage | None:
+        """准备单张截图的载荷，截图不存在或处理失败时返回 None"""
+        options = options or self.get_options()
+        try:
+            screenshot = self._lookup(screenshot_id)
+            if not screenshot:
+                logger.warning(f"截图 {screenshot_id} 不存在")
+                return None
+            file_path = screenshot.get("file_path")
+            if not file_path or not os.path.exists(file_path):
+                logger.warning(f"截图文件不存在: {file_path}")
+                return None
+            if options.format == "original":
+                return self._passthrough(screenshot_id, file_path)
+            return self._prepare_encoded(screenshot_id, screenshot, file_path, options)
+        except Exception as e:
+            logger.error(f"准备截图 {screenshot_id} 的视觉载荷失败: {e}")
+            return None
+
+    def _passthrough(self, screenshot_id: int, file_path: str) -> PreparedImage:
+        with open(file_path, "rb") as f:
+            data = f.read()
+        mime_type = guess_image_mime_type(file_path)
+        return self._build(screenshot_id, data, mime_type, len(data))
+
+    def _prepare_encoded(
+        self,
+        screenshot_id: int,
+        screenshot: dict[str, Any],
+        file_path: str,
+        options: VisionImageOptions,
+    ) -> PreparedImage:
+        stat = os.stat(file_path)
+        mime_type = ENCODED_MIME_TYPES[options.format]
+        cache_path = self._cache_path(screenshot_id, stat, options)
+        if cache_path is not None and cache_path.exists():
+            data = cache_path.read_bytes()
+            touch(cache_path)
+            prepared = self._build(screenshot_id, data, mime_type, stat.st_size)
+            prepared.cached = True
+            return prepared
+
+        roi_applied = False
+        with Image.open(file_path) as image:
+            image.load()
+            source = image
+            if options.use_roi:
+                try:
+                    cropped = _crop_roi(image, screenshot)
+                except Exception as e:
+                    logger.warning(f"截图 {screenshot_id} ROI 裁切失败，使用整图: {e}")
+                    cropped = None
+                if cropped is not None:
+                    source, roi_applied = cropped, True
+            data = encode_image(source, options)
+
+        if cache_path is not None:
+            self._write_cache(cache_path, data)
+        prepared = self._build(screenshot_id, data, mime_type, stat.st_size)
+        prepared.roi_applied = roi_applied
+        return prepared
+
+    @staticmethod
+    def _build(
+        screenshot_id: int, data: bytes, mime_type: str, original_bytes: int
+    ) -> PreparedImage:
+        data_uri = f"data:{mime_type};base64,{base64.b64encode(data).decode('utf-8')}"
+        return PreparedImage(
+            screenshot_id=screenshot_id,
+            data_uri=data_uri,
+            mime_type=mime_type,
+            original_bytes=original_bytes,
+            payload_bytes=len(data_uri),
+        )
+
+    # ===== 批量处理 =====
+
+    def prepare_many(self, screenshot_ids: list[int]) -> list[PreparedImage | None]:
+        """并行准备多张截图的载荷，结果顺序与输入一致"""
+        if not screenshot_ids:
+            return []
+        options = self.get_options()
+        max_workers = max(1, int(self._config().get("max_workers", 4)))
+        if len(screenshot_ids) == 1 or max_workers == 1:
+            return [self.prepare(screenshot_id, options) for screenshot_id in screenshot_ids]
+        with ThreadPoolExecutor(
+            max_workers=min(max_workers, len(screenshot_ids)),
+            thread_name_prefix="vision-image",
+        ) as executor:
+            return list(
+                executor.map(
+                    lambda screenshot_id: self.prepare(screenshot_id, options), screenshot_ids
+                )
+            )
+
+    # ===== 磁盘缓存 =====
+
+    def _cache_path(
+        self, screenshot_id: int, stat: os.stat_result, options: VisionImageOptions
+    ) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        raw = f"{screenshot_id}:{stat.st_mtime_ns}:{stat.st_size}:{options.cache_token()}"
+        digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+        extension = "webp" if options.format == "webp" else "jpg"
+        return self.cache_dir / f"{screenshot_id}_{digest}.{extension}"
+
+    def _write_cache(self, cache_path: Path, data: bytes) -> None:
+        try:
+            atomic_write_bytes(cache_path, data)
+        except OSError as e:
+            logger.warning(f"写入视觉图片缓存失败: {e}")
+            return
+        with self._lock:
+            self._writes_since_prune += 1
+            if self._writes_since_prune < CACHE_PRUNE_INTERVAL:
+                return
+            self._writes_since_prune = 0
+        self.prune_cache()
+
+    def prune_cache(self) -> int:
+        """缓存目录超出容量上限时删除最久未使用的文件，返回删除的文件数"""
+        if self.cache_dir is None:
+            return 0
+        max_mb = float(self._config().get("cache_max_mb", 200))
+        return prune_cache_dir(self.cache_dir, int(max_mb * 1024 * 1024))
+
+
+@lru_cache(maxsize=1)
+def get_vision_image_pipeline() -> VisionImagePipeline:
+    """获取全局视觉图片预处理管线"""
+    return VisionImagePipeline(get_vision_cache_dir())
@@ -1,8 +1,44 @@
 from __future__ import annotations
 
 import sys
+from contextlib import contextmanager
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
 
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+class MemoryDatabase:
+    """内存 SQLite 数据库，提供与 DatabaseBase 相同的 engine / get_session 接口"""
+
+    def __init__(self):
+        self.engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        SQLModel.metadata.create_all(self.engine)
+
+    @contextmanager
+    def get_session(self):
+        with Session(self.engine) as session:
+            try:
+                yield session
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+
+
+@pytest.fixture
+def memory_db() -> Iterator[MemoryDatabase]:
+    db = MemoryDatabase()
+    yield db
+    db.engine.dispose()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from lifetrace.llm.agent_pool import AgentInstancePool, make_pool_key
+
+MAX_KEYS = 2
+
+
+def _pool() -> tuple[AgentInstancePool, list]:
+    built: list = []
+
+    def factory(key):
+        built.append(key)
+        return object()
+
+    return AgentInstancePool(factory, max_keys=MAX_KEYS, max_idle_per_key=1), built
+
+
+def test_pool_reuses_instances_and_discards_after_invalidate() -> None:
+    pool, built = _pool()
+    key = make_pool_key("zh", ["b", "a"], None, None)
+    assert key == make_pool_key("zh", ["a", "b"], [], {})
+
+    with pool.lease(key) as first:
+        pass
+    with pool.lease(key) as second:
+        assert second is first
+    assert (pool.hits, pool.misses) == (1, 1)
+
+    # 借出期间失效：旧实例归还时被丢弃，下次重新构建
+    instance, generation = pool.acquire(key)
+    pool.invalidate("test")
+    pool.release(key, instance, generation)
+    with pool.lease(key) as third:
+        assert third is not first
+    assert len(built) == 2  # noqa: PLR2004
+
+
+def test_pool_evicts_least_recently_used_keys() -> None:
+    pool, built = _pool()
+    keys = [make_pool_key(lang, [], [], None) for lang in ("zh", "en", "ja")]
+    for key in keys:
+        with pool.lease(key):
+            pass
+
+    assert pool.metrics()["keys"] == MAX_KEYS
+    with pool.lease(keys[0]):
+        pass
+    assert built.count(keys[0]) == 2  # noqa: PLR2004
+
+
+def test_first_token_latency_skips_tool_events() -> None:
+    pool, _ = _pool()
+    chunks = ["[TOOL]call", "", "你好", "。"]
+
+    out = list(pool.stream_with_metrics(chunks, is_content=lambda c: not c.startswith("[TOOL]")))
+
+    assert out == chunks
+    assert pool.metrics()["first_token"]["count"] == 1
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import httpx
+from openai import BadRequestError
+
+from lifetrace.llm.agent_tool_calling import (
+    ToolCall,
+    consume_tool_stream,
+    is_tools_rejection,
+    run_tool_calls,
+)
+from lifetrace.llm.tools.base import ToolResult
+
+SLEEP_SECONDS = 0.2
+
+
+def _chunk(content=None, tool_calls=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def _tool_delta(index, call_id=None, name=None, arguments=None):
+    function = SimpleNamespace(name=name, arguments=arguments)
+    return SimpleNamespace(index=index, id=call_id, function=function)
+
+
+def _drain(generator):
+    chunks = []
+    try:
+        while True:
+            chunks.append(next(generator))
+    except StopIteration as stop:
+        return chunks, stop.value
+
+
+def test_consume_tool_stream_merges_fragmented_calls() -> None:
+    stream = [
+        _chunk(content="好的"),
+        _chunk(tool_calls=[_tool_delta(0, "a", "web_search", '{"query": '), _tool_delta(1, "b")]),
+        _chunk(tool_calls=[_tool_delta(0, arguments='"天气"}'), _tool_delta(1, name="todo")]),
+        _chunk(tool_calls=[_tool_delta(1, arguments="not json")]),
+    ]
+
+    chunks, (content, calls) = _drain(consume_tool_stream(stream))
+
+    assert chunks == ["好的"] and content == "好的"
+    assert [(c.id, c.name) for c in calls] == [("a", "web_search"), ("b", "todo")]
+    assert calls[0].arguments == {"query": "天气"}
+    assert calls[1].error is not None
+
+
+def test_run_tool_calls_overlaps_and_times_out() -> None:
+    def execute(name: str, params: dict) -> ToolResult:
+        time.sleep(params["seconds"])
+        return ToolResult(success=True, content=name)
+
+    calls = [
+        ToolCall.from_raw(i, "", f"tool{i}", f'{{"seconds": {seconds}}}')
+        for i, seconds in enumerate([SLEEP_SECONDS, SLEEP_SECONDS, 5])
+    ]
+    started = time.perf_counter()
+
+    progress, outcomes = _drain(run_tool_calls(calls, execute, timeout=SLEEP_SECONDS * 2))
+
+    elapsed = time.perf_counter() - started
+    assert elapsed < SLEEP_SECONDS * 3  # 两个 0.2 秒的工具并行执行，慢工具在超时后放弃
+    assert [o.result.success for o in outcomes] == [True, True, False]
+    assert sum("[使用工具:" in p for p in progress) == len(calls)
+    assert any("超时" in p for p in progress)
+
+
+def _bad_request(message: str, param: str | None = None) -> BadRequestError:
+    response = httpx.Response(400, request=httpx.Request("POST", "http://llm.test/v1"))
+    body = {"message": message, "param": param, "code": "invalid_request_error"}
+    return BadRequestError(message, response=response, body=body)
+
+
+def test_only_tools_related_errors_disable_native_calling() -> None:
+    assert is_tools_rejection(_bad_request("Unrecognized request argument", param="tools"))
+    assert is_tools_rejection(_bad_request("tool_choice is not supported by this model"))
+    assert not is_tools_rejection(_bad_request("maximum context length exceeded"))
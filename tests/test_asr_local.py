@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+
+from lifetrace.scripts.benchmark_asr import synthesize
+from lifetrace.services.asr_local import LocalASRClient, benchmark_real_time_factor
+from lifetrace.services.asr_vad import VadChunker, VadConfig
+
+SAMPLE_RATE = 16000
+LOUD = 5000
+SENTENCES = 2
+
+
+def _pcm(seconds: float, amplitude: int) -> bytes:
+    return np.full(int(seconds * SAMPLE_RATE), amplitude, dtype="<i2").tobytes()
+
+
+def _speech() -> bytes:
+    """两句话：1.5 秒语音 + 1.5 秒静音，重复两次"""
+    sentence = _pcm(1.5, LOUD) + _pcm(1.5, 0)
+    return sentence * SENTENCES
+
+
+def _config() -> VadConfig:
+    return VadConfig(max_sentence_silence_ms=600, partial_interval_ms=500, pre_roll_ms=90)
+
+
+def test_vad_chunker_emits_partials_and_trimmed_finals() -> None:
+    chunker = VadChunker(SAMPLE_RATE, _config())
+    pcm = _speech()
+    segments = []
+    # 奇数大小的块，验证跨块拼帧
+    for offset in range(0, len(pcm), 777):
+        segments += chunker.feed(pcm[offset : offset + 777])
+    segments += chunker.flush()
+
+    finals = [s for s in segments if s.is_final]
+    assert [s.index for s in finals] == list(range(SENTENCES))
+    assert all(abs(s.duration_seconds - 1.5) < 0.1 for s in finals)  # noqa: PLR2004
+    assert any(not s.is_final for s in segments)
+    assert chunker.flush() == []
+
+
+def test_local_client_streams_results_in_order() -> None:
+    client = LocalASRClient(
+        "mock", {"delay_seconds": 0.01}, sample_rate=SAMPLE_RATE, vad_config=_config()
+    )
+    results: list[tuple[str, bool]] = []
+    pcm = _speech() + _pcm(1.0, LOUD)  # 结尾未说完的一句在流结束时输出
+
+    async def stream():
+        for offset in range(0, len(pcm), 3200):
+            yield pcm[offset : offset + 3200]
+            await asyncio.sleep(0)
+
+    try:
+        asyncio.run(client.transcribe_stream(stream(), lambda t, f: results.append((t, f))))
+        report = benchmark_real_time_factor(client, synthesize(9.0))
+    finally:
+        client.shutdown()
+
+    finals = [text for text, final in results if final]
+    assert finals == ["语音1.5秒", "语音1.5秒", "语音1.0秒"]
+    assert results[-1] == ("语音1.0秒", True)
+    assert report["final_results"] == SENTENCES
+    assert 0 < report["rtf"] < 1
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+
+from lifetrace.llm.batch_runner import BatchItem, BatchLLMRunner, chunk_text
+
+CONCURRENCY = 3
+ITEMS = 8
+CHUNK_CHARS = 20
+
+
+def _runner(tmp_path) -> BatchLLMRunner:
+    return BatchLLMRunner(
+        "test_job",
+        concurrency=CONCURRENCY,
+        requests_per_minute=0,
+        chunk_chars=CHUNK_CHARS,
+        chunk_overlap=6,
+        checkpoint_path=tmp_path / "job.jsonl",
+    )
+
+
+def test_chunk_text_respects_size_and_sentence_overlap() -> None:
+    text = "第一句话。第二句话。第三句话比较长一些。第四句。" * 2
+
+    chunks = chunk_text(text, CHUNK_CHARS, overlap_chars=6)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= CHUNK_CHARS for chunk in chunks)
+    assert chunks[2].startswith("第二句话。")  # 上一块末句作为重叠上下文
+    assert chunk_text("短文本", CHUNK_CHARS) == ["短文本"]
+    assert chunk_text("   ", CHUNK_CHARS) == []
+
+
+def test_runner_bounds_concurrency_and_checkpoints(tmp_path) -> None:
+    items = [
+        BatchItem(key=str(i), text=f"第{i}项。" + "内容很长的一句话。" * (i % 2 + 1))
+        for i in range(ITEMS)
+    ]
+    active = [0, 0]
+    committed: dict[str, list] = {}
+
+    async def map_chunk(item: BatchItem, chunk: str) -> str:
+        active[0] += 1
+        active[1] = max(active[1], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        if item.key == "3" and "fail" not in committed:
+            committed["fail"] = []
+            raise RuntimeError("temporary")
+        return chunk
+
+    def commit(item: BatchItem, result: list[str]) -> dict[str, int]:
+        committed[item.key] = result
+        return {"chunks": len(result)}
+
+    runner = _runner(tmp_path)
+    stats = asyncio.run(
+        runner.run(items, map_chunk=map_chunk, reduce=lambda _i, r: r, commit=commit)
+    )
+
+    assert active[1] == CONCURRENCY
+    assert stats["done"] == ITEMS - 1
+    assert stats["failed"] == 1
+    assert len(committed["1"]) > 1  # 长文本被切块
+
+    # 重新运行只处理上次失败的项
+    rerun = _runner(tmp_path)
+    assert [item.key for item in rerun.pending(items)] == ["3"]
+    stats = asyncio.run(rerun.run(items, map_chunk=map_chunk, commit=commit))
+    assert (stats["done"], stats["failed"], stats["skipped"]) == (1, 0, ITEMS - 1)
+    assert rerun.pending(items) == []
+
+
+def test_estimate_uses_prices_and_output_ratio(tmp_path, monkeypatch) -> None:
+    class _Prices:
+        def get_model_price(self, _model, _input_tokens=None):
+            return 1.0, 2.0
+
+    monkeypatch.setattr("lifetrace.util.token_usage_logger.get_token_logger", _Prices)
+    runner = _runner(tmp_path)
+    items = [BatchItem(key="a", text="一" * 10), BatchItem(key="b", text="二" * 10)]
+
+    estimate = runner.estimate(items, model="m", prompt_tokens=90, output_ratio=0.5)
+
+    assert estimate["calls"] == len(items)
+    assert estimate["input_tokens"] == 200  # noqa: PLR2004
+    assert estimate["output_tokens"] == 100  # noqa: PLR2004
+    assert estimate["estimated_cost"] == 0.4  # noqa: PLR2004
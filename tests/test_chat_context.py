@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from lifetrace.repositories.sql_chat_repository import SqlChatRepository
+from lifetrace.services import chat_service
+from lifetrace.services.chat_service import ChatService, SessionContextCache
+
+if TYPE_CHECKING:
+    from tests.conftest import MemoryDatabase
+
+KEEP = 3
+
+
+def _service(monkeypatch, db: MemoryDatabase) -> tuple[ChatService, list[str]]:
+    monkeypatch.setattr(chat_service, "MAX_CONTEXT_LENGTH", KEEP)
+    monkeypatch.setattr(chat_service, "_context_cache", SessionContextCache(max_sessions=2))
+    repository = SqlChatRepository(db)
+    reads: list[str] = []
+    original = repository.get_context_entries
+
+    def counting_get(session_id: str, limit: int):
+        reads.append(session_id)
+        return original(session_id, limit)
+
+    repository.get_context_entries = counting_get  # type: ignore[method-assign]
+    return ChatService(repository), reads
+
+
+def test_context_is_appended_windowed_and_cached(monkeypatch, memory_db) -> None:
+    service, reads = _service(monkeypatch, memory_db)
+    for i in range(5):
+        service.add_to_session_context("s1", "user", f"m{i}")
+
+    assert [e["content"] for e in service.get_session_context("s1")] == ["m2", "m3", "m4"]
+    # 写穿：已缓存的会话追加后无需再读数据库
+    service.add_to_session_context("s1", "assistant", "m5")
+    assert [e["content"] for e in service.get_session_context("s1")] == ["m3", "m4", "m5"]
+    assert reads == ["s1"]
+    # 数据库中旧条目已被裁剪
+    assert len(service.repository.get_context_entries("s1", 100)) == KEEP
+
+    assert service.clear_session_context("s1")
+    assert service.get_session_context("s1") == []
+    assert reads == ["s1", "s1"]  # 第二次来自上面直接查询仓库；清空后缓存为空列表，不再读库
+
+
+def test_stale_load_does_not_overwrite_concurrent_append(monkeypatch, memory_db) -> None:
+    service, _ = _service(monkeypatch, memory_db)
+    service.add_to_session_context("s1", "user", "m0")
+    repository = service.repository
+    original = repository.get_context_entries
+
+    def racing_get(session_id: str, limit: int):
+        stale = original(session_id, limit)
+        # 读取完成、回填缓存之前，另一个请求追加了一条
+        repository.get_context_entries = original  # type: ignore[method-assign]
+        service.add_to_session_context(session_id, "assistant", "m1")
+        return stale
+
+    repository.get_context_entries = racing_get  # type: ignore[method-assign]
+
+    assert [e["content"] for e in service.get_session_context("s1")] == ["m0"]
+    assert [e["content"] for e in service.get_session_context("s1")] == ["m0", "m1"]
+
+
+def test_chat_summaries_count_messages_in_one_query(monkeypatch, memory_db) -> None:
+    service, _ = _service(monkeypatch, memory_db)
+    service.add_message("a", "user", "你好")
+    service.add_message("a", "assistant", "你好！")
+    service.create_chat("b", chat_type="general")
+
+    summaries = {s["session_id"]: s["message_count"] for s in service.get_chat_summaries()}
+
+    assert summaries == {"a": 2, "b": 0}
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from lifetrace.llm.context_packer import ContextPacker, TokenCounter, approximate_token_count
+
+# CJK 字符 1 token/字，英文单词约 1.3 token/词（四舍五入）
+CJK_TOKENS = 4
+ASCII_TOKENS = 3
+PER_RECORD_MAX_TOKENS = 20
+
+
+def test_approximate_token_count_handles_mixed_text() -> None:
+    assert approximate_token_count("你好世界") == CJK_TOKENS
+    assert approximate_token_count("hello world") == ASCII_TOKENS
+    assert approximate_token_count("") == 0
+
+
+def test_pack_prefers_relevance_per_token_within_budget() -> None:
+    counter = TokenCounter(tokenizer="approx")
+    packer = ContextPacker(counter, per_record_max_tokens=200)
+    records = [
+        {"id": 1, "ocr_text": "长文本" * 60, "relevance_score": 0.6},
+        {"id": 2, "ocr_text": "会议纪要：周五提交方案", "relevance_score": 0.5},
+        {"id": 3, "ocr_text": "代码评审 review notes", "relevance_score": 0.4},
+    ]
+
+    packed, report = packer.pack(records, budget_tokens=100)
+
+    assert [item.record["id"] for item in packed] == [2, 3]
+    assert report.over_budget == 1
+    assert report.used_tokens <= report.budget_tokens
+    assert report.formatted == 0
+
+
+def test_pack_drops_near_duplicate_ocr_blocks() -> None:
+    counter = TokenCounter(tokenizer="approx")
+    packer = ContextPacker(counter, dedupe_similarity=0.8)
+    text = "项目周会 讨论上线时间 负责人张三 明天下午三点"
+    records = [
+        {"id": 1, "ocr_text": text, "relevance_score": 0.9},
+        {"id": 2, "ocr_text": text + "。", "relevance_score": 0.8},
+    ]
+
+    packed, report = packer.pack(records, budget_tokens=1000)
+
+    assert [item.record["id"] for item in packed] == [1]
+    assert report.deduplicated == 1
+
+
+def test_pack_truncates_only_selected_long_records() -> None:
+    counter = TokenCounter(tokenizer="approx")
+    packer = ContextPacker(counter, per_record_max_tokens=PER_RECORD_MAX_TOKENS)
+    short_text = "会议纪要：周五提交方案"
+    records = [
+        {"id": 1, "ocr_text": "长文本" * 60, "relevance_score": 0.9},
+        {"id": 2, "ocr_text": short_text, "relevance_score": 0.5},
+    ]
+
+    packed, _ = packer.pack(records, budget_tokens=1000)
+
+    long_packed, short_packed = packed
+    assert long_packed.text.endswith("...")
+    assert approximate_token_count(long_packed.text[:-3]) <= PER_RECORD_MAX_TOKENS
+    assert short_packed.text == short_text
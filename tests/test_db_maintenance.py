@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from sqlalchemy import create_engine, text
+
+from lifetrace.jobs import db_maintenance
+from lifetrace.jobs.db_maintenance import AUTO_VACUUM_INCREMENTAL, DatabaseMaintenanceService
+from lifetrace.storage.schema_manager import SchemaState
+
+ROWS = 2000
+KEEP = 100
+IDLE = 10_000.0
+PAGES_PER_STEP = 8
+
+
+def _insert_and_delete(engine) -> None:
+    """写入一批行后删除其中大部分，留下空闲页"""
+    with engine.begin() as conn:
+        conn.execute(
+            text("INSERT INTO blob_rows (data) VALUES (:data)"),
+            [{"data": "x" * 500} for _ in range(ROWS)],
+        )
+        conn.execute(text("DELETE FROM blob_rows WHERE id > :keep"), {"keep": KEEP})
+
+
+def _fragmented_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'maint.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE blob_rows (id INTEGER PRIMARY KEY, data TEXT)"))
+    _insert_and_delete(engine)
+    return engine
+
+
+def _service(engine, monkeypatch, idle: float = IDLE) -> DatabaseMaintenanceService:
+    monkeypatch.setattr(db_maintenance, "get_idle_seconds", lambda: idle)
+    return DatabaseMaintenanceService(engine, SchemaState(engine))
+
+
+def test_maintenance_reclaims_space_and_records_metrics(tmp_path, monkeypatch) -> None:
+    engine = _fragmented_engine(tmp_path)
+    service = _service(engine, monkeypatch)
+
+    report = service.execute()
+
+    assert report["before"]["freelist_count"] > 0
+    assert report["after"]["freelist_count"] == 0
+    assert report["after"]["file_size_bytes"] < report["before"]["file_size_bytes"]
+    assert report["after"]["auto_vacuum"] == AUTO_VACUUM_INCREMENTAL
+    assert report["operations"]["optimize"]["statement"] == "ANALYZE"
+    assert "skipped" in report["operations"]["wal_checkpoint"]
+    assert service.due_operations() == []
+    assert service.execute() == {"skipped": "nothing_due"}
+
+    # 已切换为增量模式后，再次大量删除只需 incremental_vacuum
+    _insert_and_delete(engine)
+    report = service.execute(force=True)
+    assert report["operations"]["incremental_vacuum"]["mode"] == "incremental"
+    assert report["after"]["freelist_count"] == 0
+    assert service.status()["last_report"]["operations"]["optimize"]["statement"] == (
+        "PRAGMA optimize"
+    )
+
+
+def test_maintenance_waits_for_idle_and_respects_deadline(tmp_path, monkeypatch) -> None:
+    engine = _fragmented_engine(tmp_path)
+    service = _service(engine, monkeypatch, idle=0.0)
+
+    assert service.execute()["skipped"] == "not_idle"
+
+    service.max_duration = 0
+    report = service.execute(force=True)
+
+    assert {op["status"] for op in report["operations"].values()} == {"deferred"}
+    assert report["after"]["freelist_count"] == report["before"]["freelist_count"]
+    assert len(service.due_operations()) == len(db_maintenance.OPERATIONS)
+
+
+def test_incremental_vacuum_step_frees_pages_per_step(tmp_path, monkeypatch) -> None:
+    engine = _fragmented_engine(tmp_path)
+    service = _service(engine, monkeypatch)
+    service.execute()  # 切换为增量回收模式
+    _insert_and_delete(engine)
+    service.pages_per_step = PAGES_PER_STEP
+
+    with engine.connect() as conn:
+        before = conn.exec_driver_sql("PRAGMA freelist_count").scalar()
+        assert before > PAGES_PER_STEP
+        assert service._incremental_vacuum_step(conn) == before - PAGES_PER_STEP
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import pytest
+
+from lifetrace.util.llm_response_cache import LLMResponseCache, build_cache_key
+
+MAX_ENTRIES = 2
+INPUT_TOKENS = 30
+OUTPUT_TOKENS = 5
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch) -> LLMResponseCache:
+    config = {
+        "enabled": True,
+        "ttl_seconds": 3600,
+        "max_entries": MAX_ENTRIES,
+        "features": ["intent_classification"],
+    }
+    instance = LLMResponseCache(tmp_path / "llm_cache.db")
+    monkeypatch.setattr(instance, "_config", lambda: config)
+    yield instance
+    instance.close()
+
+
+def test_cache_key_depends_on_temperature_and_feature() -> None:
+    base = build_cache_key("qwen-plus", "hello", 0.1, "intent_classification")
+
+    assert base == build_cache_key("qwen-plus", "hello", 0.1, "intent_classification")
+    assert base != build_cache_key("qwen-plus", "hello", 0.3, "intent_classification")
+    assert base != build_cache_key("qwen-plus", "hello", 0.1, "query_parsing")
+
+
+def test_cache_hit_records_tokens_saved(cache: LLMResponseCache) -> None:
+    params = {
+        "feature": "intent_classification",
+        "model": "qwen-plus",
+        "prompt": [{"role": "user", "content": "hi"}],
+        "temperature": 0.1,
+    }
+
+    assert cache.get(**params) is None
+    cache.set(
+        **params,
+        response='{"intent_type": "general_chat"}',
+        input_tokens=INPUT_TOKENS,
+        output_tokens=OUTPUT_TOKENS,
+    )
+    assert cache.get(**params) == '{"intent_type": "general_chat"}'
+
+    stats = cache.get_stats(days=1)
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["tokens_saved"] == INPUT_TOKENS + OUTPUT_TOKENS
+
+
+def test_cache_disabled_feature_is_bypassed(cache: LLMResponseCache) -> None:
+    cache.set(
+        feature="event_summary",
+        model="qwen-plus",
+        prompt="text",
+        temperature=0.3,
+        response="summary",
+    )
+
+    assert (
+        cache.get(feature="event_summary", model="qwen-plus", prompt="text", temperature=0.3)
+        is None
+    )
+    assert cache.get_stats(days=1)["entries"] == 0
+
+
+def test_cache_evicts_least_recently_used(cache: LLMResponseCache) -> None:
+    for index in range(MAX_ENTRIES + 1):
+        cache.set(
+            feature="intent_classification",
+            model="qwen-plus",
+            prompt=f"query-{index}",
+            temperature=0.1,
+            response=f"result-{index}",
+        )
+
+    assert cache.evict() == 1
+    assert cache.get_stats(days=1)["entries"] == MAX_ENTRIES
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from lifetrace.util import log_reader
+from lifetrace.util.log_reader import (
+    LogFilter,
+    read_entries_after,
+    read_entries_before,
+    tail_text,
+)
+
+LINES = [
+    "2026-01-01 10:00:00.000 | INFO | a.py:1 | started",
+    "2026-01-01 10:00:01.000 | ERROR | a.py:2 | boom",
+    "Traceback (most recent call last):",
+    '  File "a.py", line 2',
+    "2026-01-01 10:00:02.000 | DEBUG | a.py:3 | detail",
+    "2026-01-01 10:00:03.000 | WARNING | a.py:4 | slow request",
+]
+
+
+def _write_log(tmp_path, monkeypatch):
+    # 使用很小的块，覆盖跨块拼接
+    monkeypatch.setattr(log_reader, "BLOCK_SIZE", 16)
+    path = tmp_path / "app.log"
+    path.write_text("\n".join(LINES) + "\n", encoding="utf-8")
+    return path
+
+
+def test_tail_and_backward_pagination(tmp_path, monkeypatch) -> None:
+    path = _write_log(tmp_path, monkeypatch)
+
+    assert tail_text(path, 2) == "\n".join(LINES[-2:]) + "\n"
+
+    page = read_entries_before(path, limit=2)
+    assert [entry["level"] for entry in page["entries"]] == ["DEBUG", "WARNING"]
+    assert page["has_more"] is True
+
+    older = read_entries_before(path, before=page["prev_cursor"], limit=10)
+    assert [entry["level"] for entry in older["entries"]] == ["INFO", "ERROR"]
+    assert older["entries"][1]["text"].endswith('  File "a.py", line 2')
+    assert older["has_more"] is False
+
+
+def test_forward_pagination_with_filters(tmp_path, monkeypatch) -> None:
+    path = _write_log(tmp_path, monkeypatch)
+
+    first = read_entries_after(path, 0, limit=1)
+    assert [entry["level"] for entry in first["entries"]] == ["INFO"]
+    rest = read_entries_after(path, first["next_cursor"], limit=10)
+    assert [entry["level"] for entry in rest["entries"]] == ["ERROR", "DEBUG", "WARNING"]
+    assert rest["next_cursor"] == path.stat().st_size
+
+    warnings = read_entries_after(path, 0, log_filter=LogFilter(level="warning"))
+    assert [entry["level"] for entry in warnings["entries"]] == ["ERROR", "WARNING"]
+    keyword = read_entries_before(path, log_filter=LogFilter(keyword="TRACEBACK"))
+    assert [entry["level"] for entry in keyword["entries"]] == ["ERROR"]
+
+
+def test_forward_read_skips_partial_last_line(tmp_path, monkeypatch) -> None:
+    path = _write_log(tmp_path, monkeypatch)
+    size = path.stat().st_size
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("2026-01-01 10:00:04.000 | INFO | a.py:5 | half")
+
+    result = read_entries_after(path, size)
+
+    assert result["entries"] == []
+    assert result["next_cursor"] == size
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from datetime import UTC, datetime, timedelta
+
+from lifetrace.storage.notification_storage import NotificationStore
+from lifetrace.util.time_utils import get_utc_now
+
+MAX_ENTRIES = 3
+
+
+def _notification(notification_id: str, minutes_ago: float) -> dict:
+    timestamp = get_utc_now() - timedelta(minutes=minutes_ago)
+    return {"id": notification_id, "title": "t", "content": "c", "timestamp": timestamp.isoformat()}
+
+
+def test_store_indexes_evicts_and_restores_from_database(memory_db) -> None:
+    store = NotificationStore(memory_db.get_session, max_entries=MAX_ENTRIES, ttl_hours=1)
+    reminder_at = datetime(2030, 1, 1, 9, 0, tzinfo=UTC)
+
+    assert store.add(_notification("expired", minutes_ago=120))
+    for i in range(4):
+        assert store.add({**_notification(f"n{i}", minutes_ago=10 - i), "todo_id": i % 2})
+    assert not store.add(_notification("n3", minutes_ago=0))  # 去重
+    store.add(
+        {**_notification("r", minutes_ago=0), "todo_id": 7, "reminder_at": reminder_at.isoformat()}
+    )
+
+    # 过期通知与超出容量的最旧通知被淘汰，列表按时间倒序
+    assert [n["id"] for n in store.list_notifications()] == ["r", "n3", "n2"]
+    assert [n["id"] for n in store.by_todo(1)] == ["n3"]
+    assert store.by_todo(0) == [store.get("n2")]
+
+    assert store.remove("r")
+    assert store.is_dismissed(7, reminder_at)
+
+    # 重启后从数据库恢复通知与已取消标记
+    restored = NotificationStore(memory_db.get_session, max_entries=MAX_ENTRIES, ttl_hours=1)
+    assert [n["id"] for n in restored.list_notifications()] == ["n3", "n2"]
+    assert restored.by_todo(1)[0]["todo_id"] == 1
+    assert restored.is_dismissed(7, reminder_at)
+    assert restored.clear_dismissed(7)
+    assert not NotificationStore(memory_db.get_session).is_dismissed(7, reminder_at)
+
+
+def test_subscribers_are_woken_by_writes_from_other_threads(memory_db) -> None:
+    store = NotificationStore(memory_db.get_session)
+
+    async def _wait_for_change() -> int:
+        with store.subscribe() as changed:
+            version = store.version
+            writer = threading.Thread(target=store.add, args=(_notification("x", 0),))
+            writer.start()
+            await asyncio.wait_for(changed.wait(), timeout=2)
+            writer.join()
+            return store.version - version
+
+    assert asyncio.run(_wait_for_change()) >= 1
+    assert store.count() == 1
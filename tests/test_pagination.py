@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+
+from lifetrace.storage import event_queries
+from lifetrace.storage.models import Event, Screenshot
+from lifetrace.storage.pagination import (
+    EVENT_KEYSET,
+    TODO_KEYSET,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+)
+
+if TYPE_CHECKING:
+    from tests.conftest import MemoryDatabase
+
+EVENTS = 23
+PAGE = 5
+# 每 GROUP 个事件共用一个开始时间；事件 i 有 i % GROUP 张截图
+GROUP = 3
+
+
+def _seed(db: MemoryDatabase) -> None:
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    with db.get_session() as session:
+        for i in range(1, EVENTS + 1):
+            # 同组事件开始时间相同，翻页必须靠 id 决胜
+            session.add(
+                Event(id=i, app_name="app", start_time=start + timedelta(minutes=i // GROUP))
+            )
+            for n in range(i % GROUP):
+                session.add(
+                    Screenshot(
+                        file_path=f"/tmp/{i}-{n}.png",
+                        file_hash=f"{i}-{n}",
+                        file_size=0,
+                        width=0,
+                        height=0,
+                        event_id=i,
+                    )
+                )
+
+
+def test_cursor_round_trip_and_rejects_foreign_or_garbage_cursors() -> None:
+    values = [datetime(2024, 5, 1, 8, 30, tzinfo=UTC), 42]
+    cursor = encode_cursor("events", values)
+
+    assert decode_cursor("events", cursor, 2) == values
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("todos", cursor, 2)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("events", "not-a-cursor!", 2)
+    with pytest.raises(InvalidCursorError):
+        TODO_KEYSET.after(cursor)
+
+
+def test_event_pages_cover_all_rows_once_with_grouped_screenshot_stats(memory_db) -> None:
+    _seed(memory_db)
+
+    seen: list[dict] = []
+    cursor = None
+    while True:
+        page = event_queries.list_events(memory_db, limit=PAGE, cursor=cursor)
+        seen.extend(page)
+        cursor = EVENT_KEYSET.next_cursor(page, PAGE)
+        if cursor is None:
+            break
+
+    assert [e["id"] for e in seen] == list(range(EVENTS, 0, -1))
+    by_id = {e["id"]: e for e in seen}
+    assert by_id[5]["screenshot_count"] == 5 % GROUP
+    assert by_id[3]["screenshot_count"] == 0
+    assert by_id[3]["first_screenshot_id"] is None
+    # OFFSET 分页与游标分页顺序一致
+    offset_page = event_queries.list_events(memory_db, limit=PAGE, offset=PAGE)
+    assert [e["id"] for e in offset_page] == [e["id"] for e in seen[PAGE : 2 * PAGE]]
+    assert event_queries.get_events_by_ids(memory_db, [5])[0]["first_screenshot_id"] is not None
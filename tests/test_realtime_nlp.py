@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import asyncio
+
+from lifetrace.services.audio_extraction_service import AudioExtractionService
+from lifetrace.services.realtime_nlp import (
+    RealtimeNlpConfig,
+    RealtimeNlpEngine,
+    TokenBudget,
+)
+
+WINDOW = 60.0
+TOKENS = 100
+
+
+class _FakeExtraction(AudioExtractionService):
+    def __init__(self):
+        super().__init__(llm_client=None)
+        self.calls: list[tuple[str, dict]] = []
+
+    async def extract_todos_and_schedules(self, text, incremental=None, raise_on_error=False):
+        assert raise_on_error  # 失败时需要抛出，批次才能保留重试
+        self.calls.append((text, incremental))
+        todos = [{"title": line, "source_text": line} for line in text.splitlines() if "买" in line]
+        # 模型重复提取了上一轮的待办
+        todos += [{"title": "买牛奶", "source_text": "买牛奶"}]
+        return {"todos": todos, "schedules": [], "summary": f"摘要{len(self.calls)}"}
+
+
+class _FakeAudioService:
+    def __init__(self):
+        self.extraction_service = _FakeExtraction()
+        self.optimize_calls: list[tuple[str, str | None]] = []
+
+    async def optimize_transcription_text(self, text, context=None, raise_on_error=False):
+        assert raise_on_error
+        self.optimize_calls.append((text, context))
+        return text.upper()
+
+
+def test_engine_only_sends_new_sentences_and_merges_by_stable_id() -> None:
+    service = _FakeAudioService()
+    config = RealtimeNlpConfig(context_sentences=1, max_new_sentences=2, tokens_per_minute=0)
+    engine = RealtimeNlpEngine(service, config)
+
+    async def scenario():
+        engine.add_sentence("买牛奶")
+        engine.add_sentence("hello")
+        engine.add_sentence("  ")
+        first = await engine.run_once()
+        engine.add_sentence("买面包")
+        second = await engine.run_once()
+        return first, second, await engine.run_once()
+
+    first, second, third = asyncio.run(scenario())
+
+    assert service.optimize_calls == [("买牛奶\nhello", ""), ("买面包", "hello")]
+    assert [call[1]["summary"] for call in service.extraction_service.calls] == ["（无）", "摘要1"]
+    assert first["text"] == "买牛奶\nHELLO"
+    assert second["text"] == "买牛奶\nHELLO\n买面包"
+    assert second["summary"] == "摘要2"
+    assert [todo["title"] for todo in second["todos"]] == ["买牛奶", "买面包"]
+    assert second["todos"][0]["id"] == first["todos"][0]["id"]
+    assert third is None
+
+
+class _FailingLLMClient:
+    def is_available(self):
+        return True
+
+    def _initialize_client(self):
+        return None
+
+    def _get_client(self):
+        raise RuntimeError("LLM 超时")
+
+
+def test_failed_batch_is_kept_for_retry() -> None:
+    service = _FakeAudioService()
+    working = service.extraction_service
+    # 使用真实的提取服务：默认吞掉异常返回空结果，只有 raise_on_error 时才会抛出
+    service.extraction_service = AudioExtractionService(llm_client=_FailingLLMClient())
+    engine = RealtimeNlpEngine(service, RealtimeNlpConfig(tokens_per_minute=0))
+
+    async def scenario():
+        engine.add_sentence("买牛奶")
+        failed = await engine.run_once()
+        pending = engine.pending_count
+        service.extraction_service = working
+        return failed, pending, await engine.run_once()
+
+    failed, pending, retried = asyncio.run(scenario())
+
+    assert failed is None
+    assert pending == 1
+    assert retried["text"] == "买牛奶"
+    assert [todo["title"] for todo in retried["todos"]] == ["买牛奶"]
+    assert engine.pending_count == 0
+
+
+def test_token_budget_defers_runs_within_window() -> None:
+    now = [0.0]
+    budget = TokenBudget(TOKENS, clock=lambda: now[0])
+
+    assert budget.allows(TOKENS * 2)
+    budget.consume(TOKENS // 2)
+    now[0] = 10.0
+    budget.consume(TOKENS // 2)
+    assert not budget.allows(1)
+    assert budget.seconds_until(TOKENS // 2) == WINDOW - 10.0
+    assert budget.seconds_until(TOKENS) == WINDOW
+
+    now[0] = WINDOW
+    assert budget.allows(TOKENS // 2)
+
+    overrides = {"nlp_tokens_per_minute": "50", "nlp_throttle_seconds": "oops"}
+    config = RealtimeNlpConfig.from_settings(overrides)
+    assert config.tokens_per_minute == TOKENS // 2
+    assert config.throttle_seconds == RealtimeNlpConfig().throttle_seconds
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import TYPE_CHECKING
+
+from lifetrace.storage.event_manager import EventManager
+from lifetrace.storage.models import Event, Screenshot
+from lifetrace.storage.recorder_write_buffer import RecorderWriteBuffer
+from lifetrace.storage.screenshot_manager import ScreenshotManager
+from lifetrace.util.time_utils import get_utc_now
+
+if TYPE_CHECKING:
+    from tests.conftest import MemoryDatabase
+
+SCREENSHOTS = 3
+NEVER_MS = 60_000
+
+
+def _buffer(db: MemoryDatabase, journal_path) -> RecorderWriteBuffer:
+    return RecorderWriteBuffer(
+        db,
+        ScreenshotManager(db),
+        EventManager(db),
+        journal_path=journal_path,
+        flush_interval_ms=NEVER_MS,
+        max_items=100,
+    )
+
+
+def _add(buffer: RecorderWriteBuffer, index: int, app: str, callback=None) -> None:
+    buffer.add_screenshot(
+        f"/shots/{index}.png",
+        f"hash-{index}",
+        100,
+        50,
+        metadata={"screen_id": 1, "app_name": app, "window_title": "w"},
+        timestamp=get_utc_now() + timedelta(seconds=index),
+        on_committed=callback,
+    )
+
+
+def test_buffered_writes_commit_together(tmp_path, monkeypatch, memory_db) -> None:
+    summarized = []
+    monkeypatch.setattr(
+        EventManager, "trigger_event_summary", lambda _self, i: summarized.append(i)
+    )
+    buffer = _buffer(memory_db, tmp_path / "journal.jsonl")
+    committed = []
+    try:
+        for index, app in enumerate(["a", "a", "b"]):
+            _add(buffer, index, app, committed.append)
+        buffer.close_active_event()
+
+        assert len(buffer.pending()) == SCREENSHOTS + 1
+        assert (tmp_path / "journal.jsonl").exists()
+        with memory_db.get_session() as session:
+            assert session.query(Screenshot).count() == 0
+
+        assert buffer.flush() == SCREENSHOTS + 1
+    finally:
+        buffer.close()
+
+    assert buffer.pending() == []
+    assert not (tmp_path / "journal.jsonl").exists()
+    assert [result["event_id"] for result in committed] == [1, 1, 2]
+    assert summarized == [1, 2]
+    with memory_db.get_session() as session:
+        screenshots = session.query(Screenshot).order_by(Screenshot.id).all()
+        assert [s.event_id for s in screenshots] == [1, 1, 2]
+        events = session.query(Event).order_by(Event.id).all()
+        assert all(event.end_time is not None for event in events)
+        assert events[0].status == "processing"
+
+
+def test_journal_replay_after_crash(tmp_path, monkeypatch, memory_db) -> None:
+    monkeypatch.setattr(EventManager, "trigger_event_summary", lambda *_args: None)
+    journal_path = tmp_path / "journal.jsonl"
+    crashed = _buffer(memory_db, journal_path)
+    _add(crashed, 0, "a")
+    _add(crashed, 1, "b")
+    # 模拟崩溃：第一条已提交但日志未清理，最后一行只写了一半
+    crashed.screenshot_mgr.add_screenshot("/shots/0.png", "hash-0", 100, 50)
+    with open(journal_path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 3, "op": "scr')
+    crashed._items.clear()
+
+    recovered = _buffer(memory_db, journal_path)
+    recovered.close()
+
+    assert not journal_path.exists()
+    with memory_db.get_session() as session:
+        paths = [s.file_path for s in session.query(Screenshot).order_by(Screenshot.id)]
+        assert paths == ["/shots/0.png", "/shots/1.png"]
+        assert session.query(Event).count() == 1
+
+
+def test_items_failing_their_single_retry_are_kept_for_the_next_flush(
+    tmp_path, monkeypatch, memory_db
+) -> None:
+    monkeypatch.setattr(EventManager, "trigger_event_summary", lambda *_args: None)
+    journal_path = tmp_path / "journal.jsonl"
+    buffer = _buffer(memory_db, journal_path)
+    original_apply = buffer._apply
+    # 批量写入与随后的逐条重试都遇到锁，下一次 flush 时恢复
+    failures = {"/shots/1.png": 2}
+
+    def flaky_apply(session, item):
+        path = item.payload.get("file_path")
+        if failures.get(path):
+            failures[path] -= 1
+            raise RuntimeError("database is locked")
+        return original_apply(session, item)
+
+    monkeypatch.setattr(buffer, "_apply", flaky_apply)
+    try:
+        for index in range(SCREENSHOTS):
+            _add(buffer, index, "a")
+
+        assert buffer.flush() == SCREENSHOTS - 1
+        assert [item["payload"]["file_path"] for item in buffer.pending()] == ["/shots/1.png"]
+        assert buffer._items[0].attempts == 1
+        assert "/shots/1.png" in journal_path.read_text(encoding="utf-8")
+
+        assert buffer.flush() == 1
+    finally:
+        buffer.close()
+
+    assert not journal_path.exists()
+    with memory_db.get_session() as session:
+        assert session.query(Screenshot).count() == SCREENSHOTS
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+
+from lifetrace.jobs import deadline_reminder
+from lifetrace.storage.models import Todo
+from lifetrace.storage.reminder_manager import ReminderManager
+from lifetrace.util.time_utils import get_utc_now
+
+GRACE_SECONDS = 60
+
+
+def _reminder(todo_id: int, due_minutes: float, schedule_minutes: float, offset: int = 0) -> dict:
+    now = get_utc_now()
+    return {
+        "todo_id": todo_id,
+        "due_at": now + timedelta(minutes=due_minutes),
+        "schedule_time": now + timedelta(minutes=schedule_minutes),
+        "reminder_offset": offset,
+    }
+
+
+def test_manager_pops_due_rows_in_order_and_tracks_next_due(memory_db) -> None:
+    reminders = ReminderManager(memory_db)
+    now = get_utc_now()
+    reminders.replace_all([_reminder(1, -5, 10), _reminder(2, 30, 60), _reminder(3, -1, 5)])
+    soonest = _reminder(2, 20, 50)
+    reminders.replace_for_todo(2, [soonest, _reminder(2, 40, 50)])
+
+    assert reminders.count() == 4  # noqa: PLR2004
+    assert [r["todo_id"] for r in reminders.pop_due(now)] == [1, 3]
+    assert reminders.pop_due(now) == []
+    assert reminders.next_due_at() == soonest["due_at"]
+    assert reminders.delete_for_todo(2) == 2  # noqa: PLR2004
+    assert reminders.next_due_at() is None
+
+
+def test_engine_plans_future_offsets_and_catches_up_missed_reminders(
+    monkeypatch, memory_db
+) -> None:
+    now = get_utc_now()
+    with memory_db.get_session() as session:
+        session.add(
+            Todo(
+                id=1,
+                name="会议",
+                deadline=now + timedelta(minutes=30),
+                reminder_offsets=json.dumps([0, 10, 60, 24 * 60]),
+            )
+        )
+        session.add(Todo(id=2, name="已过期", deadline=now - timedelta(days=1)))
+
+    delivered: list[tuple[int, int]] = []
+    monkeypatch.setattr(deadline_reminder, "todo_mgr", SimpleNamespace(db_base=memory_db))
+    monkeypatch.setattr(deadline_reminder, "reminder_mgr", ReminderManager(memory_db))
+    monkeypatch.setattr(deadline_reminder, "get_scheduler_manager", lambda: None)
+    monkeypatch.setattr(deadline_reminder, "is_notification_dismissed", lambda *_: False)
+    monkeypatch.setattr(
+        deadline_reminder,
+        "add_notification",
+        lambda **kw: delivered.append((kw["todo_id"], kw["reminder_offset"])) or True,
+    )
+
+    todo = deadline_reminder._fetch_todos({1})[1]
+    planned = deadline_reminder.plan_todo_reminders(todo, now, GRACE_SECONDS)
+    # 提前 60 分钟、1 天的提醒已错过，只保留未来的两条
+    assert sorted(r["reminder_offset"] for r in planned) == [0, 10]
+
+    # 停机期间错过：待办时间未到的补发，待办已过且超出宽限期的跳过
+    deadline_reminder.reminder_mgr.replace_all(
+        [
+            {**_reminder(1, -30, 30, offset=60), "due_at": todo["deadline"] - timedelta(hours=1)},
+            {**_reminder(2, -60 * 25, -60 * 24), "schedule_time": now - timedelta(days=1)},
+        ]
+    )
+    assert deadline_reminder.run_due_reminders() == 1
+    assert delivered == [(1, 60)]
+    assert deadline_reminder.reminder_mgr.count() == 0
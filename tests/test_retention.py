@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+from lifetrace.core import lazy_services
+from lifetrace.jobs import retention
+from lifetrace.jobs.retention import RetentionEngine, RetentionTier
+from lifetrace.storage.models import ActivityEventRelation, Event, OCRResult, Screenshot
+from lifetrace.util.time_utils import get_utc_now
+
+SCREENSHOT_COUNT = 4
+FILE_SIZE = 10
+
+
+class _FakeVectorService:
+    def __init__(self) -> None:
+        self.deleted: list[str] = []
+
+    def delete_ocr_results(self, ocr_ids: list[int]) -> int:
+        self.deleted += [f"ocr_{i}" for i in ocr_ids]
+        return len(ocr_ids)
+
+    def delete_events(self, event_ids: list[int]) -> int:
+        self.deleted += [f"event_{i}" for i in event_ids]
+        return len(event_ids)
+
+
+def _setup(tmp_path, monkeypatch, db):
+    get_session = db.get_session
+    vector_service = _FakeVectorService()
+    monkeypatch.setattr(retention, "get_session", get_session)
+    monkeypatch.setattr(
+        retention,
+        "settings",
+        SimpleNamespace(get=lambda key, _default=None: key == "vector_db.enabled"),
+    )
+    monkeypatch.setattr(lazy_services, "get_vector_service", lambda: vector_service)
+    monkeypatch.setattr(retention.get_thumbnail_service(), "delete_thumbnails", lambda _id: 0)
+
+    old = get_utc_now() - timedelta(days=10)
+    with get_session() as session:
+        session.add(Event(id=1, app_name="app", start_time=old, end_time=old))
+        session.add(ActivityEventRelation(activity_id=1, event_id=1))
+        for index in range(1, SCREENSHOT_COUNT + 1):
+            path = tmp_path / f"shot_{index}.png"
+            path.write_bytes(b"x" * FILE_SIZE)
+            session.add(
+                Screenshot(
+                    id=index,
+                    file_path=str(path),
+                    file_hash=str(index),
+                    file_size=FILE_SIZE,
+                    width=1,
+                    height=1,
+                    event_id=1,
+                    created_at=old,
+                )
+            )
+            session.add(OCRResult(screenshot_id=index, text_content="text"))
+    return get_session, vector_service
+
+
+def test_keep_one_per_event_then_drop_images(tmp_path, monkeypatch, memory_db) -> None:
+    get_session, _ = _setup(tmp_path, monkeypatch, memory_db)
+    engine = RetentionEngine(batch_size=2)
+
+    report = engine.apply(RetentionTier("thin", "keep_one_per_event", after_days=7))
+
+    assert report.files == SCREENSHOT_COUNT - 1
+    assert report.reclaimed_bytes == (SCREENSHOT_COUNT - 1) * FILE_SIZE
+    assert (tmp_path / "shot_1.png").exists()
+    with get_session() as session:
+        kept = session.query(Screenshot).filter(Screenshot.file_deleted.is_not(True)).all()
+        assert [shot.id for shot in kept] == [1]
+        assert session.query(OCRResult).count() == SCREENSHOT_COUNT
+
+
+def test_delete_all_cascades(tmp_path, monkeypatch, memory_db) -> None:
+    get_session, vector_service = _setup(tmp_path, monkeypatch, memory_db)
+
+    report = RetentionEngine(batch_size=3).apply(RetentionTier("purge", "delete_all", after_days=7))
+
+    assert (report.records, report.ocr_records) == (SCREENSHOT_COUNT,) * 2
+    # 每张截图一条 OCR 文档，外加被删除事件的 event_1 文档
+    assert report.vector_documents == SCREENSHOT_COUNT + 1
+    assert report.events == 1
+    assert vector_service.deleted[-1] == "event_1"
+    with get_session() as session:
+        assert session.query(Screenshot).count() == 0
+        assert session.query(OCRResult).count() == 0
+        assert session.query(Event).count() == 0
+        assert session.query(ActivityEventRelation).count() == 0
+
+
+def test_max_count_keeps_newest(tmp_path, monkeypatch, memory_db) -> None:
+    _setup(tmp_path, monkeypatch, memory_db)
+
+    report = RetentionEngine().apply(RetentionTier("count", "drop_images", max_count=1))
+
+    assert report.files == SCREENSHOT_COUNT - 1
+    assert (tmp_path / f"shot_{SCREENSHOT_COUNT}.png").exists()
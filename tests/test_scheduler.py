@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import sqlite3
+
+from lifetrace.jobs.scheduler import LEGACY_JOBS_TABLE, drop_legacy_jobs_table
+
+
+def test_legacy_jobs_table_is_dropped_once(tmp_path) -> None:
+    db_path = tmp_path / "scheduler.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"CREATE TABLE {LEGACY_JOBS_TABLE} (id TEXT PRIMARY KEY)")
+        conn.execute(f"INSERT INTO {LEGACY_JOBS_TABLE} VALUES ('todo_reminder_1_0')")
+    conn.close()
+
+    assert drop_legacy_jobs_table(f"sqlite:///{db_path}")
+    assert not drop_legacy_jobs_table(f"sqlite:///{db_path}")
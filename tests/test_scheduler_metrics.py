@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from apscheduler.events import (
+    EVENT_JOB_ERROR,
+    EVENT_JOB_EXECUTED,
+    EVENT_JOB_MAX_INSTANCES,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_SUBMITTED,
+    JobExecutionEvent,
+    JobSubmissionEvent,
+)
+
+from lifetrace.jobs.scheduler_metrics import SchedulerMetrics
+
+SCHEDULED = datetime(2026, 1, 1, 9, 0, tzinfo=UTC)
+LAG_MS = 250.0
+RUN_MS = 1500.0
+
+
+def _at(ms: float) -> datetime:
+    return SCHEDULED + timedelta(milliseconds=ms)
+
+
+def test_metrics_track_lag_run_time_errors_and_misses() -> None:
+    metrics = SchedulerMetrics()
+    second_run = SCHEDULED + timedelta(seconds=10)
+
+    metrics.listener(JobSubmissionEvent(EVENT_JOB_SUBMITTED, "ocr", None, [SCHEDULED]), _at(LAG_MS))
+    metrics.listener(
+        JobExecutionEvent(EVENT_JOB_EXECUTED, "ocr", None, SCHEDULED), _at(LAG_MS + RUN_MS)
+    )
+    # 执行事件先于提交事件到达时不记录耗时，遗留的提交记录在下次执行时清理
+    metrics.listener(
+        JobExecutionEvent(EVENT_JOB_ERROR, "ocr", None, second_run, exception=RuntimeError())
+    )
+    metrics.listener(
+        JobSubmissionEvent(EVENT_JOB_SUBMITTED, "ocr", None, [second_run]), _at(10_000)
+    )
+    metrics.listener(JobExecutionEvent(EVENT_JOB_MISSED, "ocr", None, SCHEDULED), _at(90_000))
+    metrics.listener(JobSubmissionEvent(EVENT_JOB_MAX_INSTANCES, "ocr", None, [SCHEDULED]))
+
+    [ocr] = metrics.snapshot("ocr")
+    assert (ocr["runs"], ocr["errors"], ocr["misses"], ocr["skipped"]) == (2, 1, 1, 1)
+    assert ocr["run"] == {"avg_ms": RUN_MS, "max_ms": RUN_MS, "last_ms": RUN_MS}
+    assert ocr["lag"]["max_ms"] == 90_000  # noqa: PLR2004
+    assert ocr["lag"]["last_ms"] == 90_000  # noqa: PLR2004
+    assert metrics.snapshot("recorder") == []
+
+    metrics.listener(
+        JobExecutionEvent(EVENT_JOB_EXECUTED, "ocr", None, second_run + timedelta(seconds=10))
+    )
+    assert metrics._submitted_at["ocr"] == {}
+    metrics.reset()
+    assert metrics.snapshot() == []
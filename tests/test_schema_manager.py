@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlmodel import SQLModel, create_engine
+
+from lifetrace.storage import schema_manager
+from lifetrace.storage.schema_manager import (
+    PERFORMANCE_INDEXES,
+    IndexBuilder,
+    SchemaState,
+    compute_index_fingerprint,
+    compute_schema_fingerprint,
+    plan_missing_indexes,
+)
+
+
+def _engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    SQLModel.metadata.create_all(engine)
+    return engine
+
+
+def test_fingerprints_are_stable() -> None:
+    fingerprint = compute_schema_fingerprint()
+
+    assert compute_schema_fingerprint() == fingerprint
+    assert compute_index_fingerprint(fingerprint) != compute_index_fingerprint("other")
+
+
+def test_builds_missing_indexes_and_records_fingerprint(tmp_path) -> None:
+    engine = _engine(tmp_path)
+    builder = IndexBuilder(engine, SchemaState(engine), "schema")
+    assert builder.is_up_to_date() is False
+
+    status = builder.run()
+
+    assert status["state"] == "done"
+    assert status["up_to_date"] is True
+    assert len(status["created"]) + len(status["skipped"]) == len(PERFORMANCE_INDEXES)
+    with engine.connect() as conn:
+        assert plan_missing_indexes(conn)[0] == []
+
+
+def test_background_build_reports_progress(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(schema_manager, "INDEX_BUILD_PAUSE_SECONDS", 0)
+    engine = _engine(tmp_path)
+    state = SchemaState(engine)
+    IndexBuilder(engine, state, "schema").run()
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX idx_todos_status"))
+
+    # 结构变化后指纹不同，需要重新检查
+    builder = IndexBuilder(engine, state, "schema-v2")
+    assert builder.start_background() is True
+    assert builder._thread is not None
+    builder._thread.join(timeout=10)
+
+    status = builder.status()
+    assert status["state"] == "done"
+    assert [item["index"] for item in status["created"]] == ["idx_todos_status"]
+    assert status["completed"] == status["total"] == 1
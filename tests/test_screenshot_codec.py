@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import io
+
+from PIL import Image, ImageChops
+
+from lifetrace.util.screenshot_codec import (
+    encode_screenshot,
+    guess_image_mime_type,
+    list_screenshot_files,
+)
+
+
+def test_webp_lossless_roundtrip_is_pixel_exact() -> None:
+    image = Image.new("RGB", (64, 32), color=(255, 255, 255))
+    image.paste((12, 34, 56), (8, 8, 40, 24))
+
+    data = encode_screenshot(image, "webp_lossless")
+
+    with Image.open(io.BytesIO(data)) as decoded:
+        assert decoded.format == "WEBP"
+        assert ImageChops.difference(decoded.convert("RGB"), image).getbbox() is None
+
+
+def test_mime_type_and_listing_cover_all_formats(tmp_path) -> None:
+    for name in ("a.png", "b.webp", "c.avif", "notes.txt"):
+        (tmp_path / name).write_bytes(b"x")
+
+    assert sorted(path.name for path in list_screenshot_files(tmp_path)) == [
+        "a.png",
+        "b.webp",
+        "c.avif",
+    ]
+    assert guess_image_mime_type("x/b.webp") == "image/webp"
+    assert guess_image_mime_type("x/c.AVIF") == "image/avif"
+    assert guess_image_mime_type("x/unknown") == "image/png"
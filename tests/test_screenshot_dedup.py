@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from lifetrace.storage.screenshot_dedup import (
+    BloomFilter,
+    PerceptualHashIndex,
+    ScreenshotHashIndex,
+)
+
+MAX_FALSE_POSITIVES = 50
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    bloom = BloomFilter(1000)
+    values = [f"{i:032x}" for i in range(1000)]
+    for value in values:
+        bloom.add(value)
+
+    assert all(value in bloom for value in values)
+    false_positives = sum(f"miss-{i}" in bloom for i in range(1000))
+    assert false_positives < MAX_FALSE_POSITIVES
+
+
+def test_hash_index_short_circuits_unknown_hashes() -> None:
+    loads = []
+
+    def loader() -> list[str]:
+        loads.append(1)
+        return ["aaa", "bbb"]
+
+    index = ScreenshotHashIndex(loader, lru_size=1)
+
+    assert index.lookup("aaa") == (None, True)
+    assert index.lookup("zzz") == (None, False)
+    index.add("ccc", 3)
+    assert index.lookup("ccc") == (3, True)
+    index.add("ddd", 4)
+    # LRU 已淘汰，但布隆过滤器仍记得
+    assert index.lookup("ccc") == (None, True)
+    assert len(loads) == 1
+
+
+def test_perceptual_index_finds_near_duplicates_within_window() -> None:
+    index = PerceptualHashIndex(window=4)
+    index.add("ffff0000ffff0000")
+
+    assert index.find_within("ffff0000ffff0001", 5) == 1
+    assert index.find_within("0000ffff0000ffff", 5) is None
+
+    for value in ("0000000000000001", "0000000000000002", "0000000000000004", "0000000000000008"):
+        index.add(value)
+    # 两代滚动后最早的哈希被淘汰
+    assert index.find_within("ffff0000ffff0000", 0) is None
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+
+from PIL import Image
+
+from lifetrace.jobs import screenshot_reconciler
+from lifetrace.jobs.screenshot_reconciler import ScreenshotReconciler
+
+
+class _FakeScreenshotManager:
+    def __init__(self, known: set[str]) -> None:
+        self.known = known
+        self.added: list[str] = []
+
+    def get_all_file_paths(self) -> set[str]:
+        return set(self.known)
+
+    def add_screenshot(self, file_path: str, **_kwargs) -> int:
+        self.added.append(file_path)
+        self.known.add(file_path)
+        return len(self.added)
+
+
+def _make_screenshots(directory, names, age_seconds: float = 3600) -> None:
+    mtime = time.time() - age_seconds
+    for name in names:
+        Image.new("RGB", (8, 8)).save(directory / name)
+        os.utime(directory / name, (mtime, mtime))
+
+
+def test_registers_unknown_files_and_skips_transcode_leftovers(tmp_path, monkeypatch) -> None:
+    shots = tmp_path / "screenshots"
+    shots.mkdir()
+    _make_screenshots(shots, ["screen_0_a.png", "screen_1_b.png", "screen_1_b.webp"])
+    manager = _FakeScreenshotManager({str(shots / "screen_0_a.png")})
+    monkeypatch.setattr(screenshot_reconciler, "screenshot_mgr", manager)
+    reconciler = ScreenshotReconciler(shots, tmp_path / "state.json")
+
+    stats = reconciler.run()
+
+    assert stats["registered"] == 1
+    assert manager.added == [str(shots / "screen_1_b.webp")]
+    state = json.loads((tmp_path / "state.json").read_text(encoding="utf-8"))
+    assert "pending" not in state
+    # 水位线之前的文件不再被检查
+    assert reconciler.run()["candidates"] == 0
+
+
+def test_resumes_after_cursor(tmp_path, monkeypatch) -> None:
+    shots = tmp_path / "screenshots"
+    shots.mkdir()
+    _make_screenshots(shots, ["screen_0_a.png", "screen_0_b.png", "screen_0_c.png"])
+    manager = _FakeScreenshotManager(set())
+    monkeypatch.setattr(screenshot_reconciler, "screenshot_mgr", manager)
+    state_path = tmp_path / "state.json"
+    state_path.write_text(
+        json.dumps(
+            {
+                "screenshots_dir": str(shots),
+                "pending": {"scan_started": 0.0, "watermark": 0.0, "cursor": "screen_0_a.png"},
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    stats = ScreenshotReconciler(shots, state_path).run()
+
+    assert stats["resumed"] is True
+    assert [path.rsplit("/", 1)[-1] for path in manager.added] == [
+        "screen_0_b.png",
+        "screen_0_c.png",
+    ]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from PIL import Image
+
+from lifetrace.jobs import screenshot_transcoder
+from lifetrace.jobs.screenshot_transcoder import ScreenshotTranscoder
+from lifetrace.storage.models import Screenshot
+
+BATCH_SIZE = 2
+SCREENSHOTS = 4
+
+
+def test_broken_pngs_at_head_of_queue_do_not_block_later_batches(
+    tmp_path, monkeypatch, memory_db
+) -> None:
+    hash_index = SimpleNamespace(discard=lambda _hash: None, add=lambda _hash, _id: None)
+    monkeypatch.setattr(screenshot_transcoder, "get_session", memory_db.get_session)
+    monkeypatch.setattr(
+        screenshot_transcoder, "screenshot_mgr", SimpleNamespace(hash_index=hash_index)
+    )
+    monkeypatch.setattr(screenshot_transcoder, "get_screenshot_codec", lambda: "webp")
+
+    with memory_db.get_session() as session:
+        for index in range(1, SCREENSHOTS + 1):
+            path = tmp_path / f"shot_{index}.png"
+            if index <= BATCH_SIZE:
+                path.write_bytes(b"not a png")  # 损坏的截图排在队首
+            else:
+                Image.new("RGB", (8, 8), "white").save(path)
+            session.add(
+                Screenshot(
+                    id=index,
+                    file_path=str(path),
+                    file_hash=str(index),
+                    file_size=path.stat().st_size,
+                    width=8,
+                    height=8,
+                )
+            )
+
+    transcoder = ScreenshotTranscoder()
+    transcoder.batch_size = BATCH_SIZE
+    transcoder._leftovers_checked = True
+
+    assert transcoder.execute()["skipped"] == BATCH_SIZE
+    assert transcoder.execute()["transcoded"] == SCREENSHOTS - BATCH_SIZE
+    with memory_db.get_session() as session:
+        paths = {s.id: s.file_path for s in session.query(Screenshot).all()}
+    assert paths[SCREENSHOTS].endswith(".webp")
+    assert paths[1].endswith(".png")
+
+    # 扫描到末尾后游标归零，下一轮从头重试损坏的记录
+    assert transcoder.execute() == {
+        "codec": "webp",
+        "transcoded": 0,
+        "skipped": 0,
+        "saved_bytes": 0,
+    }
+    assert transcoder.execute()["skipped"] == BATCH_SIZE
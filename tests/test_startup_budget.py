@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+HTTP_OK = 200
+
+# 冷启动到 /health 首次响应的时间预算（秒），较慢的机器可通过环境变量放宽
+STARTUP_BUDGET_SECONDS = float(os.environ.get("LIFETRACE_STARTUP_BUDGET_SEC", "10"))
+
+# 墙钟时间断言在负载较高的 CI 上不稳定，默认跳过；设置 LIFETRACE_PERF_TESTS=1 时运行
+pytestmark = pytest.mark.skipif(
+    os.environ.get("LIFETRACE_PERF_TESTS") != "1",
+    reason="性能测试，设置 LIFETRACE_PERF_TESTS=1 运行",
+)
+
+_PROBE = """
+import json
+from fastapi.testclient import TestClient
+from lifetrace.server import app
+from lifetrace.util.import_profiler import get_import_profiler
+
+response = TestClient(app).get("/health")
+profiler = get_import_profiler()
+print(json.dumps({
+    "status": response.status_code,
+    "app": response.json().get("app"),
+    "report": profiler.format_report(15) if profiler.installed else "",
+}))
+"""
+
+
+def test_time_to_first_health_response_within_budget(tmp_path) -> None:
+    env = {**os.environ, "LIFETRACE_DATA_DIR": str(tmp_path), "LIFETRACE_PROFILE_IMPORTS": "1"}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=STARTUP_BUDGET_SECONDS * 3,
+        check=False,
+    )
+    elapsed = time.perf_counter() - start
+
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert result["status"] == HTTP_OK
+    assert result["app"] == "lifetrace"
+    assert elapsed <= STARTUP_BUDGET_SECONDS, (
+        f"冷启动到 /health 响应耗时 {elapsed:.1f}s，超出预算 {STARTUP_BUDGET_SECONDS:.0f}s\n"
+        f"{result['report']}"
+    )
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from PIL import Image
+
+from lifetrace.services.thumbnail_service import ThumbnailService
+
+SIZES = {"small": 100, "large": 400}
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch) -> ThumbnailService:
+    instance = ThumbnailService(tmp_path / "thumbs")
+    config = {"sizes": SIZES, "quality": 70, "cache_max_mb": 10}
+    monkeypatch.setattr(instance, "_config", lambda: config)
+    return instance
+
+
+def _screenshot(tmp_path, screenshot_id: int) -> dict:
+    path = tmp_path / f"shot_{screenshot_id}.png"
+    Image.new("RGB", (1600, 900), color=(10, 20, 30)).save(path)
+    return {"id": screenshot_id, "file_path": str(path), "file_hash": "abcdef0123456789ff"}
+
+
+def test_thumbnail_is_generated_once_in_sharded_dir(service, tmp_path) -> None:
+    screenshot = _screenshot(tmp_path, 300)
+
+    path = service.get_thumbnail(screenshot, "small")
+
+    assert path == tmp_path / "thumbs" / "2c" / "300_small.webp"
+    with Image.open(path) as thumb:
+        assert thumb.format == "WEBP"
+        assert thumb.size == (100, 56)
+    mtime = path.stat().st_mtime_ns
+    assert service.get_thumbnail(screenshot, "small") == path
+    assert path.stat().st_mtime_ns >= mtime
+    assert service.compute_etag(screenshot, "small") == '"abcdef0123456789-small100-q70"'
+
+
+def test_unknown_size_is_rejected(service, tmp_path) -> None:
+    with pytest.raises(ValueError):
+        service.get_thumbnail(_screenshot(tmp_path, 1), "huge")
+
+
+def test_sprite_places_cells_on_grid_and_skips_missing(service, tmp_path) -> None:
+    screenshots = [
+        _screenshot(tmp_path, 1),
+        {"id": 2, "file_path": None},
+        _screenshot(tmp_path, 3),
+    ]
+
+    data, cells = service.build_sprite(screenshots, "small", columns=2)
+
+    assert [(cell.screenshot_id, cell.x, cell.y) for cell in cells] == [(1, 0, 0), (3, 0, 100)]
+    with Image.open(io.BytesIO(data)) as sprite:
+        assert sprite.size == (200, 200)
+
+
+def test_sprite_exceeding_webp_limit_is_rejected(service) -> None:
+    # large 为 400px，41 列即超过 16383px
+    screenshots = [{"id": i, "file_path": None} for i in range(41)]
+
+    with pytest.raises(ValueError, match="WebP"):
+        service.build_sprite(screenshots, "large", columns=41)
+
+
+def test_generate_all_and_delete(service, tmp_path) -> None:
+    screenshot = _screenshot(tmp_path, 7)
+
+    assert service.generate_all(screenshot) == len(SIZES)
+    assert service.generate_all(screenshot) == 0
+    assert service.delete_thumbnails(7) == len(SIZES)
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from sqlmodel import Session
+
+from lifetrace.storage.models import TokenUsage, TokenUsageDaily
+from lifetrace.util import token_usage_logger
+from lifetrace.util.time_utils import get_utc_now
+from lifetrace.util.token_usage_logger import TokenUsageLogger
+from lifetrace.util.token_usage_stats import query_usage_stats, write_usage_batch
+
+BATCH_SIZE = 3
+OLD_DAYS = 10
+
+
+def _row(model: str, created_at, feature_type: str | None = "chat") -> dict:
+    return {
+        "model": model,
+        "input_tokens": 100,
+        "output_tokens": 10,
+        "total_tokens": 110,
+        "endpoint": None,
+        "feature_type": feature_type,
+        "input_cost": 0.1,
+        "output_cost": 0.2,
+        "total_cost": 0.3,
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def test_rollups_and_sql_aggregation(memory_db) -> None:
+    engine = memory_db.engine
+    now = get_utc_now()
+    old = now - timedelta(days=OLD_DAYS)
+    with Session(engine) as session:
+        write_usage_batch(session, [_row("a", now), _row("a", now), _row("b", now, None)])
+        write_usage_batch(session, [_row("a", now), _row("a", old)])
+        session.commit()
+
+        assert session.query(TokenUsage).count() == BATCH_SIZE + 2
+        rollup = session.query(TokenUsageDaily).filter_by(model="a", feature_type="chat").all()
+        assert sorted(row.requests for row in rollup) == [1, BATCH_SIZE]
+
+        stats = query_usage_stats(session, days=OLD_DAYS - 1)
+
+    assert stats["total_requests"] == BATCH_SIZE + 1
+    assert stats["model_stats"]["a"]["requests"] == BATCH_SIZE
+    assert stats["feature_stats"]["unknown"]["requests"] == 1
+    assert list(stats["endpoint_stats"]) == ["unknown"]
+    assert stats["daily_stats"][now.strftime("%Y-%m-%d")]["total_tokens"] == 110 * 4
+
+
+def test_logger_buffers_until_batch_size(monkeypatch, memory_db) -> None:
+    get_session = memory_db.get_session
+    monkeypatch.setattr(token_usage_logger, "get_session", get_session)
+    monkeypatch.setattr(TokenUsageLogger, "get_model_price", lambda *_args: (0.001, 0.002))
+    usage_logger = TokenUsageLogger(flush_interval=60, batch_size=100)
+    try:
+        for _ in range(BATCH_SIZE):
+            usage_logger.log_token_usage("m", 1000, 500, metadata={"feature_type": "chat"})
+
+        with get_session() as session:
+            assert session.query(TokenUsage).count() == 0
+
+        assert usage_logger.flush() == BATCH_SIZE
+        with get_session() as session:
+            daily = session.query(TokenUsageDaily).one()
+            assert daily.requests == BATCH_SIZE
+            assert round(daily.total_cost, 6) == round(BATCH_SIZE * 0.002, 6)
+    finally:
+        usage_logger.close()
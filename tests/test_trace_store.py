@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+import os
+
+from lifetrace.observability.trace_store import TraceStore
+
+TRACE_COUNT = 5
+
+
+def _trace(index: int, status: str = "success") -> dict:
+    return {
+        "trace_id": f"t{index}",
+        "duration_ms": 10,
+        "tool_calls": [{"name": "search"}],
+        "llm_calls": [],
+        "status": status,
+    }
+
+
+def test_append_only_session_with_summary_and_pagination(tmp_path) -> None:
+    store = TraceStore(tmp_path)
+    store.append_session_traces("abc", [_trace(i) for i in range(3)])
+    filepath = store.append_session_traces("abc", [_trace(3), _trace(4, status="error")])
+
+    assert filepath.suffix == ".jsonl"
+    assert len(filepath.read_text(encoding="utf-8").splitlines()) == TRACE_COUNT
+
+    listing = store.list_sessions()
+    assert listing["total"] == 1
+    summary = listing["sessions"][0]["summary"]
+    assert summary["trace_count"] == TRACE_COUNT
+    assert summary["tool_count"] == TRACE_COUNT
+    assert summary["status"] == "error"
+
+    page = store.read_session_traces("abc", offset=2, limit=2)
+    assert [trace["trace_id"] for trace in page] == ["t2", "t3"]
+
+
+def test_reads_legacy_session_json(tmp_path) -> None:
+    legacy = {"session_id": "old", "traces": [_trace(1)], "summary": {"trace_count": 1}}
+    (tmp_path / "session_old_20260101_000000.json").write_text(json.dumps(legacy))
+
+    store = TraceStore(tmp_path)
+
+    assert [trace["trace_id"] for trace in store.iter_session_traces("old")] == ["t1"]
+    assert store.list_sessions()["sessions"][0]["summary"] == {"trace_count": 1}
+
+
+def test_cleanup_removes_oldest_sessions_with_summary(tmp_path) -> None:
+    store = TraceStore(tmp_path)
+    old = store.append_session_traces("old", [_trace(1)])
+    os.utime(old, (0, 0))
+    store.append_session_traces("new", [_trace(2)])
+
+    assert store.cleanup(max_files=1) == 1
+    assert sorted(path.name.split("_")[1] for path in tmp_path.iterdir()) == ["new", "new"]
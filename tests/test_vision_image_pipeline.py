@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import io
+
+from PIL import Image
+
+from lifetrace.util.vision_image_pipeline import (
+    VisionImageOptions,
+    VisionImagePipeline,
+    encode_image,
+)
+
+
+def _make_pipeline(tmp_path, monkeypatch, config: dict) -> VisionImagePipeline:
+    screenshot_path = tmp_path / "shot.png"
+    Image.new("RGB", (3200, 1800), color=(200, 30, 30)).save(screenshot_path)
+    lookups = {
+        1: {"file_path": str(screenshot_path), "app_name": "code", "window_title": "x"},
+        2: {"file_path": str(tmp_path / "missing.png")},
+    }
+    pipeline = VisionImagePipeline(tmp_path / "cache", lookup=lookups.get)
+    monkeypatch.setattr(pipeline, "_config", lambda: config)
+    return pipeline
+
+
+def test_encode_image_downscales_to_max_dimension() -> None:
+    image = Image.new("RGB", (4000, 1000), color=(0, 0, 0))
+    data = encode_image(image, VisionImageOptions(max_dimension=800, format="jpeg", quality=70))
+
+    with Image.open(io.BytesIO(data)) as encoded:
+        assert encoded.format == "JPEG"
+        assert encoded.size == (800, 200)
+
+
+def test_prepare_caches_payload_on_disk(tmp_path, monkeypatch) -> None:
+    pipeline = _make_pipeline(
+        tmp_path, monkeypatch, {"max_dimension": 1024, "format": "webp", "quality": 60}
+    )
+
+    first = pipeline.prepare(1)
+    second = pipeline.prepare(1)
+
+    assert first is not None and second is not None
+    assert first.data_uri.startswith("data:image/webp;base64,")
+    assert not first.cached
+    assert second.cached
+    assert second.data_uri == first.data_uri
+    assert first.payload_bytes < first.original_bytes
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+
+def test_prepare_many_keeps_order_and_reports_missing(tmp_path, monkeypatch) -> None:
+    pipeline = _make_pipeline(tmp_path, monkeypatch, {"format": "jpeg", "max_workers": 4})
+
+    results = pipeline.prepare_many([1, 2, 3, 1])
+
+    assert [result is not None for result in results] == [True, False, False, True]
+    assert results[0].screenshot_id == 1